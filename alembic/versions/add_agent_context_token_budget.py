@@ -0,0 +1,28 @@
+"""Add context_token_budget to ai_agents
+
+Revision ID: agent_context_budget_001
+Revises: worship_type_001
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "agent_context_budget_001"
+down_revision = "worship_type_001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # NULL이면 CHAT_CONTEXT_TOKEN_BUDGET 기본값 사용
+    op.add_column(
+        "ai_agents", sa.Column("context_token_budget", sa.Integer(), nullable=True)
+    )
+
+
+def downgrade():
+    op.drop_column("ai_agents", "context_token_budget")
@@ -0,0 +1,66 @@
+"""Add attendance rollup table
+
+Revision ID: attendance_rollup_001
+Revises: offering_rollup_001
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "attendance_rollup_001"
+down_revision = "offering_rollup_001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "attendance_rollups",
+        sa.Column(
+            "church_id", sa.Integer(), sa.ForeignKey("churches.id"), nullable=False
+        ),
+        sa.Column("service_type", sa.String(), nullable=False),
+        sa.Column("period_type", sa.String(), nullable=False),
+        sa.Column("period_start", sa.Date(), nullable=False),
+        sa.Column("present_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("distinct_members", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()
+        ),
+        sa.PrimaryKeyConstraint(
+            "church_id", "service_type", "period_type", "period_start"
+        ),
+    )
+
+    # 기존 출석 데이터로 초기 적재 (이후 재구축/점검은 scripts/rebuild_attendance_rollups.py)
+    # service_type '*' 는 모든 예배 합계
+    for period_type, period_start in (
+        ("day", "service_date"),
+        ("week", "date_trunc('week', service_date)::date"),
+        ("month", "date_trunc('month', service_date)::date"),
+    ):
+        # GROUP BY 에 상수('*')는 쓸 수 없으므로 묶음 컬럼을 따로 지정
+        for service_type, group_by in (
+            ("service_type", "church_id, service_type"),
+            ("'*'", "church_id"),
+        ):
+            op.execute(
+                f"""
+                INSERT INTO attendance_rollups
+                    (church_id, service_type, period_type, period_start,
+                     present_count, distinct_members)
+                SELECT church_id, {service_type}, '{period_type}', {period_start},
+                       COUNT(*), COUNT(DISTINCT member_id)
+                FROM attendances
+                WHERE present = true
+                GROUP BY {group_by}, {period_start}
+                """
+            )
+
+
+def downgrade():
+    op.drop_table("attendance_rollups")
@@ -0,0 +1,102 @@
+"""Add unique index on attendances (member_id, service_date, service_type)
+
+Revision ID: attendance_unique_001
+Revises: attendance_rollup_001
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "attendance_unique_001"
+down_revision = "attendance_rollup_001"
+branch_labels = None
+depends_on = None
+
+
+BACKUP_TABLE = "attendances_duplicates_backup"
+
+
+def _rebuild_rollups():
+    """rollup 을 attendances 에서 다시 적재"""
+    op.execute("DELETE FROM attendance_rollups")
+    for period_type, period_start in (
+        ("day", "service_date"),
+        ("week", "date_trunc('week', service_date)::date"),
+        ("month", "date_trunc('month', service_date)::date"),
+    ):
+        # GROUP BY 에 상수('*')는 쓸 수 없으므로 묶음 컬럼을 따로 지정
+        for service_type, group_by in (
+            ("service_type", "church_id, service_type"),
+            ("'*'", "church_id"),
+        ):
+            op.execute(
+                f"""
+                INSERT INTO attendance_rollups
+                    (church_id, service_type, period_type, period_start,
+                     present_count, distinct_members)
+                SELECT church_id, {service_type}, '{period_type}', {period_start},
+                       COUNT(*), COUNT(DISTINCT member_id)
+                FROM attendances
+                WHERE present = true
+                GROUP BY {group_by}, {period_start}
+                """
+            )
+
+
+def upgrade():
+    # 기존 중복 출석은 출석(present) 행을 우선, 그다음 먼저 입력된 행을 남기고
+    # 나머지는 삭제 전에 백업 테이블로 복사
+    op.execute(
+        f"""
+        CREATE TABLE {BACKUP_TABLE} AS
+        SELECT a.*
+        FROM attendances a
+        JOIN (
+            SELECT id,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY member_id, service_date, service_type
+                       ORDER BY present DESC NULLS LAST, id
+                   ) AS rank
+            FROM attendances
+        ) ranked ON ranked.id = a.id
+        WHERE ranked.rank > 1
+        """
+    )
+    removed = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                f"DELETE FROM attendances WHERE id IN (SELECT id FROM {BACKUP_TABLE})"
+            )
+        )
+        .rowcount
+    )
+
+    op.create_index(
+        "uq_attendances_member_service",
+        "attendances",
+        ["member_id", "service_date", "service_type"],
+        unique=True,
+    )
+
+    if removed:
+        print(f"Moved {removed} duplicate attendances to {BACKUP_TABLE}")
+        # 삭제된 중복이 집계에 포함되어 있으므로 rollup 재적재
+        _rebuild_rollups()
+    else:
+        op.drop_table(BACKUP_TABLE)
+
+
+def downgrade():
+    op.drop_index("uq_attendances_member_service", table_name="attendances")
+
+    # 백업해 둔 중복 출석 복원
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table(BACKUP_TABLE):
+        op.execute(f"INSERT INTO attendances SELECT * FROM {BACKUP_TABLE}")
+        op.drop_table(BACKUP_TABLE)
+        _rebuild_rollups()
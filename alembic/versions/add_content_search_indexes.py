@@ -0,0 +1,77 @@
+"""Add trigram indexes for content search
+
+Revision ID: content_search_001
+Revises: member_initials_001
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "content_search_001"
+down_revision = "member_initials_001"
+branch_labels = None
+depends_on = None
+
+# (색인 이름, 테이블, 컬럼) - ILIKE '%q%' 와 q <% col (word_similarity) 모두 사용.
+# announcements.title, members.name 색인은 aa06dac1934a 에서 이미 생성됨
+TRIGRAM_INDEXES = [
+    ("idx_announcements_content_trgm", "announcements", "content"),
+    ("idx_prayer_requests_content_trgm", "prayer_requests", "prayer_content"),
+    (
+        "idx_pastoral_care_requests_content_trgm",
+        "pastoral_care_requests",
+        "request_content",
+    ),
+    ("idx_members_name_eng_trgm", "members", "name_eng"),
+]
+
+# 검색이 더 이상 쓰지 않는 english tsvector 색인 (쓰기 비용만 발생)
+FTS_INDEXES = {
+    "idx_announcements_fts": (
+        "announcements",
+        "to_tsvector('english', COALESCE(title, '') || ' ' || COALESCE(content, ''))",
+    ),
+    "idx_prayer_requests_fts": (
+        "prayer_requests",
+        "to_tsvector('english', COALESCE(prayer_content, ''))",
+    ),
+    "idx_pastoral_care_requests_fts": (
+        "pastoral_care_requests",
+        "to_tsvector('english', COALESCE(request_content, ''))",
+    ),
+    "idx_members_name_fts": (
+        "members",
+        "to_tsvector('english', COALESCE(name, '') || ' ' || COALESCE(name_eng, ''))",
+    ),
+}
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column in TRIGRAM_INDEXES:
+        op.create_index(
+            name,
+            table,
+            [column],
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+            if_not_exists=True,
+        )
+    for name in FTS_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for name, (table, expression) in FTS_INDEXES.items():
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING GIN ({expression})"
+        )
+    for name, table, _ in reversed(TRIGRAM_INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,76 @@
+"""Add members.name_initials for indexed choseong search
+
+Revision ID: member_initials_001
+Revises: attendance_unique_001
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.korean import get_initial_consonants
+
+
+# revision identifiers, used by Alembic.
+revision = "member_initials_001"
+down_revision = "attendance_unique_001"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH = 5000
+
+
+def upgrade():
+    op.add_column("members", sa.Column("name_initials", sa.String(), nullable=True))
+
+    # 초성 계산은 앱과 같은 get_initial_consonants 로 (id 순 묶음 단위)
+    bind = op.get_bind()
+    members = sa.table(
+        "members",
+        sa.column("id", sa.Integer),
+        sa.column("name", sa.String),
+        sa.column("name_initials", sa.String),
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(members.c.id, members.c.name)
+            .where(members.c.id > last_id, members.c.name.isnot(None))
+            .order_by(members.c.id)
+            .limit(BACKFILL_BATCH)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            members.update()
+            .where(members.c.id == sa.bindparam("member_id"))
+            .values(name_initials=sa.bindparam("initials")),
+            [
+                {"member_id": row.id, "initials": get_initial_consonants(row.name)}
+                for row in rows
+            ],
+        )
+        last_id = rows[-1].id
+
+    # 접두어 검색 (교회 범위) + 부분/순서 일치 검색 (trigram)
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "idx_members_church_name_initials",
+        "members",
+        ["church_id", "name_initials"],
+        postgresql_ops={"name_initials": "varchar_pattern_ops"},
+    )
+    op.create_index(
+        "idx_members_name_initials_trgm",
+        "members",
+        ["name_initials"],
+        postgresql_using="gin",
+        postgresql_ops={"name_initials": "gin_trgm_ops"},
+    )
+
+
+def downgrade():
+    op.drop_index("idx_members_name_initials_trgm", table_name="members")
+    op.drop_index("idx_members_church_name_initials", table_name="members")
+    op.drop_column("members", "name_initials")
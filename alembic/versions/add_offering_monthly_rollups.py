@@ -0,0 +1,86 @@
+"""Add offering monthly rollup tables
+
+Revision ID: offering_rollup_001
+Revises: agent_context_budget_001
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "offering_rollup_001"
+down_revision = "agent_context_budget_001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "offering_monthly_rollup",
+        sa.Column(
+            "church_id", sa.Integer(), sa.ForeignKey("churches.id"), nullable=False
+        ),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("month", sa.Integer(), nullable=False),
+        sa.Column("fund_type", sa.String(), nullable=False),
+        sa.Column(
+            "total_amount", sa.DECIMAL(15, 2), nullable=False, server_default="0"
+        ),
+        sa.Column("offering_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()
+        ),
+        sa.PrimaryKeyConstraint("church_id", "year", "month", "fund_type"),
+    )
+    op.create_table(
+        "offering_member_monthly_rollup",
+        sa.Column(
+            "church_id", sa.Integer(), sa.ForeignKey("churches.id"), nullable=False
+        ),
+        sa.Column(
+            "member_id", sa.Integer(), sa.ForeignKey("members.id"), nullable=False
+        ),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("month", sa.Integer(), nullable=False),
+        sa.Column("fund_type", sa.String(), nullable=False),
+        sa.Column(
+            "total_amount", sa.DECIMAL(15, 2), nullable=False, server_default="0"
+        ),
+        sa.Column("offering_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()
+        ),
+        sa.PrimaryKeyConstraint("church_id", "member_id", "year", "month", "fund_type"),
+    )
+
+    # 기존 헌금 데이터로 초기 적재 (이후 재구축은 scripts/rebuild_offering_rollups.py)
+    op.execute(
+        """
+        INSERT INTO offering_monthly_rollup
+            (church_id, year, month, fund_type, total_amount, offering_count)
+        SELECT church_id,
+               EXTRACT(YEAR FROM offered_on)::int,
+               EXTRACT(MONTH FROM offered_on)::int,
+               fund_type, SUM(amount), COUNT(*)
+        FROM offerings
+        GROUP BY 1, 2, 3, 4
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO offering_member_monthly_rollup
+            (church_id, member_id, year, month, fund_type, total_amount, offering_count)
+        SELECT church_id, member_id, EXTRACT(YEAR FROM offered_on)::int,
+               EXTRACT(MONTH FROM offered_on)::int, fund_type, SUM(amount), COUNT(*)
+        FROM offerings
+        GROUP BY 1, 2, 3, 4, 5
+        """
+    )
+
+
+def downgrade():
+    op.drop_table("offering_member_monthly_rollup")
+    op.drop_table("offering_monthly_rollup")
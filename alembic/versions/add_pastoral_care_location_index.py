@@ -0,0 +1,34 @@
+"""Add church-scoped location index for pastoral care requests
+
+Revision ID: pastoral_location_001
+Revises: content_search_001
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "pastoral_location_001"
+down_revision = "content_search_001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 위치 검색의 bounding box 조회용 (교회 범위 + 위도 범위, 경도는 색인 안에서 필터)
+    op.create_index(
+        "idx_pastoral_care_church_location",
+        "pastoral_care_requests",
+        ["church_id", "latitude", "longitude"],
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "idx_pastoral_care_church_location",
+        table_name="pastoral_care_requests",
+        if_exists=True,
+    )
@@ -0,0 +1,41 @@
+"""Add cancelled_at to push notifications for scheduled dispatch
+
+Revision ID: push_schedule_001
+Revises: pastoral_location_001
+Create Date: 2026-10-17 23:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "push_schedule_001"
+down_revision = "pastoral_location_001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "push_notifications",
+        sa.Column("cancelled_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    # 아직 발송되지 않은 예약 알림 조회용 (Redis 예약 목록 복구)
+    op.create_index(
+        "idx_push_notifications_pending_schedule",
+        "push_notifications",
+        ["scheduled_at"],
+        postgresql_where=sa.text("sent_at IS NULL AND cancelled_at IS NULL"),
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "idx_push_notifications_pending_schedule",
+        table_name="push_notifications",
+        if_exists=True,
+    )
+    op.drop_column("push_notifications", "cancelled_at")
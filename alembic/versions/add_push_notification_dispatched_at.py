@@ -0,0 +1,28 @@
+"""Add dispatched_at to push notifications for idempotent fan-out
+
+Revision ID: push_dispatch_001
+Revises: push_schedule_001
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "push_dispatch_001"
+down_revision = "push_schedule_001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "push_notifications",
+        sa.Column("dispatched_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_column("push_notifications", "dispatched_at")
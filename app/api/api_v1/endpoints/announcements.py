@@ -11,6 +11,7 @@ from app.core.announcement_categories import (
     validate_category,
     ANNOUNCEMENT_CATEGORIES,
 )
+from app.services.church_data_cache import invalidate_announcement_cache
 
 router = APIRouter()
 
@@ -204,6 +205,7 @@ def create_announcement(
     db.add(announcement)
     db.commit()
     db.refresh(announcement)
+    invalidate_announcement_cache(announcement.church_id)
     return announcement
 
 
@@ -269,6 +271,7 @@ def update_announcement(
     db.add(announcement)
     db.commit()
     db.refresh(announcement)
+    invalidate_announcement_cache(announcement.church_id)
     return announcement
 
 
@@ -303,6 +306,7 @@ def delete_announcement(
 
     db.delete(announcement)
     db.commit()
+    invalidate_announcement_cache(current_user.church_id)
     return {"message": "Announcement deleted successfully"}
 
 
@@ -338,6 +342,7 @@ def toggle_pin_announcement(
     db.add(announcement)
     db.commit()
     db.refresh(announcement)
+    invalidate_announcement_cache(announcement.church_id)
     return announcement
 
 
@@ -420,6 +425,7 @@ def update_system_announcement(
             detail="시스템 공지사항만 수정 가능합니다"
         )
     
+    previous_church_id = announcement.church_id
     update_data = announcement_in.dict(exclude_unset=True, exclude={'target_church_ids'})
     target_church_ids = getattr(announcement_in, 'target_church_ids', [])
     
@@ -461,6 +467,9 @@ def update_system_announcement(
         db.commit()
     
     db.refresh(announcement)
+    # 단일 교회 대상 공지는 해당 교회 캐시에 포함됨
+    for church_id in {previous_church_id, announcement.church_id} - {None}:
+        invalidate_announcement_cache(church_id)
     return announcement
 
 
@@ -495,6 +504,9 @@ def delete_system_announcement(
             detail="시스템 공지사항만 삭제 가능합니다"
         )
     
+    church_id = announcement.church_id
     db.delete(announcement)
     db.commit()
+    if church_id:
+        invalidate_announcement_cache(church_id)
     return {"message": "System announcement deleted successfully"}
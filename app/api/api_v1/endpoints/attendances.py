@@ -5,6 +5,13 @@ from sqlalchemy.orm import Session
 
 from app import models, schemas
 from app.api import deps
+from app.services.church_data_cache import invalidate_attendance_cache
+from app.services.attendance_ingest import insert_attendance_chunk, iter_chunks
+from app.services.attendance_rollup import (
+    record_attendances,
+    refresh_attendance_buckets,
+)
+from app.services.qr_checkin import queue_checked_in
 
 router = APIRouter()
 
@@ -74,11 +81,44 @@ def create_attendance(
 
     attendance = models.Attendance(**attendance_in.dict(), created_by=current_user.id)
     db.add(attendance)
+    record_attendances(db, [attendance])
+    # Keep QR check-in from reporting success for an already recorded member
+    queue_checked_in(db, [attendance])
     db.commit()
     db.refresh(attendance)
+    invalidate_attendance_cache(attendance.church_id)
     return attendance
 
 
+def _import_attendances(
+    db: Session,
+    attendances_in: List[schemas.AttendanceCreate],
+    current_user: models.User,
+):
+    """Insert in chunks, committing each; rows outside the user's church are rejected"""
+    church_id = None if current_user.is_superuser else current_user.church_id
+    created_ids, skipped, rejected, chunks = [], 0, 0, 0
+    affected_churches = set()
+
+    for chunk in iter_chunks(attendance_in.dict() for attendance_in in attendances_in):
+        result = insert_attendance_chunk(db, chunk, current_user.id, church_id)
+        db.commit()
+        created_ids.extend(row.id for row in result["created"])
+        affected_churches.update(row.church_id for row in result["created"])
+        skipped += result["skipped"]
+        rejected += result["rejected"]
+        chunks += 1
+
+    for affected in affected_churches:
+        invalidate_attendance_cache(affected)
+    return created_ids, {
+        "created": len(created_ids),
+        "skipped": skipped,
+        "rejected": rejected,
+        "chunks": chunks,
+    }
+
+
 @router.post("/bulk", response_model=List[schemas.Attendance])
 def create_bulk_attendance(
     *,
@@ -86,51 +126,30 @@ def create_bulk_attendance(
     attendances_in: List[schemas.AttendanceCreate],
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
-    created_attendances = []
-
-    for attendance_in in attendances_in:
-        if (
-            not current_user.is_superuser
-            and current_user.church_id != attendance_in.church_id
-        ):
-            continue
-
-        # Check if member belongs to the church
-        member = (
-            db.query(models.Member)
-            .filter(
-                models.Member.id == attendance_in.member_id,
-                models.Member.church_id == attendance_in.church_id,
-            )
-            .first()
-        )
-        if not member:
-            continue
-
-        # Skip if already exists
-        existing = (
-            db.query(models.Attendance)
-            .filter(
-                models.Attendance.member_id == attendance_in.member_id,
-                models.Attendance.service_date == attendance_in.service_date,
-                models.Attendance.service_type == attendance_in.service_type,
-            )
-            .first()
-        )
-        if existing:
-            continue
+    created_ids, _ = _import_attendances(db, attendances_in, current_user)
+    if not created_ids:
+        return []
+    return (
+        db.query(models.Attendance)
+        .filter(models.Attendance.id.in_(created_ids))
+        .order_by(models.Attendance.id)
+        .all()
+    )
 
-        attendance = models.Attendance(
-            **attendance_in.dict(), created_by=current_user.id
-        )
-        db.add(attendance)
-        created_attendances.append(attendance)
 
-    db.commit()
-    for attendance in created_attendances:
-        db.refresh(attendance)
-
-    return created_attendances
+@router.post("/bulk-import", response_model=schemas.AttendanceBulkResult)
+def import_bulk_attendance(
+    *,
+    db: Session = Depends(deps.get_db),
+    attendances_in: List[schemas.AttendanceCreate],
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Bulk attendance import for large rosters (tens of thousands of rows).
+    Returns counts only; duplicates are skipped, not errors.
+    """
+    _, result = _import_attendances(db, attendances_in, current_user)
+    return result
 
 
 @router.get("/{attendance_id}", response_model=schemas.Attendance)
@@ -173,13 +192,20 @@ def update_attendance(
     if not current_user.is_superuser and attendance.church_id != current_user.church_id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
+    previous = (attendance.service_type, attendance.service_date)
     update_data = attendance_in.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(attendance, field, value)
 
     db.add(attendance)
+    refresh_attendance_buckets(
+        db,
+        attendance.church_id,
+        [previous, (attendance.service_type, attendance.service_date)],
+    )
     db.commit()
     db.refresh(attendance)
+    invalidate_attendance_cache(attendance.church_id)
     return attendance
 
 
@@ -201,6 +227,12 @@ def delete_attendance(
     if not current_user.is_superuser and attendance.church_id != current_user.church_id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
+    church_id = attendance.church_id
     db.delete(attendance)
+    queue_checked_in(db, [attendance], removed=True)
+    refresh_attendance_buckets(
+        db, church_id, [(attendance.service_type, attendance.service_date)]
+    )
     db.commit()
+    invalidate_attendance_cache(church_id)
     return {"message": "Attendance deleted successfully"}
@@ -1,12 +1,17 @@
 from typing import Any, Dict, List
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
 import asyncio
+import json
 import logging
+import os
 
 from app import models, schemas
 from app.api import deps
+from app.core.config import settings
+from app.db.session import SessionLocal
 from app.models.ai_agent import AIAgent, ChatHistory, ChatMessage
 from app.services.church_default_agent_service import ChurchDefaultAgentService
 from app.schemas.ai_agent import (
@@ -18,11 +23,10 @@ from app.schemas.ai_agent import (
     ChatRequest,
     ChatResponse,
 )
-from app.services.openai_service import openai_service
-from app.services.church_data_context import (
-    get_church_context_data,
-    format_context_for_prompt,
-)
+from app.services.openai_service import openai_service, openai_client_registry
+from app.services.church_data_context import get_church_context_data
+from app.services.prompt_context_builder import build_prompt_context, estimate_tokens
+from app.utils.request_cancellation import ClientDisconnected, cancel_on_disconnect
 
 # from app.services.secretary_agent_service import secretary_agent_service
 
@@ -354,17 +358,10 @@ def read_chat_messages(
     return {"success": True, "data": messages_data}
 
 
-@router.post("/messages", response_model=dict)
-async def send_message(
-    *,
-    db: Session = Depends(deps.get_db),
-    chat_request: ChatRequest,
-    current_user: models.User = Depends(deps.get_current_active_user),
-) -> Any:
-    """
-    Send message and get AI response.
-    Automatically creates chat history if chat_history_id is null and create_history_if_needed is True.
-    """
+def _resolve_agent_and_history(
+    db: Session, chat_request: ChatRequest, current_user: models.User
+):
+    """요청의 에이전트와 대화 히스토리를 확인 (필요시 히스토리 자동 생성)"""
     # Convert agent_id to int if needed
     try:
         agent_id = (
@@ -430,9 +427,8 @@ async def send_message(
         db.commit()
         db.refresh(new_history)
 
-        chat_history_id = new_history.id
-        history = new_history
-        logger.info(f"Created new chat history with ID: {chat_history_id}")
+        logger.info(f"Created new chat history with ID: {new_history.id}")
+        return agent, new_history
 
     elif chat_history_id is not None:
         # Convert string ID to int if needed
@@ -461,6 +457,8 @@ async def send_message(
         if not history:
             raise HTTPException(status_code=404, detail="Chat history not found")
 
+        return agent, history
+
     else:
         # chat_history_id is None and create_history_if_needed is False
         raise HTTPException(
@@ -468,324 +466,328 @@ async def send_message(
             detail="chat_history_id is required when create_history_if_needed is False",
         )
 
-    # Agent was already validated above
 
-    # Get church for GPT settings
+def _get_church_for_chat(db: Session, current_user: models.User) -> models.Church:
+    """GPT 설정을 위한 교회 조회 (API 키 미설정 시 환경변수 키 사용)"""
     church = (
         db.query(models.Church)
         .filter(models.Church.id == current_user.church_id)
         .first()
     )
 
-    # Check if church has GPT API key configured
-    if not church.gpt_api_key:
-        # Use default API key from environment
-        import os
+    # Without a church key the environment key is passed to the client registry;
+    # it is never written to church.gpt_api_key, which a later commit could persist
+    if not church.gpt_api_key and not os.getenv("OPENAI_API_KEY"):
+        raise HTTPException(
+            status_code=500, detail="GPT API key not configured for this church"
+        )
 
-        default_key = os.getenv("OPENAI_API_KEY")
-        if default_key:
-            church.gpt_api_key = default_key
-        else:
-            raise HTTPException(
-                status_code=500, detail="GPT API key not configured for this church"
-            )
+    return church
 
-    # Save user message
-    user_message = ChatMessage(
-        chat_history_id=chat_history_id,
-        content=chat_request.content,
-        role="user",
-        tokens_used=0,
-    )
-    db.add(user_message)
-    db.commit()
-    db.refresh(user_message)
 
-    try:
-        # 🆕 비서 모드 또는 비서 에이전트인 경우 처리
-        logger.info(f"🔍 Debug - Agent ID: {agent.id}, Category: {agent.category}, Enable Church Data: {agent.enable_church_data}")
-        logger.info(f"🔍 Debug - Request Secretary Mode: {chat_request.secretary_mode}, Prioritize Church Data: {getattr(chat_request, 'prioritize_church_data', 'N/A')}")
-        
-        is_secretary_mode = chat_request.secretary_mode or (
-            agent.category == "secretary" and agent.enable_church_data
-        )
-        
-        logger.info(f"🔍 Debug - Is Secretary Mode: {is_secretary_mode}")
-
-        if is_secretary_mode:
-            logger.info(f"Processing secretary mode message for agent {agent.id}")
-
-            # 교회 데이터 컨텍스트 처리
-            church_data_context = chat_request.church_data_context
-            logger.info(f"🔍 Debug - Initial church_data_context: {church_data_context is not None}")
-            logger.info(f"🔍 Debug - prioritize_church_data: {getattr(chat_request, 'prioritize_church_data', None)}")
-            logger.info(f"🔍 Debug - agent.church_data_sources: {agent.church_data_sources}")
-            
-            # 비서 에이전트는 항상 최신 데이터 조회, 일반 에이전트는 기존 로직 유지
-            is_secretary_mode = getattr(chat_request, 'secretary_mode', False)
-            logger.info(f"🔍 Debug - is_secretary_mode: {is_secretary_mode}")
-            should_get_church_data = (
-                (not church_data_context or is_secretary_mode)  # 비서 모드에서는 하드코딩된 컨텍스트 무시
-                and chat_request.prioritize_church_data
-                and agent.church_data_sources
-            )
-            logger.info(f"🔍 Debug - should_get_church_data: {should_get_church_data}")
-            
-            if should_get_church_data:
-                logger.info(f"📊 Retrieving church data for agent {agent.id}")
-                # 교회 데이터 조회
-                church_context = get_church_context_data(
-                    db=db,
-                    church_id=current_user.church_id,
-                    church_data_sources=agent.church_data_sources,
-                    user_query=chat_request.content,
-                )
-                logger.info(f"🔍 Debug - Retrieved church_context keys: {list(church_context.keys()) if church_context else 'None'}")
+def _prepare_chat_turn(
+    db: Session,
+    chat_request: ChatRequest,
+    current_user: models.User,
+    agent: AIAgent,
+    church: models.Church,
+    chat_history_id: int,
+) -> Dict[str, Any]:
+    """
+    GPT 호출에 필요한 프롬프트, 메시지, 모델 설정을 구성
 
-                # GPT용 컨텍스트 포맷팅
-                from app.api.api_v1.endpoints.church_data import format_for_gpt_context
+    Returns:
+        is_secretary_mode, completion_params(generate_response 인자),
+        church_data_context(비서 모드) 또는 church_context(일반 모드)를 담은 딕셔너리
+    """
+    # 🆕 비서 모드 또는 비서 에이전트인 경우 처리
+    logger.info(f"🔍 Debug - Agent ID: {agent.id}, Category: {agent.category}, Enable Church Data: {agent.enable_church_data}")
+    logger.info(f"🔍 Debug - Request Secretary Mode: {chat_request.secretary_mode}, Prioritize Church Data: {getattr(chat_request, 'prioritize_church_data', 'N/A')}")
 
-                church_data_context = format_for_gpt_context(
-                    church_context, current_user.church_id, db
-                )
-                logger.info(
-                    f"📊 Fresh church context retrieved: {len(church_data_context)} characters"
-                )
+    is_secretary_mode = chat_request.secretary_mode or (
+        agent.category == "secretary" and agent.enable_church_data
+    )
+
+    logger.info(f"🔍 Debug - Is Secretary Mode: {is_secretary_mode}")
+
+    if is_secretary_mode:
+        logger.info(f"Processing secretary mode message for agent {agent.id}")
+
+        # 교회 데이터 컨텍스트 처리
+        church_data_context = chat_request.church_data_context
+        context_tokens = estimate_tokens(church_data_context or "")
+        logger.info(f"🔍 Debug - Initial church_data_context: {church_data_context is not None}")
+        logger.info(f"🔍 Debug - prioritize_church_data: {getattr(chat_request, 'prioritize_church_data', None)}")
+        logger.info(f"🔍 Debug - agent.church_data_sources: {agent.church_data_sources}")
+
+        # 비서 에이전트는 항상 최신 데이터 조회, 일반 에이전트는 기존 로직 유지
+        request_secretary_mode = getattr(chat_request, 'secretary_mode', False)
+        logger.info(f"🔍 Debug - is_secretary_mode: {request_secretary_mode}")
+        should_get_church_data = (
+            (not church_data_context or request_secretary_mode)  # 비서 모드에서는 하드코딩된 컨텍스트 무시
+            and chat_request.prioritize_church_data
+            and agent.church_data_sources
+        )
+        logger.info(f"🔍 Debug - should_get_church_data: {should_get_church_data}")
 
-            # 비서 프롬프트 생성
-            church_name = church.name if church else f"Church {current_user.church_id}"
-            secretary_prompt = create_secretary_prompt(
-                church_data=church_data_context or "",
+        if should_get_church_data:
+            logger.info(f"📊 Retrieving church data for agent {agent.id}")
+            # 교회 데이터 조회
+            church_context = get_church_context_data(
+                db=db,
+                church_id=current_user.church_id,
+                church_data_sources=agent.church_data_sources,
                 user_query=chat_request.content,
-                church_name=church_name,
-                agent=agent,
-                prioritize_church_data=chat_request.prioritize_church_data,
-                fallback_to_general=chat_request.fallback_to_general,
+                retrieval=settings.CONTENT_INDEX_ENABLED,
             )
+            logger.info(f"🔍 Debug - Retrieved church_context keys: {list(church_context.keys()) if church_context else 'None'}")
 
-            # OpenAI 서비스 설정 (기존 로직 재사용)
-            use_test_service = False
-            try:
-                from app.core.security import decrypt_data
-
-                api_key = (
-                    decrypt_data(church.gpt_api_key) if church.gpt_api_key else None
-                )
-                if not api_key or api_key == "":
-                    api_key = church.gpt_api_key
-            except Exception:
-                api_key = church.gpt_api_key
-
-            if (
-                not api_key
-                or api_key == ""
-                or "test" in (church.gpt_api_key or "").lower()
-            ):
-                use_test_service = True
-                logger.warning(
-                    f"Using test OpenAI service for secretary mode in church {church.id}"
-                )
+            # 질문 관련도 순으로 토큰 예산 안에서 컨텍스트 조립
+            prompt_context = build_prompt_context(
+                church_context, chat_request.content, agent.context_token_budget
+            )
+            church_data_context = prompt_context["text"]
+            context_tokens = prompt_context["token_count"]
+            logger.info(
+                f"📊 Fresh church context retrieved: {context_tokens} tokens "
+                f"(budget {prompt_context['token_budget']}, included {prompt_context['included']})"
+            )
 
-            if use_test_service:
-                from app.services.openai_test_service import TestOpenAIService
-
-                church_openai_service = TestOpenAIService()
-            else:
-                from app.services.openai_service import OpenAIService
-
-                church_openai_service = OpenAIService(api_key=api_key)
-
-            # 메시지 히스토리 준비
-            messages = []
-            if chat_request.messages:
-                messages = chat_request.messages
-            else:
-                # 기존 대화 히스토리 조회
-                recent_messages = (
-                    db.query(ChatMessage)
-                    .filter(ChatMessage.chat_history_id == chat_history_id)
-                    .order_by(desc(ChatMessage.created_at))
-                    .limit(10)
-                    .all()
-                )
-                for msg in reversed(recent_messages[1:]):  # 방금 추가된 메시지 제외
-                    messages.append({"role": msg.role, "content": msg.content})
+        # 비서 프롬프트 생성
+        church_name = church.name if church else f"Church {current_user.church_id}"
+        secretary_prompt = create_secretary_prompt(
+            church_data=church_data_context or "",
+            user_query=chat_request.content,
+            church_name=church_name,
+            agent=agent,
+            prioritize_church_data=chat_request.prioritize_church_data,
+            fallback_to_general=chat_request.fallback_to_general,
+        )
 
-            messages.append({"role": "user", "content": chat_request.content})
+        # 메시지 히스토리 준비
+        messages = []
+        if chat_request.messages:
+            messages = chat_request.messages
+        else:
+            # 기존 대화 히스토리 조회
+            recent_messages = (
+                db.query(ChatMessage)
+                .filter(ChatMessage.chat_history_id == chat_history_id)
+                .order_by(desc(ChatMessage.created_at))
+                .limit(10)
+                .all()
+            )
+            for msg in reversed(recent_messages[1:]):  # 방금 추가된 메시지 제외
+                messages.append({"role": msg.role, "content": msg.content})
 
-            # GPT 응답 생성
-            model = agent.gpt_model or church.gpt_model or "gpt-4o-mini"
-            max_tokens = agent.max_tokens or church.max_tokens or 4000
-            temperature = agent.temperature or church.temperature or 0.7
+        messages.append({"role": "user", "content": chat_request.content})
 
-            logger.info(f"🤖 Secretary Mode GPT Call - Model: {model}")
+        # GPT 응답 생성
+        model = agent.gpt_model or church.gpt_model or "gpt-4o-mini"
+        max_tokens = agent.max_tokens or church.max_tokens or 4000
+        temperature = agent.temperature or church.temperature or 0.7
+
+        logger.info(f"🤖 Secretary Mode GPT Call - Model: {model}")
+
+        return {
+            "is_secretary_mode": True,
+            "church_data_context": church_data_context,
+            "context_tokens": context_tokens,
+            "completion_params": {
+                "messages": messages,
+                "model": model,
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+                "system_prompt": secretary_prompt,
+            },
+        }
 
-            response = await church_openai_service.generate_response(
-                messages=messages,
-                model=model,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                system_prompt=secretary_prompt,
-            )
+    # 기존 일반 에이전트 로직
+    church_context = {}
+    if agent.church_data_sources:
+        logger.info(
+            f"🔍 Fetching church context for church_id={current_user.church_id}, sources={agent.church_data_sources}"
+        )
+        church_context = get_church_context_data(
+            db=db,
+            church_id=current_user.church_id,
+            church_data_sources=agent.church_data_sources,
+            user_query=chat_request.content,
+        )
+        logger.info(
+            f"📊 Church context retrieved: {list(church_context.keys()) if church_context else 'No data'}"
+        )
 
-            # 응답 분석
-            response_analysis = analyze_secretary_response(
-                gpt_response=response["content"],
-                church_data_provided=bool(
-                    church_data_context and church_data_context.strip()
-                ),
-                user_query=chat_request.content,
-            )
+    # Get recent conversation history
+    recent_messages = (
+        db.query(ChatMessage)
+        .filter(ChatMessage.chat_history_id == chat_history_id)
+        .order_by(desc(ChatMessage.created_at))
+        .limit(10)
+        .all()
+    )
 
-            # AI 응답 저장
-            ai_message = ChatMessage(
-                chat_history_id=chat_history_id,
-                content=response["content"],
-                role="assistant",
-                tokens_used=response["tokens_used"],
-            )
-            db.add(ai_message)
-
-            # 통계 업데이트
-            agent.usage_count = (agent.usage_count or 0) + 1
-            agent.total_tokens_used = (agent.total_tokens_used or 0) + response[
-                "tokens_used"
-            ]
-            agent.total_cost = (agent.total_cost or 0) + openai_service.calculate_cost(
-                response["tokens_used"], model
+    # Prepare messages for OpenAI
+    messages = []
+    for msg in reversed(recent_messages[1:]):  # Exclude the just-added message
+        messages.append({"role": msg.role, "content": msg.content})
+    messages.append({"role": "user", "content": chat_request.content})
+
+    # Add church data context if available
+    enhanced_system_prompt = agent.system_prompt
+    context_tokens = 0
+    if church_context:
+        prompt_context = build_prompt_context(
+            church_context, chat_request.content, agent.context_token_budget
+        )
+        context_text = prompt_context["text"]
+        if context_text:
+            # Add context to the system prompt, not the user message
+            enhanced_system_prompt = agent.system_prompt + "\n\n" + context_text
+            context_tokens = prompt_context["token_count"]
+            logger.info(
+                f"Added church context to system prompt: {context_tokens} tokens "
+                f"(budget {prompt_context['token_budget']}, included {prompt_context['included']})"
             )
 
-            church.current_month_tokens = (church.current_month_tokens or 0) + response[
-                "tokens_used"
-            ]
-            church.current_month_cost = (
-                church.current_month_cost or 0
-            ) + openai_service.calculate_cost(response["tokens_used"], model)
+    # Log OpenAI request details
+    requested_model = church.gpt_model or "gpt-4o-mini"
+    logger.info(f"🚀 OpenAI 호출 - 요청 모델: {requested_model}")
+    logger.info(f"📝 DB 모델 설정: {church.gpt_model}")
+    logger.info(f"📋 최대 토큰: {church.max_tokens or 4000}")
+    logger.info(f"🌡️ 온도: {church.temperature or 0.7}")
 
-            history.message_count += 2
+    return {
+        "is_secretary_mode": False,
+        "church_context": church_context,
+        "context_tokens": context_tokens,
+        "completion_params": {
+            "messages": messages,
+            "model": requested_model,
+            "max_tokens": church.max_tokens or 4000,
+            "temperature": church.temperature or 0.7,
+            # Use enhanced system prompt (which includes church context if available)
+            "system_prompt": enhanced_system_prompt,
+        },
+    }
 
-            db.commit()
-            db.refresh(ai_message)
 
-            logger.info(
-                f"✅ Secretary Response Analysis: {response_analysis['query_type']}"
-            )
+def _save_ai_response(
+    db: Session,
+    agent: AIAgent,
+    church: models.Church,
+    history: ChatHistory,
+    content: str,
+    tokens_used: int,
+    cost_model: str,
+) -> ChatMessage:
+    """AI 응답 저장 및 에이전트/교회 사용량 통계 업데이트"""
+    ai_message = ChatMessage(
+        chat_history_id=history.id,
+        content=content,
+        role="assistant",
+        tokens_used=tokens_used,
+    )
+    db.add(ai_message)
 
-            return {
-                "success": True,
-                "data": {
-                    "user_message": {
-                        "id": user_message.id,
-                        "content": user_message.content,
-                        "role": user_message.role,
-                        "timestamp": user_message.created_at,
-                    },
-                    "ai_response": {
-                        "id": ai_message.id,
-                        "content": ai_message.content,
-                        "role": ai_message.role,
-                        "tokens_used": ai_message.tokens_used,
-                        "timestamp": ai_message.created_at,
-                    },
-                    "model": response.get("model", model),
-                    "actual_model": response.get("model", model),
-                    "total_tokens": response.get("tokens_used", 0),
-                    "chat_history_id": chat_history_id,
-                    # 🆕 비서 모드 메타데이터
-                    "is_secretary_agent": True,
-                    "data_sources": response_analysis["data_sources"],
-                    "query_type": response_analysis["query_type"],
-                    "church_data_used": response_analysis["church_data_used"],
-                    "fallback_used": response_analysis["fallback_used"],
-                },
-            }
+    # Update usage statistics for all agents
+    cost = openai_service.calculate_cost(tokens_used, cost_model)
+    agent.usage_count = (agent.usage_count or 0) + 1
+    agent.total_tokens_used = (agent.total_tokens_used or 0) + tokens_used
+    agent.total_cost = (agent.total_cost or 0) + cost
 
-        # 기존 일반 에이전트 로직
-        church_context = {}
-        if agent.church_data_sources:
-            logger.info(
-                f"🔍 Fetching church context for church_id={current_user.church_id}, sources={agent.church_data_sources}"
-            )
-            church_context = get_church_context_data(
-                db=db,
-                church_id=current_user.church_id,
-                church_data_sources=agent.church_data_sources,
-                user_query=chat_request.content,
-            )
-            logger.info(
-                f"📊 Church context retrieved: {list(church_context.keys()) if church_context else 'No data'}"
-            )
+    # Update church usage
+    church.current_month_tokens = (church.current_month_tokens or 0) + tokens_used
+    church.current_month_cost = (church.current_month_cost or 0) + cost
 
-        # Get recent conversation history
-        recent_messages = (
-            db.query(ChatMessage)
-            .filter(ChatMessage.chat_history_id == chat_request.chat_history_id)
-            .order_by(desc(ChatMessage.created_at))
-            .limit(10)
-            .all()
-        )
+    # Update history
+    history.message_count += 2
 
-        # Prepare messages for OpenAI
-        messages = []
-        for msg in reversed(recent_messages[1:]):  # Exclude the just-added message
-            messages.append({"role": msg.role, "content": msg.content})
-        messages.append({"role": "user", "content": chat_request.content})
+    db.commit()
+    db.refresh(ai_message)
+    return ai_message
 
-        # Add church data context if available
-        enhanced_system_prompt = agent.system_prompt
-        if church_context:
-            context_text = format_context_for_prompt(church_context)
-            if context_text:
-                # Add context to the system prompt, not the user message
-                enhanced_system_prompt = agent.system_prompt + "\n\n" + context_text
-                logger.info(
-                    f"Added church context to system prompt: {len(context_text)} characters"
-                )
 
-        # Use test service if no valid API key is configured
-        use_test_service = False
+def _build_response_metadata(
+    turn: Dict[str, Any], content: str, chat_request: ChatRequest
+) -> Dict[str, Any]:
+    """응답에 포함할 데이터 소스/쿼리 타입 메타데이터"""
+    if turn["is_secretary_mode"]:
+        church_data_context = turn["church_data_context"]
+        # 응답 분석
+        response_analysis = analyze_secretary_response(
+            gpt_response=content,
+            church_data_provided=bool(
+                church_data_context and church_data_context.strip()
+            ),
+            user_query=chat_request.content,
+        )
+        logger.info(
+            f"✅ Secretary Response Analysis: {response_analysis['query_type']}"
+        )
+        # 🆕 비서 모드 메타데이터
+        return {
+            "is_secretary_agent": True,
+            "data_sources": response_analysis["data_sources"],
+            "query_type": response_analysis["query_type"],
+            "church_data_used": response_analysis["church_data_used"],
+            "fallback_used": response_analysis["fallback_used"],
+            "context_tokens": turn["context_tokens"],
+        }
 
-        # Try to decrypt API key, if it fails use as is
-        try:
-            from app.core.security import decrypt_data
+    church_context = turn["church_context"]
+    # 🆕 일반 에이전트도 동일한 메타데이터 구조 제공
+    return {
+        "is_secretary_agent": False,
+        "data_sources": list(church_context.keys()) if church_context else [],
+        "query_type": "general_query",
+        "church_data_used": bool(church_context),
+        "fallback_used": False,
+        "context_tokens": turn["context_tokens"],
+    }
 
-            api_key = decrypt_data(church.gpt_api_key) if church.gpt_api_key else None
-            if not api_key or api_key == "":
-                api_key = church.gpt_api_key  # Use as is if decryption fails
-        except Exception:
-            api_key = church.gpt_api_key  # Use as is if decryption fails
 
-        # Check if we should use test service
-        if not api_key or api_key == "" or "test" in (church.gpt_api_key or "").lower():
-            use_test_service = True
-            logger.warning(f"Using test OpenAI service for church {church.id}")
+@router.post("/messages", response_model=dict)
+async def send_message(
+    *,
+    request: Request,
+    db: Session = Depends(deps.get_db),
+    chat_request: ChatRequest,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Send message and get AI response.
+    Automatically creates chat history if chat_history_id is null and create_history_if_needed is True.
+    """
+    agent, history = _resolve_agent_and_history(db, chat_request, current_user)
+    chat_history_id = history.id
 
-        if use_test_service:
-            from app.services.openai_test_service import TestOpenAIService
+    # Get church for GPT settings
+    church = _get_church_for_chat(db, current_user)
 
-            church_openai_service = TestOpenAIService()
-        else:
-            from app.services.openai_service import OpenAIService
+    # Save user message
+    user_message = ChatMessage(
+        chat_history_id=chat_history_id,
+        content=chat_request.content,
+        role="user",
+        tokens_used=0,
+    )
+    db.add(user_message)
+    db.commit()
+    db.refresh(user_message)
 
-            church_openai_service = OpenAIService(api_key=api_key)
+    try:
+        turn = _prepare_chat_turn(
+            db, chat_request, current_user, agent, church, chat_history_id
+        )
+        church_openai_service = openai_client_registry.get_for_church(
+            church, fallback_key=os.getenv("OPENAI_API_KEY")
+        )
+        params = turn["completion_params"]
 
         # Generate AI response
-        # Use enhanced system prompt (which includes church context if available)
-        final_system_prompt = enhanced_system_prompt
-
-        # Log OpenAI request details
-        requested_model = church.gpt_model or "gpt-4o-mini"
-        logger.info(f"🚀 OpenAI 호출 - 요청 모델: {requested_model}")
-        logger.info(f"📝 DB 모델 설정: {church.gpt_model}")
-        logger.info(f"📋 최대 토큰: {church.max_tokens or 4000}")
-        logger.info(f"🌡️ 온도: {church.temperature or 0.7}")
-
-        response = await church_openai_service.generate_response(
-            messages=messages,
-            model=requested_model,
-            max_tokens=church.max_tokens or 4000,
-            temperature=church.temperature or 0.7,
-            system_prompt=final_system_prompt,
+        response = await cancel_on_disconnect(
+            request, church_openai_service.generate_response(**params)
         )
 
         # Log OpenAI response details
@@ -797,40 +799,19 @@ async def send_message(
         )
 
         # Save AI response
-        ai_message = ChatMessage(
-            chat_history_id=chat_history_id,
+        ai_message = _save_ai_response(
+            db,
+            agent,
+            church,
+            history,
             content=response["content"],
-            role="assistant",
             tokens_used=response["tokens_used"],
+            cost_model=params["model"],
         )
-        db.add(ai_message)
-
-        # Update usage statistics for all agents
-        agent.usage_count = (agent.usage_count or 0) + 1
-        agent.total_tokens_used = (agent.total_tokens_used or 0) + response[
-            "tokens_used"
-        ]
-        agent.total_cost = (agent.total_cost or 0) + openai_service.calculate_cost(
-            response["tokens_used"], church.gpt_model or "gpt-4o-mini"
-        )
-
-        # Update church usage
-        church.current_month_tokens = (church.current_month_tokens or 0) + response[
-            "tokens_used"
-        ]
-        church.current_month_cost = (
-            church.current_month_cost or 0
-        ) + openai_service.calculate_cost(
-            response["tokens_used"], church.gpt_model or "gpt-4o-mini"
-        )
-
-        # Update history
-        history.message_count += 2
-
-        db.commit()
-        db.refresh(ai_message)
+        metadata = _build_response_metadata(turn, response["content"], chat_request)
 
         # Prepare response data
+        model = response.get("model", params["model"])
         response_data = {
             "success": True,
             "data": {
@@ -847,24 +828,22 @@ async def send_message(
                     "tokens_used": ai_message.tokens_used,
                     "timestamp": ai_message.created_at,
                 },
-                "model": response.get("model", church.gpt_model or "gpt-4o-mini"),
-                "gpt_model": response.get("model", church.gpt_model or "gpt-4o-mini"),
-                "actual_model": response.get(
-                    "model", church.gpt_model or "gpt-4o-mini"
-                ),
+                "model": model,
+                "actual_model": model,
                 "total_tokens": response.get("tokens_used", 0),
-                "tokensUsed": response.get("tokens_used", 0),
-                "prompt_tokens": 0,  # OpenAI response doesn't separate these in our current setup
-                "completion_tokens": response.get("tokens_used", 0),
                 "chat_history_id": chat_history_id,
-                # 🆕 일반 에이전트도 동일한 메타데이터 구조 제공
-                "is_secretary_agent": False,
-                "data_sources": list(church_context.keys()) if church_context else [],
-                "query_type": "general_query",
-                "church_data_used": bool(church_context),
-                "fallback_used": False,
+                **metadata,
             },
         }
+        if not turn["is_secretary_mode"]:
+            response_data["data"].update(
+                {
+                    "gpt_model": model,
+                    "tokensUsed": response.get("tokens_used", 0),
+                    "prompt_tokens": 0,  # OpenAI response doesn't separate these in our current setup
+                    "completion_tokens": response.get("tokens_used", 0),
+                }
+            )
 
         # Log final response data for debugging
         logger.info(
@@ -875,6 +854,14 @@ async def send_message(
 
         return response_data
 
+    except ClientDisconnected:
+        # Client went away before the AI response arrived; the LLM call is cancelled
+        logger.info(f"Client disconnected, cancelled AI response for history {chat_history_id}")
+        db.delete(user_message)
+        db.commit()
+
+        raise HTTPException(status_code=499, detail="Client disconnected")
+
     except Exception as e:
         # Delete the user message if AI response failed
         db.delete(user_message)
@@ -883,6 +870,154 @@ async def send_message(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Server-Sent Events 형식의 메시지 생성"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+@router.post("/messages/stream")
+async def send_message_stream(
+    *,
+    db: Session = Depends(deps.get_db),
+    chat_request: ChatRequest,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Send message and stream the AI response as Server-Sent Events.
+
+    Events:
+    - start: user message saved (user_message_id, chat_history_id)
+    - delta: partial response text ({"content": "..."})
+    - done: AI message saved ("saved": true) with usage and the same metadata as /messages
+    - error: generation or saving failed ("saved": false when the content was
+      streamed but could not be stored); the user message is removed
+    """
+    agent, history = _resolve_agent_and_history(db, chat_request, current_user)
+    chat_history_id = history.id
+    church = _get_church_for_chat(db, current_user)
+
+    user_message = ChatMessage(
+        chat_history_id=chat_history_id,
+        content=chat_request.content,
+        role="user",
+        tokens_used=0,
+    )
+    db.add(user_message)
+    db.commit()
+    db.refresh(user_message)
+
+    try:
+        turn = _prepare_chat_turn(
+            db, chat_request, current_user, agent, church, chat_history_id
+        )
+        church_openai_service = openai_client_registry.get_for_church(
+            church, fallback_key=os.getenv("OPENAI_API_KEY")
+        )
+    except Exception as e:
+        db.delete(user_message)
+        db.commit()
+        raise HTTPException(status_code=500, detail=str(e))
+
+    params = turn["completion_params"]
+    user_message_id = user_message.id
+    # 요청 세션은 응답 스트리밍 전에 닫히므로 스트림 안에서는 별도 세션 사용
+    agent_id, church_id = agent.id, church.id
+
+    def delete_user_message(stream_db: Session):
+        stream_db.query(ChatMessage).filter(ChatMessage.id == user_message_id).delete()
+        stream_db.commit()
+
+    async def event_stream():
+        yield _sse_event(
+            "start",
+            {"user_message_id": user_message_id, "chat_history_id": chat_history_id},
+        )
+
+        content_parts = []
+        result = {}
+        try:
+            async for event in church_openai_service.stream_response(**params):
+                if event["type"] == "delta":
+                    content_parts.append(event["content"])
+                    yield _sse_event("delta", {"content": event["content"]})
+                else:
+                    result = event
+        except asyncio.CancelledError:
+            # Client disconnected mid-stream; keep the history consistent
+            logger.info(f"Client disconnected, cancelled AI stream for history {chat_history_id}")
+            with SessionLocal() as stream_db:
+                delete_user_message(stream_db)
+            raise
+        except Exception as e:
+            logger.error(f"Streaming AI response failed: {e}")
+            with SessionLocal() as stream_db:
+                delete_user_message(stream_db)
+            yield _sse_event("error", {"detail": str(e)})
+            return
+
+        content = "".join(content_parts) or (
+            "죄송합니다. 응답을 생성하는 중에 문제가 발생했습니다. 다시 시도해 주세요."
+        )
+        tokens_used = result.get("tokens_used", 0)
+
+        # Persist the final message and usage counters once the stream completes
+        with SessionLocal() as stream_db:
+            try:
+                ai_message = _save_ai_response(
+                    stream_db,
+                    stream_db.get(AIAgent, agent_id),
+                    stream_db.get(models.Church, church_id),
+                    stream_db.get(ChatHistory, chat_history_id),
+                    content=content,
+                    tokens_used=tokens_used,
+                    cost_model=params["model"],
+                )
+            except Exception as e:
+                # The client already has the content; close the stream explicitly
+                logger.error(f"Saving streamed AI response failed: {e}")
+                stream_db.rollback()
+                try:
+                    delete_user_message(stream_db)
+                except Exception:
+                    stream_db.rollback()
+                yield _sse_event(
+                    "error",
+                    {
+                        "detail": "응답을 저장하지 못했습니다.",
+                        "saved": False,
+                        "chat_history_id": chat_history_id,
+                    },
+                )
+                return
+
+            model = result.get("model", params["model"])
+            yield _sse_event(
+                "done",
+                {
+                    "ai_response": {
+                        "id": ai_message.id,
+                        "content": ai_message.content,
+                        "role": ai_message.role,
+                        "tokens_used": ai_message.tokens_used,
+                        "timestamp": ai_message.created_at,
+                    },
+                    "saved": True,
+                    "model": model,
+                    "actual_model": model,
+                    "total_tokens": tokens_used,
+                    "finish_reason": result.get("finish_reason"),
+                    "chat_history_id": chat_history_id,
+                    **_build_response_metadata(turn, content, chat_request),
+                },
+            )
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.put("/histories/{history_id}", response_model=ChatHistorySchema)
 def update_chat_history(
     *,
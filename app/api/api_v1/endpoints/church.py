@@ -18,7 +18,7 @@ from app.schemas.ai_agent import (
     SystemStatus,
 )
 from app.services.church_data_service import church_data_service
-from app.services.openai_service import openai_service
+from app.services.openai_service import openai_service, openai_client_registry
 from app.core.security import encrypt_data, decrypt_data
 
 router = APIRouter()
@@ -167,6 +167,9 @@ async def update_gpt_config(
     db.commit()
     db.refresh(church)
 
+    # Drop cached clients built with the previous key
+    openai_client_registry.evict_church(church.id)
+
     return {"success": True, "message": "GPT configuration updated successfully"}
 
 
@@ -1,14 +1,15 @@
 from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 import pandas as pd
 import io
-from datetime import datetime
+from datetime import date, datetime
 
 from app import models, schemas
 from app.api import deps
-from app.schemas.enums import Gender
+from app.db.session import SessionLocal
+from app.services import export_stream, member_import
 
 router = APIRouter()
 
@@ -19,10 +20,12 @@ async def upload_members_excel(
     db: Session = Depends(deps.get_db),
     current_user: models.User = Depends(deps.get_current_active_superuser),
     file: UploadFile = File(...),
+    dry_run: bool = Query(False, description="Validate and return the diff only"),
 ) -> Any:
     """
     Upload members from Excel file.
     Expected columns: 이름, 성별, 생년월일, 전화번호, 주소, 직분, 구역
+    Existing members are matched by phone number and updated.
     """
     if not file.filename.endswith((".xlsx", ".xls")):
         raise HTTPException(
@@ -30,147 +33,85 @@ async def upload_members_excel(
         )
 
     try:
-        # Read Excel file
-        df = pd.read_excel(io.BytesIO(await file.read()))
-
-        # Validate required columns
-        required_columns = ["이름", "성별", "전화번호"]
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Missing required columns: {', '.join(missing_columns)}",
-            )
-
-        # Process each row
-        created_count = 0
-        updated_count = 0
-        errors = []
-
-        for index, row in df.iterrows():
-            try:
-                # Check if member exists by phone number
-                existing_member = (
-                    db.query(models.Member)
-                    .filter(
-                        models.Member.church_id == current_user.church_id,
-                        models.Member.phone == str(row.get("전화번호", "")).strip(),
-                    )
-                    .first()
-                )
+        # Read every cell as text so phone numbers keep their leading zero
+        df = pd.read_excel(io.BytesIO(await file.read()), dtype=str)
+        plan = member_import.plan_member_import(db, df, current_user.church_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error processing file: {str(e)}")
 
-                # Convert Korean gender labels to M/F
-                gender_raw = str(row.get("성별", "")).strip()
+    if dry_run:
+        return {
+            "message": "Dry run - no changes saved",
+            "dry_run": True,
+            "created": len(plan["inserts"]),
+            "updated": len(plan["updates"]),
+            "unchanged": plan["unchanged"],
+            "errors": plan["errors"],
+            "diff": member_import.summarize_plan(plan),
+        }
 
-                member_data = {
-                    "name": str(row.get("이름", "")).strip(),
-                    "gender": gender_raw,  # Will be validated by schema
-                    "phone": str(row.get("전화번호", "")).strip(),
-                    "church_id": current_user.church_id,
-                }
+    result = member_import.apply_member_import(db, plan)
+    return {
+        "message": "Excel upload completed",
+        "dry_run": False,
+        "created": result["created"],
+        "updated": result["updated"],
+        "unchanged": plan["unchanged"],
+        "errors": plan["errors"],
+    }
 
-                # Optional fields
-                if pd.notna(row.get("생년월일")):
-                    try:
-                        member_data["birthdate"] = pd.to_datetime(
-                            row["생년월일"]
-                        ).date()
-                    except:
-                        pass
 
-                if pd.notna(row.get("주소")):
-                    member_data["address"] = str(row["주소"]).strip()
+def _streamed(make_chunks, *args):
+    """Run an export generator on its own session so it outlives the request's"""
+    db = SessionLocal()
+    try:
+        yield from make_chunks(db, *args)
+    finally:
+        db.close()
 
-                if pd.notna(row.get("직분")):
-                    member_data["position"] = str(row["직분"]).strip()
 
-                if pd.notna(row.get("구역")):
-                    member_data["district"] = str(row["구역"]).strip()
+def _export_response(chunks, filename: str, media_type: str) -> StreamingResponse:
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
 
-                if existing_member:
-                    # Update existing member
-                    for key, value in member_data.items():
-                        if key != "church_id":
-                            setattr(existing_member, key, value)
-                    updated_count += 1
-                else:
-                    # Create new member
-                    new_member = models.Member(**member_data)
-                    db.add(new_member)
-                    created_count += 1
 
-            except Exception as e:
-                errors.append(f"Row {index + 2}: {str(e)}")
+def _stream_table(sheet_name: str, header, iter_rows, format: str):
+    def make_chunks(db, *args):
+        rows = iter_rows(db, *args)
+        if format == "csv":
+            return export_stream.stream_csv(header, rows)
+        return export_stream.stream_xlsx(sheet_name, header, rows)
 
-        db.commit()
-
-        return {
-            "message": "Excel upload completed",
-            "created": created_count,
-            "updated": updated_count,
-            "errors": errors,
-        }
-
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error processing file: {str(e)}")
+    return make_chunks
 
 
 @router.get("/members/download")
 def download_members_excel(
     *,
-    db: Session = Depends(deps.get_db),
+    format: str = Query("xlsx", pattern="^(xlsx|csv)$"),
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Download all members as Excel file.
+    Download all members as Excel (or CSV) file, streamed row by row.
     """
-    # Get all members for the church
-    members = (
-        db.query(models.Member)
-        .filter(models.Member.church_id == current_user.church_id)
-        .all()
+    make_chunks = _stream_table(
+        "교인명단", export_stream.MEMBER_HEADER, export_stream.iter_member_rows, format
     )
 
-    # Convert to DataFrame
-    data = []
-    for member in members:
-        # Convert gender M/F to Korean labels for Excel export
-        gender_display = ""
-        if member.gender:
-            gender_enum = Gender(member.gender)
-            gender_display = gender_enum.to_korean()
-
-        data.append(
-            {
-                "이름": member.name,
-                "성별": gender_display,
-                "생년월일": member.birthdate,
-                "전화번호": member.phone,
-                "주소": member.address or "",
-                "직분": member.position or "",
-                "구역": member.district or "",
-                "등록일": member.registration_date,
-                "상태": member.member_status or "active",
-            }
-        )
-
-    df = pd.DataFrame(data)
-
-    # Create Excel file in memory
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df.to_excel(writer, sheet_name="교인명단", index=False)
-
-    output.seek(0)
-
-    # Generate filename
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"members_{current_user.church_id}_{timestamp}.xlsx"
-
-    return StreamingResponse(
-        io.BytesIO(output.read()),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    return _export_response(
+        _streamed(make_chunks, current_user.church_id),
+        f"members_{current_user.church_id}_{timestamp}.{format}",
+        (
+            export_stream.CSV_MEDIA_TYPE
+            if format == "csv"
+            else export_stream.XLSX_MEDIA_TYPE
+        ),
     )
 
 
@@ -239,58 +180,60 @@ def download_member_template(
 @router.get("/attendance/download")
 def download_attendance_excel(
     *,
-    db: Session = Depends(deps.get_db),
-    start_date: datetime = None,
-    end_date: datetime = None,
+    start_date: date = None,
+    end_date: date = None,
+    format: str = Query("xlsx", pattern="^(xlsx|csv)$"),
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Download attendance records as Excel file.
+    Download attendance records as Excel (or CSV) file, streamed row by row.
     """
-    query = db.query(models.Attendance).filter(
-        models.Attendance.church_id == current_user.church_id
+    make_chunks = _stream_table(
+        "출석기록",
+        export_stream.ATTENDANCE_HEADER,
+        export_stream.iter_attendance_rows,
+        format,
     )
 
-    if start_date:
-        query = query.filter(models.Attendance.service_date >= start_date)
-    if end_date:
-        query = query.filter(models.Attendance.service_date <= end_date)
-
-    attendances = query.all()
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return _export_response(
+        _streamed(make_chunks, current_user.church_id, start_date, end_date),
+        f"attendance_{current_user.church_id}_{timestamp}.{format}",
+        (
+            export_stream.CSV_MEDIA_TYPE
+            if format == "csv"
+            else export_stream.XLSX_MEDIA_TYPE
+        ),
+    )
 
-    # Get member names
-    member_ids = [att.member_id for att in attendances]
-    members = db.query(models.Member).filter(models.Member.id.in_(member_ids)).all()
-    member_dict = {m.id: m.name for m in members}
 
-    # Convert to DataFrame
-    data = []
-    for att in attendances:
-        data.append(
-            {
-                "날짜": att.service_date,
-                "이름": member_dict.get(att.member_id, ""),
-                "예배구분": att.service_type,
-                "출석여부": "출석" if att.present else "결석",
-                "비고": att.notes or "",
-            }
+@router.get("/attendance/download/monthly")
+def download_attendance_by_month(
+    *,
+    start_date: date = Query(..., description="Start date"),
+    end_date: date = Query(None, description="End date (default: today)"),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Download attendance records as a ZIP of one CSV per month.
+    Each month is queried separately, so long ranges stay cheap.
+    """
+    end_date = end_date or date.today()
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=400, detail="start_date must be before end_date"
         )
 
-    df = pd.DataFrame(data)
-
-    # Create Excel file
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df.to_excel(writer, sheet_name="출석기록", index=False)
-
-    output.seek(0)
-
-    # Generate filename
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"attendance_{current_user.church_id}_{timestamp}.xlsx"
-
-    return StreamingResponse(
-        io.BytesIO(output.read()),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    filename = (
+        f"attendance_{current_user.church_id}_{start_date:%Y%m}-{end_date:%Y%m}.zip"
+    )
+    return _export_response(
+        _streamed(
+            export_stream.stream_attendance_zip,
+            current_user.church_id,
+            start_date,
+            end_date,
+        ),
+        filename,
+        "application/zip",
     )
@@ -4,10 +4,12 @@ from decimal import Decimal
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, extract
+from sqlalchemy import and_
 
 from app import models, schemas
 from app.api import deps
+from app.services.church_data_cache import invalidate_offering_cache
+from app.services import offering_rollup
 
 router = APIRouter()
 
@@ -74,8 +76,10 @@ def create_offering(
     offering_data["input_user_id"] = current_user.id
     offering = models.Offering(**offering_data)
     db.add(offering)
+    offering_rollup.record_offering(db, offering)
     db.commit()
     db.refresh(offering)
+    invalidate_offering_cache(current_user.church_id)
     return offering
 
 
@@ -207,19 +211,8 @@ def get_offerings_summary(
     """Get offering statistics summary"""
     if group_by == "fund_type":
         # Group by fund type
-        results = (
-            db.query(
-                models.Offering.fund_type,
-                func.sum(models.Offering.amount).label("total_amount"),
-                func.count(models.Offering.id).label("offering_count"),
-            )
-            .filter(
-                models.Offering.church_id == current_user.church_id,
-                models.Offering.offered_on >= start_date,
-                models.Offering.offered_on <= end_date,
-            )
-            .group_by(models.Offering.fund_type)
-            .all()
+        results = offering_rollup.summarize_by_fund_type(
+            db, current_user.church_id, start_date, end_date
         )
 
         return [
@@ -235,27 +228,8 @@ def get_offerings_summary(
 
     elif group_by == "month":
         # Group by month
-        results = (
-            db.query(
-                extract("year", models.Offering.offered_on).label("year"),
-                extract("month", models.Offering.offered_on).label("month"),
-                func.sum(models.Offering.amount).label("total_amount"),
-                func.count(models.Offering.id).label("offering_count"),
-            )
-            .filter(
-                models.Offering.church_id == current_user.church_id,
-                models.Offering.offered_on >= start_date,
-                models.Offering.offered_on <= end_date,
-            )
-            .group_by(
-                extract("year", models.Offering.offered_on),
-                extract("month", models.Offering.offered_on),
-            )
-            .order_by(
-                extract("year", models.Offering.offered_on),
-                extract("month", models.Offering.offered_on),
-            )
-            .all()
+        results = offering_rollup.summarize_by_month(
+            db, current_user.church_id, start_date, end_date
         )
 
         return [
@@ -282,24 +256,8 @@ def get_member_summary(
     limit: int = Query(50, le=100),
 ):
     """Get top members offering summary"""
-    results = (
-        db.query(
-            models.Member.id,
-            models.Member.name,
-            func.sum(models.Offering.amount).label("total_amount"),
-            func.count(models.Offering.id).label("offering_count"),
-            func.array_agg(models.Offering.fund_type.distinct()).label("fund_types"),
-        )
-        .join(models.Offering, models.Member.id == models.Offering.member_id)
-        .filter(
-            models.Member.church_id == current_user.church_id,
-            models.Offering.offered_on >= start_date,
-            models.Offering.offered_on <= end_date,
-        )
-        .group_by(models.Member.id, models.Member.name)
-        .order_by(func.sum(models.Offering.amount).desc())
-        .limit(limit)
-        .all()
+    results = offering_rollup.summarize_by_member(
+        db, current_user.church_id, start_date, end_date, limit
     )
 
     return [
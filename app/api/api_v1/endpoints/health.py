@@ -10,6 +10,7 @@ import os
 from app.api.deps import get_db
 from app.core.redis import redis_client
 from app.core.celery_app import celery_app
+from app.services.openai_service import openai_client_registry
 
 router = APIRouter()
 
@@ -167,6 +168,16 @@ async def system_health():
         }
 
 
+@router.get("/health/openai", response_model=Dict[str, Any])
+async def openai_client_health():
+    """OpenAI client registry hit/miss metrics for this worker"""
+    return {
+        "status": "healthy",
+        "timestamp": datetime.utcnow().isoformat(),
+        "client_registry": openai_client_registry.get_stats(),
+    }
+
+
 @router.get("/health/all", response_model=Dict[str, Any])
 async def all_health_checks(db: Session = Depends(get_db)):
     """Comprehensive health check of all services"""
@@ -9,6 +9,7 @@ from datetime import datetime
 
 from app import models, schemas
 from app.api import deps
+from app.services.qr_checkin import qr_checkin
 
 router = APIRouter()
 
@@ -414,8 +415,10 @@ def regenerate_member_card_qr(
         .all()
     )
 
+    replaced_codes = []
     for code in existing_codes:
         code.is_active = False
+        replaced_codes.append(code.code)
 
     # Create new QR code
     import uuid
@@ -432,6 +435,8 @@ def regenerate_member_card_qr(
     db.add(new_qr_code)
     db.commit()
     db.refresh(new_qr_code)
+    # Deactivated codes must stop working on the QR check-in fast path today
+    qr_checkin.drop_codes(member.church_id, replaced_codes)
 
     return {
         "message": "QR code regenerated successfully",
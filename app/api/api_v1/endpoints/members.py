@@ -1,13 +1,12 @@
 from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import case, or_
 from datetime import datetime
-import asyncio
 
 from app import models, schemas
 from app.api import deps
-from app.utils.korean import is_korean_initial_search, match_initial_consonants
+from app.utils.korean import initial_consonants_like_pattern, is_korean_initial_search
 from app.utils.password import generate_temporary_password
 from app.utils.encryption import encrypt_password, decrypt_password
 from app.utils.email import send_temporary_password_email
@@ -76,18 +75,21 @@ def read_members(
                 # Check for Korean initial consonant search
                 if is_korean_initial_search(search_term):
                     print(f"🔤 Korean initial consonant search detected")
-                    # Get all members first, then filter by consonant matching
-                    all_members = query.all()
-                    matching_members = []
-                    for member in all_members:
-                        if member.name and match_initial_consonants(member.name, search_term):
-                            matching_members.append(member)
-                    
-                    # Apply pagination to filtered results
-                    total_matches = len(matching_members)
-                    print(f"🔤 Found {total_matches} members matching Korean initials")
-                    paginated_members = matching_members[skip:skip + limit]
-                    return paginated_members
+                    # Prefix match on the church-scoped btree index for short terms,
+                    # contiguous match on the trigram index for 3+ characters;
+                    # prefix matches come first either way
+                    query = query.filter(
+                        models.Member.name_initials.like(
+                            initial_consonants_like_pattern(search_term)
+                        )
+                    ).order_by(
+                        case(
+                            (models.Member.name_initials.like(f"{search_term}%"), 0),
+                            else_=1,
+                        ),
+                        models.Member.name,
+                        models.Member.id,
+                    )
                 else:
                     # Regular text search (name, email, phone)
                     print(f"📝 Regular text search")
@@ -198,7 +200,7 @@ def create_member(
     # Geocode address if provided
     if member.address:
         try:
-            coords = asyncio.run(geocoding_service.get_coordinates(member.address))
+            coords = geocoding_service.geocode_sync(member.address)
             if coords:
                 member.latitude, member.longitude = coords
                 print(
@@ -338,7 +340,7 @@ def update_member(
     # Geocode new address if changed
     if address_changed and member.address:
         try:
-            coords = asyncio.run(geocoding_service.get_coordinates(member.address))
+            coords = geocoding_service.geocode_sync(member.address)
             if coords:
                 member.latitude, member.longitude = coords
                 print(
@@ -1,5 +1,5 @@
 from typing import Any, List, Optional
-from datetime import datetime
+from datetime import date, datetime, time
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, func, and_, or_
@@ -17,7 +17,11 @@ from app.schemas.pastoral_care import (
     PastoralCareStats,
     LocationQuery,
     PastoralCareRequestWithDistance,
+    VisitRoute,
 )
+from app.services.church_data_cache import invalidate_pastoral_care_cache
+from app.services.pastoral_care_location import find_requests_near
+from app.services.visit_route import plan_visit_route
 
 router = APIRouter()
 
@@ -39,6 +43,7 @@ def create_pastoral_care_request(
     db.add(request)
     db.commit()
     db.refresh(request)
+    invalidate_pastoral_care_cache(request.church_id)
     return request
 
 
@@ -104,6 +109,7 @@ def update_pastoral_care_request(
 
     db.commit()
     db.refresh(request)
+    invalidate_pastoral_care_cache(request.church_id)
     return request
 
 
@@ -134,6 +140,7 @@ def delete_pastoral_care_request(
 
     request.status = "cancelled"
     db.commit()
+    invalidate_pastoral_care_cache(request.church_id)
 
     return {"success": True, "message": "Request cancelled successfully"}
 
@@ -242,6 +249,7 @@ def admin_update_pastoral_care_request(
 
     db.commit()
     db.refresh(request)
+    invalidate_pastoral_care_cache(request.church_id)
     return request
 
 
@@ -295,6 +303,7 @@ def assign_pastor_to_request(
 
     db.commit()
     db.refresh(request)
+    invalidate_pastoral_care_cache(request.church_id)
     return request
 
 
@@ -333,6 +342,7 @@ def complete_pastoral_care_request(
 
     db.commit()
     db.refresh(request)
+    invalidate_pastoral_care_cache(request.church_id)
     return request
 
 
@@ -453,64 +463,66 @@ def search_requests_by_location(
     *,
     db: Session = Depends(deps.get_db),
     location_query: LocationQuery,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Search pastoral care requests by location (admin only).
-    Returns requests within specified radius with distance calculation.
+    Returns requests within specified radius, nearest first, paginated with skip/limit.
     """
     # Check admin permission
     if current_user.role not in ["admin", "minister"]:
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
-    from decimal import Decimal
-    import math
-
-    query = db.query(PastoralCareRequest).filter(
-        PastoralCareRequest.church_id == current_user.church_id,
-        PastoralCareRequest.latitude.isnot(None),
-        PastoralCareRequest.longitude.isnot(None),
+    nearby = find_requests_near(
+        db,
+        current_user.church_id,
+        float(location_query.latitude),
+        float(location_query.longitude),
+        location_query.radius_km,
+        skip=skip,
+        limit=limit,
     )
+    return [
+        {
+            **{
+                column.name: getattr(request, column.name)
+                for column in request.__table__.columns
+            },
+            "distance_km": round(distance, 2),
+        }
+        for request, distance in nearby
+    ]
+
+
+@router.get("/admin/visit-route", response_model=VisitRoute)
+def get_visit_route(
+    *,
+    db: Session = Depends(deps.get_db),
+    visit_date: date = Query(..., description="Day of the scheduled visits"),
+    start_latitude: float = Query(..., ge=-90, le=90),
+    start_longitude: float = Query(..., ge=-180, le=180),
+    start_time: time = Query(time(9, 0), description="Departure time (HH:MM)"),
+    pastor_id: Optional[int] = Query(None, description="Defaults to the current user"),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Optimized visit order for a pastor's scheduled pastoral care visits (admin only).
+    Respects preferred time windows; travel times are estimated from coordinates.
+    """
+    if current_user.role not in ["admin", "minister"]:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
 
-    requests = query.all()
-    requests_with_distance = []
-
-    # Calculate distance for each request
-    for request in requests:
-        if request.latitude and request.longitude:
-            # Haversine formula for distance calculation
-            lat1, lon1 = float(location_query.latitude), float(location_query.longitude)
-            lat2, lon2 = float(request.latitude), float(request.longitude)
-
-            # Convert to radians
-            lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-
-            # Haversine formula
-            dlat = lat2 - lat1
-            dlon = lon2 - lon1
-            a = (
-                math.sin(dlat / 2) ** 2
-                + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
-            )
-            c = 2 * math.asin(math.sqrt(a))
-            distance = 6371 * c  # Radius of Earth in km
-
-            # Only include requests within the specified radius
-            if distance <= location_query.radius_km:
-                # Convert request to dict and add distance
-                request_dict = {
-                    **{
-                        column.name: getattr(request, column.name)
-                        for column in request.__table__.columns
-                    },
-                    "distance_km": round(distance, 2),
-                }
-                requests_with_distance.append(request_dict)
-
-    # Sort by distance
-    requests_with_distance.sort(key=lambda x: x["distance_km"])
-
-    return requests_with_distance
+    return plan_visit_route(
+        db,
+        current_user.church_id,
+        pastor_id or current_user.id,
+        visit_date,
+        start_latitude,
+        start_longitude,
+        start_time,
+    )
 
 
 @router.get("/admin/requests/urgent", response_model=List[PastoralCareRequestSchema])
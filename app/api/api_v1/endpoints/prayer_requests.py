@@ -17,6 +17,7 @@ from app.schemas.pastoral_care import (
     PrayerRequestStats,
     PrayerParticipation as PrayerParticipationSchema,
 )
+from app.services.church_data_cache import invalidate_prayer_cache
 
 router = APIRouter()
 
@@ -46,6 +47,7 @@ def create_prayer_request(
     db.add(request)
     db.commit()
     db.refresh(request)
+    invalidate_prayer_cache(request.church_id)
     return request
 
 
@@ -167,6 +169,7 @@ def participate_in_prayer(
     request.prayer_count += 1
 
     db.commit()
+    invalidate_prayer_cache(request.church_id)
 
     return {
         "success": True,
@@ -206,6 +209,7 @@ def update_prayer_request(
 
     db.commit()
     db.refresh(request)
+    invalidate_prayer_cache(request.church_id)
     return request
 
 
@@ -237,6 +241,7 @@ def add_answered_testimony(
 
     db.commit()
     db.refresh(request)
+    invalidate_prayer_cache(request.church_id)
     return request
 
 
@@ -265,6 +270,7 @@ def delete_prayer_request(
     request.closed_at = datetime.now()
 
     db.commit()
+    invalidate_prayer_cache(request.church_id)
 
     return {"success": True, "message": "Prayer request closed successfully"}
 
@@ -374,6 +380,7 @@ def admin_update_prayer_request(
 
     db.commit()
     db.refresh(request)
+    invalidate_prayer_cache(request.church_id)
     return request
 
 
@@ -411,6 +418,7 @@ def moderate_prayer_request(
 
     db.commit()
     db.refresh(request)
+    invalidate_prayer_cache(request.church_id)
     return request
 
 
@@ -1,7 +1,7 @@
 from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Body
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 from app.api.deps import get_db, get_current_active_user
 from app.models.user import User
@@ -17,12 +17,17 @@ from app.schemas.push_notification import (
     DeviceResponse,
     NotificationSend,
     NotificationBatchSend,
+    NotificationSchedule,
+    ScheduledNotificationResponse,
     NotificationResponse,
     NotificationHistoryResponse,
     NotificationPreferenceUpdate,
     NotificationPreferenceResponse,
 )
 from app.services.push_notification import PushNotificationService
+from app.services.push_fanout import dead_token_rate
+from app.services import notification_scheduler
+from app.core.redis import redis_client
 
 router = APIRouter()
 
@@ -180,6 +185,126 @@ async def send_church_notification(
     return result
 
 
+@router.post("/schedule", response_model=ScheduledNotificationResponse)
+def schedule_notification(
+    notification_in: NotificationSchedule,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """예약 푸시 알림 등록 (교회 전체 또는 지정 사용자, 관리자/목사만 가능)"""
+    if current_user.role not in ["admin", "pastor"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="권한이 없습니다"
+        )
+
+    try:
+        scheduled_at = notification_scheduler.to_utc(
+            notification_in.scheduled_at, notification_in.timezone
+        )
+    except (KeyError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="알 수 없는 시간대입니다"
+        )
+    if scheduled_at <= datetime.now(timezone.utc):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="예약 시각이 이미 지났습니다",
+        )
+
+    if notification_in.user_ids:
+        users_count = (
+            db.query(User)
+            .filter(
+                User.id.in_(notification_in.user_ids),
+                User.church_id == current_user.church_id,
+            )
+            .count()
+        )
+        if users_count != len(set(notification_in.user_ids)):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="일부 사용자가 교회에 속하지 않습니다",
+            )
+
+    # Without Redis the schedule would never fire, so refuse up front
+    if not redis_client.connected:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="예약 발송을 사용할 수 없습니다",
+        )
+
+    notification = PushNotification(
+        church_id=current_user.church_id,
+        sender_id=current_user.id,
+        type=notification_in.type,
+        title=notification_in.title,
+        body=notification_in.body,
+        data=notification_in.data,
+        image_url=notification_in.image_url,
+        target_type="group" if notification_in.user_ids else "all",
+        target_users=notification_in.user_ids,
+        scheduled_at=scheduled_at,
+    )
+    db.add(notification)
+    db.commit()
+    db.refresh(notification)
+
+    notification_scheduler.schedule_notification(notification)
+    return notification
+
+
+@router.get("/scheduled", response_model=List[ScheduledNotificationResponse])
+def get_scheduled_notifications(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """발송 대기 중인 예약 알림 목록 (관리자/목사만 가능)"""
+    if current_user.role not in ["admin", "pastor"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="권한이 없습니다"
+        )
+
+    return notification_scheduler.list_scheduled_notifications(
+        db, current_user.church_id
+    )
+
+
+@router.delete(
+    "/scheduled/{notification_id}", response_model=ScheduledNotificationResponse
+)
+def cancel_scheduled_notification(
+    notification_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """예약 알림 취소 (발송 시작 전까지만 가능, 관리자/목사만 가능)"""
+    if current_user.role not in ["admin", "pastor"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="권한이 없습니다"
+        )
+
+    notification = (
+        db.query(PushNotification)
+        .filter(
+            PushNotification.id == notification_id,
+            PushNotification.church_id == current_user.church_id,
+            PushNotification.scheduled_at.isnot(None),
+        )
+        .first()
+    )
+    if not notification:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="알림을 찾을 수 없습니다"
+        )
+
+    if not notification_scheduler.cancel_scheduled_notification(db, notification):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="이미 발송되었거나 취소된 알림입니다",
+        )
+    return notification
+
+
 @router.get("/history", response_model=List[NotificationHistoryResponse])
 def get_notification_history(
     skip: int = 0,
@@ -211,6 +336,35 @@ def get_notification_history(
     return notifications
 
 
+@router.get("/token-health", response_model=Dict[str, Any])
+def get_token_health(
+    days: int = Query(7, ge=1, le=7),
+    current_user: User = Depends(get_current_active_user),
+):
+    """일별 만료 토큰 비율 (FCM 이 만료/잘못된 토큰으로 응답한 기기 비율, 관리자/목사만 가능)"""
+    if current_user.role not in ["admin", "pastor"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="권한이 없습니다"
+        )
+
+    today = datetime.now().date()
+    daily = [
+        dead_token_rate(
+            current_user.church_id,
+            (today - timedelta(days=offset)).strftime("%Y-%m-%d"),
+        )
+        for offset in range(days)
+    ]
+    devices = sum(day["devices"] for day in daily)
+    dead = sum(day["dead_tokens"] for day in daily)
+    return {
+        "devices": devices,
+        "dead_tokens": dead,
+        "dead_token_rate": round(dead / devices, 4) if devices else 0.0,
+        "daily": daily,
+    }
+
+
 @router.get("/my-notifications", response_model=List[NotificationHistoryResponse])
 def get_my_notifications(
     skip: int = 0,
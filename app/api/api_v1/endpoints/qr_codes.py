@@ -9,6 +9,9 @@ from datetime import datetime, timedelta, timezone
 
 from app import models, schemas
 from app.api import deps
+from app.services.church_data_cache import invalidate_attendance_cache
+from app.services.attendance_rollup import record_attendances
+from app.services.qr_checkin import qr_checkin, queue_checked_in
 
 router = APIRouter()
 
@@ -38,8 +41,10 @@ def generate_qr_code(
         .all()
     )
 
+    replaced_codes = []
     for code in existing_codes:
         code.is_active = False
+        replaced_codes.append(code.code)
 
     # Generate unique code
     unique_code = f"{member.church_id}:{member_id}:{uuid.uuid4().hex}"
@@ -59,6 +64,7 @@ def generate_qr_code(
     db.add(qr_code)
     db.commit()
     db.refresh(qr_code)
+    qr_checkin.update_code(qr_code, member, replaced_codes)
 
     return qr_code
 
@@ -121,6 +127,11 @@ def verify_qr_code(
     """
     Verify QR code and mark attendance.
     """
+    # Fast path: Redis code index + idempotent check-in set, DB write is batched
+    fast = qr_checkin.check_in(db, code, attendance_type)
+    if fast is not None:
+        return _fast_check_in_response(fast, attendance_type)
+
     qr_code = (
         db.query(models.QRCode)
         .filter(models.QRCode.code == code, models.QRCode.is_active == True)
@@ -170,8 +181,11 @@ def verify_qr_code(
         check_in_method="qr_code",
     )
     db.add(attendance)
+    record_attendances(db, [attendance])
+    queue_checked_in(db, [attendance])
     db.commit()
     db.refresh(attendance)
+    invalidate_attendance_cache(attendance.church_id)
 
     # Get member info
     member = (
@@ -189,9 +203,40 @@ def verify_qr_code(
         "attendance": {
             "id": attendance.id,
             "member_id": attendance.member_id,
-            "attendance_date": attendance.attendance_date.isoformat(),
-            "attendance_type": attendance.attendance_type,
-            "is_present": attendance.is_present,
+            "attendance_date": attendance.service_date.isoformat(),
+            "attendance_type": attendance.service_type,
+            "is_present": attendance.present,
+        },
+    }
+
+
+def _fast_check_in_response(result: dict, attendance_type: str) -> dict:
+    status, entry = result["status"], result["entry"]
+    if status == "invalid":
+        raise HTTPException(status_code=404, detail="Invalid QR code")
+    if status == "expired":
+        raise HTTPException(status_code=400, detail="QR code has expired")
+    if status == "already_marked":
+        return {
+            "status": "already_marked",
+            "message": "Attendance already marked for today",
+            "member_id": entry["member_id"],
+        }
+
+    return {
+        "status": "success",
+        "message": "Attendance marked successfully",
+        "member": {
+            "id": entry["member_id"],
+            "name": entry["name"],
+            "profile_photo_url": entry["profile_photo_url"],
+        },
+        "attendance": {
+            "id": None,  # assigned when the queued check-in is flushed
+            "member_id": entry["member_id"],
+            "attendance_date": datetime.now(timezone.utc).date().isoformat(),
+            "attendance_type": attendance_type,
+            "is_present": True,
         },
     }
 
@@ -4,20 +4,20 @@
 
 import logging
 from typing import Dict, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request
 from sqlalchemy.orm import Session
 
 from app.api import deps
 from app.models.user import User
 from app.models.church import Church
 from app.services.smart_assistant_service import smart_assistant_service
+from app.services.openai_service import openai_client_registry
+from app.utils.request_cancellation import ClientDisconnected, cancel_on_disconnect
 from app.schemas.smart_assistant import (
     SmartAssistantQuery,
     SmartAssistantResponse,
     QueryAnalysisResponse
 )
-from app.core.security import decrypt_data
-import json
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -26,6 +26,7 @@ logger = logging.getLogger(__name__)
 @router.post("/query", response_model=SmartAssistantResponse)
 async def process_smart_query(
     *,
+    request: Request,
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_active_user),
     query: SmartAssistantQuery
@@ -56,23 +57,22 @@ async def process_smart_query(
             "temperature": query.temperature or church.temperature or 0.3
         }
         
-        # GPT API 키 설정
-        api_key = None
+        # GPT API 키 설정 (동시 요청 간 공유 싱글톤을 바꾸지 않도록 교회별 서비스 사용)
+        church_openai_service = None
         if church.gpt_api_key:
-            try:
-                api_key = decrypt_data(church.gpt_api_key)
-                smart_assistant_service.openai_service = smart_assistant_service.openai_service.__class__(api_key=api_key)
-            except Exception as e:
-                logger.error(f"Failed to decrypt GPT API key: {e}")
-                raise HTTPException(status_code=500, detail="GPT API 키 설정에 문제가 있습니다.")
+            church_openai_service = openai_client_registry.get_for_church(church)
         
-        # 스마트 어시스턴트 쿼리 처리
-        result = await smart_assistant_service.process_query(
-            user_message=query.message,
-            church_id=current_user.church_id,
-            user_id=current_user.id,
-            db=db,
-            gpt_config=gpt_config
+        # 스마트 어시스턴트 쿼리 처리 (클라이언트 연결이 끊기면 GPT 호출 취소)
+        result = await cancel_on_disconnect(
+            request,
+            smart_assistant_service.process_query(
+                user_message=query.message,
+                church_id=current_user.church_id,
+                user_id=current_user.id,
+                db=db,
+                gpt_config=gpt_config,
+                openai_service=church_openai_service
+            )
         )
         
         # 토큰 사용량 업데이트 (백그라운드)
@@ -100,6 +100,9 @@ async def process_smart_query(
         
     except HTTPException:
         raise
+    except ClientDisconnected:
+        logger.info(f"Client disconnected, cancelled smart assistant query for user {current_user.id}")
+        raise HTTPException(status_code=499, detail="Client disconnected")
     except Exception as e:
         logger.error(f"Smart assistant error: {e}")
         return SmartAssistantResponse(
@@ -38,20 +38,21 @@ def get_attendance_summary(
         .scalar()
     )
 
-    # Get attendance records
+    # Get attendance records (daily rollup buckets)
     attendance_query = (
         db.query(
-            models.Attendance.service_date,
-            func.count(models.Attendance.id).label("present_count"),
+            models.AttendanceRollup.period_start.label("service_date"),
+            models.AttendanceRollup.present_count,
         )
         .filter(
-            models.Attendance.church_id == current_user.church_id,
-            models.Attendance.service_date >= start_date,
-            models.Attendance.service_date <= end_date,
-            models.Attendance.service_type == attendance_type,
-            models.Attendance.present == True,
+            models.AttendanceRollup.church_id == current_user.church_id,
+            models.AttendanceRollup.service_type == attendance_type,
+            models.AttendanceRollup.period_type == "day",
+            models.AttendanceRollup.period_start >= start_date,
+            models.AttendanceRollup.period_start <= end_date,
+            models.AttendanceRollup.present_count > 0,
         )
-        .group_by(models.Attendance.service_date)
+        .order_by(models.AttendanceRollup.period_start)
         .all()
     )
 
@@ -14,6 +14,7 @@ from app.schemas.worship_schedule import (
     WorshipScheduleResponse,
 )
 from app.crud.base import CRUDBase
+from app.services.church_data_cache import invalidate_worship_cache
 
 router = APIRouter()
 
@@ -134,6 +135,7 @@ def create_worship_service(
     db.add(db_service)
     db.commit()
     db.refresh(db_service)
+    invalidate_worship_cache(church_id)
     return db_service
 
 
@@ -188,6 +190,7 @@ def update_worship_service(
 
     db.commit()
     db.refresh(service)
+    invalidate_worship_cache(service.church_id)
     return service
 
 
@@ -214,8 +217,10 @@ def delete_worship_service(
             detail="예배 일정 삭제 권한이 없습니다",
         )
 
+    church_id = service.church_id
     db.delete(service)
     db.commit()
+    invalidate_worship_cache(church_id)
     return {"message": "예배 서비스가 삭제되었습니다"}
 
 
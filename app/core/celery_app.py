@@ -9,7 +9,13 @@ try:
         "smart_yoram",
         broker=settings.REDIS_URL,
         backend=settings.REDIS_URL,
-        include=["app.tasks.notifications"],
+        include=[
+            "app.tasks.notifications",
+            "app.tasks.cache_warming",
+            "app.tasks.attendance_rollups",
+            "app.tasks.geocoding",
+            "app.tasks.content_index",
+        ],
     )
 
     # Configure Celery
@@ -36,6 +42,16 @@ try:
             "task": "app.tasks.notifications.send_worship_reminders",
             "schedule": crontab(hour=8, minute=0, day_of_week=0),  # Sunday
         },
+        # Pre-warm church statistics caches before Sunday services
+        "prewarm-church-data-cache-sunday": {
+            "task": "app.tasks.cache_warming.prewarm_church_data_cache",
+            "schedule": crontab(hour=6, minute=30, day_of_week=0),  # Sunday
+        },
+        # Load QR check-in code index before Sunday services (UTC date has rolled over)
+        "prewarm-qr-checkin-index-sunday": {
+            "task": "app.tasks.cache_warming.prewarm_qr_checkin_index",
+            "schedule": crontab(hour=9, minute=5, day_of_week=0),  # Sunday
+        },
         # Send birthday notifications daily at 9 AM
         "birthday-notifications": {
             "task": "app.tasks.notifications.send_birthday_notifications",
@@ -46,6 +62,21 @@ try:
             "task": "app.tasks.notifications.process_notification_queue",
             "schedule": 60.0,  # Every 60 seconds
         },
+        # Send scheduled notifications whose time has come
+        "dispatch-scheduled-notifications": {
+            "task": "app.tasks.notifications.dispatch_scheduled_notifications",
+            "schedule": settings.NOTIFICATION_SCHEDULER_INTERVAL_SECONDS,
+        },
+        # Re-register future scheduled notifications if Redis lost them
+        "restore-notification-schedule": {
+            "task": "app.tasks.notifications.restore_notification_schedule",
+            "schedule": crontab(minute=15),
+        },
+        # Fill in missing member / pastoral care coordinates nightly
+        "backfill-coordinates": {
+            "task": "app.tasks.geocoding.backfill_coordinates",
+            "schedule": crontab(hour=3, minute=30),
+        },
         # Cleanup expired tokens daily at 2 AM
         "cleanup-expired-tokens": {
             "task": "app.tasks.notifications.cleanup_expired_tokens",
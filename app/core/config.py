@@ -65,13 +65,61 @@ class Settings(BaseSettings):
 
     # Redis Configuration
     REDIS_URL: str = "redis://localhost:6379/0"
+    CHURCH_DATA_LOCAL_CACHE_SIZE: int = 512  # in-process church data entries per worker
+
+    # Attendance Configuration
+    ATTENDANCE_BULK_CHUNK_SIZE: int = 1000  # rows per INSERT in bulk attendance imports
+    # queue QR check-ins in Redis, flush in batches
+    QR_CHECKIN_WRITE_BEHIND: bool = True
+    QR_CHECKIN_FLUSH_INTERVAL: float = 1.0  # seconds between write-behind flushes
+    QR_CHECKIN_BATCH_SIZE: int = 500  # check-ins per flush INSERT
+    # failed flushes of a batch before it moves to the dead-letter list
+    QR_CHECKIN_MAX_FLUSH_ATTEMPTS: int = 5
+
+    # OpenAI Configuration
+    OPENAI_TIMEOUT: float = 60.0  # seconds per request
+    OPENAI_MAX_RETRIES: int = 2
+    OPENAI_MAX_CONCURRENCY: int = 32  # in-flight requests per worker
+    OPENAI_CLIENT_CACHE_SIZE: int = 256  # churches with a ready client per worker
+    # church data tokens per prompt (agent default)
+    CHAT_CONTEXT_TOKEN_BUDGET: int = 4000
+
+    # Content Index (local embeddings for chat retrieval)
+    # keep per-church indexes updated on content writes
+    CONTENT_INDEX_ENABLED: bool = True
+    # per-church vector/metadata files; must be shared by the API and Celery workers
+    CONTENT_INDEX_DIR: str = "content_index"
+    CONTENT_INDEX_ENCODER: str = "hashing"  # key in content_index.ENCODERS
+    CONTENT_INDEX_DIM: int = 512
+    CONTENT_INDEX_TOP_K: int = 8  # chunks retrieved per chat question
+
+    # Pastoral Visit Route Configuration
+    VISIT_ROUTE_SPEED_KMH: float = 25.0  # average city driving speed
+    VISIT_ROUTE_DETOUR_FACTOR: float = 1.3  # road distance / straight-line distance
+    VISIT_ROUTE_VISIT_MINUTES: float = 40.0  # time spent at each visit
 
     # Firebase Configuration
     FIREBASE_CREDENTIALS_PATH: str = "firebase-credentials.json"
 
+    # Scheduled Push Notifications
+    # for scheduled_at given without an offset
+    NOTIFICATION_TIMEZONE: str = "Asia/Seoul"
+    # how often due notifications are popped
+    NOTIFICATION_SCHEDULER_INTERVAL_SECONDS: float = 5.0
+
     # Naver Maps API Configuration
     NAVER_MAPS_CLIENT_ID: Optional[str] = None
     NAVER_MAPS_CLIENT_SECRET: Optional[str] = None
+    NAVER_GEOCODING_URL: str = (
+        "https://naveropenapi.apigw.ntruss.com/map-geocode/v2/geocode"
+    )
+    GEOCODING_CONCURRENCY: int = 4  # simultaneous requests to the geocoding API
+    # provider quota (requests per second), shared by all processes through Redis
+    GEOCODING_RATE_PER_SECOND: float = 10.0
+    GEOCODING_TIMEOUT_SECONDS: float = 10.0
+    GEOCODING_CACHE_TTL: int = 86400 * 90  # resolved addresses (90 days)
+    # addresses with no result (7 days, longer than the nightly backfill period)
+    GEOCODING_NEGATIVE_CACHE_TTL: int = 86400 * 7
 
     class Config:
         env_file = ".env"
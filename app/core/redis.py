@@ -1,12 +1,65 @@
 import redis
 from typing import Optional, Any, Dict
 import json
+import uuid
 from datetime import timedelta
 from app.core.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Delete the lock key only when it still holds our token (it may have expired and been retaken)
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Count a hit and start the window on the first one, atomically (no INCR without EXPIRE)
+_RATE_LIMIT_SCRIPT = """
+local count = redis.call("incr", KEYS[1])
+if count == 1 then
+    redis.call("expire", KEYS[1], ARGV[1])
+end
+return count
+"""
+
+# Shared token bucket: refill by elapsed server time (same clock for every process),
+# take one token if available, otherwise return how long to wait (ms) before retrying
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local time = redis.call("time")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call("hmget", KEYS[1], "tokens", "updated")
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) / rate * 1000)
+end
+redis.call("hset", KEYS[1], "tokens", tostring(tokens), "updated", tostring(now))
+redis.call("expire", KEYS[1], math.ceil(capacity / rate) + 1)
+return wait
+"""
+
+# Take up to ARGV[2] members due by ARGV[1] and remove them in the same step, so two
+# schedulers (or a cancel racing a dispatch) never both get the same notification
+_POP_DUE_SCRIPT = """
+local ids = redis.call("zrangebyscore", KEYS[1], "-inf", ARGV[1], "LIMIT", 0, ARGV[2])
+if #ids > 0 then
+    redis.call("zrem", KEYS[1], unpack(ids))
+end
+return ids
+"""
+
+SCHEDULED_NOTIFICATIONS_KEY = "scheduled_notifications"
+PIPELINE_CHUNK_SIZE = 1000  # commands per round trip for bulk pipelines
+
 
 class RedisClient:
     def __init__(self):
@@ -46,6 +99,11 @@ class RedisClient:
                 )
 
             self.client = redis.Redis.from_url(settings.REDIS_URL, **redis_params)
+            self._rate_limit_script = self.client.register_script(_RATE_LIMIT_SCRIPT)
+            self._token_bucket_script = self.client.register_script(
+                _TOKEN_BUCKET_SCRIPT
+            )
+            self._pop_due_script = self.client.register_script(_POP_DUE_SCRIPT)
             self._test_connection()
             self.connected = True
         except Exception as e:
@@ -86,16 +144,22 @@ class RedisClient:
             logger.warning("Redis not connected, returning empty device tokens")
             return []
 
-        device_tokens = self.client.smembers(f"user_devices:{user_id}")
-        active_tokens = []
+        device_tokens = list(self.client.smembers(f"user_devices:{user_id}"))
+        if not device_tokens:
+            return []
 
+        pipe = self.client.pipeline(transaction=False)
         for token in device_tokens:
-            key = f"device_token:{user_id}:{token}"
-            if self.client.exists(key):
-                active_tokens.append(token)
-            else:
-                # Clean up expired token from set
-                self.client.srem(f"user_devices:{user_id}", token)
+            pipe.exists(f"device_token:{user_id}:{token}")
+        exists = pipe.execute()
+
+        active_tokens = [token for token, alive in zip(device_tokens, exists) if alive]
+        expired_tokens = [
+            token for token, alive in zip(device_tokens, exists) if not alive
+        ]
+        if expired_tokens:
+            # Clean up expired tokens from set
+            self.client.srem(f"user_devices:{user_id}", *expired_tokens)
 
         return active_tokens
 
@@ -133,6 +197,42 @@ class RedisClient:
                 return json.loads(result)
         return None
 
+    def get_from_notification_queue_batch(self, count: int = 100) -> list:
+        """Pop up to count notifications from the queue in one round trip"""
+        if not self.connected:
+            return []
+
+        return [
+            json.loads(item)
+            for item in self.client.rpop("notification_queue", count) or []
+        ]
+
+    # Scheduled Notifications
+    def schedule_notification(self, notification_id: int, timestamp: float):
+        """Add (or move) a notification in the schedule, scored by its send time (epoch seconds)"""
+        if not self.connected:
+            logger.warning("Redis not connected, cannot schedule notification")
+            return
+
+        self.client.zadd(SCHEDULED_NOTIFICATIONS_KEY, {str(notification_id): timestamp})
+
+    def unschedule_notification(self, notification_id: int) -> bool:
+        """Remove a notification from the schedule; False if it was not there (already taken)"""
+        if not self.connected:
+            return False
+
+        return self.client.zrem(SCHEDULED_NOTIFICATIONS_KEY, str(notification_id)) == 1
+
+    def pop_due_notifications(self, now: float, count: int = 100) -> list:
+        """Atomically take up to count notification ids whose send time is <= now"""
+        if not self.connected:
+            return []
+
+        ids = self._pop_due_script(
+            keys=[SCHEDULED_NOTIFICATIONS_KEY], args=[now, count], client=self.client
+        )
+        return [int(notification_id) for notification_id in ids]
+
     # Rate Limiting
     def check_rate_limit(
         self, user_id: int, limit: int = 100, window: int = 3600
@@ -143,12 +243,43 @@ class RedisClient:
             return True
 
         key = f"rate_limit:push:{user_id}"
-        current_count = self.client.incr(key)
+        current_count = self._rate_limit_script(
+            keys=[key], args=[window], client=self.client
+        )
+        return current_count <= limit
 
-        if current_count == 1:
-            self.client.expire(key, window)
+    def check_rate_limits(
+        self, user_ids: list, limit: int = 100, window: int = 3600
+    ) -> list:
+        """check_rate_limit for many users in one pipeline; returns the user ids over the limit"""
+        if not self.connected or not user_ids:
+            return []
 
-        return current_count <= limit
+        limited = []
+        for start in range(0, len(user_ids), PIPELINE_CHUNK_SIZE):
+            chunk = user_ids[start : start + PIPELINE_CHUNK_SIZE]
+            pipe = self.client.pipeline(transaction=False)
+            for user_id in chunk:
+                self._rate_limit_script(
+                    keys=[f"rate_limit:push:{user_id}"], args=[window], client=pipe
+                )
+            counts = pipe.execute()
+            limited.extend(
+                user_id for user_id, count in zip(chunk, counts) if count > limit
+            )
+        return limited
+
+    def take_rate_token(
+        self, name: str, rate: float, capacity: float = 1.0
+    ) -> Optional[float]:
+        """Take a token shared by all processes; seconds to wait (0 = taken) or None"""
+        if not self.connected:
+            return None
+
+        wait_ms = self._token_bucket_script(
+            keys=[f"token_bucket:{name}"], args=[rate, capacity], client=self.client
+        )
+        return wait_ms / 1000
 
     # Notification Status Tracking
     def set_notification_status(
@@ -171,28 +302,23 @@ class RedisClient:
     # Batch Processing
     def add_batch_notification(self, batch_id: str, user_ids: list):
         """Add users to batch notification set"""
-        if not self.connected:
+        if not self.connected or not user_ids:
             return
 
         key = f"batch:{batch_id}"
-        for user_id in user_ids:
-            self.client.sadd(key, user_id)
-        self.client.expire(key, 3600)  # 1 hour TTL
+        pipe = self.client.pipeline(transaction=False)
+        pipe.sadd(key, *user_ids)
+        pipe.expire(key, 3600)  # 1 hour TTL
+        pipe.execute()
 
     def get_batch_users(self, batch_id: str, count: int = 100) -> list:
         """Get users from batch (and remove them)"""
         if not self.connected:
             return []
 
-        key = f"batch:{batch_id}"
-        users = []
-        for _ in range(count):
-            user_id = self.client.spop(key)
-            if user_id:
-                users.append(int(user_id))
-            else:
-                break
-        return users
+        return [
+            int(user_id) for user_id in self.client.spop(f"batch:{batch_id}", count)
+        ]
 
     def get_batch_size(self, batch_id: str) -> int:
         """Get remaining batch size"""
@@ -229,8 +355,43 @@ class RedisClient:
         cache_key = f"cache:{key}"
         self.client.delete(cache_key)
 
+    def cache_get_version(self, tag: str) -> int:
+        """Get current generation of a cache tag (0 if never bumped)"""
+        if not self.connected:
+            return 0
+
+        value = self.client.get(f"cache_version:{tag}")
+        return int(value) if value else 0
+
+    def cache_bump_version(self, tag: str) -> int:
+        """Bump generation of a cache tag, orphaning every key built from the old one"""
+        if not self.connected:
+            return 0
+
+        return self.client.incr(f"cache_version:{tag}")
+
+    # Locks
+    def acquire_lock(self, name: str, ttl: int = 60) -> Optional[str]:
+        """Try to take a short-lived lock; returns an owner token or None if held"""
+        if not self.connected:
+            return None
+
+        token = uuid.uuid4().hex
+        if self.client.set(f"lock:{name}", token, nx=True, ex=ttl):
+            return token
+        return None
+
+    def release_lock(self, name: str, token: str):
+        """Release a lock only if it is still owned by token"""
+        if not self.connected:
+            return
+
+        self.client.eval(_RELEASE_LOCK_SCRIPT, 1, f"lock:{name}", token)
+
     # Stats
-    def increment_stat(self, stat_name: str, date: Optional[str] = None):
+    def increment_stat(
+        self, stat_name: str, date: Optional[str] = None, amount: int = 1
+    ):
         """Increment daily statistics"""
         if not self.connected:
             return
@@ -241,8 +402,10 @@ class RedisClient:
             date = datetime.now().strftime("%Y-%m-%d")
 
         key = f"stats:{stat_name}:{date}"
-        self.client.incr(key)
-        self.client.expire(key, 86400 * 7)  # Keep for 7 days
+        pipe = self.client.pipeline(transaction=False)
+        pipe.incrby(key, amount)
+        pipe.expire(key, 86400 * 7)  # Keep for 7 days
+        pipe.execute()
 
     def get_stat(self, stat_name: str, date: str) -> int:
         """Get daily statistics"""
@@ -280,9 +443,27 @@ except Exception as e:
         def get_from_notification_queue(self, *args, **kwargs):
             return None
 
+        def get_from_notification_queue_batch(self, *args, **kwargs):
+            return []
+
+        def schedule_notification(self, *args, **kwargs):
+            pass
+
+        def unschedule_notification(self, *args, **kwargs):
+            return False
+
+        def pop_due_notifications(self, *args, **kwargs):
+            return []
+
         def check_rate_limit(self, *args, **kwargs):
             return True
 
+        def check_rate_limits(self, *args, **kwargs):
+            return []
+
+        def take_rate_token(self, *args, **kwargs):
+            return None
+
         def set_notification_status(self, *args, **kwargs):
             pass
 
@@ -307,6 +488,18 @@ except Exception as e:
         def cache_delete(self, *args, **kwargs):
             pass
 
+        def cache_get_version(self, *args, **kwargs):
+            return 0
+
+        def cache_bump_version(self, *args, **kwargs):
+            return 0
+
+        def acquire_lock(self, *args, **kwargs):
+            return None
+
+        def release_lock(self, *args, **kwargs):
+            pass
+
         def increment_stat(self, *args, **kwargs):
             pass
 
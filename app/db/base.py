@@ -2,7 +2,7 @@ from app.db.base_class import Base
 from app.models.user import User
 from app.models.church import Church
 from app.models.member import Member, Family
-from app.models.attendance import Attendance
+from app.models.attendance import Attendance, AttendanceRollup
 from app.models.bulletin import Bulletin
 from app.models.sms_history import SMSHistory
 from app.models.qr_code import QRCode
@@ -160,6 +160,27 @@ async def log_requests(request, call_next):
     return response
 
 
+@app.on_event("startup")
+def start_qr_checkin_batcher():
+    from app.services.qr_checkin import checkin_batcher
+
+    checkin_batcher.start()
+
+
+@app.on_event("startup")
+def register_content_index_hooks():
+    from app.services.content_index import register_index_hooks
+
+    register_index_hooks()
+
+
+@app.on_event("shutdown")
+def stop_qr_checkin_batcher():
+    from app.services.qr_checkin import checkin_batcher
+
+    checkin_batcher.stop()
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint for deployment monitoring"""
@@ -1,7 +1,7 @@
 from .user import User
 from .church import Church
 from .member import Member, Family
-from .attendance import Attendance
+from .attendance import Attendance, AttendanceRollup
 from .bulletin import Bulletin
 from .sms_history import SMSHistory
 from .qr_code import QRCode
@@ -55,6 +55,8 @@ from .financial import (
     ReceiptSnapshot,
     FundType,
     FinancialReport,
+    OfferingMonthlyRollup,
+    OfferingMemberMonthlyRollup,
 )
 from .visit import (
     Visit,
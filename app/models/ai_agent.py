@@ -59,6 +59,7 @@ class AIAgent(Base):
     gpt_model = Column(String(50), nullable=True)  # None이면 교회 설정 사용
     max_tokens = Column(Integer, nullable=True)
     temperature = Column(Float, nullable=True)
+    context_token_budget = Column(Integer, nullable=True)  # None이면 기본 예산 사용
     
     usage_count = Column(Integer, default=0)
     total_tokens_used = Column(Integer, default=0)
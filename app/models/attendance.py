@@ -1,4 +1,13 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Date
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Date,
+    Index,
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base_class import Base
@@ -27,3 +36,35 @@ class Attendance(Base):
 
     church = relationship("Church", backref="attendances")
     member = relationship("Member", backref="attendances")
+
+    # 같은 교인/예배일/예배유형 출석은 1건 (대량 입력의 ON CONFLICT DO NOTHING 기준)
+    __table_args__ = (
+        Index(
+            "uq_attendances_member_service",
+            "member_id",
+            "service_date",
+            "service_type",
+            unique=True,
+        ),
+    )
+
+
+class AttendanceRollup(Base):
+    """
+    교회/예배유형/기간별 출석 집계 (출석 입력 시 증분 갱신, rebuild 로 재구축)
+
+    service_type "*" 행은 모든 예배를 합친 집계 (교인 중복 제거 포함)
+    """
+
+    __tablename__ = "attendance_rollups"
+
+    church_id = Column(Integer, ForeignKey("churches.id"), primary_key=True)
+    service_type = Column(String, primary_key=True)
+    period_type = Column(String, primary_key=True)  # day, week, month
+    period_start = Column(Date, primary_key=True)  # 해당 일 / 주 월요일 / 월 1일
+    present_count = Column(Integer, nullable=False, default=0)
+    distinct_members = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
@@ -124,3 +124,38 @@ class FinancialReport(Base):
 
     church = relationship("Church", backref="financial_reports")
     generator = relationship("User", backref="generated_financial_reports")
+
+
+class OfferingMonthlyRollup(Base):
+    """교회/월/헌금유형별 합계 (헌금 입력 시 증분 갱신, rebuild 로 재구축)"""
+
+    __tablename__ = "offering_monthly_rollup"
+
+    church_id = Column(Integer, ForeignKey("churches.id"), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    fund_type = Column(String, primary_key=True)
+    total_amount = Column(DECIMAL(15, 2), nullable=False, default=0)
+    offering_count = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
+class OfferingMemberMonthlyRollup(Base):
+    """교인/월/헌금유형별 합계 (교인별 헌금 요약용)"""
+
+    __tablename__ = "offering_member_monthly_rollup"
+
+    church_id = Column(Integer, ForeignKey("churches.id"), primary_key=True)
+    member_id = Column(Integer, ForeignKey("members.id"), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    fund_type = Column(String, primary_key=True)
+    total_amount = Column(DECIMAL(15, 2), nullable=False, default=0)
+    offering_count = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
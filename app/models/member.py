@@ -9,9 +9,16 @@ from sqlalchemy import (
     Text,
     Float,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 from app.db.base_class import Base
+from app.utils.korean import get_initial_consonants
+
+
+def _name_initials_default(context):
+    # Core/bulk insert 경로용 (ORM 은 아래 validates 에서 설정)
+    name = context.get_current_parameters().get("name")
+    return get_initial_consonants(name) if name else None
 
 
 class Member(Base):
@@ -24,6 +31,7 @@ class Member(Base):
     # Basic Information
     code = Column(String, unique=True)  # 교번 (내부 일련번호)
     name = Column(String, nullable=False)
+    name_initials = Column(String, default=_name_initials_default)  # 이름 초성 (초성 검색용)
     name_eng = Column(String)  # 영문 이름
     phone = Column(String)
     email = Column(String)
@@ -131,6 +139,11 @@ class Member(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    @validates("name")
+    def _sync_name_initials(self, key, name):
+        self.name_initials = get_initial_consonants(name) if name else None
+        return name
+
     church = relationship("Church", backref="members")
     user = relationship("User", backref="member_profile")
     family = relationship("Family", foreign_keys=[family_id], backref="members")
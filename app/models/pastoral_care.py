@@ -8,6 +8,7 @@ from sqlalchemy import (
     Date,
     Time,
     ForeignKey,
+    Index,
     Numeric,
 )
 from sqlalchemy.orm import relationship
@@ -17,6 +18,12 @@ from app.db.base_class import Base
 
 class PastoralCareRequest(Base):
     __tablename__ = "pastoral_care_requests"
+    __table_args__ = (
+        # Bounding-box prefilter for location search
+        Index(
+            "idx_pastoral_care_church_location", "church_id", "latitude", "longitude"
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     church_id = Column(
@@ -105,6 +105,10 @@ class PushNotification(Base):
     # 스케줄링
     scheduled_at = Column(DateTime(timezone=True))  # None이면 즉시 발송
     sent_at = Column(DateTime(timezone=True))
+    dispatched_at = Column(
+        DateTime(timezone=True)
+    )  # fan-out 시작 시각 (중복 발송 방지)
+    cancelled_at = Column(DateTime(timezone=True))  # 예약 발송 취소 시각
 
     # 통계
     total_recipients = Column(Integer, default=0)
@@ -2,7 +2,13 @@ from .user import User, UserCreate, UserUpdate, UserInDB
 from .token import Token, TokenPayload, TokenWithUser
 from .member import Member, MemberCreate, MemberUpdate, MemberInDB
 from .church import Church, ChurchCreate, ChurchUpdate, ChurchInDB
-from .attendance import Attendance, AttendanceCreate, AttendanceUpdate, AttendanceInDB
+from .attendance import (
+    Attendance,
+    AttendanceBulkResult,
+    AttendanceCreate,
+    AttendanceUpdate,
+    AttendanceInDB,
+)
 from .bulletin import Bulletin, BulletinCreate, BulletinUpdate, BulletinInDB
 from .sms import SMS, SMSCreate, SMSBulkCreate, SMSUpdate, SMSInDB
 from .qr_code import QRCode, QRCodeCreate, QRCodeUpdate, QRCodeInDB
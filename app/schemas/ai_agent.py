@@ -51,6 +51,7 @@ class AIAgentBase(BaseModel):
     system_prompt: Optional[str] = None
     church_data_sources: Optional[ChurchDataSources] = ChurchDataSources()
     is_active: Optional[bool] = True
+    context_token_budget: Optional[int] = None  # 프롬프트에 넣을 교회 데이터 최대 토큰
 
 
 class AIAgentCreate(AIAgentBase):
@@ -38,3 +38,10 @@ class Attendance(AttendanceInDBBase):
 
 class AttendanceInDB(AttendanceInDBBase):
     pass
+
+
+class AttendanceBulkResult(BaseModel):
+    created: int
+    skipped: int  # already recorded (member, service_date, service_type)
+    rejected: int  # member not in the church, or church not permitted
+    chunks: int
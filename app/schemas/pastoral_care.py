@@ -192,3 +192,32 @@ class LocationQuery(BaseModel):
 # Enhanced response schema with location distance
 class PastoralCareRequestWithDistance(PastoralCareRequest):
     distance_km: Optional[float] = None
+
+
+# Visit route schemas
+class VisitRouteStop(BaseModel):
+    sequence: int
+    request_id: int
+    requester_name: str
+    address: Optional[str] = None
+    latitude: float
+    longitude: float
+    preferred_time_start: Optional[time] = None
+    preferred_time_end: Optional[time] = None
+    arrival_time: str  # HH:MM
+    departure_time: str  # HH:MM
+    wait_minutes: int
+    late_minutes: int
+    distance_km: float  # from the previous stop (or the start location)
+
+
+class VisitRoute(BaseModel):
+    pastor_id: int
+    visit_date: date
+    start_time: str
+    end_time: str
+    total_distance_km: float
+    total_travel_minutes: int
+    late_stops: int
+    stops: List[VisitRouteStop]
+    unrouted_request_ids: List[int]  # scheduled requests without coordinates
@@ -60,6 +60,33 @@ class NotificationBatchSend(BaseModel):
     user_ids: List[int] = Field(..., min_items=1)
 
 
+class NotificationSchedule(BaseModel):
+    title: str = Field(..., max_length=200)
+    body: str = Field(...)
+    type: NotificationType = NotificationType.CUSTOM
+    data: Optional[Dict[str, Any]] = None
+    image_url: Optional[str] = None
+    user_ids: Optional[List[int]] = None  # None sends to the whole church
+    scheduled_at: datetime
+    # IANA name used when scheduled_at has no UTC offset (default NOTIFICATION_TIMEZONE)
+    timezone: Optional[str] = None
+
+
+class ScheduledNotificationResponse(BaseModel):
+    id: int
+    type: NotificationType
+    title: str
+    body: str
+    target_type: str
+    scheduled_at: datetime
+    cancelled_at: Optional[datetime]
+    sent_at: Optional[datetime]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class NotificationResponse(BaseModel):
     success: bool
     message: str
@@ -0,0 +1,107 @@
+"""
+출석 대량 입력 서비스
+
+행마다 교인 확인/중복 확인 SELECT 를 보내는 대신 청크 단위로 처리합니다.
+- 교인 소속 확인: 청크당 IN 쿼리 1회
+- 중복 제거: (member_id, service_date, service_type) 유니크 인덱스 기준
+  INSERT ... ON CONFLICT DO NOTHING RETURNING 1회
+- rollup 반영: 실제로 생성된 행만 record_attendances 로 반영
+- QR 체크인 set 반영: 생성된 행을 commit 후 추가 (queue_checked_in)
+"""
+
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.attendance import Attendance
+from app.models.member import Member
+from app.services.attendance_rollup import _insert_for, record_attendances
+from app.services.qr_checkin import queue_checked_in
+
+UNIQUE_COLUMNS = ("member_id", "service_date", "service_type")
+
+
+def iter_chunks(rows: Iterable[Any], size: Optional[int] = None) -> Iterator[List[Any]]:
+    """입력을 size 개씩 나누어 반환 (기본값: ATTENDANCE_BULK_CHUNK_SIZE)"""
+    size = size or settings.ATTENDANCE_BULK_CHUNK_SIZE
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def insert_attendance_chunk(
+    db: Session,
+    rows: List[Dict[str, Any]],
+    created_by: Optional[int] = None,
+    church_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    출석 행 묶음을 한 번에 입력 (commit 은 호출자가 수행)
+
+    Args:
+        rows: AttendanceCreate 필드를 가진 dict 목록
+        church_id: 지정하면 해당 교회 행만 허용 (슈퍼유저는 None)
+
+    Returns:
+        {"created": [생성된 행(id, church_id, ...)], "skipped": 중복 수, "rejected": 거부 수,
+         "rejected_rows": 거부된 입력 dict 목록}
+    """
+    allowed = [
+        row for row in rows if church_id is None or row["church_id"] == church_id
+    ]
+
+    member_ids = {row["member_id"] for row in allowed}
+    member_church = dict(
+        db.query(Member.id, Member.church_id).filter(Member.id.in_(member_ids)).all()
+        if member_ids
+        else []
+    )
+    valid = [
+        {**row, "created_by": created_by}
+        for row in allowed
+        if member_church.get(row["member_id"]) == row["church_id"]
+    ]
+    rejected_rows = [
+        row
+        for row in rows
+        if (church_id is not None and row["church_id"] != church_id)
+        or member_church.get(row["member_id"]) != row["church_id"]
+    ]
+    rejected = len(rejected_rows)
+    if not valid:
+        return {
+            "created": [],
+            "skipped": 0,
+            "rejected": rejected,
+            "rejected_rows": rejected_rows,
+        }
+
+    # 파라미터 목록으로 실행하면 문장은 캐시되고 insertmanyvalues 가 다중 행으로 묶음
+    table = Attendance.__table__
+    insert = _insert_for(db)
+    stmt = (
+        insert(table)
+        .on_conflict_do_nothing(index_elements=list(UNIQUE_COLUMNS))
+        .returning(
+            table.c.id,
+            table.c.church_id,
+            table.c.member_id,
+            table.c.service_type,
+            table.c.service_date,
+            table.c.present,
+        )
+    )
+    created = db.execute(stmt, valid).all()
+    record_attendances(db, created)
+    queue_checked_in(db, created)
+    return {
+        "created": created,
+        "skipped": len(valid) - len(created),
+        "rejected": rejected,
+        "rejected_rows": rejected_rows,
+    }
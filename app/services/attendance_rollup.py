@@ -0,0 +1,309 @@
+"""
+출석 집계(rollup) 서비스
+
+attendances 전체 이력을 매번 집계하는 대신 교회/예배유형/기간(일·주·월)별
+출석 수와 중복 제거 교인 수를 유지합니다.
+- 출석 입력 시 같은 트랜잭션에서 record_attendances 로 증분 반영
+  (배치 단위: 기존 출석 조회 1회 + 다중 행 upsert 1회)
+- 출석 수정/삭제 시 refresh_attendance_buckets 로 영향받은 기간만 재계산
+- rebuild_attendance_rollups 로 전체 재구축, check_attendance_rollups 로 정합성 점검
+"""
+
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import Date, String, cast, func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.models.attendance import Attendance, AttendanceRollup
+
+ALL_SERVICES = "*"
+PERIOD_TYPES = ("day", "week", "month")
+
+BucketKey = Tuple[
+    int, str, str, date
+]  # church_id, service_type, period_type, period_start
+
+
+def period_start(period_type: str, day: date) -> date:
+    if period_type == "week":
+        return day - timedelta(days=day.weekday())
+    if period_type == "month":
+        return day.replace(day=1)
+    return day
+
+
+def period_end(period_type: str, start: date) -> date:
+    if period_type == "week":
+        return start + timedelta(days=6)
+    if period_type == "month":
+        return (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    return start
+
+
+def _buckets(church_id: int, service_type: str, service_date: date) -> List[BucketKey]:
+    return [
+        (church_id, st, period_type, period_start(period_type, service_date))
+        for st in (service_type, ALL_SERVICES)
+        for period_type in PERIOD_TYPES
+    ]
+
+
+def _insert_for(db: Session):
+    """ON CONFLICT 를 지원하는 dialect 별 insert"""
+    if db.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def record_attendances(db: Session, attendances: Iterable[Any]):
+    """
+    새로 추가된 출석 행들을 rollup 에 반영 (commit 은 호출자가 수행)
+
+    attendances 는 church_id, member_id, service_type, service_date, present, id 속성을
+    가진 객체 (ORM 객체는 flush 로 id 가 채워진 상태여야 함)
+    """
+    rows = [a for a in attendances if a.present is not False]
+    if not rows:
+        return
+    db.flush()
+
+    added: Dict[BucketKey, List[int]] = defaultdict(list)
+    for row in rows:
+        for key in _buckets(row.church_id, row.service_type, row.service_date):
+            added[key].append(row.member_id)
+
+    # 같은 기간에 이미 출석 기록이 있는 교인은 distinct_members 를 올리지 않음
+    existing: Dict[BucketKey, Set[int]] = defaultdict(set)
+    by_church: Dict[int, List[Any]] = defaultdict(list)
+    for row in rows:
+        by_church[row.church_id].append(row)
+    for church_id, church_rows in by_church.items():
+        keys = [key for key in added if key[0] == church_id]
+        previous = (
+            db.query(
+                Attendance.member_id, Attendance.service_type, Attendance.service_date
+            )
+            .filter(
+                Attendance.church_id == church_id,
+                Attendance.service_date.between(
+                    min(key[3] for key in keys),
+                    max(period_end(key[2], key[3]) for key in keys),
+                ),
+                Attendance.present == True,
+                Attendance.member_id.in_({r.member_id for r in church_rows}),
+                Attendance.id.notin_([r.id for r in church_rows]),
+            )
+            .all()
+        )
+        for member_id, service_type, service_date in previous:
+            for key in _buckets(church_id, service_type, service_date):
+                if key in added:
+                    existing[key].add(member_id)
+
+    values = [
+        {
+            "church_id": key[0],
+            "service_type": key[1],
+            "period_type": key[2],
+            "period_start": key[3],
+            "present_count": len(members),
+            "distinct_members": len(set(members) - existing[key]),
+        }
+        for key, members in added.items()
+    ]
+    insert = _insert_for(db)
+    stmt = insert(AttendanceRollup).values(values)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[c.name for c in AttendanceRollup.__table__.primary_key],
+            set_={
+                "present_count": AttendanceRollup.present_count
+                + stmt.excluded.present_count,
+                "distinct_members": AttendanceRollup.distinct_members
+                + stmt.excluded.distinct_members,
+                "updated_at": func.now(),
+            },
+        )
+    )
+
+
+def _period_start_expr(db: Session, period_type: str, column):
+    """service_date 를 기간 시작일로 바꾸는 SQL 식"""
+    if db.bind.dialect.name == "postgresql":
+        if period_type == "day":
+            return column
+        return cast(func.date_trunc(period_type, column), Date)
+    # SQLite: 6일 전으로 간 뒤 다음 월요일 = 해당 주의 월요일
+    if period_type == "week":
+        return func.date(column, "-6 days", "weekday 1")
+    if period_type == "month":
+        return func.date(column, "start of month")
+    return func.date(column)
+
+
+def _aggregate_query(
+    db: Session,
+    church_id: Optional[int] = None,
+    service_date_range: Optional[Tuple[date, date]] = None,
+    service_types: Optional[List[str]] = None,
+):
+    """원본 attendances 로부터 rollup 과 같은 형태의 집계 SELECT"""
+    filters = [Attendance.present == True]
+    if church_id is not None:
+        filters.append(Attendance.church_id == church_id)
+    if service_date_range is not None:
+        filters.append(Attendance.service_date.between(*service_date_range))
+
+    specific = [st for st in service_types or [] if st != ALL_SERVICES]
+    include_all = service_types is None or ALL_SERVICES in service_types
+
+    parts = []
+    for period_type in PERIOD_TYPES:
+        start = _period_start_expr(db, period_type, Attendance.service_date)
+        variants = []
+        if service_types is None or specific:
+            service_filter = [Attendance.service_type.in_(specific)] if specific else []
+            variants.append(
+                (Attendance.service_type, service_filter, [Attendance.service_type])
+            )
+        if include_all:
+            variants.append((literal(ALL_SERVICES, String), [], []))
+
+        for service, service_filter, service_group in variants:
+            parts.append(
+                select(
+                    Attendance.church_id.label("church_id"),
+                    service.label("service_type"),
+                    literal(period_type, String).label("period_type"),
+                    start.label("period_start"),
+                    func.count(Attendance.id).label("present_count"),
+                    func.count(Attendance.member_id.distinct()).label(
+                        "distinct_members"
+                    ),
+                )
+                .where(*filters, *service_filter)
+                .group_by(Attendance.church_id, start, *service_group)
+            )
+    return union_all(*parts)
+
+
+def _as_date(value) -> date:
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def refresh_attendance_buckets(
+    db: Session, church_id: int, changes: Iterable[Tuple[str, date]]
+):
+    """
+    수정/삭제된 출석 (service_type, service_date) 이 속한 기간만 원본으로 재계산
+    (commit 은 호출자가 수행)
+    """
+    keys = {key for st, day in changes for key in _buckets(church_id, st, day)}
+    if not keys:
+        return
+    db.flush()
+
+    for key in keys:
+        db.query(AttendanceRollup).filter(
+            AttendanceRollup.church_id == key[0],
+            AttendanceRollup.service_type == key[1],
+            AttendanceRollup.period_type == key[2],
+            AttendanceRollup.period_start == key[3],
+        ).delete(synchronize_session=False)
+
+    earliest = min(key[3] for key in keys)
+    latest = max(period_end(key[2], key[3]) for key in keys)
+    service_types = sorted({key[1] for key in keys})
+    for row in db.execute(
+        _aggregate_query(db, church_id, (earliest, latest), service_types)
+    ).mappings():
+        row = dict(row, period_start=_as_date(row["period_start"]))
+        key = (
+            row["church_id"],
+            row["service_type"],
+            row["period_type"],
+            row["period_start"],
+        )
+        if key in keys:
+            db.add(AttendanceRollup(**row))
+
+
+def rebuild_attendance_rollups(db: Session, church_id: Optional[int] = None) -> int:
+    """
+    attendances 원본으로 rollup 재구축 (commit 은 호출자가 수행)
+
+    Returns:
+        생성된 rollup 행 수
+    """
+    query = db.query(AttendanceRollup)
+    if church_id is not None:
+        query = query.filter(AttendanceRollup.church_id == church_id)
+    query.delete(synchronize_session=False)
+
+    columns = [
+        "church_id",
+        "service_type",
+        "period_type",
+        "period_start",
+        "present_count",
+        "distinct_members",
+    ]
+    aggregate = _aggregate_query(db, church_id).subquery()
+    db.execute(
+        AttendanceRollup.__table__.insert().from_select(
+            columns, select(*(aggregate.c[name] for name in columns))
+        )
+    )
+
+    query = db.query(func.count()).select_from(AttendanceRollup)
+    if church_id is not None:
+        query = query.filter(AttendanceRollup.church_id == church_id)
+    return query.scalar()
+
+
+def check_attendance_rollups(
+    db: Session, church_id: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    rollup 과 원본 집계를 비교해 다른 기간 목록 반환 (수정하지 않음)
+
+    Returns:
+        [{church_id, service_type, period_type, period_start, expected, actual}, ...]
+    """
+    expected = {
+        (r.church_id, r.service_type, r.period_type, _as_date(r.period_start)): (
+            r.present_count,
+            r.distinct_members,
+        )
+        for r in db.execute(_aggregate_query(db, church_id))
+    }
+    query = db.query(AttendanceRollup)
+    if church_id is not None:
+        query = query.filter(AttendanceRollup.church_id == church_id)
+    actual = {
+        (r.church_id, r.service_type, r.period_type, r.period_start): (
+            r.present_count,
+            r.distinct_members,
+        )
+        for r in query
+        if r.present_count  # 삭제로 비워진 기간은 행이 없는 것과 같음
+    }
+
+    mismatches = []
+    for key in sorted(set(expected) | set(actual), key=str):
+        if expected.get(key) != actual.get(key):
+            mismatches.append(
+                {
+                    "church_id": key[0],
+                    "service_type": key[1],
+                    "period_type": key[2],
+                    "period_start": key[3].isoformat(),
+                    "expected": expected.get(key),
+                    "actual": actual.get(key),
+                }
+            )
+    return mismatches
@@ -9,15 +9,30 @@
 - 예배 일정: 6시간 캐시 (거의 변하지 않음)
 - 기도요청: 10분 캐시 (비교적 자주 변경)
 - 심방요청: 10분 캐시 (비교적 자주 변경)
+
+집계 쿼리가 많은 통계(교인/헌금/출석)는 stale-while-revalidate 로 동작합니다.
+TTL 이 지나도 유예 시간 동안은 이전 값을 바로 반환하고, Redis 락을 잡은
+한 워커만 백그라운드에서 새 값을 계산합니다.
+
+캐시 무효화는 교회별/데이터 타입별 버전(generation) 카운터로 처리합니다.
+키에 현재 버전이 포함되므로 버전을 올리면 파라미터(limit 등)가 다른
+모든 변형 키가 한 번에 무효화되고, 이전 버전 키는 TTL 로 자연 소멸합니다.
 """
 
-from typing import Dict, Any, List, Optional, Callable
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from sqlalchemy.orm import Session
 import hashlib
+import inspect
 import logging
+import threading
+import time
 from datetime import datetime
 
+from app.core.config import settings
 from app.core.redis import redis_client
+from app.db.session import SessionLocal
 from app.services.church_data_context import (
     get_enhanced_member_statistics,
     get_all_offerings,
@@ -31,10 +46,31 @@ from app.services.church_data_context import (
 logger = logging.getLogger(__name__)
 
 
-class ChurchDataCache:
-    """교회 데이터 캐싱 매니저"""
+# 로컬 캐시 미스 표시 (None/빈 목록도 유효한 캐시 값이므로 별도 센티널 사용)
+_MISS = object()
+
+
+class _Flight:
+    """동일 키에 대한 진행 중인 DB 조회 (single-flight)"""
 
     def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.failed = False
+
+
+class ChurchDataCache:
+    """
+    교회 데이터 캐싱 매니저
+
+    2단계 캐시: 프로세스 내 LRU/TTL (L1) → Redis (L2) → DB
+    - L1 항목은 저장 시점의 버전을 함께 보관하고, Redis 버전과 다르면 폐기
+    - Redis 장애 시에는 버전 확인 없이 TTL 이내의 L1 데이터를 그대로 제공
+    - 같은 키에 대한 동시 캐시 미스는 한 번의 DB 조회로 합침
+    - L1 값은 호출자 간에 공유되므로 읽기 전용으로 사용해야 함
+    """
+
+    def __init__(self, local_max_size: int = None):
         self.redis = redis_client
         
         # 데이터 타입별 캐시 TTL 설정 (초 단위)
@@ -48,6 +84,22 @@ class ChurchDataCache:
             "pastoral_care_requests": 600, # 10분 - 심방요청은 비교적 자주 변경
         }
         
+        # TTL 만료 후 이전 값을 제공하며 백그라운드 갱신하는 유예 시간 (초)
+        # - 여기 없는 타입은 만료 즉시 동기 재조회
+        self.stale_ttl = {
+            "member_stats": 3600,
+            "offering_stats": 1800,
+            "attendance_stats": 900,
+        }
+
+        # 주일 예배 전 Celery beat 로 미리 채워둘 데이터 타입
+        self.prewarm_data_types = [
+            "member_stats",
+            "offering_stats",
+            "attendance_stats",
+            "worship_schedule",
+        ]
+
         # 데이터 조회 함수 매핑
         self.data_fetchers = {
             "member_stats": get_enhanced_member_statistics,
@@ -59,11 +111,46 @@ class ChurchDataCache:
             "pastoral_care_requests": get_recent_pastoral_care_requests,
         }
 
+        # L1: (church_id, data_type, params) -> (version, expires_at, data)
+        self.local_max_size = local_max_size or settings.CHURCH_DATA_LOCAL_CACHE_SIZE
+        self.single_flight_timeout = 30.0  # 대표 조회를 기다리는 최대 시간 (초)
+        self.refresh_lock_ttl = 60  # 백그라운드 갱신 락 유지 시간 (초)
+        self._refresh_executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="church-cache-refresh"
+        )
+        self._local: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._inflight: Dict[tuple, _Flight] = {}
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(
+            (
+                "local_hits",
+                "local_misses",
+                "redis_hits",
+                "redis_misses",
+                "db_fetches",
+                "coalesced",
+                "local_evictions",
+                "stale_served",
+                "background_refreshes",
+            ),
+            0,
+        )
+
+    def get_cache_tag(self, church_id: int, data_type: str) -> str:
+        """버전 카운터 태그 (교회 + 데이터 타입 단위)"""
+        return f"church_data:{church_id}:{data_type}"
+
     def get_cache_key(self, church_id: int, data_type: str, **params) -> str:
-        """캐시 키 생성"""
+        """캐시 키 생성 (현재 버전 포함)"""
+        tag = self.get_cache_tag(church_id, data_type)
+        return self._build_key(church_id, data_type, self.redis.cache_get_version(tag), params)
+
+    def _build_key(
+        self, church_id: int, data_type: str, version: int, params: Dict[str, Any]
+    ) -> str:
         # 파라미터가 있으면 포함하여 고유한 키 생성
         param_str = "_".join(f"{k}={v}" for k, v in sorted(params.items())) if params else ""
-        key_data = f"church_data:{church_id}:{data_type}"
+        key_data = f"{self.get_cache_tag(church_id, data_type)}:v{version}"
         if param_str:
             key_data += f":{param_str}"
         
@@ -72,78 +159,276 @@ class ChurchDataCache:
             return f"church_data:{church_id}:{hashlib.md5(key_data.encode()).hexdigest()}"
         return key_data
 
-    def get_cached_data(self, db: Session, church_id: int, data_type: str, **params) -> Any:
-        """캐시된 데이터 조회 (캐시 미스시 DB에서 조회 후 캐시 저장)"""
-        
+    def _get_version(self, church_id: int, data_type: str) -> Optional[int]:
+        """현재 버전 조회 (Redis 사용 불가 시 None)"""
         if not self.redis.connected:
-            # Redis가 사용 불가능하면 직접 DB 조회
-            logger.warning(f"Redis not available, fetching {data_type} directly from DB")
-            return self._fetch_from_db(db, church_id, data_type, **params)
-        
-        cache_key = self.get_cache_key(church_id, data_type, **params)
-        
+            return None
         try:
-            # 캐시에서 조회
-            cached_data = self.redis.cache_get(cache_key)
-            if cached_data:
-                logger.info(f"Cache HIT for {data_type} (church_id: {church_id})")
-                return cached_data
-            
-            # 캐시 미스 - DB에서 조회
+            return self.redis.cache_get_version(self.get_cache_tag(church_id, data_type))
+        except Exception as e:
+            logger.warning(f"Redis version lookup failed for {data_type}: {e}")
+            return None
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def _local_get(self, local_key: tuple, version: Optional[int]) -> Any:
+        with self._lock:
+            entry = self._local.get(local_key)
+            if entry is None:
+                return _MISS
+            entry_version, expires_at, data = entry
+            if time.monotonic() >= expires_at or (
+                version is not None and entry_version != version
+            ):
+                del self._local[local_key]
+                return _MISS
+            self._local.move_to_end(local_key)
+            return data
+
+    def _local_set(
+        self, local_key: tuple, version: Optional[int], data: Any, ttl: float = None
+    ):
+        if ttl is None:
+            ttl = self.cache_ttl.get(local_key[1], 300)
+        with self._lock:
+            self._local[local_key] = (version, time.monotonic() + ttl, data)
+            self._local.move_to_end(local_key)
+            while len(self._local) > self.local_max_size:
+                self._local.popitem(last=False)
+                self._counters["local_evictions"] += 1
+
+    def get_cached_data(self, db: Session, church_id: int, data_type: str, **params) -> Any:
+        """캐시된 데이터 조회 (L1 → Redis → DB 순서, 미스 시 상위 계층에 저장)"""
+        local_key = (church_id, data_type, tuple(sorted(params.items())))
+        version = self._get_version(church_id, data_type)
+
+        data = self._local_get(local_key, version)
+        if data is not _MISS:
+            self._count("local_hits")
+            return data
+        self._count("local_misses")
+
+        if version is not None:
+            cache_key = self._build_key(church_id, data_type, version, params)
+            try:
+                cached_data = self.redis.cache_get(cache_key)
+            except Exception as e:
+                logger.error(f"Cache error for {data_type}: {e}")
+                cached_data = None
+            if cached_data is not None:
+                data, fresh_for = self._unwrap(data_type, cached_data)
+                if fresh_for > 0:
+                    logger.info(f"Cache HIT for {data_type} (church_id: {church_id})")
+                    self._count("redis_hits")
+                    self._local_set(local_key, version, data, ttl=fresh_for)
+                    return data
+
+                # 만료되었지만 유예 시간 이내 - 이전 값 반환 후 백그라운드 갱신
+                logger.info(f"Cache STALE for {data_type} (church_id: {church_id})")
+                self._count("stale_served")
+                self._schedule_refresh(cache_key, version, church_id, data_type, params)
+                return data
+            self._count("redis_misses")
             logger.info(f"Cache MISS for {data_type} (church_id: {church_id})")
+        else:
+            logger.warning(f"Redis not available, fetching {data_type} from local cache or DB")
+
+        return self._load_single_flight(db, local_key, version, church_id, data_type, params)
+
+    def _load_single_flight(
+        self,
+        db: Session,
+        local_key: tuple,
+        version: Optional[int],
+        church_id: int,
+        data_type: str,
+        params: Dict[str, Any],
+    ) -> Any:
+        """동시 미스는 먼저 도착한 요청 하나만 DB 를 조회하고 나머지는 결과를 공유"""
+        with self._lock:
+            flight = self._inflight.get(local_key)
+            is_leader = flight is None
+            if is_leader:
+                flight = self._inflight[local_key] = _Flight()
+
+        if not is_leader:
+            self._count("coalesced")
+            if flight.event.wait(self.single_flight_timeout) and not flight.failed:
+                return flight.result
+            # 대표 조회가 실패했거나 너무 오래 걸리면 직접 조회
+            return self._fetch_from_db(db, church_id, data_type, **params)
+
+        try:
+            self._count("db_fetches")
             data = self._fetch_from_db(db, church_id, data_type, **params)
-            
-            # 캐시에 저장
-            ttl = self.cache_ttl.get(data_type, 300)  # 기본 5분 TTL
-            self.redis.cache_set(cache_key, data, ttl=ttl)
-            logger.info(f"Cached {data_type} for {ttl}s (church_id: {church_id})")
-            
+            flight.result = data
+            self._store(version, church_id, data_type, params, data)
             return data
-            
+        except Exception:
+            flight.failed = True
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(local_key, None)
+            flight.event.set()
+
+    def _unwrap(self, data_type: str, cached: Any) -> Tuple[Any, float]:
+        """Redis 값에서 (데이터, 남은 신선 시간) 추출"""
+        if isinstance(cached, dict) and cached.get("__swr__"):
+            return cached["data"], cached["fresh_until"] - time.time()
+        return cached, self.cache_ttl.get(data_type, 300)
+
+    def _store(
+        self,
+        version: Optional[int],
+        church_id: int,
+        data_type: str,
+        params: Dict[str, Any],
+        data: Any,
+    ):
+        """L1 과 Redis 에 저장 (stale 허용 타입은 신선 기한을 함께 저장)"""
+        ttl = self.cache_ttl.get(data_type, 300)  # 기본 5분 TTL
+        local_key = (church_id, data_type, tuple(sorted(params.items())))
+        self._local_set(local_key, version, data, ttl=ttl)
+
+        if version is None:
+            return
+
+        value, redis_ttl = data, ttl
+        stale_ttl = self.stale_ttl.get(data_type)
+        if stale_ttl:
+            value = {"__swr__": True, "fresh_until": time.time() + ttl, "data": data}
+            redis_ttl = ttl + stale_ttl
+        try:
+            self.redis.cache_set(
+                self._build_key(church_id, data_type, version, params), value, ttl=redis_ttl
+            )
+            logger.info(f"Cached {data_type} for {ttl}s (church_id: {church_id})")
         except Exception as e:
             logger.error(f"Cache error for {data_type}: {e}")
-            # 캐시 오류시 직접 DB 조회
-            return self._fetch_from_db(db, church_id, data_type, **params)
+
+    def _schedule_refresh(
+        self,
+        cache_key: str,
+        version: int,
+        church_id: int,
+        data_type: str,
+        params: Dict[str, Any],
+    ):
+        """Redis 락을 잡은 경우에만 백그라운드 갱신 예약 (다른 워커가 갱신 중이면 생략)"""
+        lock_name = f"refresh:{cache_key}"
+        try:
+            token = self.redis.acquire_lock(lock_name, ttl=self.refresh_lock_ttl)
+        except Exception as e:
+            logger.error(f"Failed to acquire refresh lock for {data_type}: {e}")
+            return
+        if not token:
+            return
+        self._refresh_executor.submit(
+            self._refresh_in_background, lock_name, token, version, church_id, data_type, params
+        )
+
+    def _refresh_in_background(
+        self,
+        lock_name: str,
+        token: str,
+        version: int,
+        church_id: int,
+        data_type: str,
+        params: Dict[str, Any],
+    ):
+        try:
+            self._count("background_refreshes")
+            with SessionLocal() as db:
+                data = self._run_fetcher(db, church_id, data_type, params)
+            self._store(version, church_id, data_type, params, data)
+        except Exception as e:
+            # 조회 실패 시 기존 stale 값을 유지 (다음 요청이 다시 갱신 시도)
+            logger.error(f"Background refresh failed for {data_type} (church_id: {church_id}): {e}")
+        finally:
+            try:
+                self.redis.release_lock(lock_name, token)
+            except Exception as e:
+                logger.warning(f"Failed to release refresh lock {lock_name}: {e}")
+
+    def warm_cache(
+        self, db: Session, church_id: int, data_types: Optional[List[str]] = None
+    ) -> List[str]:
+        """
+        지정한 데이터 타입을 DB 에서 새로 조회해 캐시에 저장 (예배 전 사전 적재용)
+
+        Returns:
+            적재된 데이터 타입 목록
+        """
+        warmed = []
+        for data_type in data_types or self.prewarm_data_types:
+            version = self._get_version(church_id, data_type)
+            if version is None:
+                # Redis 없이 채운 L1 은 이 프로세스(beat 워커)에서만 보이므로 의미 없음
+                break
+            # get_*_cached 헬퍼와 같은 파라미터를 써야 같은 키가 채워짐
+            params = {"limit": 100} if self._accepts_limit(data_type) else {}
+            try:
+                data = self._run_fetcher(db, church_id, data_type, params)
+            except Exception as e:
+                logger.error(f"Failed to warm {data_type} (church_id: {church_id}): {e}")
+                continue
+            self._store(version, church_id, data_type, params, data)
+            warmed.append(data_type)
+        return warmed
+
+    def _accepts_limit(self, data_type: str) -> bool:
+        fetcher = self.data_fetchers.get(data_type)
+        return fetcher is not None and "limit" in inspect.signature(fetcher).parameters
+
+    def _run_fetcher(
+        self, db: Session, church_id: int, data_type: str, params: Dict[str, Any]
+    ) -> Any:
+        """조회 함수 실행 (오류는 호출자에게 전달)"""
+        fetcher = self.data_fetchers[data_type]
+
+        # limit 파라미터가 있는 함수들 처리
+        if self._accepts_limit(data_type):
+            return fetcher(db, church_id, params.get("limit", 100))
+        return fetcher(db, church_id)
 
     def _fetch_from_db(self, db: Session, church_id: int, data_type: str, **params) -> Any:
         """데이터베이스에서 직접 데이터 조회"""
         
-        fetcher = self.data_fetchers.get(data_type)
-        if not fetcher:
+        if data_type not in self.data_fetchers:
             logger.error(f"No fetcher found for data_type: {data_type}")
             return {}
             
         try:
-            # 함수 시그니처에 따라 파라미터 전달
-            import inspect
-            sig = inspect.signature(fetcher)
-            
-            # limit 파라미터가 있는 함수들 처리
-            if 'limit' in sig.parameters:
-                limit = params.get('limit', 100)
-                return fetcher(db, church_id, limit)
-            else:
-                return fetcher(db, church_id)
+            return self._run_fetcher(db, church_id, data_type, params)
                 
         except Exception as e:
             logger.error(f"Error fetching {data_type} from DB: {e}")
             return {} if data_type.endswith('_stats') else []
 
     def invalidate_cache(self, church_id: int, data_types: List[str]):
-        """캐시 무효화"""
+        """캐시 무효화 (데이터 타입별 버전 증가 - 모든 파라미터 변형 키가 무효화됨)"""
+
+        # 이 프로세스의 L1 항목은 Redis 상태와 무관하게 즉시 제거
+        with self._lock:
+            for local_key in [
+                k for k in self._local if k[0] == church_id and k[1] in data_types
+            ]:
+                del self._local[local_key]
         
         if not self.redis.connected:
             logger.warning("Redis not available, cannot invalidate cache")
             return
             
         try:
-            invalidated_count = 0
             for data_type in data_types:
-                cache_key = self.get_cache_key(church_id, data_type)
-                self.redis.cache_delete(cache_key)
-                invalidated_count += 1
+                self.redis.cache_bump_version(self.get_cache_tag(church_id, data_type))
                 
-            logger.info(f"Invalidated {invalidated_count} cache entries for church_id: {church_id}")
+            logger.info(
+                f"Invalidated {', '.join(data_types)} cache for church_id: {church_id}"
+            )
             
         except Exception as e:
             logger.error(f"Error invalidating cache: {e}")
@@ -153,27 +438,63 @@ class ChurchDataCache:
         all_data_types = list(self.cache_ttl.keys())
         self.invalidate_cache(church_id, all_data_types)
 
+    def get_tier_stats(self) -> Dict[str, Any]:
+        """계층별 적중률 (프로세스 시작 이후 누적)"""
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._local)
+
+        def ratio(hits: int, misses: int) -> float:
+            return round(hits / (hits + misses), 4) if hits + misses else 0.0
+
+        return {
+            "local": {
+                "hits": counters["local_hits"],
+                "misses": counters["local_misses"],
+                "hit_ratio": ratio(counters["local_hits"], counters["local_misses"]),
+                "size": size,
+                "max_size": self.local_max_size,
+                "evictions": counters["local_evictions"],
+            },
+            "redis": {
+                "hits": counters["redis_hits"],
+                "misses": counters["redis_misses"],
+                "hit_ratio": ratio(counters["redis_hits"], counters["redis_misses"]),
+            },
+            "db_fetches": counters["db_fetches"],
+            "coalesced": counters["coalesced"],
+            "stale_served": counters["stale_served"],
+            "background_refreshes": counters["background_refreshes"],
+        }
+
     def get_cache_stats(self, church_id: int) -> Dict[str, Any]:
         """캐시 통계 정보 조회"""
         
         if not self.redis.connected:
-            return {"status": "Redis not available"}
+            return {"status": "Redis not available", "tiers": self.get_tier_stats()}
             
         stats = {
             "church_id": church_id,
             "timestamp": datetime.now().isoformat(),
+            "tiers": self.get_tier_stats(),
             "cache_status": {},
         }
         
         for data_type in self.cache_ttl.keys():
-            cache_key = self.get_cache_key(church_id, data_type)
+            tag = self.get_cache_tag(church_id, data_type)
             try:
-                # 캐시 존재 여부 및 TTL 확인
-                exists = self.redis.client.exists(f"cache:{cache_key}")
-                ttl = self.redis.client.ttl(f"cache:{cache_key}") if exists else -1
+                # 현재 버전의 캐시 키 (파라미터 변형 포함) 존재 여부 및 TTL 확인
+                version = self.redis.cache_get_version(tag)
+                base_key = f"cache:{tag}:v{version}"
+                keys = list(self.redis.client.scan_iter(match=f"{base_key}:*", count=100))
+                if self.redis.client.exists(base_key):
+                    keys.append(base_key)
+                ttl = max((self.redis.client.ttl(k) for k in keys), default=-1)
                 
                 stats["cache_status"][data_type] = {
-                    "cached": bool(exists),
+                    "cached": bool(keys),
+                    "variants": len(keys),
+                    "version": version,
                     "ttl_seconds": ttl,
                     "configured_ttl": self.cache_ttl[data_type],
                 }
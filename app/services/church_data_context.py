@@ -1,16 +1,24 @@
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func, text
+from sqlalchemy import and_, desc, func, literal, select, union_all
 import logging
 
 from app.models.announcement import Announcement
 from app.models.user import User
 from app.models.worship_schedule import WorshipService
 from app.models.pastoral_care import PastoralCareRequest, PrayerRequest
-from app.models.financial import Offering, FundType
-from app.models.attendance import Attendance
+from app.models.financial import Offering, FundType, OfferingMonthlyRollup
+from app.models.attendance import Attendance, AttendanceRollup
 from app.models.member import Member, Family
+from app.services.attendance_rollup import ALL_SERVICES
+from app.services.content_search import (  # noqa: F401  (기존 import 경로 유지)
+    search_all_content,
+    search_announcements,
+    search_members,
+    search_pastoral_care_requests,
+    search_prayer_requests,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -23,10 +31,16 @@ def get_church_context_data(
     requested_sources: List[str] = None,
     format: str = "detailed",
     prioritize_church_data: bool = False,
+    retrieval: bool = False,
 ) -> Dict[str, Any]:
     """
     Retrieve church data based on enabled data sources.
 
+    With retrieval=True and a user_query, the requested announcements and prayer
+    requests are not dumped in full; the top-k public chunks closest to the query
+    are returned as "retrieved_content" instead. Until the church's index has
+    been built (in Celery) the full lists are used.
+
     Args:
         db: Database session
         church_id: Church ID
@@ -35,6 +49,7 @@ def get_church_context_data(
         requested_sources: List of specific sources to include
         format: Response format (detailed, summary, compact)
         prioritize_church_data: Whether this is for priority church data mode
+        retrieval: Use the local content index instead of full content lists
 
     Returns:
         Dictionary containing church context data
@@ -83,8 +98,26 @@ def get_church_context_data(
             get_offering_stats_cached,
         )
 
+        retrieved_sources = set()
+        if retrieval and user_query:
+            try:
+                from app.services.content_index import SOURCE_DOC_TYPES, retrieve
+
+                retrieved_sources = {s for s in sources_to_include if s in SOURCE_DOC_TYPES}
+                if retrieved_sources:
+                    doc_types = {SOURCE_DOC_TYPES[s] for s in retrieved_sources}
+                    hits = retrieve(db, church_id, user_query, doc_types=doc_types)
+                    if hits is None:
+                        # No index yet (build queued): fall back to full lists
+                        retrieved_sources = set()
+                    else:
+                        context_data["retrieved_content"] = hits
+            except Exception as e:
+                logger.warning(f"Content retrieval failed, using full lists: {e}")
+                retrieved_sources = set()
+
         # Simple direct data fetching - back to original working state
-        if "announcements" in sources_to_include:
+        if "announcements" in sources_to_include and "announcements" not in retrieved_sources:
             context_data["announcements"] = get_announcements_cached(db, church_id)
 
         if "attendance" in sources_to_include or "attendances" in sources_to_include:
@@ -105,7 +138,7 @@ def get_church_context_data(
         if "worship_services" in sources_to_include or "worship" in sources_to_include:
             context_data["worship_schedule"] = get_worship_schedule_cached(db, church_id)
 
-        if "prayer_requests" in sources_to_include:
+        if "prayer_requests" in sources_to_include and "prayer_requests" not in retrieved_sources:
             context_data["prayer_requests"] = get_prayer_requests_cached(db, church_id)
 
         if "pastoral_care_requests" in sources_to_include or "pastoral_care" in sources_to_include:
@@ -281,7 +314,7 @@ def get_all_offerings(db: Session, church_id: int) -> Dict:
     Get comprehensive offering statistics for the church (all data).
     """
     try:
-        from datetime import datetime, timedelta
+        from datetime import datetime
 
         # Calculate multiple date ranges
         end_date = datetime.now().date()
@@ -290,9 +323,6 @@ def get_all_offerings(db: Session, church_id: int) -> Dict:
         # This year and last year
         current_year = end_date.year
         last_year = current_year - 1
-        this_year_start = datetime(current_year, 1, 1).date()
-        last_year_start = datetime(last_year, 1, 1).date()
-        last_year_end = datetime(last_year, 12, 31).date()
 
         # Current month and last month
         current_month_start = end_date.replace(day=1)
@@ -305,96 +335,55 @@ def get_all_offerings(db: Session, church_id: int) -> Dict:
                 month=current_month_start.month - 1
             )
 
-        # Get total offering for all time
-        total_all_time = (
-            db.query(func.sum(Offering.amount))
-            .filter(Offering.church_id == church_id, Offering.offered_on <= end_date)
-            .scalar()
-            or 0
-        )
-
-        # Get this year total
-        total_this_year = (
-            db.query(func.sum(Offering.amount))
-            .filter(
-                Offering.church_id == church_id,
-                Offering.offered_on >= this_year_start,
-                Offering.offered_on <= end_date,
-            )
-            .scalar()
-            or 0
-        )
-
-        # Get last year total
-        total_last_year = (
-            db.query(func.sum(Offering.amount))
-            .filter(
-                Offering.church_id == church_id,
-                Offering.offered_on >= last_year_start,
-                Offering.offered_on <= last_year_end,
-            )
-            .scalar()
-            or 0
-        )
+        # Totals from the monthly rollup (one row per month and fund type)
+        rollup = OfferingMonthlyRollup
+        year_month = rollup.year * 100 + rollup.month
+        current_ym = current_year * 100 + current_month_start.month
+        last_month_ym = last_month_start.year * 100 + last_month_start.month
 
-        # Get this month total
-        total_this_month = (
-            db.query(func.sum(Offering.amount))
-            .filter(
-                Offering.church_id == church_id,
-                Offering.offered_on >= current_month_start,
-                Offering.offered_on <= end_date,
+        totals = (
+            db.query(
+                func.sum(rollup.total_amount).filter(year_month <= current_ym).label("all_time"),
+                func.sum(rollup.total_amount)
+                .filter(rollup.year == current_year, year_month <= current_ym)
+                .label("this_year"),
+                func.sum(rollup.total_amount).filter(rollup.year == last_year).label("last_year"),
+                func.sum(rollup.total_amount).filter(year_month == current_ym).label("this_month"),
+                func.sum(rollup.total_amount).filter(year_month == last_month_ym).label("last_month"),
             )
-            .scalar()
-            or 0
+            .filter(rollup.church_id == church_id)
+            .one()
         )
-
-        # Get last month total
-        if current_month_start.month == 1:
-            last_month_end = datetime(current_month_start.year - 1, 12, 31).date()
-        else:
-            last_month_end = current_month_start - timedelta(days=1)
-
-        total_last_month = (
-            db.query(func.sum(Offering.amount))
-            .filter(
-                Offering.church_id == church_id,
-                Offering.offered_on >= last_month_start,
-                Offering.offered_on <= last_month_end,
-            )
-            .scalar()
-            or 0
+        total_all_time = totals.all_time or 0
+        total_this_year = totals.this_year or 0
+        total_last_year = totals.last_year or 0
+        total_this_month = totals.this_month or 0
+        total_last_month = totals.last_month or 0
+
+        this_year = (
+            rollup.church_id == church_id,
+            rollup.year == current_year,
+            rollup.month <= current_month_start.month,
         )
 
         # Monthly breakdown for this year
         monthly_breakdown = (
-            db.query(
-                func.extract("month", Offering.offered_on).label("month"),
-                func.sum(Offering.amount).label("total"),
-            )
-            .filter(
-                Offering.church_id == church_id,
-                Offering.offered_on >= this_year_start,
-                Offering.offered_on <= end_date,
-            )
-            .group_by(func.extract("month", Offering.offered_on))
-            .order_by("month")
+            db.query(rollup.month, func.sum(rollup.total_amount).label("total"))
+            .filter(*this_year)
+            .group_by(rollup.month)
+            .order_by(rollup.month)
             .all()
         )
 
         # Fund type breakdown for this year
         fund_stats_year = (
             db.query(
-                Offering.fund_type,
-                func.sum(Offering.amount).label("total"),
-                func.count(Offering.id).label("count"),
+                rollup.fund_type,
+                func.sum(rollup.total_amount).label("total"),
+                func.sum(rollup.offering_count).label("count"),
             )
-            .filter(
-                Offering.church_id == church_id,
-                Offering.offered_on >= this_year_start,
-                Offering.offered_on <= end_date,
-            )
-            .group_by(Offering.fund_type)
+            .filter(*this_year)
+            .group_by(rollup.fund_type)
             .order_by(desc("total"))
             .all()
         )
@@ -525,7 +514,6 @@ def get_attendance_stats(db: Session, church_id: int) -> Dict:
         # Get date ranges
         today = datetime.now().date()
         last_week_start = today - timedelta(days=today.weekday() + 7)  # Last Monday
-        last_week_end = last_week_start + timedelta(days=6)  # Last Sunday
 
         # Get total member count
         total_members = (
@@ -534,15 +522,20 @@ def get_attendance_stats(db: Session, church_id: int) -> Dict:
             .count()
         )
 
+        # 기간별 출석 수는 attendance_rollups 에서 읽음 (원본 전체 스캔 없음)
+        rollups = db.query(AttendanceRollup).filter(
+            AttendanceRollup.church_id == church_id,
+            AttendanceRollup.present_count > 0,
+        )
+        all_services = rollups.filter(AttendanceRollup.service_type == ALL_SERVICES)
+
         # Get last week attendance
         last_week_attendance = (
-            db.query(func.count(Attendance.id.distinct()))
-            .filter(
-                Attendance.church_id == church_id,
-                Attendance.service_date >= last_week_start,
-                Attendance.service_date <= last_week_end,
-                Attendance.present == True,
+            all_services.filter(
+                AttendanceRollup.period_type == "week",
+                AttendanceRollup.period_start == last_week_start,
             )
+            .with_entities(AttendanceRollup.present_count)
             .scalar()
             or 0
         )
@@ -550,38 +543,24 @@ def get_attendance_stats(db: Session, church_id: int) -> Dict:
         # Get attendance by service type for last 4 weeks
         four_weeks_ago = today - timedelta(weeks=4)
         service_stats = (
-            db.query(
-                Attendance.service_type,
-                func.count(Attendance.id).label("total_attendance"),
-                func.count(func.distinct(Attendance.service_date)).label(
-                    "service_count"
-                ),
+            rollups.filter(
+                AttendanceRollup.service_type != ALL_SERVICES,
+                AttendanceRollup.period_type == "day",
+                AttendanceRollup.period_start >= four_weeks_ago,
             )
-            .filter(
-                Attendance.church_id == church_id,
-                Attendance.service_date >= four_weeks_ago,
-                Attendance.present == True,
+            .with_entities(
+                AttendanceRollup.service_type,
+                func.sum(AttendanceRollup.present_count).label("total_attendance"),
+                func.count(AttendanceRollup.period_start).label("service_count"),
             )
-            .group_by(Attendance.service_type)
+            .group_by(AttendanceRollup.service_type)
             .all()
         )
 
         # Monthly attendance trends (전체 기간)
         monthly_attendance = (
-            db.query(
-                func.extract("year", Attendance.service_date).label("year"),
-                func.extract("month", Attendance.service_date).label("month"),
-                func.count(Attendance.id).label("attendance_count"),
-                func.count(func.distinct(Attendance.member_id)).label(
-                    "unique_attendees"
-                ),
-            )
-            .filter(Attendance.church_id == church_id, Attendance.present == True)
-            .group_by(
-                func.extract("year", Attendance.service_date),
-                func.extract("month", Attendance.service_date),
-            )
-            .order_by("year", "month")
+            all_services.filter(AttendanceRollup.period_type == "month")
+            .order_by(AttendanceRollup.period_start)
             .all()
         )
 
@@ -604,21 +583,12 @@ def get_attendance_stats(db: Session, church_id: int) -> Dict:
         # Weekly attendance pattern (last 8 weeks)
         eight_weeks_ago = today - timedelta(weeks=8)
         weekly_attendance = (
-            db.query(
-                func.extract("week", Attendance.service_date).label("week"),
-                func.extract("year", Attendance.service_date).label("year"),
-                func.count(Attendance.id).label("attendance_count"),
-            )
-            .filter(
-                Attendance.church_id == church_id,
-                Attendance.service_date >= eight_weeks_ago,
-                Attendance.present == True,
-            )
-            .group_by(
-                func.extract("year", Attendance.service_date),
-                func.extract("week", Attendance.service_date),
+            all_services.filter(
+                AttendanceRollup.period_type == "week",
+                AttendanceRollup.period_start
+                >= eight_weeks_ago - timedelta(days=eight_weeks_ago.weekday()),
             )
-            .order_by("year", "week")
+            .order_by(AttendanceRollup.period_start)
             .all()
         )
 
@@ -672,8 +642,8 @@ def get_attendance_stats(db: Session, church_id: int) -> Dict:
             ],
             "monthly_trends": [
                 {
-                    "year": int(month.year),
-                    "month": int(month.month),
+                    "year": month.period_start.year,
+                    "month": month.period_start.month,
                     "month_name": [
                         "",
                         "1월",
@@ -688,17 +658,17 @@ def get_attendance_stats(db: Session, church_id: int) -> Dict:
                         "10월",
                         "11월",
                         "12월",
-                    ][int(month.month)],
-                    "total_attendance": month.attendance_count,
-                    "unique_attendees": month.unique_attendees,
+                    ][month.period_start.month],
+                    "total_attendance": month.present_count,
+                    "unique_attendees": month.distinct_members,
                 }
                 for month in monthly_attendance
             ],
             "weekly_trends": [
                 {
-                    "year": int(week.year),
-                    "week": int(week.week),
-                    "attendance_count": week.attendance_count,
+                    "year": week.period_start.isocalendar()[0],
+                    "week": week.period_start.isocalendar()[1],
+                    "attendance_count": week.present_count,
                 }
                 for week in weekly_attendance
             ],
@@ -741,208 +711,152 @@ def get_attendance_stats(db: Session, church_id: int) -> Dict:
         }
 
 
-def get_enhanced_member_statistics(db: Session, church_id: int) -> Dict:
-    """
-    Get enhanced member statistics for the church (without personal information).
+# Member columns summarized as {value: count} maps in get_enhanced_member_statistics
+MEMBER_STAT_DIMENSIONS = {
+    "position": Member.position,
+    "department": Member.department,
+    "district": Member.district,
+    "gender": Member.gender,
+    "marital_status": Member.marital_status,
+    "age": Member.age,
+}
+
+
+def _count_active_members_by_dimension(
+    db: Session, church_id: int
+) -> Dict[str, Dict[Any, int]]:
     """
-    try:
-        from datetime import datetime, timedelta
+    Count active members per value of each MEMBER_STAT_DIMENSIONS column in one query.
 
-        # Total members (using Member table)
-        total_members = (
-            db.query(Member)
-            .filter(Member.church_id == church_id, Member.status == "active")
-            .count()
-        )
+    PostgreSQL uses GROUPING SETS (a single scan over the church's members);
+    other dialects fall back to one UNION ALL statement. NULL and empty values
+    are dropped.
+    """
+    active = and_(Member.church_id == church_id, Member.status == "active")
+    counts: Dict[str, Dict[Any, int]] = {name: {} for name in MEMBER_STAT_DIMENSIONS}
 
-        # Members by position (직분)
-        position_stats = (
-            db.query(Member.position, func.count(Member.id).label("count"))
-            .filter(Member.church_id == church_id, Member.status == "active")
-            .group_by(Member.position)
+    if db.bind.dialect.name == "postgresql":
+        columns = list(MEMBER_STAT_DIMENSIONS.values())
+        rows = (
+            db.query(
+                *columns,
+                *(func.grouping(column) for column in columns),
+                func.count(Member.id),
+            )
+            .filter(active)
+            .group_by(func.grouping_sets(*columns))
             .all()
         )
+        width = len(columns)
+        for row in rows:
+            flags = row[width : width * 2]
+            # grouping(column) = 0 marks the set this row was aggregated over
+            index = flags.index(0)
+            if row[index] not in (None, ""):
+                counts[list(MEMBER_STAT_DIMENSIONS)[index]][row[index]] = row[-1]
+        return counts
+
+    statements = [
+        select(
+            literal(name).label("dimension"),
+            column.label("value"),
+            func.count(Member.id).label("count"),
+        )
+        .where(active, column.isnot(None))
+        .group_by(column)
+        for name, column in MEMBER_STAT_DIMENSIONS.items()
+    ]
+    for dimension, value, count in db.execute(union_all(*statements)):
+        if value != "":
+            counts[dimension][value] = count
+    return counts
+
+
+def get_enhanced_member_statistics(db: Session, church_id: int) -> Dict:
+    """
+    Get enhanced member statistics for the church (without personal information).
+
+    Three round trips: scalar aggregates (FILTER clauses), per-column counts
+    (GROUPING SETS) and the 20 most recent baptisms.
+    """
+    try:
+        from datetime import datetime
 
-        # New members this month
         start_of_month = (
             datetime.now()
             .replace(day=1, hour=0, minute=0, second=0, microsecond=0)
             .date()
         )
-        new_members_this_month = (
-            db.query(Member)
-            .filter(
-                Member.church_id == church_id,
-                Member.registration_date >= start_of_month,
-                Member.status == "active",
-            )
-            .count()
-        )
 
-        # Members by department
-        department_stats = (
-            db.query(Member.department, func.count(Member.id).label("count"))
-            .filter(
-                Member.church_id == church_id,
-                Member.status == "active",
-                Member.department.isnot(None),
-            )
-            .group_by(Member.department)
-            .all()
-        )
+        def count_where(*conditions):
+            return func.count(Member.id).filter(*conditions)
 
-        # Members by district (구역)
-        district_stats = (
-            db.query(Member.district, func.count(Member.id).label("count"))
-            .filter(
-                Member.church_id == church_id,
-                Member.status == "active",
-                Member.district.isnot(None),
-            )
-            .group_by(Member.district)
-            .all()
+        family_count_subquery = (
+            select(func.count(Family.id))
+            .where(Family.church_id == church_id)
+            .scalar_subquery()
         )
 
-        # Age demographics (optimized single query with CASE WHEN)
-        from sqlalchemy import case
-        
-        age_stats_raw = (
+        totals = (
             db.query(
-                func.sum(
-                    case(
-                        (Member.age.between(0, 12), 1),
-                        else_=0
-                    )
-                ).label("children"),
-                func.sum(
-                    case(
-                        (Member.age.between(13, 18), 1),
-                        else_=0
-                    )
-                ).label("youth"),
-                func.sum(
-                    case(
-                        (Member.age.between(19, 35), 1),
-                        else_=0
-                    )
-                ).label("young_adult"),
-                func.sum(
-                    case(
-                        (Member.age.between(36, 60), 1),
-                        else_=0
-                    )
-                ).label("adult"),
-                func.sum(
-                    case(
-                        (Member.age.between(61, 150), 1),
-                        else_=0
-                    )
-                ).label("senior")
-            )
-            .filter(
-                Member.church_id == church_id,
-                Member.status == "active",
-                Member.age.isnot(None)
-            )
-            .first()
-        )
-        
-        age_stats = {
-            "children": age_stats_raw.children or 0,
-            "youth": age_stats_raw.youth or 0,
-            "young_adult": age_stats_raw.young_adult or 0,
-            "adult": age_stats_raw.adult or 0,
-            "senior": age_stats_raw.senior or 0,
-        }
-
-        # Gender statistics (more detailed)
-        gender_stats = (
-            db.query(Member.gender, func.count(Member.id).label("count"))
-            .filter(
-                Member.church_id == church_id,
-                Member.status == "active",
-                Member.gender.isnot(None),
+                func.count(Member.id).label("total_members"),
+                count_where(Member.registration_date >= start_of_month).label(
+                    "new_members_this_month"
+                ),
+                count_where(Member.baptism_date.isnot(None)).label("baptized"),
+                func.avg(Member.age).label("average_age"),
+                count_where(Member.age.between(0, 12)).label("children"),
+                count_where(Member.age.between(13, 18)).label("youth"),
+                count_where(Member.age.between(19, 35)).label("young_adult"),
+                count_where(Member.age.between(36, 60)).label("adult"),
+                count_where(Member.age.between(61, 150)).label("senior"),
+                family_count_subquery.label("family_count"),
             )
-            .group_by(Member.gender)
-            .all()
+            .filter(Member.church_id == church_id, Member.status == "active")
+            .one()
         )
 
-        # Marital status statistics
-        marital_stats = (
-            db.query(Member.marital_status, func.count(Member.id).label("count"))
-            .filter(
-                Member.church_id == church_id,
-                Member.status == "active",
-                Member.marital_status.isnot(None),
-            )
-            .group_by(Member.marital_status)
-            .all()
-        )
+        dimension_counts = _count_active_members_by_dimension(db, church_id)
 
-        # Detailed age statistics (actual ages, not just ranges)
-        age_distribution = (
-            db.query(Member.age, func.count(Member.id).label("count"))
-            .filter(
-                Member.church_id == church_id,
-                Member.status == "active",
-                Member.age.isnot(None),
+        # Recent 20 baptisms - only the columns shown
+        recent_baptized = (
+            db.query(
+                Member.name,
+                Member.baptism_date,
+                Member.baptism_church,
+                Member.registration_date,
             )
-            .group_by(Member.age)
-            .order_by(Member.age)
-            .all()
-        )
-
-        # Average age calculation
-        avg_age = (
-            db.query(func.avg(Member.age))
-            .filter(
-                Member.church_id == church_id,
-                Member.status == "active",
-                Member.age.isnot(None),
-            )
-            .scalar()
-        )
-
-        # All baptisms (전체 기간) - enhanced with details
-        baptized_members = (
-            db.query(Member)
             .filter(
                 Member.church_id == church_id,
                 Member.baptism_date.isnot(None),
                 Member.status == "active",
             )
             .order_by(desc(Member.baptism_date))
+            .limit(20)
             .all()
         )
 
-        recent_baptisms = len(baptized_members)
-
-        # Family count
-        family_count = db.query(Family).filter(Family.church_id == church_id).count()
-
         return {
-            "total_members": total_members,
-            "new_members_this_month": new_members_this_month,
-            "recent_baptisms": recent_baptisms,
-            "family_count": family_count,
-            "average_age": round(avg_age, 1) if avg_age else 0,
-            "members_by_position": {pos: count for pos, count in position_stats if pos},
-            "members_by_department": {
-                dept: count for dept, count in department_stats if dept
-            },
-            "members_by_district": {
-                district: count for district, count in district_stats if district
-            },
-            "age_demographics": age_stats,
-            "detailed_age_distribution": {
-                age: count for age, count in age_distribution
-            },
-            "gender_distribution": {
-                gender: count for gender, count in gender_stats if gender
-            },
-            "marital_status_distribution": {
-                status: count for status, count in marital_stats if status
+            "total_members": totals.total_members,
+            "new_members_this_month": totals.new_members_this_month,
+            "recent_baptisms": totals.baptized,
+            "family_count": totals.family_count or 0,
+            "average_age": (
+                round(float(totals.average_age), 1) if totals.average_age else 0
+            ),
+            "members_by_position": dimension_counts["position"],
+            "members_by_department": dimension_counts["department"],
+            "members_by_district": dimension_counts["district"],
+            "age_demographics": {
+                "children": totals.children,
+                "youth": totals.youth,
+                "young_adult": totals.young_adult,
+                "adult": totals.adult,
+                "senior": totals.senior,
             },
+            "detailed_age_distribution": dict(sorted(dimension_counts["age"].items())),
+            "gender_distribution": dimension_counts["gender"],
+            "marital_status_distribution": dimension_counts["marital_status"],
             # Added baptism details
             "baptism_details": [
                 {
@@ -957,7 +871,7 @@ def get_enhanced_member_statistics(db: Session, church_id: int) -> Dict:
                         else None
                     ),
                 }
-                for member in baptized_members[:20]  # Recent 20 baptisms
+                for member in recent_baptized
             ],
         }
     except Exception as e:
@@ -1368,199 +1282,3 @@ def format_context_for_prompt(context_data: Dict) -> str:
                 )
 
     return "\n".join(context_parts) if context_parts else ""
-
-
-# 🔍 Full-text Search Functions
-def search_announcements(
-    db: Session, church_id: int, search_query: str, limit: int = 50
-) -> List[Dict]:
-    """
-    Search announcements using PostgreSQL full-text search.
-    Supports both Korean and English text.
-    """
-    try:
-        # Use both full-text search and trigram similarity for best results
-        results = (
-            db.query(Announcement)
-            .filter(Announcement.church_id == church_id)
-            .filter(
-                text(
-                    "to_tsvector('english', COALESCE(title, '') || ' ' || COALESCE(content, '')) @@ plainto_tsquery('english', :query)"
-                    " OR title % :query"  # trigram similarity
-                    " OR content ILIKE :like_query"  # fallback for Korean
-                ).params(
-                    query=search_query, 
-                    like_query=f"%{search_query}%"
-                )
-            )
-            .order_by(desc(Announcement.created_at))
-            .limit(limit)
-            .all()
-        )
-
-        return [
-            {
-                "id": ann.id,
-                "title": ann.title,
-                "content": ann.content,
-                "category": ann.category,
-                "author_name": ann.author_name,
-                "created_at": ann.created_at.isoformat() if ann.created_at else None,
-                "relevance_score": "high",  # Could implement ts_rank for scoring
-            }
-            for ann in results
-        ]
-    except Exception as e:
-        logger.error(f"Error searching announcements: {e}")
-        return []
-
-
-def search_prayer_requests(
-    db: Session, church_id: int, search_query: str, limit: int = 50
-) -> List[Dict]:
-    """
-    Search prayer requests using full-text search.
-    """
-    try:
-        results = (
-            db.query(PrayerRequest)
-            .filter(PrayerRequest.church_id == church_id)
-            .filter(
-                text(
-                    "to_tsvector('english', COALESCE(prayer_content, '')) @@ plainto_tsquery('english', :query)"
-                    " OR prayer_content ILIKE :like_query"
-                ).params(
-                    query=search_query,
-                    like_query=f"%{search_query}%"
-                )
-            )
-            .order_by(desc(PrayerRequest.created_at))
-            .limit(limit)
-            .all()
-        )
-
-        return [
-            {
-                "id": req.id,
-                "requester_name": req.requester_name if not req.is_anonymous else "익명",
-                "prayer_content": req.prayer_content,
-                "prayer_type": req.prayer_type,
-                "created_at": req.created_at.isoformat() if req.created_at else None,
-            }
-            for req in results
-        ]
-    except Exception as e:
-        logger.error(f"Error searching prayer requests: {e}")
-        return []
-
-
-def search_pastoral_care_requests(
-    db: Session, church_id: int, search_query: str, limit: int = 50
-) -> List[Dict]:
-    """
-    Search pastoral care requests using full-text search.
-    """
-    try:
-        results = (
-            db.query(PastoralCareRequest)
-            .filter(PastoralCareRequest.church_id == church_id)
-            .filter(
-                text(
-                    "to_tsvector('english', COALESCE(request_content, '')) @@ plainto_tsquery('english', :query)"
-                    " OR request_content ILIKE :like_query"
-                ).params(
-                    query=search_query,
-                    like_query=f"%{search_query}%"
-                )
-            )
-            .order_by(desc(PastoralCareRequest.created_at))
-            .limit(limit)
-            .all()
-        )
-
-        return [
-            {
-                "id": req.id,
-                "requester_name": req.requester_name,
-                "request_content": req.request_content,
-                "request_type": req.request_type,
-                "status": req.status,
-                "created_at": req.created_at.isoformat() if req.created_at else None,
-            }
-            for req in results
-        ]
-    except Exception as e:
-        logger.error(f"Error searching pastoral care requests: {e}")
-        return []
-
-
-def search_members(
-    db: Session, church_id: int, search_query: str, limit: int = 50
-) -> List[Dict]:
-    """
-    Search members by name using trigram similarity for fuzzy matching.
-    """
-    try:
-        results = (
-            db.query(Member)
-            .filter(
-                Member.church_id == church_id,
-                Member.status == "active"
-            )
-            .filter(
-                text(
-                    "name % :query OR name_eng % :query OR name ILIKE :like_query"
-                ).params(
-                    query=search_query,
-                    like_query=f"%{search_query}%"
-                )
-            )
-            .order_by(
-                text("similarity(name, :query) DESC").params(query=search_query)
-            )
-            .limit(limit)
-            .all()
-        )
-
-        return [
-            {
-                "id": member.id,
-                "name": member.name,
-                "name_eng": member.name_eng,
-                "position": member.position,
-                "department": member.department,
-                "district": member.district,
-                "phone": member.phone,
-            }
-            for member in results
-        ]
-    except Exception as e:
-        logger.error(f"Error searching members: {e}")
-        return []
-
-
-def search_all_content(
-    db: Session, church_id: int, search_query: str, limit_per_type: int = 20
-) -> Dict[str, List[Dict]]:
-    """
-    Search across all content types and return combined results.
-    """
-    try:
-        return {
-            "announcements": search_announcements(db, church_id, search_query, limit_per_type),
-            "prayer_requests": search_prayer_requests(db, church_id, search_query, limit_per_type),
-            "pastoral_care_requests": search_pastoral_care_requests(db, church_id, search_query, limit_per_type),
-            "members": search_members(db, church_id, search_query, limit_per_type),
-            "search_query": search_query,
-            "searched_at": datetime.now().isoformat(),
-        }
-    except Exception as e:
-        logger.error(f"Error in unified search: {e}")
-        return {
-            "announcements": [],
-            "prayer_requests": [],
-            "pastoral_care_requests": [],
-            "members": [],
-            "search_query": search_query,
-            "error": str(e),
-        }
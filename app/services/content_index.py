@@ -0,0 +1,631 @@
+"""
+교회 콘텐츠 의미 검색 인덱스 (로컬 임베딩)
+
+AI 채팅에 공지사항/기도요청 목록 전체를 넣는 대신 질문과 가까운 조각만 찾아 넣습니다.
+- 대상: 공지사항, 설교 자료(내용 + 첨부 파일 추출 텍스트), 기도요청, 교회 소식
+- 분할: 문단 단위로 CHUNK_CHARS 글자 내외 조각 (긴 문단은 겹치게 자름)
+- 임베딩: 교체 가능한 로컬 인코더 (기본: 해싱 인코더, 외부 API/모델 파일 불필요)
+- 저장: 교회별 디렉터리에 float32 벡터 파일(memmap) + 조각 메타(jsonl) + state.json
+- 검색: 정규화된 벡터 내적 한 번으로 top-k (수천 조각 기준 수 ms)
+- 공개 범위: 비공개 설교 자료/기도요청, 비활성 공지, 취소·중지된 소식은 색인하지 않음
+  (DocumentSource.visible / where, 비공개로 바뀌면 tombstone)
+- 생성/갱신은 요청 밖에서: 인덱스가 없으면 Celery 로 생성을 맡기고 그동안은 전체 목록 사용,
+  ORM commit 후에는 바뀐 문서 키만 Celery 작업(app.tasks.content_index)으로 넘겨
+  파일 추출/인코딩을 워커에서 문서 단위 증분 반영 (이전 조각은 tombstone,
+  삭제 비율이 커지면 새 generation 으로 압축)
+
+파일 구성 (CONTENT_INDEX_DIR/church_{id}/):
+    state.json           generation, count(유효 행 수 포함 전체 행), deleted(행 번호) 등
+    vectors-{gen}.f32    count x dim float32 (append-only)
+    chunks-{gen}.jsonl   행마다 {"type", "id", "text"} (append-only)
+읽는 쪽은 state.json 에 기록된 범위만 읽으므로 쓰는 중인 프로세스와 잠금 없이 공존하고,
+쓰는 쪽은 교회별 flock 으로 직렬화합니다.
+"""
+
+import fcntl
+import json
+import logging
+import os
+import re
+import threading
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import event, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.models.announcement import Announcement
+from app.models.church_news import ChurchNews
+from app.models.common import CommonStatus
+from app.models.pastoral_care import PrayerRequest
+from app.models.sermon_material import SermonMaterial
+
+logger = logging.getLogger(__name__)
+
+CHUNK_CHARS = 500
+CHUNK_OVERLAP = 100
+COMPACT_RATIO = 0.3  # 삭제된 행이 이 비율을 넘으면 압축
+COMPACT_MIN_ROWS = 200
+MIN_SCORE = 0.05  # 이보다 낮은 유사도는 관련 없는 조각으로 보고 제외
+SERMON_FILE_TYPES = {"pdf", "docx", "doc", "txt"}
+SERMON_FILE_URL_PREFIX = "/api/v1/sermon-materials/files/"
+
+BUILD_LOCK_TTL = 600  # 같은 교회 인덱스 생성 작업을 다시 맡기기까지 최소 간격 (초)
+HIDDEN_NEWS_STATUSES = (CommonStatus.CANCELLED, CommonStatus.PAUSED)
+
+DocKey = Tuple[str, int]  # (문서 유형, 문서 ID)
+
+
+class HashingEncoder:
+    """
+    해싱 트릭 기반 bag-of-features 인코더 (학습/모델 파일 불필요)
+
+    한글 단어는 조사 변화에 강하도록 음절 2-gram 과 단어 자체를, 그 외는 단어를
+    특징으로 쓰고, crc32 로 dim 차원에 부호와 함께 흩뿌린 뒤 log(1 + tf) 가중치로
+    L2 정규화합니다. 같은 텍스트는 프로세스와 무관하게 항상 같은 벡터가 됩니다.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    @staticmethod
+    def features(text: str) -> List[str]:
+        features = []
+        for word in re.findall(r"[가-힣]+|[0-9a-z]+", (text or "").lower()):
+            features.append(word)
+            if "가" <= word[0] <= "힣" and len(word) > 2:
+                features.extend(word[i : i + 2] for i in range(len(word) - 1))
+        return features
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            hashes = np.fromiter(
+                (zlib.crc32(f.encode("utf-8")) for f in self.features(text)),
+                dtype=np.int64,
+            )
+            if not hashes.size:
+                continue
+            signs = np.where((hashes // self.dim) & 1, 1.0, -1.0).astype(np.float32)
+            np.add.at(vectors[row], hashes % self.dim, signs)
+        vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return (vectors / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+ENCODERS: Dict[str, Callable[[int], Any]] = {"hashing": HashingEncoder}
+
+
+def get_encoder(name: Optional[str] = None, dim: Optional[int] = None):
+    """설정된 인코더 생성 (ENCODERS 에 등록해 교체)"""
+    name = name or settings.CONTENT_INDEX_ENCODER
+    if name not in ENCODERS:
+        raise ValueError(f"Unknown content index encoder: {name}")
+    return ENCODERS[name](dim or settings.CONTENT_INDEX_DIM)
+
+
+def _sermon_file_text(file_url: Optional[str], file_type: Optional[str]) -> str:
+    """설교 자료 첨부 파일에서 텍스트 추출 (pdf/docx/txt)"""
+    if not file_url or (file_type or "").lower() not in SERMON_FILE_TYPES:
+        return ""
+    from app.utils.file_handler import file_handler
+
+    relative = file_url.split(SERMON_FILE_URL_PREFIX, 1)[-1]
+    path = Path(file_handler.upload_directory) / relative
+    if not path.exists():
+        return ""
+    return file_handler.extract_text_content(path, file_type.lower()) or ""
+
+
+@dataclass
+class DocumentSource:
+    model: Any
+    text: Callable[[Any], str]
+    # 채팅에 노출해도 되는 문서인지 (객체 기준 / SQL 조건, 둘은 같은 규칙)
+    visible: Callable[[Any], bool]
+    where: Callable[[], Any]
+    file: Optional[Callable[[Any], Tuple[Optional[str], Optional[str]]]] = None
+
+
+DOCUMENT_SOURCES: Dict[str, DocumentSource] = {
+    "announcement": DocumentSource(
+        Announcement,
+        lambda ann: f"{ann.title}\n{ann.content or ''}",
+        visible=lambda ann: ann.is_active is not False,
+        where=lambda: Announcement.is_active.isnot(False),
+    ),
+    "sermon_material": DocumentSource(
+        SermonMaterial,
+        lambda s: "\n".join(
+            part
+            for part in (s.title, s.author, s.scripture_reference, s.content)
+            if part
+        ),
+        # is_public 기본값이 False 이므로 명시적으로 공개된 자료만
+        visible=lambda s: s.is_public is True,
+        where=lambda: SermonMaterial.is_public.is_(True),
+        file=lambda s: (s.file_url, s.file_type),
+    ),
+    "prayer_request": DocumentSource(
+        PrayerRequest,
+        lambda req: (
+            f"{'익명' if req.is_anonymous else req.requester_name} "
+            f"({req.prayer_type}): {req.prayer_content or ''}"
+        ),
+        visible=lambda req: req.is_public is not False,
+        where=lambda: PrayerRequest.is_public.isnot(False),
+    ),
+    "church_news": DocumentSource(
+        ChurchNews,
+        lambda news: f"{news.title}\n{news.content or ''}",
+        visible=lambda news: news.status not in HIDDEN_NEWS_STATUSES,
+        where=lambda: or_(
+            ChurchNews.status.is_(None), ChurchNews.status.notin_(HIDDEN_NEWS_STATUSES)
+        ),
+    ),
+}
+MODEL_DOC_TYPES = {
+    source.model: doc_type for doc_type, source in DOCUMENT_SOURCES.items()
+}
+
+# get_church_context_data 의 데이터 소스 키 → 문서 유형
+SOURCE_DOC_TYPES = {
+    "announcements": "announcement",
+    "sermon_materials": "sermon_material",
+    "sermons": "sermon_material",
+    "prayer_requests": "prayer_request",
+    "church_news": "church_news",
+}
+
+
+def chunk_text(
+    text: str, size: int = CHUNK_CHARS, overlap: int = CHUNK_OVERLAP
+) -> List[str]:
+    """문단을 size 글자 내외로 묶고, size 보다 긴 문단은 overlap 만큼 겹쳐 자름"""
+    chunks, current = [], ""
+    for paragraph in (p.strip() for p in re.split(r"\n\s*\n|\r\n\s*\r\n", text or "")):
+        if not paragraph:
+            continue
+        if len(current) + len(paragraph) + 1 <= size:
+            current = f"{current}\n{paragraph}" if current else paragraph
+            continue
+        if current:
+            chunks.append(current)
+            current = ""
+        if len(paragraph) <= size:
+            current = paragraph
+            continue
+        step = size - overlap
+        for start in range(0, len(paragraph), step):
+            chunks.append(paragraph[start : start + size])
+            if start + size >= len(paragraph):
+                break
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+@dataclass
+class _Loaded:
+    signature: Tuple[int, int, int]
+    vectors: np.ndarray
+    chunks: List[Dict[str, Any]]
+    live: np.ndarray  # bool mask
+    rows_by_key: Dict[DocKey, List[int]]
+
+
+_loaded: Dict[Path, _Loaded] = {}
+_loaded_lock = threading.Lock()
+
+
+class ChurchIndex:
+    def __init__(self, church_id: int, root: Optional[str] = None, encoder=None):
+        self.church_id = church_id
+        self.directory = (
+            Path(root or settings.CONTENT_INDEX_DIR) / f"church_{church_id}"
+        )
+        self.encoder = encoder or get_encoder()
+
+    @property
+    def state_path(self) -> Path:
+        return self.directory / "state.json"
+
+    def _vectors_path(self, generation: int) -> Path:
+        return self.directory / f"vectors-{generation}.f32"
+
+    def _chunks_path(self, generation: int) -> Path:
+        return self.directory / f"chunks-{generation}.jsonl"
+
+    def read_state(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        if (
+            state.get("encoder") != self.encoder.name
+            or state.get("dim") != self.encoder.dim
+        ):
+            return None  # 인코더 설정이 바뀌면 재생성 대상
+        return state
+
+    def _write_state(self, state: Dict[str, Any]):
+        tmp = self.state_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.state_path)  # 읽는 쪽은 항상 완전한 state 만 봄
+
+    @contextmanager
+    def _write_lock(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / "index.lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load(self, state: Dict[str, Any]) -> _Loaded:
+        generation, count = state["generation"], state["count"]
+        signature = (generation, count, len(state["deleted"]))
+        with _loaded_lock:
+            cached = _loaded.get(self.directory)
+        if cached and cached.signature == signature:
+            return cached
+
+        if count:
+            vectors = np.memmap(
+                self._vectors_path(generation),
+                dtype=np.float32,
+                mode="r",
+                shape=(count, self.encoder.dim),
+            )
+        else:
+            vectors = np.zeros((0, self.encoder.dim), dtype=np.float32)
+        with open(self._chunks_path(generation), "rb") as f:
+            raw = f.read(state["chunks_bytes"])
+        chunks = [json.loads(line) for line in raw.splitlines()][:count]
+
+        live = np.ones(count, dtype=bool)
+        live[state["deleted"]] = False
+        rows_by_key: Dict[DocKey, List[int]] = {}
+        for row, chunk in enumerate(chunks):
+            if live[row]:
+                rows_by_key.setdefault((chunk["type"], chunk["id"]), []).append(row)
+
+        loaded = _Loaded(signature, vectors, chunks, live, rows_by_key)
+        with _loaded_lock:
+            _loaded[self.directory] = loaded
+        return loaded
+
+    def search(
+        self, query: str, k: int = 8, doc_types: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        질문과 가까운 조각 top-k
+
+        Returns:
+            [{"type", "id", "text", "score"}] 점수 내림차순 (인덱스가 없으면 빈 목록)
+        """
+        state = self.read_state()
+        if not state or not state["count"]:
+            return []
+        try:
+            loaded = self._load(state)
+        except FileNotFoundError:
+            # 읽는 사이 압축으로 이전 generation 파일이 지워진 경우 한 번 재시도
+            state = self.read_state()
+            if not state:
+                return []
+            loaded = self._load(state)
+
+        mask = loaded.live
+        if doc_types is not None:
+            wanted = set(doc_types)
+            mask = mask & np.fromiter(
+                (chunk["type"] in wanted for chunk in loaded.chunks),
+                dtype=bool,
+                count=len(loaded.chunks),
+            )
+        candidates = np.flatnonzero(mask)
+        if not candidates.size:
+            return []
+
+        query_vector = self.encoder.encode([query])[0]
+        scores = loaded.vectors[candidates] @ query_vector
+        top = min(k, candidates.size)
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best])]
+        return [
+            {**loaded.chunks[candidates[i]], "score": round(float(scores[i]), 4)}
+            for i in best
+            if scores[i] >= MIN_SCORE
+        ]
+
+    def _encode_documents(
+        self, documents: Iterable[Tuple[str, int, str]]
+    ) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+        chunks = [
+            {"type": doc_type, "id": doc_id, "text": chunk}
+            for doc_type, doc_id, text in documents
+            for chunk in chunk_text(text)
+        ]
+        vectors = self.encoder.encode([chunk["text"] for chunk in chunks])
+        return vectors, chunks
+
+    def _new_generation(
+        self, generation: int, vectors: np.ndarray, chunks: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        encoded = "".join(
+            json.dumps(c, ensure_ascii=False) + "\n" for c in chunks
+        ).encode()
+        with open(self._vectors_path(generation), "wb") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        with open(self._chunks_path(generation), "wb") as f:
+            f.write(encoded)
+        return {
+            "generation": generation,
+            "count": len(chunks),
+            "chunks_bytes": len(encoded),
+            "deleted": [],
+            "encoder": self.encoder.name,
+            "dim": self.encoder.dim,
+        }
+
+    def _remove_generation(self, generation: int):
+        for path in (self._vectors_path(generation), self._chunks_path(generation)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _rebuild_locked(self, documents: Iterable[Tuple[str, int, str]]) -> int:
+        vectors, chunks = self._encode_documents(documents)
+        previous = self.read_state()
+        generation = (previous["generation"] + 1) if previous else 1
+        self._write_state(self._new_generation(generation, vectors, chunks))
+        if previous:
+            self._remove_generation(previous["generation"])
+        return len(chunks)
+
+    def rebuild(self, documents: Iterable[Tuple[str, int, str]]) -> int:
+        """문서 전체로 새 generation 생성 (documents: (유형, ID, 텍스트)), 조각 수 반환"""
+        with self._write_lock():
+            return self._rebuild_locked(documents)
+
+    def ensure(self, documents: Callable[[], Iterable[Tuple[str, int, str]]]) -> bool:
+        """인덱스가 없을 때만 생성 (동시에 들어온 요청 중 하나만 생성), 생성했으면 True"""
+        if self.read_state() is not None:
+            return False
+        with self._write_lock():
+            if self.read_state() is not None:
+                return False
+            self._rebuild_locked(documents())
+            return True
+
+    def apply(
+        self,
+        upserts: Iterable[Tuple[str, int, str]] = (),
+        removals: Iterable[DocKey] = (),
+    ) -> Dict[str, int]:
+        """
+        문서 단위 증분 갱신: 해당 문서의 기존 조각은 tombstone, 새 조각은 append
+
+        인덱스가 아직 없으면 아무것도 하지 않음 (첫 검색 때 DB 에서 전체 생성)
+        """
+        upserts = list(upserts)
+        vectors, chunks = self._encode_documents(upserts)
+        with self._write_lock():
+            state = self.read_state()
+            if state is None:
+                return {"added": 0, "removed": 0}
+            loaded = self._load(state)
+            stale = {(doc_type, doc_id) for doc_type, doc_id, _ in upserts} | set(
+                removals
+            )
+            removed_rows = [
+                row for key in stale for row in loaded.rows_by_key.get(key, [])
+            ]
+            generation = state["generation"]
+
+            encoded = "".join(
+                json.dumps(c, ensure_ascii=False) + "\n" for c in chunks
+            ).encode()
+            # 이전 쓰기가 중간에 실패했어도 state 기준 끝에서 이어 쓰도록 먼저 잘라냄
+            with open(self._vectors_path(generation), "r+b") as f:
+                f.truncate(state["count"] * self.encoder.dim * 4)
+                f.seek(0, os.SEEK_END)
+                f.write(vectors.tobytes())
+            with open(self._chunks_path(generation), "r+b") as f:
+                f.truncate(state["chunks_bytes"])
+                f.seek(0, os.SEEK_END)
+                f.write(encoded)
+
+            state = {
+                **state,
+                "count": state["count"] + len(chunks),
+                "chunks_bytes": state["chunks_bytes"] + len(encoded),
+                "deleted": sorted(set(state["deleted"]) | set(removed_rows)),
+            }
+            self._write_state(state)
+            if (
+                state["count"] >= COMPACT_MIN_ROWS
+                and len(state["deleted"]) > state["count"] * COMPACT_RATIO
+            ):
+                self._compact(state)
+        return {"added": len(chunks), "removed": len(removed_rows)}
+
+    def _compact(self, state: Dict[str, Any]):
+        """tombstone 행을 뺀 새 generation 작성 (재인코딩 없이 복사, 잠금 안에서 호출)"""
+        loaded = self._load(state)
+        rows = np.flatnonzero(loaded.live)
+        new_state = self._new_generation(
+            state["generation"] + 1,
+            np.asarray(loaded.vectors[rows]),
+            [loaded.chunks[row] for row in rows],
+        )
+        self._write_state(new_state)
+        self._remove_generation(state["generation"])
+
+
+def _document_text(doc_type: str, obj: Any, extract_files: bool = True) -> str:
+    source = DOCUMENT_SOURCES[doc_type]
+    text = source.text(obj)
+    if extract_files and source.file is not None:
+        extracted = _sermon_file_text(*source.file(obj))
+        if extracted:
+            text = f"{text}\n\n{extracted}"
+    return text
+
+
+def iter_church_documents(
+    db: Session, church_id: int
+) -> Iterable[Tuple[str, int, str]]:
+    """교회의 색인 대상(공개/활성) 문서 전체 (유형, ID, 텍스트)"""
+    for doc_type, source in DOCUMENT_SOURCES.items():
+        query = db.query(source.model).filter(
+            source.model.church_id == church_id, source.where()
+        )
+        for obj in query.yield_per(500):
+            yield doc_type, obj.id, _document_text(doc_type, obj)
+
+
+def rebuild_church_index(db: Session, church_id: int) -> int:
+    """DB 에서 교회 인덱스 전체 재생성, 조각 수 반환"""
+    return ChurchIndex(church_id).rebuild(iter_church_documents(db, church_id))
+
+
+def build_church_index(db: Session, church_id: int) -> bool:
+    """인덱스가 없을 때만 생성 (Celery 작업용), 생성했으면 True"""
+    return ChurchIndex(church_id).ensure(lambda: iter_church_documents(db, church_id))
+
+
+def update_church_documents(
+    db: Session, church_id: int, keys: Iterable[DocKey]
+) -> Dict[str, int]:
+    """
+    바뀐 문서들을 DB 에서 다시 읽어 인덱스에 반영 (Celery 작업용)
+
+    공개/활성 상태로 남아 있으면 다시 색인하고, 삭제됐거나 비공개/비활성이 되었으면 제거합니다.
+    """
+    ids_by_type: Dict[str, set] = {}
+    for doc_type, doc_id in keys:
+        if doc_type in DOCUMENT_SOURCES:
+            ids_by_type.setdefault(doc_type, set()).add(int(doc_id))
+
+    upserts, removals = [], []
+    for doc_type, doc_ids in ids_by_type.items():
+        source = DOCUMENT_SOURCES[doc_type]
+        rows = (
+            db.query(source.model)
+            .filter(
+                source.model.church_id == church_id,
+                source.model.id.in_(doc_ids),
+                source.where(),
+            )
+            .all()
+        )
+        for obj in rows:
+            upserts.append((doc_type, obj.id, _document_text(doc_type, obj)))
+        found = {obj.id for obj in rows}
+        removals.extend((doc_type, doc_id) for doc_id in doc_ids - found)
+    return ChurchIndex(church_id).apply(upserts=upserts, removals=removals)
+
+
+def request_index_build(church_id: int) -> bool:
+    """교회 인덱스 생성을 Celery 에 맡김 (BUILD_LOCK_TTL 안에는 한 번만), 맡겼으면 True"""
+    if (
+        redis_client.acquire_lock(
+            f"content_index_build:{church_id}", ttl=BUILD_LOCK_TTL
+        )
+        is None
+    ):
+        return False
+    from app.tasks.content_index import build_content_index
+
+    try:
+        build_content_index.apply_async((church_id,), retry=False)
+        return True
+    except Exception as e:
+        logger.warning(
+            f"Failed to queue content index build for church {church_id}: {e}"
+        )
+        return False
+
+
+def retrieve(
+    db: Session,
+    church_id: int,
+    query: str,
+    k: Optional[int] = None,
+    doc_types: Optional[Iterable[str]] = None,
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    교회 콘텐츠에서 질문과 가까운 조각 top-k
+
+    인덱스가 아직 없으면 생성을 Celery 에 맡기고 None 반환 (호출자는 전체 목록 사용)
+    """
+    index = ChurchIndex(church_id)
+    if index.read_state() is None:
+        request_index_build(church_id)
+        return None
+    return index.search(query, k or settings.CONTENT_INDEX_TOP_K, doc_types)
+
+
+# flush 시점에 바뀐 문서 키를 모아 두었다가 commit 후 Celery 로 넘김 (rollback 되면 버림)
+_PENDING_KEY = "content_index_pending"
+
+
+def _collect_changes(session: Session, flush_context):
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        doc_type = MODEL_DOC_TYPES.get(type(obj))
+        if doc_type is None or obj.church_id is None:
+            continue
+        if obj in session.dirty and not session.is_modified(
+            obj, include_collections=False
+        ):
+            continue
+        # 공개 여부/삭제는 작업이 DB 에서 다시 읽어 판단 (비공개로 바뀐 문서는 제거)
+        pending.add((obj.church_id, doc_type, obj.id))
+
+
+def _apply_changes(session: Session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    from app.tasks.content_index import update_content_index
+
+    by_church: Dict[int, List[List[Any]]] = {}
+    for church_id, doc_type, doc_id in pending:
+        by_church.setdefault(church_id, []).append([doc_type, doc_id])
+    for church_id, keys in by_church.items():
+        try:
+            update_content_index.apply_async((church_id, keys), retry=False)
+        except Exception as e:
+            logger.warning(
+                f"Failed to queue content index update for church {church_id}: {e}"
+            )
+
+
+def _discard_changes(session: Session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def register_index_hooks():
+    """모든 Session 의 공지/설교/기도요청/교회소식 변경을 인덱스에 증분 반영"""
+    if not settings.CONTENT_INDEX_ENABLED or event.contains(
+        Session, "after_flush", _collect_changes
+    ):
+        return
+    event.listen(Session, "after_flush", _collect_changes)
+    event.listen(Session, "after_commit", _apply_changes)
+    event.listen(Session, "after_rollback", _discard_changes)
@@ -0,0 +1,315 @@
+"""
+교회 콘텐츠 통합 검색 (공지사항/기도제목/심방요청/교인)
+
+to_tsvector('english', ...) 를 매번 계산하던 방식은 한글에 효과가 없어
+결국 ILIKE '%q%' 순차 스캔으로 처리되고 순위도 없었습니다.
+- 색인: 검색 대상 컬럼별 pg_trgm GIN 색인 (한글도 글자 단위 trigram 으로 색인됨)
+- 조건: 부분 문자열 일치(ILIKE) 또는 단어 유사도 일치(q <% col), 모두 색인 사용
+- 순위: word_similarity 기반 0~1 점수 (제목 일치 우선), 같은 점수는 최신순
+- 하이라이트: 일치 부분 주변을 잘라 <b>…</b> 로 감싼 snippet
+- 통합 검색: 유형별 검색을 각자 세션으로 동시에 실행하고 점수순으로 병합
+PostgreSQL 이 아니면 ILIKE 로 찾고 점수는 일치 위치로 계산합니다.
+"""
+
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import desc, func, literal, or_
+from sqlalchemy.orm import Session
+
+from app.models.announcement import Announcement
+from app.models.member import Member
+from app.models.pastoral_care import PastoralCareRequest, PrayerRequest
+
+logger = logging.getLogger(__name__)
+
+BODY_WEIGHT = 0.8  # 본문 일치는 제목 일치보다 낮게
+SNIPPET_RADIUS = 60  # 일치 부분 앞뒤로 보여줄 글자 수
+HIGHLIGHT_START, HIGHLIGHT_END = "<b>", "</b>"
+
+
+@dataclass
+class SearchTarget:
+    """검색 대상 유형 정의"""
+
+    key: str
+    model: Any
+    serialize: Callable[[Any], Dict[str, Any]]
+    title: Optional[Any] = None  # 제목 컬럼 (가중치 1.0)
+    body: Optional[Any] = None  # 본문 컬럼 (가중치 BODY_WEIGHT, snippet 대상)
+    filters: Callable[[Any], List[Any]] = field(default=lambda model: [])
+
+
+def _escape_like(query: str) -> str:
+    return re.sub(r"([\\%_])", r"\\\1", query)
+
+
+def _is_postgresql(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _columns(target: SearchTarget) -> List[Any]:
+    return [column for column in (target.title, target.body) if column is not None]
+
+
+def _weights(target: SearchTarget) -> List[float]:
+    return [
+        1.0 if column is target.title else BODY_WEIGHT for column in _columns(target)
+    ]
+
+
+def _pg_score(target: SearchTarget, query: str):
+    scores = [
+        func.word_similarity(query, func.coalesce(column, "")) * weight
+        for column, weight in zip(_columns(target), _weights(target))
+    ]
+    return func.greatest(*scores) if len(scores) > 1 else scores[0]
+
+
+def _python_score(target: SearchTarget, row: Any, query: str) -> float:
+    """PostgreSQL 이 아닐 때의 점수: 일치한 컬럼 가중치 (앞쪽 일치일수록 약간 높게)"""
+    needle = query.lower()
+    best = 0.0
+    for column, weight in zip(_columns(target), _weights(target)):
+        value = (getattr(row, column.key) or "").lower()
+        position = value.find(needle)
+        if position >= 0:
+            best = max(best, weight * (1.0 - min(position, 100) / 1000))
+    return best
+
+
+def highlight_snippet(
+    text: Optional[str], query: str, radius: int = SNIPPET_RADIUS
+) -> str:
+    """
+    text 에서 query (또는 그 단어들) 가 처음 나오는 부분 주변을 잘라 강조 표시
+
+    일치하는 부분이 없으면 앞부분을 radius * 2 글자만큼 반환합니다.
+    """
+    if not text:
+        return ""
+    terms = sorted(set(query.split()) | {query.strip()}, key=len, reverse=True)
+    pattern = re.compile(
+        "|".join(re.escape(term) for term in terms if term), re.IGNORECASE
+    )
+    first = pattern.search(text)
+    if first is None:
+        return text[: radius * 2] + ("…" if len(text) > radius * 2 else "")
+
+    start = max(0, first.start() - radius)
+    end = min(len(text), first.end() + radius)
+    snippet = pattern.sub(
+        lambda match: f"{HIGHLIGHT_START}{match.group(0)}{HIGHLIGHT_END}",
+        text[start:end],
+    )
+    return ("…" if start > 0 else "") + snippet + ("…" if end < len(text) else "")
+
+
+def _highlight(target: SearchTarget, row: Any, query: str) -> str:
+    # 본문에 일치하는 부분이 없으면 (제목/이름으로 찾은 경우) 제목에서 snippet 생성
+    needle = query.lower()
+    values = [
+        getattr(row, column.key) or ""
+        for column in (target.body, target.title)
+        if column is not None
+    ]
+    matched = next((value for value in values if needle in value.lower()), values[0])
+    return highlight_snippet(matched, query)
+
+
+def search_target(
+    db: Session,
+    target: SearchTarget,
+    church_id: int,
+    search_query: str,
+    limit: int = 50,
+) -> List[Dict[str, Any]]:
+    """
+    한 유형 검색 (점수 내림차순)
+
+    Returns:
+        serialize 결과 + relevance_score(0~1) + highlight 목록. 오류 시 빈 목록
+    """
+    query = search_query.strip()
+    if not query:
+        return []
+    try:
+        model = target.model
+        like = f"%{_escape_like(query)}%"
+        conditions = [column.ilike(like, escape="\\") for column in _columns(target)]
+        base = db.query(model).filter(
+            model.church_id == church_id, *target.filters(model)
+        )
+
+        if _is_postgresql(db):
+            # q <% col: 단어 유사도 일치 (오타/조사 차이 허용), gin_trgm_ops 색인 사용
+            conditions += [
+                literal(query).op("<%")(column) for column in _columns(target)
+            ]
+            score = _pg_score(target, query).label("score")
+            scored = (
+                base.add_columns(score)
+                .filter(or_(*conditions))
+                .order_by(desc("score"), desc(model.created_at))
+                .limit(limit)
+                .all()
+            )
+        else:
+            rows = base.filter(or_(*conditions)).order_by(desc(model.created_at)).all()
+            scored = sorted(
+                ((row, _python_score(target, row, query)) for row in rows),
+                key=lambda pair: pair[1],
+                reverse=True,
+            )[:limit]
+
+        return [
+            {
+                **target.serialize(row),
+                "relevance_score": round(float(score or 0), 4),
+                "highlight": _highlight(target, row, query),
+            }
+            for row, score in scored
+        ]
+    except Exception as e:
+        logger.error(f"Error searching {target.key}: {e}")
+        return []
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+ANNOUNCEMENTS = SearchTarget(
+    key="announcements",
+    model=Announcement,
+    title=Announcement.title,
+    body=Announcement.content,
+    serialize=lambda ann: {
+        "id": ann.id,
+        "title": ann.title,
+        "content": ann.content,
+        "category": ann.category,
+        "author_name": ann.author_name,
+        "created_at": _isoformat(ann.created_at),
+    },
+)
+
+PRAYER_REQUESTS = SearchTarget(
+    key="prayer_requests",
+    model=PrayerRequest,
+    body=PrayerRequest.prayer_content,
+    serialize=lambda req: {
+        "id": req.id,
+        "requester_name": req.requester_name if not req.is_anonymous else "익명",
+        "prayer_content": req.prayer_content,
+        "prayer_type": req.prayer_type,
+        "created_at": _isoformat(req.created_at),
+    },
+)
+
+PASTORAL_CARE_REQUESTS = SearchTarget(
+    key="pastoral_care_requests",
+    model=PastoralCareRequest,
+    body=PastoralCareRequest.request_content,
+    serialize=lambda req: {
+        "id": req.id,
+        "requester_name": req.requester_name,
+        "request_content": req.request_content,
+        "request_type": req.request_type,
+        "status": req.status,
+        "created_at": _isoformat(req.created_at),
+    },
+)
+
+MEMBERS = SearchTarget(
+    key="members",
+    model=Member,
+    title=Member.name,
+    body=Member.name_eng,
+    filters=lambda model: [model.status == "active"],
+    serialize=lambda member: {
+        "id": member.id,
+        "name": member.name,
+        "name_eng": member.name_eng,
+        "position": member.position,
+        "department": member.department,
+        "district": member.district,
+        "phone": member.phone,
+    },
+)
+
+SEARCH_TARGETS = [ANNOUNCEMENTS, PRAYER_REQUESTS, PASTORAL_CARE_REQUESTS, MEMBERS]
+
+
+def search_announcements(
+    db: Session, church_id: int, search_query: str, limit: int = 50
+) -> List[Dict]:
+    return search_target(db, ANNOUNCEMENTS, church_id, search_query, limit)
+
+
+def search_prayer_requests(
+    db: Session, church_id: int, search_query: str, limit: int = 50
+) -> List[Dict]:
+    return search_target(db, PRAYER_REQUESTS, church_id, search_query, limit)
+
+
+def search_pastoral_care_requests(
+    db: Session, church_id: int, search_query: str, limit: int = 50
+) -> List[Dict]:
+    return search_target(db, PASTORAL_CARE_REQUESTS, church_id, search_query, limit)
+
+
+def search_members(
+    db: Session, church_id: int, search_query: str, limit: int = 50
+) -> List[Dict]:
+    return search_target(db, MEMBERS, church_id, search_query, limit)
+
+
+def _search_in_own_session(
+    bind: Any, target: SearchTarget, church_id: int, search_query: str, limit: int
+) -> List[Dict[str, Any]]:
+    # Session 은 스레드 간에 공유할 수 없으므로 유형별로 따로 연다
+    with Session(bind=bind) as db:
+        return search_target(db, target, church_id, search_query, limit)
+
+
+def search_all_content(
+    db: Session, church_id: int, search_query: str, limit_per_type: int = 20
+) -> Dict[str, Any]:
+    """
+    전체 유형을 동시에 검색하고 점수순으로 병합
+
+    Returns:
+        유형별 결과 목록 + results(전체를 relevance_score 내림차순으로 병합, type 포함)
+    """
+    searched_at = datetime.now().isoformat()
+    bind = db.get_bind()
+    with ThreadPoolExecutor(max_workers=len(SEARCH_TARGETS)) as executor:
+        futures = {
+            target.key: executor.submit(
+                _search_in_own_session,
+                bind,
+                target,
+                church_id,
+                search_query,
+                limit_per_type,
+            )
+            for target in SEARCH_TARGETS
+        }
+        by_type = {key: future.result() for key, future in futures.items()}
+
+    merged = sorted(
+        ({"type": key, **item} for key, items in by_type.items() for item in items),
+        key=lambda item: item["relevance_score"],
+        reverse=True,
+    )
+    return {
+        **by_type,
+        "results": merged,
+        "search_query": search_query,
+        "searched_at": searched_at,
+    }
@@ -1,88 +1,282 @@
 """
 Naver Maps Geocoding Service
 주소를 위도/경도 좌표로 변환하는 서비스
+
+주소마다 새 httpx.AsyncClient 를 만들고 순차로 호출하던 방식 대신
+- 클라이언트: 전용 이벤트 루프 스레드의 장기 AsyncClient 하나를 공유 (연결/TLS 재사용)
+  동기 코드(엔드포인트, Celery)와 비동기 코드 모두 같은 루프에 작업을 넘깁니다.
+- 동시성: Semaphore(GEOCODING_CONCURRENCY) 로 동시 요청 수 제한
+- 속도 제한: 토큰 버킷(GEOCODING_RATE_PER_SECOND) 으로 공급자 할당량 준수,
+  버킷은 Redis 에 두어 API/Celery 프로세스 전체가 할당량 하나를 나눠 씀
+  (Redis 를 쓸 수 없으면 프로세스 안 버킷), 429/5xx 는 짧게 물러났다가 재시도
+- 캐시: 정규화한 주소 기준 Redis 캐시 (결과 없음도 백필 주기보다 긴 TTL 로 캐시)
+- 백필: 좌표가 없는 교인/심방 요청을 id 순 묶음 단위로 일괄 변환
 """
 
-import httpx
-from typing import Optional, Dict, Tuple
+import asyncio
+import hashlib
+import json
 import logging
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import Future
+from typing import Coroutine, Dict, Iterable, List, Optional, Tuple, Union
+
+import httpx
+from sqlalchemy.orm import Session
+
 from app.core.config import settings
+from app.core.redis import redis_client
+from app.models.member import Member
+from app.models.pastoral_care import PastoralCareRequest
 
 logger = logging.getLogger(__name__)
 
+Coordinates = Tuple[float, float]
+
+CACHE_PREFIX = "geocode:"
+NOT_FOUND = "not_found"  # 캐시에 저장하는 "결과 없음" 표시
+MAX_RETRIES = 2
+RETRY_BACKOFF_SECONDS = 0.5
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+BACKFILL_BATCH_SIZE = 200
+BACKFILL_MODELS = {"members": Member, "pastoral_care_requests": PastoralCareRequest}
+RATE_LIMIT_BUCKET = "geocoding"  # 공급자 할당량은 API 키 단위라 모든 프로세스가 공유
+
+
+def normalize_address(address: Optional[str]) -> str:
+    """캐시 키용 주소 정규화 (유니코드 NFKC, 공백/구두점 정리, 소문자)"""
+    if not address:
+        return ""
+    value = unicodedata.normalize("NFKC", address)
+    value = re.sub(r"[,·]+", " ", value)
+    value = re.sub(r"\s+", " ", value)
+    return value.strip().lower()
+
+
+def _cache_key(normalized: str) -> str:
+    return CACHE_PREFIX + hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+class TokenBucket:
+    """
+    초당 rate 개씩 채워지는 토큰 버킷 (최대 capacity 개까지 몰아서 사용 가능)
+
+    name 을 주면 Redis 의 공유 버킷을 사용해 여러 프로세스가 같은 할당량을 나눠 쓰고,
+    Redis 를 쓸 수 없을 때만 프로세스 안 버킷으로 대신합니다.
+    """
+
+    def __init__(
+        self, rate: float, capacity: Optional[float] = None, name: Optional[str] = None
+    ):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.name = name
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _take_shared(self) -> Optional[float]:
+        if self.name is None:
+            return None
+        try:
+            return redis_client.take_rate_token(self.name, self.rate, self.capacity)
+        except Exception as e:
+            logger.warning(f"Shared rate limit unavailable, using local bucket: {e}")
+            return None
+
+    def _take_local(self) -> float:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                wait = self._take_shared()
+                if wait is None:
+                    wait = self._take_local()
+                if wait <= 0:
+                    return
+                await asyncio.sleep(wait)
+
 
 class NaverGeocodingService:
     """네이버 Maps Geocoding API를 사용한 주소-좌표 변환 서비스"""
 
-    BASE_URL = "https://naveropenapi.apigw.ntruss.com/map-geocode/v2/geocode"
-
     def __init__(self):
         self.client_id = settings.NAVER_MAPS_CLIENT_ID
         self.client_secret = settings.NAVER_MAPS_CLIENT_SECRET
+        self.base_url = settings.NAVER_GEOCODING_URL
+        self.concurrency = settings.GEOCODING_CONCURRENCY
+        self.rate_per_second = settings.GEOCODING_RATE_PER_SECOND
 
-    async def get_coordinates(self, address: str) -> Optional[Tuple[float, float]]:
-        """
-        주소를 위도/경도 좌표로 변환
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._start_lock = threading.Lock()
+        # 아래 객체들은 전용 루프 안에서 처음 사용할 때 생성
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._bucket: Optional[TokenBucket] = None
 
-        Args:
-            address: 변환할 주소 문자열
+    def _submit(self, coro: Coroutine) -> Future:
+        """전용 이벤트 루프 스레드에서 coro 실행 (처음 호출 시 스레드 시작)"""
+        with self._start_lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="geocoding-loop", daemon=True
+                ).start()
+                self._loop = loop
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
 
-        Returns:
-            (latitude, longitude) 튜플 또는 None
-        """
-        if not address:
-            return None
+    def _ensure_client(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=settings.GEOCODING_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=self.concurrency,
+                    max_keepalive_connections=self.concurrency,
+                ),
+                headers={
+                    "X-NCP-APIGW-API-KEY-ID": self.client_id or "",
+                    "X-NCP-APIGW-API-KEY": self.client_secret or "",
+                },
+            )
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            # 몰아서 보내지 않고 고르게 (어느 1초 구간에서도 할당량을 넘지 않도록)
+            self._bucket = TokenBucket(
+                self.rate_per_second, capacity=1.0, name=RATE_LIMIT_BUCKET
+            )
 
-        headers = {
-            "X-NCP-APIGW-API-KEY-ID": self.client_id,
-            "X-NCP-APIGW-API-KEY": self.client_secret,
-        }
+    async def _request(self, address: str) -> Union[Coordinates, str, None]:
+        """
+        API 1회 조회 (재시도 포함)
 
+        Returns:
+            (latitude, longitude), 결과가 없으면 NOT_FOUND, 오류면 None
+        """
         params = {
             "query": address,
             "coordinate": "127.105399,37.3595704",  # 서울시청 기준점 (검색 정확도 향상)
         }
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                async with self._semaphore:
+                    await self._bucket.acquire()
+                    response = await self._client.get(self.base_url, params=params)
+            except httpx.RequestError as e:
+                logger.error(f"Request error during geocoding: {e}")
+                return None
 
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    self.BASE_URL, headers=headers, params=params, timeout=10.0
-                )
-
-                if response.status_code != 200:
-                    logger.error(f"Geocoding API error: {response.status_code}")
-                    return None
+            if response.status_code in RETRY_STATUS_CODES and attempt < MAX_RETRIES:
+                await asyncio.sleep(RETRY_BACKOFF_SECONDS * (2**attempt))
+                continue
+            if response.status_code != 200:
+                logger.error(f"Geocoding API error: {response.status_code}")
+                return None
 
+            try:
                 data = response.json()
-
                 # 검색 결과가 있는지 확인
                 if data.get("meta", {}).get("totalCount", 0) == 0:
                     logger.warning(f"No geocoding results for address: {address}")
-                    return None
-
+                    return NOT_FOUND
                 # 첫 번째 결과의 좌표 반환
                 first_result = data.get("addresses", [])[0]
                 longitude = float(first_result.get("x"))  # 경도
                 latitude = float(first_result.get("y"))  # 위도
-
-                logger.info(f"Geocoded '{address}' to ({latitude}, {longitude})")
                 return (latitude, longitude)
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                logger.error(f"Error parsing geocoding response: {e}")
+                return None
+        return None
 
-        except httpx.RequestError as e:
-            logger.error(f"Request error during geocoding: {e}")
-            return None
-        except (KeyError, IndexError, ValueError) as e:
-            logger.error(f"Error parsing geocoding response: {e}")
-            return None
+    def _cache_read(self, normalized: List[str]) -> Dict[str, object]:
+        if not redis_client.connected or not normalized:
+            return {}
+        try:
+            values = redis_client.client.mget([_cache_key(n) for n in normalized])
         except Exception as e:
-            logger.error(f"Unexpected error during geocoding: {e}")
-            return None
+            logger.warning(f"Geocoding cache read failed: {e}")
+            return {}
+        cached = {}
+        for key, value in zip(normalized, values):
+            if value is not None:
+                decoded = json.loads(value)
+                cached[key] = tuple(decoded) if decoded != NOT_FOUND else NOT_FOUND
+        return cached
+
+    def _cache_write(self, results: Dict[str, object]):
+        if not redis_client.connected or not results:
+            return
+        try:
+            pipe = redis_client.client.pipeline(transaction=False)
+            for normalized, value in results.items():
+                ttl = (
+                    settings.GEOCODING_NEGATIVE_CACHE_TTL
+                    if value == NOT_FOUND
+                    else settings.GEOCODING_CACHE_TTL
+                )
+                pipe.setex(_cache_key(normalized), ttl, json.dumps(value))
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Geocoding cache write failed: {e}")
+
+    async def _geocode_many(
+        self, addresses: Iterable[str]
+    ) -> Dict[str, Optional[Coordinates]]:
+        self._ensure_client()
+        by_normalized: Dict[str, List[str]] = {}
+        for address in addresses:
+            normalized = normalize_address(address)
+            if normalized:
+                by_normalized.setdefault(normalized, []).append(address)
+
+        resolved = self._cache_read(list(by_normalized))
+        misses = [n for n in by_normalized if n not in resolved]
+        fetched = await asyncio.gather(*(self._request(n) for n in misses))
+        # 오류(None)는 캐시하지 않고 다음에 다시 시도
+        fresh = {n: value for n, value in zip(misses, fetched) if value is not None}
+        self._cache_write(fresh)
+        resolved.update(fresh)
+        if misses:
+            logger.info(
+                f"Geocoded {len(by_normalized)} addresses "
+                f"({len(by_normalized) - len(misses)} cached, {len(misses)} requested)"
+            )
+
+        results: Dict[str, Optional[Coordinates]] = {}
+        for address in addresses:
+            value = resolved.get(normalize_address(address))
+            results[address] = value if value not in (None, NOT_FOUND) else None
+        return results
+
+    async def get_coordinates(self, address: str) -> Optional[Coordinates]:
+        """
+        주소를 위도/경도 좌표로 변환
+
+        Args:
+            address: 변환할 주소 문자열
+
+        Returns:
+            (latitude, longitude) 튜플 또는 None
+        """
+        results = await self.batch_geocode([address])
+        return results.get(address)
 
     async def batch_geocode(
-        self, addresses: list[str]
-    ) -> Dict[str, Optional[Tuple[float, float]]]:
+        self, addresses: List[str]
+    ) -> Dict[str, Optional[Coordinates]]:
         """
-        여러 주소를 일괄 처리하여 좌표로 변환
+        여러 주소를 일괄 처리하여 좌표로 변환 (동시 요청, 속도 제한, 캐시)
 
         Args:
             addresses: 주소 문자열 리스트
@@ -90,14 +284,61 @@ class NaverGeocodingService:
         Returns:
             {주소: (위도, 경도)} 딕셔너리
         """
-        results = {}
+        addresses = list(addresses)
+        return await asyncio.wrap_future(self._submit(self._geocode_many(addresses)))
 
-        for address in addresses:
-            coords = await self.get_coordinates(address)
-            results[address] = coords
+    def geocode_sync(self, address: str) -> Optional[Coordinates]:
+        """동기 코드용 get_coordinates (이벤트 루프 밖에서만 호출)"""
+        return self.batch_geocode_sync([address]).get(address)
 
-        return results
+    def batch_geocode_sync(
+        self, addresses: List[str]
+    ) -> Dict[str, Optional[Coordinates]]:
+        """동기 코드용 batch_geocode (이벤트 루프 밖에서만 호출)"""
+        addresses = list(addresses)
+        return self._submit(self._geocode_many(addresses)).result()
 
 
 # 싱글톤 인스턴스
 geocoding_service = NaverGeocodingService()
+
+
+def backfill_missing_coordinates(
+    db: Session, church_id: Optional[int] = None, batch_size: Optional[int] = None
+) -> Dict[str, Dict[str, int]]:
+    """
+    주소는 있지만 좌표가 없는 교인/심방 요청에 좌표 채우기 (묶음마다 commit)
+
+    Returns:
+        {"members": {"scanned", "geocoded"}, "pastoral_care_requests": {...}}
+    """
+    batch_size = batch_size or BACKFILL_BATCH_SIZE
+    summary = {}
+    for key, model in BACKFILL_MODELS.items():
+        scanned = geocoded = last_id = 0
+        while True:
+            query = db.query(model).filter(
+                model.id > last_id,
+                model.address.isnot(None),
+                model.address != "",
+                (model.latitude.is_(None)) | (model.longitude.is_(None)),
+            )
+            if church_id is not None:
+                query = query.filter(model.church_id == church_id)
+            rows = query.order_by(model.id).limit(batch_size).all()
+            if not rows:
+                break
+
+            results = geocoding_service.batch_geocode_sync(
+                [row.address for row in rows]
+            )
+            for row in rows:
+                coords = results.get(row.address)
+                if coords:
+                    row.latitude, row.longitude = coords
+                    geocoded += 1
+            db.commit()
+            scanned += len(rows)
+            last_id = rows[-1].id
+        summary[key] = {"scanned": scanned, "geocoded": geocoded}
+    return summary
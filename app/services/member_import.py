@@ -0,0 +1,208 @@
+"""
+교인 엑셀 일괄 등록 서비스 (벡터화)
+
+행마다 전화번호로 SELECT 하던 방식 대신 DataFrame 단위로 처리합니다.
+- 컬럼 정규화/검증: pandas 연산으로 한 번에 수행, 행 번호별 오류 수집
+- 기존 교인 조회: 교회의 해당 전화번호 교인을 쿼리 1회로 조회
+- 신규/수정 분리 후 bulk insert/update mappings 를 묶음 단위로 적용
+- dry-run: DB 를 바꾸지 않고 생성/수정될 내용(diff)만 반환
+"""
+
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from app.models.member import Member
+from app.schemas.enums import Gender
+from app.utils.korean import get_initial_consonants
+
+REQUIRED_COLUMNS = ["이름", "성별", "전화번호"]
+COLUMN_FIELDS = {
+    "이름": "name",
+    "성별": "gender",
+    "생년월일": "birthdate",
+    "전화번호": "phone",
+    "주소": "address",
+    "직분": "position",
+    "구역": "district",
+}
+UPDATE_FIELDS = ["name", "gender", "birthdate", "address", "position", "district"]
+BATCH_SIZE = 1000
+FIRST_DATA_ROW = 2  # 엑셀 1행은 헤더
+GENDER_CODES = {
+    **{gender.value: gender.value for gender in Gender},
+    **{
+        label: Gender.from_korean(label).value
+        for label in ("남", "남자", "남성", "여", "여자", "여성")
+    },
+}
+
+
+def normalize_member_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    엑셀 컬럼을 Member 필드로 정규화하고 행별 오류를 error 컬럼에 기록
+
+    Returns:
+        COLUMN_FIELDS 값 + row(엑셀 행 번호) + error 컬럼을 가진 DataFrame
+    """
+    frame = pd.DataFrame(index=df.index)
+    for column, field in COLUMN_FIELDS.items():
+        if column in df.columns:
+            values = df[column].astype("string").str.strip()
+            frame[field] = values.mask(values == "")
+        else:
+            frame[field] = pd.Series(pd.NA, index=df.index, dtype="string")
+    frame["row"] = df.index + FIRST_DATA_ROW
+
+    frame["gender"] = frame["gender"].str.upper().map(GENDER_CODES)
+    raw_birthdate = frame["birthdate"]
+    frame["birthdate"] = pd.to_datetime(
+        raw_birthdate, errors="coerce", format="mixed"
+    ).dt.date
+
+    checks = [
+        (frame["name"].isna(), "이름이 비어 있습니다"),
+        (frame["phone"].isna(), "전화번호가 비어 있습니다"),
+        (frame["gender"].isna(), "성별은 남/여 (또는 M/F) 여야 합니다"),
+        (
+            raw_birthdate.notna() & frame["birthdate"].isna(),
+            "생년월일 형식이 올바르지 않습니다 (YYYY-MM-DD)",
+        ),
+        (
+            frame["phone"].notna() & frame["phone"].duplicated(keep="first"),
+            "같은 전화번호가 파일에 이미 있습니다",
+        ),
+    ]
+    errors = pd.Series("", index=frame.index)
+    for mask, message in checks:
+        mask = mask.fillna(False).astype(bool)
+        errors = errors.mask(mask & (errors == ""), message)
+    frame["error"] = errors.mask(errors == "")
+    return frame
+
+
+def _clean(value: Any) -> Any:
+    """pandas 결측값(NA/NaT/NaN)을 None 으로"""
+    if value is None or value is pd.NA or value is pd.NaT or value != value:
+        return None
+    return value
+
+
+def plan_member_import(db: Session, df: pd.DataFrame, church_id: int) -> Dict[str, Any]:
+    """
+    가져오기 계획 수립 (DB 변경 없음)
+
+    Returns:
+        {"inserts": [mapping], "updates": [mapping(id 포함)],
+         "changes": [{row, id, name, changes}], "unchanged": int, "errors": [str]}
+    """
+    missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+    frame = normalize_member_frame(df)
+    invalid = frame[frame["error"].notna()]
+    valid = frame[frame["error"].isna()]
+    errors = [
+        f"Row {row}: {error}" for row, error in zip(invalid["row"], invalid["error"])
+    ]
+
+    phones = valid["phone"].tolist()
+    existing = pd.DataFrame(
+        (
+            db.query(
+                Member.id, Member.phone, *(getattr(Member, f) for f in UPDATE_FIELDS)
+            )
+            .filter(Member.church_id == church_id, Member.phone.in_(phones))
+            .all()
+            if phones
+            else []
+        ),
+        columns=["id", "phone", *UPDATE_FIELDS],
+    ).drop_duplicates("phone", keep="first")
+
+    merged = valid.merge(existing, on="phone", how="left", suffixes=("", "_old"))
+    fields = ["phone", *UPDATE_FIELDS]
+
+    inserts = [
+        {**{field: _clean(row[field]) for field in fields}, "church_id": church_id}
+        for row in merged[merged["id"].isna()].to_dict("records")
+    ]
+
+    updates, changes, unchanged = [], [], 0
+    for row in merged[merged["id"].notna()].to_dict("records"):
+        # 비어 있는 선택 항목은 기존 값을 유지 (기존 업로드와 동일)
+        diff = {
+            field: [_clean(row[f"{field}_old"]), _clean(row[field])]
+            for field in UPDATE_FIELDS
+            if _clean(row[field]) is not None
+            and _clean(row[field]) != _clean(row[f"{field}_old"])
+        }
+        if not diff:
+            unchanged += 1
+            continue
+        member_id = int(row["id"])
+        update = {"id": member_id, **{field: new for field, (_, new) in diff.items()}}
+        if "name" in diff:
+            # bulk update 는 ORM validates 를 거치지 않으므로 초성도 함께 갱신
+            update["name_initials"] = get_initial_consonants(update["name"])
+        updates.append(update)
+        changes.append(
+            {
+                "row": int(row["row"]),
+                "id": member_id,
+                "name": row["name"],
+                "changes": diff,
+            }
+        )
+
+    return {
+        "inserts": inserts,
+        "updates": updates,
+        "changes": changes,
+        "unchanged": unchanged,
+        "errors": errors,
+    }
+
+
+def apply_member_import(
+    db: Session, plan: Dict[str, Any], batch_size: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    계획을 bulk insert/update 로 적용 (묶음마다 commit 해 긴 트랜잭션을 피함)
+    """
+    batch_size = batch_size or BATCH_SIZE
+    for mappings, apply in (
+        (plan["inserts"], db.bulk_insert_mappings),
+        (plan["updates"], db.bulk_update_mappings),
+    ):
+        for start in range(0, len(mappings), batch_size):
+            apply(Member, mappings[start : start + batch_size])
+            db.commit()
+    return {"created": len(plan["inserts"]), "updated": len(plan["updates"])}
+
+
+def _json_value(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, date) else value
+
+
+def summarize_plan(plan: Dict[str, Any], limit: int = 100) -> Dict[str, List[Any]]:
+    """dry-run 응답용 diff (각 목록 최대 limit 건)"""
+    return {
+        "inserts": [
+            {key: _json_value(value) for key, value in row.items()}
+            for row in plan["inserts"][:limit]
+        ],
+        "updates": [
+            {
+                **change,
+                "changes": {
+                    field: [_json_value(v) for v in pair]
+                    for field, pair in change["changes"].items()
+                },
+            }
+            for change in plan["changes"][:limit]
+        ],
+    }
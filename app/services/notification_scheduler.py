@@ -0,0 +1,127 @@
+"""
+예약 푸시 알림 발송 (Redis sorted set)
+
+PushNotification.scheduled_at 을 점수(epoch 초)로 Redis sorted set 에 넣어 두고
+beat 작업(app.tasks.notifications.dispatch_scheduled_notifications)이
+NOTIFICATION_SCHEDULER_INTERVAL_SECONDS 마다 도래한 알림을 묶음으로 꺼내 fan-out 합니다.
+- 예약: scheduled_at 에 시간대가 없으면 지정한(또는 기본 NOTIFICATION_TIMEZONE) 시간대로 해석해 UTC 로 저장
+- 꺼내기: 조회와 삭제를 Lua 로 한 번에 처리해 여러 beat/worker 가 같은 알림을 두 번 꺼내지 않음
+- 취소: sorted set 에서 삭제에 성공한 경우에만 취소 (이미 꺼내져 발송 중이면 취소 불가)
+- 복구: Redis 가 비워져도 DB 에 남은 미래 예약 알림을 다시 등록 (restore_schedule)
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.models.push_notification import PushNotification
+
+POP_BATCH_SIZE = 100
+MAX_BATCHES_PER_RUN = 50  # 한 번 실행에서 꺼낼 최대 묶음 수 (나머지는 다음 실행)
+
+
+def to_utc(value: datetime, tz_name: Optional[str] = None) -> datetime:
+    """
+    예약 시각을 UTC 로 변환
+
+    시간대 정보가 없는 값은 tz_name (없으면 NOTIFICATION_TIMEZONE) 기준 현지 시각으로 봅니다.
+    잘못된 시간대 이름이면 ZoneInfoNotFoundError (KeyError 하위 클래스)
+    """
+    if value.tzinfo is None:
+        value = value.replace(
+            tzinfo=ZoneInfo(tz_name or settings.NOTIFICATION_TIMEZONE)
+        )
+    return value.astimezone(timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # sqlite 등 시간대를 저장하지 않는 DB 에서 읽은 값은 UTC 로 저장된 것으로 간주
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def is_due(notification: PushNotification, now: Optional[datetime] = None) -> bool:
+    """예약이 없거나, 예약 시각이 now (+ 스케줄러 주기 여유) 이전이면 True"""
+    if notification.scheduled_at is None:
+        return True
+    now = now or datetime.now(timezone.utc)
+    slack = timedelta(seconds=settings.NOTIFICATION_SCHEDULER_INTERVAL_SECONDS)
+    return _as_utc(notification.scheduled_at) <= now + slack
+
+
+def schedule_notification(notification: PushNotification) -> bool:
+    """
+    커밋된 알림을 예약 목록에 등록 (같은 알림을 다시 등록하면 시각만 바뀜)
+
+    Returns:
+        Redis 를 사용할 수 없으면 False
+    """
+    if not redis_client.connected:
+        return False
+    redis_client.schedule_notification(
+        notification.id, _as_utc(notification.scheduled_at).timestamp()
+    )
+    return True
+
+
+def cancel_scheduled_notification(db: Session, notification: PushNotification) -> bool:
+    """
+    발송 전 예약 취소
+
+    Returns:
+        취소했으면 True, 이미 발송됐거나 발송 중(예약 목록에서 꺼내짐)이면 False
+    """
+    if notification.sent_at is not None or notification.cancelled_at is not None:
+        return False
+    if not redis_client.unschedule_notification(notification.id):
+        return False
+    notification.cancelled_at = datetime.now(timezone.utc)
+    db.commit()
+    return True
+
+
+def pending_scheduled_query(db: Session):
+    return db.query(PushNotification).filter(
+        PushNotification.scheduled_at.isnot(None),
+        PushNotification.sent_at.is_(None),
+        PushNotification.cancelled_at.is_(None),
+    )
+
+
+def list_scheduled_notifications(db: Session, church_id: int) -> List[PushNotification]:
+    """교회의 발송 대기 중인 예약 알림 (예약 시각순)"""
+    return (
+        pending_scheduled_query(db)
+        .filter(PushNotification.church_id == church_id)
+        .order_by(PushNotification.scheduled_at)
+        .all()
+    )
+
+
+def pop_due_notification_ids(
+    now: Optional[datetime] = None, batch_size: int = POP_BATCH_SIZE
+) -> List[int]:
+    """예약 시각이 된 알림 id 를 최대 batch_size 개 꺼냄 (꺼낸 id 는 목록에서 삭제됨)"""
+    now = now or datetime.now(timezone.utc)
+    return redis_client.pop_due_notifications(now.timestamp(), batch_size)
+
+
+def restore_schedule(db: Session) -> int:
+    """
+    DB 의 미래 예약 알림을 예약 목록에 다시 등록 (Redis 초기화 대비)
+
+    이미 지난 예약은 꺼내져 발송 중일 수 있어 중복 발송을 피하려고 제외합니다.
+    """
+    if not redis_client.connected:
+        return 0
+    notifications = (
+        pending_scheduled_query(db)
+        .filter(PushNotification.scheduled_at > datetime.now(timezone.utc))
+        .all()
+    )
+    for notification in notifications:
+        schedule_notification(notification)
+    return len(notifications)
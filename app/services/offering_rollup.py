@@ -0,0 +1,272 @@
+"""
+헌금 월별 집계(rollup) 서비스
+
+offerings 원본을 매번 SUM 하는 대신 교회/월/헌금유형(및 교인) 단위 합계를
+유지합니다.
+- 헌금 입력 시 같은 트랜잭션에서 record_offering 으로 증분 반영
+- 과거 데이터 적재/정합성 복구는 rebuild_offering_rollups 로 재구축
+- 임의 기간 조회는 온전한 월은 rollup, 월 중간에 걸친 앞뒤 구간만 원본에서 합산
+"""
+
+from datetime import date, timedelta
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import Integer, and_, cast, extract, func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.models.financial import (
+    Offering,
+    OfferingMemberMonthlyRollup,
+    OfferingMonthlyRollup,
+)
+from app.models.member import Member
+
+ROLLUP_TABLES = (OfferingMonthlyRollup, OfferingMemberMonthlyRollup)
+
+
+def _insert_for(db: Session):
+    """ON CONFLICT 를 지원하는 dialect 별 insert"""
+    if db.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def record_offering(db: Session, offering: Offering, sign: int = 1):
+    """
+    헌금 1건을 rollup 에 반영 (commit 은 호출자가 수행)
+
+    Args:
+        sign: 1 이면 추가, -1 이면 취소(삭제/수정 전 값 제거)
+    """
+    insert = _insert_for(db)
+    base = {
+        "church_id": offering.church_id,
+        "year": offering.offered_on.year,
+        "month": offering.offered_on.month,
+        "fund_type": offering.fund_type,
+        "total_amount": offering.amount * sign,
+        "offering_count": sign,
+    }
+    for table, extra in (
+        (OfferingMonthlyRollup, {}),
+        (OfferingMemberMonthlyRollup, {"member_id": offering.member_id}),
+    ):
+        stmt = insert(table).values(**base, **extra)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[c.name for c in table.__table__.primary_key],
+                set_={
+                    "total_amount": table.total_amount + stmt.excluded.total_amount,
+                    "offering_count": table.offering_count
+                    + stmt.excluded.offering_count,
+                    "updated_at": func.now(),
+                },
+            )
+        )
+
+
+def rebuild_offering_rollups(db: Session, church_id: Optional[int] = None) -> int:
+    """
+    offerings 원본으로 rollup 재구축 (commit 은 호출자가 수행)
+
+    Returns:
+        교회 단위 rollup 행 수
+    """
+    year = cast(extract("year", Offering.offered_on), Integer)
+    month = cast(extract("month", Offering.offered_on), Integer)
+    church_filter = [Offering.church_id == church_id] if church_id is not None else []
+
+    for table in ROLLUP_TABLES:
+        query = db.query(table)
+        if church_id is not None:
+            query = query.filter(table.church_id == church_id)
+        query.delete(synchronize_session=False)
+
+    for table, keys in (
+        (OfferingMonthlyRollup, [Offering.church_id, year, month, Offering.fund_type]),
+        (
+            OfferingMemberMonthlyRollup,
+            [Offering.church_id, Offering.member_id, year, month, Offering.fund_type],
+        ),
+    ):
+        columns = [c.name for c in table.__table__.primary_key]
+        source = (
+            select(*keys, func.sum(Offering.amount), func.count(Offering.id))
+            .where(*church_filter)
+            .group_by(*keys)
+        )
+        db.execute(
+            table.__table__.insert().from_select(
+                columns + ["total_amount", "offering_count"], source
+            )
+        )
+
+    query = db.query(func.count()).select_from(OfferingMonthlyRollup)
+    if church_id is not None:
+        query = query.filter(OfferingMonthlyRollup.church_id == church_id)
+    return query.scalar()
+
+
+def split_months(
+    start_date: date, end_date: date
+) -> Tuple[Optional[Tuple[int, int]], List[Tuple[date, date]]]:
+    """
+    기간을 온전한 월 구간과 나머지 일자 구간으로 분리
+
+    Returns:
+        ((시작 yyyymm, 끝 yyyymm) 또는 None, [(시작일, 종료일), ...])
+    """
+    first_full = start_date if start_date.day == 1 else _next_month(start_date)
+    next_day = end_date + timedelta(days=1)
+    last_full = (
+        end_date if next_day.day == 1 else end_date.replace(day=1) - timedelta(days=1)
+    )
+
+    if first_full > last_full:
+        return None, [(start_date, end_date)] if start_date <= end_date else []
+
+    partial = []
+    if start_date < first_full:
+        partial.append((start_date, first_full - timedelta(days=1)))
+    if end_date > last_full:
+        partial.append((last_full + timedelta(days=1), end_date))
+    return (_yyyymm(first_full), _yyyymm(last_full)), partial
+
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def _yyyymm(day: date) -> int:
+    return day.year * 100 + day.month
+
+
+def _combined_rows(
+    table,
+    church_id: int,
+    start_date: date,
+    end_date: date,
+    rollup_keys: List[Any],
+    offering_keys: List[Any],
+):
+    """rollup(온전한 월) + 원본(나머지 일자) 합계를 같은 키로 합친 서브쿼리"""
+    full_months, partial = split_months(start_date, end_date)
+    names = [f"k{i}" for i in range(len(rollup_keys))]
+    parts = []
+
+    if full_months:
+        parts.append(
+            select(
+                *(key.label(name) for key, name in zip(rollup_keys, names)),
+                table.total_amount.label("total_amount"),
+                table.offering_count.label("offering_count"),
+            ).where(
+                table.church_id == church_id,
+                (table.year * 100 + table.month).between(*full_months),
+            )
+        )
+    for range_start, range_end in partial:
+        parts.append(
+            select(
+                *(key.label(name) for key, name in zip(offering_keys, names)),
+                func.sum(Offering.amount).label("total_amount"),
+                func.count(Offering.id).label("offering_count"),
+            )
+            .where(
+                Offering.church_id == church_id,
+                Offering.offered_on.between(range_start, range_end),
+            )
+            .group_by(*offering_keys)
+        )
+
+    if not parts:
+        # 빈 기간 - 결과 없는 서브쿼리
+        parts.append(
+            select(
+                *(literal(None).label(name) for name in names),
+                literal(0).label("total_amount"),
+                literal(0).label("offering_count"),
+            ).where(literal(False))
+        )
+    combined = (union_all(*parts) if len(parts) > 1 else parts[0]).subquery()
+    return combined, [combined.c[name] for name in names]
+
+
+def summarize_by_fund_type(
+    db: Session, church_id: int, start_date: date, end_date: date
+):
+    """기간 내 헌금유형별 (fund_type, total_amount, offering_count)"""
+    rows, (fund_type,) = _combined_rows(
+        OfferingMonthlyRollup,
+        church_id,
+        start_date,
+        end_date,
+        [OfferingMonthlyRollup.fund_type],
+        [Offering.fund_type],
+    )
+    return (
+        db.query(
+            fund_type.label("fund_type"),
+            func.sum(rows.c.total_amount).label("total_amount"),
+            func.sum(rows.c.offering_count).label("offering_count"),
+        )
+        .group_by(fund_type)
+        .all()
+    )
+
+
+def summarize_by_month(db: Session, church_id: int, start_date: date, end_date: date):
+    """기간 내 월별 (year, month, total_amount, offering_count), 시간순"""
+    rows, (year, month) = _combined_rows(
+        OfferingMonthlyRollup,
+        church_id,
+        start_date,
+        end_date,
+        [OfferingMonthlyRollup.year, OfferingMonthlyRollup.month],
+        [
+            cast(extract("year", Offering.offered_on), Integer),
+            cast(extract("month", Offering.offered_on), Integer),
+        ],
+    )
+    return (
+        db.query(
+            year.label("year"),
+            month.label("month"),
+            func.sum(rows.c.total_amount).label("total_amount"),
+            func.sum(rows.c.offering_count).label("offering_count"),
+        )
+        .group_by(year, month)
+        .order_by(year, month)
+        .all()
+    )
+
+
+def summarize_by_member(
+    db: Session, church_id: int, start_date: date, end_date: date, limit: int
+):
+    """기간 내 헌금 합계 상위 교인 (id, name, total_amount, offering_count, fund_types)"""
+    rows, (member_id, fund_type) = _combined_rows(
+        OfferingMemberMonthlyRollup,
+        church_id,
+        start_date,
+        end_date,
+        [OfferingMemberMonthlyRollup.member_id, OfferingMemberMonthlyRollup.fund_type],
+        [Offering.member_id, Offering.fund_type],
+    )
+    total = func.sum(rows.c.total_amount)
+    return (
+        db.query(
+            Member.id,
+            Member.name,
+            total.label("total_amount"),
+            func.sum(rows.c.offering_count).label("offering_count"),
+            func.array_agg(fund_type.distinct()).label("fund_types"),
+        )
+        .join(rows, and_(Member.id == member_id, Member.church_id == church_id))
+        .group_by(Member.id, Member.name)
+        .order_by(total.desc())
+        .limit(limit)
+        .all()
+    )
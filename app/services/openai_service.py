@@ -1,6 +1,12 @@
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI, APITimeoutError, DefaultAsyncHttpxClient
+import asyncio
+import hashlib
 import os
-from typing import List, Dict, Optional
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 import logging
 from app.core.config import settings
 from app.core.security import decrypt_data, encrypt_data
@@ -9,19 +15,80 @@ import json
 logger = logging.getLogger(__name__)
 
 
+class _LoopResources:
+    """이벤트 루프별로 공유되는 HTTP 커넥션 풀과 동시 요청 제한 세마포어"""
+
+    def __init__(self):
+        self.http_client = DefaultAsyncHttpxClient()
+        self.semaphore = asyncio.Semaphore(settings.OPENAI_MAX_CONCURRENCY)
+
+
+# httpx 커넥션과 asyncio.Semaphore 는 생성된 이벤트 루프에 묶이므로 루프별로 보관
+_loop_resources: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _get_loop_resources() -> _LoopResources:
+    loop = asyncio.get_running_loop()
+    resources = _loop_resources.get(loop)
+    if resources is None or resources.http_client.is_closed:
+        resources = _LoopResources()
+        _loop_resources[loop] = resources
+    return resources
+
+
 class OpenAIService:
-    def __init__(self, api_key: str = None, organization: str = None):
+    def __init__(
+        self, api_key: str = None, organization: str = None, base_url: str = None
+    ):
         """Initialize OpenAI service with optional custom API key"""
-        if api_key:
-            self.client = OpenAI(api_key=api_key, organization=organization)
-        else:
+        if not api_key:
             # Try to get from environment
-            env_key = os.getenv("OPENAI_API_KEY")
-            env_org = os.getenv("OPENAI_ORGANIZATION")
-            if env_key:
-                self.client = OpenAI(api_key=env_key, organization=env_org)
-            else:
-                self.client = None
+            api_key = os.getenv("OPENAI_API_KEY")
+            organization = os.getenv("OPENAI_ORGANIZATION")
+
+        self.api_key = api_key
+        self.organization = organization
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL")
+        self._client = None
+        self._async_client = None
+        self._async_client_loop = None
+
+    @property
+    def client(self) -> Optional[OpenAI]:
+        """Synchronous client, created on first use"""
+        if self._client is None and self.api_key:
+            self._client = OpenAI(
+                api_key=self.api_key,
+                organization=self.organization,
+                base_url=self.base_url,
+                timeout=settings.OPENAI_TIMEOUT,
+                max_retries=settings.OPENAI_MAX_RETRIES,
+            )
+        return self._client
+
+    def _get_async_client(self) -> AsyncOpenAI:
+        """Async client bound to the running loop's shared connection pool"""
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            self._async_client = AsyncOpenAI(
+                api_key=self.api_key,
+                organization=self.organization,
+                base_url=self.base_url,
+                timeout=settings.OPENAI_TIMEOUT,
+                max_retries=settings.OPENAI_MAX_RETRIES,
+                http_client=_get_loop_resources().http_client,
+            )
+            self._async_client_loop = loop
+        return self._async_client
+
+    async def _create_completion(self, **params):
+        """Call chat completions without blocking the event loop.
+
+        Concurrent calls per worker are capped by OPENAI_MAX_CONCURRENCY; the
+        request is cancelled if the awaiting task is cancelled.
+        """
+        async with _get_loop_resources().semaphore:
+            return await self._get_async_client().chat.completions.create(**params)
 
     async def generate_response(
         self,
@@ -44,7 +111,7 @@ class OpenAIService:
         Returns:
             Dictionary with response content and metadata
         """
-        if not self.client:
+        if not self.api_key:
             raise Exception("OpenAI client not initialized. Please provide an API key.")
 
         # Log request details for debugging
@@ -66,31 +133,11 @@ class OpenAIService:
             logger.debug(f"Calling OpenAI API with model: {normalized_model}")
 
             # Call OpenAI API using the new client
-            # GPT-5 models have specific parameter requirements
-            if normalized_model.startswith("gpt-5"):
-                # GPT-5 models require specific parameters
-                adjusted_temperature = 1.0  # GPT-5 only supports temperature=1.0
-                if temperature != 1.0:
-                    logger.warning(
-                        f"🔧 GPT-5 Temperature 조정: {temperature} → 1.0 (모델 제약)"
-                    )
-
-                logger.info(
-                    f"Using GPT-5 parameters - max_completion_tokens: {max_tokens}, temperature: 1.0"
-                )
-                response = self.client.chat.completions.create(
-                    model=normalized_model,
-                    messages=messages,
-                    max_completion_tokens=max_tokens,
-                    temperature=adjusted_temperature,
-                )
-            else:
-                response = self.client.chat.completions.create(
-                    model=normalized_model,
-                    messages=messages,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
+            response = await self._create_completion(
+                **self._completion_params(
+                    normalized_model, messages, max_tokens, temperature
                 )
+            )
 
             # Extract response
             content = response.choices[0].message.content
@@ -112,6 +159,10 @@ class OpenAIService:
                 "finish_reason": response.choices[0].finish_reason,
             }
 
+        except (APITimeoutError, asyncio.TimeoutError) as e:
+            logger.error(f"OpenAI request timed out after {settings.OPENAI_TIMEOUT}s: {e}")
+            raise Exception("AI 응답 시간이 초과되었습니다. 잠시 후 다시 시도해주세요.")
+
         except Exception as e:
             logger.error(f"OpenAI API Error Details:")
             logger.error(f"  Model: {model}")
@@ -144,7 +195,7 @@ class OpenAIService:
                         f"Model '{model}' failed, trying fallback to gpt-4o-mini"
                     )
                     try:
-                        response = self.client.chat.completions.create(
+                        response = await self._create_completion(
                             model="gpt-4o-mini",
                             messages=messages,
                             max_tokens=max_tokens,
@@ -179,6 +230,101 @@ class OpenAIService:
                 logger.error(f"OpenAI API error: {e}")
                 raise Exception(f"AI 응답 생성 중 오류가 발생했습니다: {str(e)}")
 
+    async def stream_response(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = "gpt-4o-mini",
+        max_tokens: int = 4000,
+        temperature: float = 0.7,
+        system_prompt: str = None,
+    ) -> AsyncIterator[Dict]:
+        """
+        Stream AI response tokens as they arrive
+
+        Yields:
+            {"type": "delta", "content": str} for each text fragment, then
+            {"type": "done", "tokens_used", "model", "finish_reason"} once complete
+        """
+        if not self.api_key:
+            raise Exception("OpenAI client not initialized. Please provide an API key.")
+
+        normalized_model = self._normalize_model_name(model)
+        if system_prompt:
+            messages = [{"role": "system", "content": system_prompt}] + messages
+
+        logger.info(f"OpenAI Stream Request - Model: {normalized_model}, Max Tokens: {max_tokens}")
+
+        tokens_used = 0
+        finish_reason = None
+        try:
+            async with _get_loop_resources().semaphore:
+                stream = await self._get_async_client().chat.completions.create(
+                    **self._completion_params(
+                        normalized_model, messages, max_tokens, temperature
+                    ),
+                    stream=True,
+                    stream_options={"include_usage": True},
+                )
+                async for chunk in stream:
+                    # The final chunk carries usage only, with no choices
+                    if chunk.usage:
+                        tokens_used = chunk.usage.total_tokens
+                    if not chunk.choices:
+                        continue
+                    choice = chunk.choices[0]
+                    if choice.finish_reason:
+                        finish_reason = choice.finish_reason
+                    if choice.delta and choice.delta.content:
+                        yield {"type": "delta", "content": choice.delta.content}
+
+        except (APITimeoutError, asyncio.TimeoutError) as e:
+            logger.error(f"OpenAI stream timed out after {settings.OPENAI_TIMEOUT}s: {e}")
+            raise Exception("AI 응답 시간이 초과되었습니다. 잠시 후 다시 시도해주세요.")
+        except Exception as e:
+            logger.error(f"OpenAI stream error ({type(e).__name__}): {e}")
+            raise Exception(f"AI 응답 생성 중 오류가 발생했습니다: {str(e)}")
+
+        logger.info(f"OpenAI Stream completed - Tokens used: {tokens_used}")
+        yield {
+            "type": "done",
+            "tokens_used": tokens_used,
+            "model": normalized_model,
+            "finish_reason": finish_reason,
+        }
+
+    def _completion_params(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+    ) -> Dict:
+        """Build chat completion parameters for the given model"""
+        # GPT-5 models have specific parameter requirements
+        if model.startswith("gpt-5"):
+            # GPT-5 models require specific parameters
+            if temperature != 1.0:  # GPT-5 only supports temperature=1.0
+                logger.warning(
+                    f"🔧 GPT-5 Temperature 조정: {temperature} → 1.0 (모델 제약)"
+                )
+
+            logger.info(
+                f"Using GPT-5 parameters - max_completion_tokens: {max_tokens}, temperature: 1.0"
+            )
+            return {
+                "model": model,
+                "messages": messages,
+                "max_completion_tokens": max_tokens,
+                "temperature": 1.0,
+            }
+
+        return {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+
     def _normalize_model_name(self, model: str) -> str:
         """Normalize model name to handle variations"""
         model_lower = model.lower().strip()
@@ -284,13 +430,13 @@ class OpenAIService:
     async def test_connection(self, api_key: str = None) -> bool:
         """Test if the API key is valid"""
         try:
-            test_client = OpenAI(api_key=api_key) if api_key else self.client
+            test_service = OpenAIService(api_key=api_key) if api_key else self
 
-            if not test_client:
+            if not test_service.api_key:
                 return False
 
             # Simple test request
-            response = test_client.chat.completions.create(
+            response = await test_service._create_completion(
                 model="gpt-4o-mini",
                 messages=[{"role": "user", "content": "test"}],
                 max_tokens=5,
@@ -333,5 +479,102 @@ class OpenAIService:
         return required_data
 
 
+class OpenAIClientRegistry:
+    """
+    교회별 OpenAI 서비스 LRU 레지스트리
+
+    (교회 ID, 저장된 API 키 지문)으로 준비된 서비스를 재사용하여 요청마다
+    반복되던 Fernet 복호화와 클라이언트 생성을 없앱니다. 키가 바뀌면 지문이
+    달라지므로 다른 워커에서도 이전 클라이언트가 재사용되지 않습니다.
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[int, str], object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._build_seconds = 0.0
+
+    @staticmethod
+    def fingerprint(stored_key: str) -> str:
+        """저장된(암호화된) API 키의 지문 - 키 원문은 보관하지 않음"""
+        return hashlib.sha256((stored_key or "").encode()).hexdigest()[:16]
+
+    def get_for_church(self, church, fallback_key: Optional[str] = None):
+        """
+        교회 설정에 맞는 OpenAI 서비스 반환
+
+        교회 키가 없으면 fallback_key (예: OPENAI_API_KEY 환경변수) 사용,
+        둘 다 비어 있거나 테스트 키면 테스트 서비스
+        """
+        stored_key = church.gpt_api_key or fallback_key or ""
+        key = (church.id, self.fingerprint(stored_key))
+
+        with self._lock:
+            service = self._entries.get(key)
+            if service is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return service
+
+        started = time.perf_counter()
+        service = self._build_service(church.id, stored_key)
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self.misses += 1
+            self._build_seconds += elapsed
+            # 같은 교회의 이전 키로 만든 클라이언트는 더 이상 쓰이지 않음
+            for stale_key in [k for k in self._entries if k[0] == church.id]:
+                del self._entries[stale_key]
+                self.evictions += 1
+            self._entries[key] = service
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return service
+
+    def _build_service(self, church_id: int, stored_key: str):
+        # Only an explicitly empty or test key uses the test service
+        if not stored_key or "test" in stored_key.lower():
+            logger.warning(f"Using test OpenAI service for church {church_id}")
+            from app.services.openai_test_service import TestOpenAIService
+
+            return TestOpenAIService()
+
+        # decrypt_data returns "" for keys stored in plain text (raw sk-... keys
+        # and the environment fallback); those are used as is
+        api_key = decrypt_data(stored_key) or stored_key
+        return OpenAIService(api_key=api_key)
+
+    def evict_church(self, church_id: int):
+        """교회의 캐시된 클라이언트 제거 (API 키 변경 시 호출)"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == church_id]:
+                del self._entries[key]
+                self.evictions += 1
+
+    def get_stats(self) -> Dict:
+        """히트/미스 통계 (saved_ms 는 히트마다 절약된 평균 생성 시간의 합)"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            avg_build_ms = (
+                self._build_seconds / self.misses * 1000 if self.misses else 0.0
+            )
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "avg_build_ms": round(avg_build_ms, 3),
+                "saved_ms": round(self.hits * avg_build_ms, 1),
+            }
+
+
 # Create a singleton instance with environment key if available
 openai_service = OpenAIService()
+openai_client_registry = OpenAIClientRegistry(settings.OPENAI_CLIENT_CACHE_SIZE)
@@ -2,9 +2,10 @@
 Test OpenAI service that returns mock responses
 """
 
+import asyncio
 import random
 import logging
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict
 
 logger = logging.getLogger(__name__)
 
@@ -138,6 +139,30 @@ class TestOpenAIService:
             "finish_reason": "stop",
         }
 
+    async def stream_response(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = "gpt-4o-mini",
+        max_tokens: int = 4000,
+        temperature: float = 0.7,
+        system_prompt: str = None,
+    ) -> AsyncIterator[Dict]:
+        """Stream the mock response in small chunks"""
+        response = await self.generate_response(
+            messages, model, max_tokens, temperature, system_prompt
+        )
+        content = response["content"]
+        for i in range(0, len(content), 8):
+            yield {"type": "delta", "content": content[i : i + 8]}
+            await asyncio.sleep(0)
+
+        yield {
+            "type": "done",
+            "tokens_used": response["tokens_used"],
+            "model": response["model"],
+            "finish_reason": response["finish_reason"],
+        }
+
     def generate_response_sync(
         self,
         messages: List[Dict[str, str]],
@@ -147,8 +172,6 @@ class TestOpenAIService:
         system_prompt: str = None,
     ) -> Dict:
         """Synchronous version of generate_response"""
-        import asyncio
-
         return asyncio.run(
             self.generate_response(
                 messages, model, max_tokens, temperature, system_prompt
@@ -0,0 +1,62 @@
+"""
+심방 요청 위치 검색
+
+교회의 좌표가 있는 요청 전체를 불러와 파이썬 haversine 루프로 거르던 방식 대신
+- (church_id, latitude, longitude) 색인으로 반경을 감싸는 bounding box 만 조회
+- 반경 판정과 가까운 순 정렬은 SQL 에서 평면 근사 거리(위도 기준 도 단위 제곱)로 수행
+  (수십 km 이내에서는 haversine 과 순서/판정 차이가 사실상 없음)
+- 페이지(skip/limit)에 해당하는 행만 가져와 haversine 으로 표시용 거리 계산
+"""
+
+from typing import List, Tuple
+
+from sqlalchemy import Float, cast
+from sqlalchemy.orm import Session
+
+from app.models.pastoral_care import PastoralCareRequest
+from app.utils.geo import KM_PER_DEGREE, bounding_box, haversine_km, longitude_scale
+
+
+def find_requests_near(
+    db: Session,
+    church_id: int,
+    latitude: float,
+    longitude: float,
+    radius_km: float,
+    skip: int = 0,
+    limit: int = 50,
+) -> List[Tuple[PastoralCareRequest, float]]:
+    """
+    반경 안의 심방 요청을 가까운 순으로 한 페이지 조회
+
+    Returns:
+        [(요청, 거리 km)] 가까운 순
+    """
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+    scale = longitude_scale(latitude)
+    dy = cast(PastoralCareRequest.latitude, Float) - latitude
+    dx = (cast(PastoralCareRequest.longitude, Float) - longitude) * scale
+    distance_sq = dy * dy + dx * dx
+
+    rows = (
+        db.query(PastoralCareRequest)
+        .filter(
+            PastoralCareRequest.church_id == church_id,
+            PastoralCareRequest.latitude.between(min_lat, max_lat),
+            PastoralCareRequest.longitude.between(min_lon, max_lon),
+            distance_sq <= (radius_km / KM_PER_DEGREE) ** 2,
+        )
+        .order_by(distance_sq, PastoralCareRequest.id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return [
+        (
+            request,
+            haversine_km(
+                latitude, longitude, float(request.latitude), float(request.longitude)
+            ),
+        )
+        for request in rows
+    ]
@@ -0,0 +1,292 @@
+"""
+토큰 예산 기반 프롬프트 컨텍스트 조립기
+
+교회 데이터 전체를 프롬프트에 넣는 대신, 사용자 질문과의 관련도로 항목을
+정렬하고 에이전트별 토큰 예산 안에서 잘라 넣습니다.
+- 공지사항/기도요청/심방요청/검색된 자료 조각: 항목 단위로 점수화 (본문은 길이 제한)
+- 헌금/출석/교인/예배 통계: 섹션 단위 요약을 하나의 후보로 취급
+- 예산에 전체가 들어가지 않으면 축약본으로 대체, 그래도 안 되면 제외
+"""
+
+import logging
+import math
+import re
+from typing import Any, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.services.church_data_context import format_context_for_prompt
+
+try:
+    import tiktoken
+
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken 미설치 또는 인코딩 파일 없음 → 근사치 사용
+    _encoding = None
+
+logger = logging.getLogger(__name__)
+
+
+# 항목 목록 섹션 (출력 순서대로)
+LIST_SECTIONS = {
+    "announcements": "[교회 공지사항]",
+    "prayer_requests": "[중보기도 요청]",
+    "pastoral_care_requests": "[심방 요청]",
+    "retrieved_content": "[관련 교회 자료]",
+}
+
+# content_index 문서 유형 표시 이름
+DOC_TYPE_NAMES = {
+    "announcement": "공지",
+    "sermon_material": "설교",
+    "prayer_request": "기도요청",
+    "church_news": "교회소식",
+}
+
+# 통계 요약 섹션 - format_context_for_prompt 의 섹션 포맷 재사용
+STATS_SECTIONS = [
+    "offering_stats",
+    "attendance_stats",
+    "member_stats",
+    "worship_schedule",
+]
+
+# 질문에 포함되면 해당 섹션 점수를 올리는 키워드
+SECTION_KEYWORDS = {
+    "announcements": ["공지", "소식", "안내", "행사", "광고"],
+    "prayer_requests": ["기도", "중보", "기도제목"],
+    "pastoral_care_requests": ["심방", "방문", "상담"],
+    "offering_stats": ["헌금", "십일조", "재정", "감사헌금"],
+    "attendance_stats": ["출석", "결석", "참석", "출석률"],
+    "member_stats": ["교인", "성도", "새신자", "세례", "직분", "부서", "구역", "연령"],
+    "worship_schedule": ["예배", "시간", "일정", "설교"],
+}
+
+FULL_CONTENT_CHARS = 300
+SHORT_CONTENT_CHARS = 80
+
+PASTORAL_STATUS_NAMES = {
+    "pending": "대기중",
+    "approved": "승인됨",
+    "scheduled": "예약됨",
+    "completed": "완료됨",
+    "cancelled": "취소됨",
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    텍스트 토큰 수 계산
+
+    tiktoken 이 있으면 정확히 계산하고, 없으면 한글 음절 1토큰,
+    그 외 문자 4자당 1토큰으로 근사합니다 (한글 위주 데이터에서 약간 과대 추정).
+    """
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    hangul = sum(1 for ch in text if "가" <= ch <= "힣")
+    return hangul + math.ceil((len(text) - hangul) / 4)
+
+
+def _terms(text: str) -> Set[str]:
+    """관련도 계산용 용어 집합 (한글은 조사 변화에 강한 2-gram, 그 외는 단어)"""
+    terms = set()
+    for word in re.findall(r"[가-힣]+|[0-9a-z]+", (text or "").lower()):
+        if "가" <= word[0] <= "힣" and len(word) > 1:
+            terms.update(word[i : i + 2] for i in range(len(word) - 1))
+        else:
+            terms.add(word)
+    return terms
+
+
+def _truncate(text: Optional[str], max_chars: int) -> str:
+    text = (text or "").strip()
+    return text if len(text) <= max_chars else text[:max_chars] + "..."
+
+
+def _render_announcement(ann: Dict, max_chars: int) -> str:
+    pinned = " (고정)" if ann.get("is_pinned") else ""
+    line = (
+        f"- {ann.get('title', '')}{pinned}: {_truncate(ann.get('content'), max_chars)}"
+    )
+    if ann.get("created_at"):
+        line += f" [작성일: {ann['created_at'][:10]}]"
+    return line
+
+
+def _render_prayer_request(req: Dict, max_chars: int) -> str:
+    urgency = " (긴급)" if req.get("is_urgent") else ""
+    content = _truncate(req.get("prayer_content"), max_chars)
+    return (
+        f"- {req.get('requester_name')}: {content}{urgency} "
+        f"[{req.get('prayer_type')}, 기도수: {req.get('prayer_count') or 0}]"
+    )
+
+
+def _render_pastoral_care_request(req: Dict, max_chars: int) -> str:
+    urgency = " (긴급)" if req.get("is_urgent") else ""
+    status_text = PASTORAL_STATUS_NAMES.get(req.get("status"), req.get("status"))
+    lines = [
+        f"- ID{req.get('id')} {req.get('requester_name')}: "
+        f"{_truncate(req.get('request_content'), max_chars)}{urgency}",
+        f"  유형: {req.get('request_type')}, 상태: {status_text}"
+        + (f", 연락처: {req['requester_phone']}" if req.get("requester_phone") else ""),
+    ]
+    if req.get("scheduled_date"):
+        lines.append(
+            f"  예약일시: {req['scheduled_date']} {req.get('scheduled_time') or ''}"
+        )
+    elif req.get("preferred_date"):
+        lines.append(f"  희망일: {req['preferred_date']}")
+    # 주소/노트는 전체 버전에서만 포함
+    if max_chars >= FULL_CONTENT_CHARS:
+        if req.get("address"):
+            lines.append(f"  주소: {req['address']}")
+        notes = [
+            f"{label}: {_truncate(req.get(key), max_chars)}"
+            for key, label in (
+                ("completion_notes", "완료노트"),
+                ("admin_notes", "관리자노트"),
+            )
+            if req.get(key)
+        ]
+        if notes:
+            lines.append("  " + ", ".join(notes))
+    return "\n".join(lines)
+
+
+def _render_retrieved(chunk: Dict, max_chars: int) -> str:
+    label = DOC_TYPE_NAMES.get(chunk.get("type"), chunk.get("type"))
+    return f"- [{label}] {_truncate(chunk.get('text'), max_chars)}"
+
+
+_RENDERERS = {
+    "announcements": (_render_announcement, ("title", "content", "category")),
+    "prayer_requests": (
+        _render_prayer_request,
+        ("prayer_content", "prayer_type", "requester_name"),
+    ),
+    "pastoral_care_requests": (
+        _render_pastoral_care_request,
+        ("request_content", "request_type", "requester_name", "address"),
+    ),
+    "retrieved_content": (_render_retrieved, ("text",)),
+}
+
+
+def _section_boost(section: str, user_query: str) -> float:
+    return (
+        0.5 if any(k in user_query for k in SECTION_KEYWORDS.get(section, [])) else 0.0
+    )
+
+
+def _collect_candidates(context_data: Dict, user_query: str) -> List[Dict[str, Any]]:
+    """컨텍스트 데이터를 점수가 매겨진 후보 블록 목록으로 변환"""
+    query_terms = _terms(user_query)
+    candidates = []
+
+    for section, (renderer, text_fields) in _RENDERERS.items():
+        items = context_data.get(section) or []
+        boost = _section_boost(section, user_query)
+        for position, item in enumerate(items):
+            item_terms = _terms(" ".join(str(item.get(f) or "") for f in text_fields))
+            overlap = (
+                len(query_terms & item_terms) / len(query_terms) if query_terms else 0.0
+            )
+            # 목록은 최신순이므로 앞쪽 항목일수록 약간 가산
+            recency = 0.2 * (1 - position / max(len(items), 1))
+            flags = 0.2 if item.get("is_urgent") else 0.0
+            flags += 0.1 if item.get("is_pinned") else 0.0
+            # 인덱스 검색 결과는 벡터 유사도(0~1)를 그대로 가산
+            flags += item.get("score") or 0.0
+            candidates.append(
+                {
+                    "section": section,
+                    "order": position,
+                    "score": overlap * 2 + boost + recency + flags,
+                    "full": renderer(item, FULL_CONTENT_CHARS),
+                    "short": renderer(item, SHORT_CONTENT_CHARS),
+                }
+            )
+
+    for order, section in enumerate(STATS_SECTIONS):
+        if not context_data.get(section):
+            continue
+        try:
+            text = format_context_for_prompt({section: context_data[section]}).strip()
+        except Exception as e:
+            logger.warning(f"Failed to format {section} for prompt: {e}")
+            continue
+        if text:
+            candidates.append(
+                {
+                    "section": section,
+                    "order": order,
+                    # 통계 요약은 짧고 질문 의도와 맞으면 가치가 높음
+                    "score": 0.4 + _section_boost(section, user_query) * 2,
+                    "full": text,
+                    "short": None,
+                }
+            )
+
+    return candidates
+
+
+def build_prompt_context(
+    context_data: Dict, user_query: str = "", token_budget: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    토큰 예산 안에서 질문과 관련도가 높은 교회 데이터만 프롬프트 텍스트로 조립
+
+    Args:
+        context_data: get_church_context_data 결과
+        user_query: 사용자 질문 (관련도 계산용)
+        token_budget: 최대 토큰 수 (None 이면 CHAT_CONTEXT_TOKEN_BUDGET)
+
+    Returns:
+        text, token_count, token_budget, included(섹션별 포함 수), available(섹션별 전체 수)
+    """
+    token_budget = token_budget or settings.CHAT_CONTEXT_TOKEN_BUDGET
+    candidates = _collect_candidates(context_data or {}, user_query or "")
+    candidates.sort(key=lambda c: c["score"], reverse=True)
+
+    used = 0
+    selected: Dict[str, List[Dict]] = {}
+    for candidate in candidates:
+        section = candidate["section"]
+        # 목록 섹션은 첫 항목이 들어갈 때 헤더 비용도 함께 계산
+        header_cost = (
+            estimate_tokens(LIST_SECTIONS[section]) + 1
+            if section in LIST_SECTIONS and section not in selected
+            else 0
+        )
+        for variant in ("full", "short"):
+            text = candidate[variant]
+            if not text:
+                continue
+            cost = estimate_tokens(text) + 1 + header_cost
+            if used + cost <= token_budget:
+                used += cost
+                selected.setdefault(section, []).append({**candidate, "text": text})
+                break
+
+    parts = []
+    for section in list(LIST_SECTIONS) + STATS_SECTIONS:
+        blocks = sorted(selected.get(section, []), key=lambda c: c["order"])
+        if not blocks:
+            continue
+        if section in LIST_SECTIONS:
+            parts.append("\n" + LIST_SECTIONS[section])
+        parts.extend(block["text"] for block in blocks)
+
+    text = "\n".join(parts)
+    available = {s: len(context_data.get(s) or []) for s in LIST_SECTIONS}
+    available.update({s: 1 for s in STATS_SECTIONS if context_data.get(s)})
+
+    return {
+        "text": text,
+        "token_count": estimate_tokens(text),
+        "token_budget": token_budget,
+        "included": {s: len(blocks) for s, blocks in selected.items()},
+        "available": available,
+    }
@@ -0,0 +1,393 @@
+"""
+대량 푸시 알림 분할 발송 (fan-out)
+
+50명 단위로 send_to_multiple_users 를 반복 호출하던 방식은 묶음마다
+PushNotification 행을 새로 만들고 이벤트 루프를 새로 띄웠습니다.
+- 수신 대상: 알림 1건당 사용자/기기를 쿼리 한 번씩으로 한 번만 조회
+- 분할: 기기를 FCM 한 번 호출 크기(FCM_BATCH_SIZE)의 shard 로 나눔
+- 발송: shard 마다 Celery 하위 작업으로 병렬 발송 (app.tasks.notifications),
+  shard 안에서는 플랫폼별 FCM multicast 로 호출
+- 기록: NotificationRecipient 는 shard 마다 bulk insert 한 번
+- 집계: sent_count/failed_count 는 UPDATE ... SET x = x + n 으로 원자적으로 누적
+- 토큰 정리: FCM 응답이 만료/잘못된 토큰이면 shard 마다 기기를 한 번에 비활성화하고
+  Redis 에서도 제거, 교회별 일일 발송/만료 토큰 수를 통계로 남김
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from firebase_admin import exceptions, messaging
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.redis import redis_client
+from app.models.push_notification import (
+    NotificationRecipient,
+    NotificationStatus,
+    PushNotification,
+    UserDevice,
+)
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+FCM_BATCH_SIZE = 500  # FCM 한 번 호출에 보낼 수 있는 최대 메시지 수
+
+# shard 항목: (user_id, device_id, device_token, platform) - Celery 로 넘기므로 JSON 직렬화 가능해야 함
+DeviceTarget = Tuple[int, int, str, str]
+SendMulticast = Callable[[messaging.MulticastMessage], messaging.BatchResponse]
+
+# 더 이상 유효하지 않은 토큰 (앱 삭제/토큰 갱신, 다른 프로젝트 토큰)
+DEAD_TOKEN_ERRORS = (messaging.UnregisteredError, messaging.SenderIdMismatchError)
+UNREGISTERED = "unregistered"
+INVALID_ARGUMENT = "invalid_argument"
+DEVICES_STAT = "push_devices"
+DEAD_TOKENS_STAT = "push_dead_tokens"
+
+
+class Outcome(NamedTuple):
+    """기기 한 대의 발송 결과"""
+
+    success: bool
+    error: Optional[str] = None
+    reason: Optional[str] = None  # classify_fcm_error 결과
+
+
+def classify_fcm_error(exception: Optional[BaseException]) -> Optional[str]:
+    """FCM 오류 분류: UNREGISTERED (만료 토큰), INVALID_ARGUMENT, 그 외 None"""
+    if isinstance(exception, DEAD_TOKEN_ERRORS):
+        return UNREGISTERED
+    if isinstance(exception, exceptions.InvalidArgumentError):
+        return INVALID_ARGUMENT
+    return None
+
+
+def fcm_outcome(exception: Optional[BaseException]) -> Outcome:
+    if exception is None:
+        return Outcome(True)
+    return Outcome(False, str(exception), classify_fcm_error(exception))
+
+
+def notification_payload(notification: PushNotification) -> Dict[str, Any]:
+    """FCM 메시지 생성에 필요한 알림 내용"""
+    return {
+        "title": notification.title,
+        "body": notification.body,
+        "data": notification.data,
+        "image_url": notification.image_url,
+    }
+
+
+def _church_users(notification: PushNotification):
+    return select(User.id).where(
+        User.church_id == notification.church_id, User.is_active == True
+    )
+
+
+def resolve_devices(
+    db: Session, notification: PushNotification
+) -> Tuple[List[int], List[DeviceTarget], List[int], List[int]]:
+    """
+    알림 대상 사용자와 활성 기기 조회 (사용자별 발송 한도 확인 포함)
+
+    target_type 이 all/church 이면 교회 전체 활성 사용자가 대상입니다.
+
+    Returns:
+        (대상 사용자 id, 기기 목록, 기기가 없는 사용자 id, 발송 한도를 넘은 사용자 id)
+    """
+    if notification.target_type in ("all", "church"):
+        user_ids = list(db.scalars(_church_users(notification)))
+        # 수만 개의 IN 목록 대신 서브쿼리
+        device_filter = UserDevice.user_id.in_(_church_users(notification))
+    else:
+        user_ids = list(dict.fromkeys(notification.target_users or []))
+        device_filter = UserDevice.user_id.in_(user_ids)
+    if not user_ids:
+        return [], [], [], []
+
+    rows = (
+        db.query(
+            UserDevice.user_id,
+            UserDevice.id,
+            UserDevice.device_token,
+            UserDevice.platform,
+        ).filter(device_filter, UserDevice.is_active == True)
+        # 플랫폼별로 모아 두면 shard 대부분이 multicast 한 번으로 끝남
+        .order_by(UserDevice.platform, UserDevice.user_id, UserDevice.id)
+    )
+    devices = [
+        (user_id, device_id, token, getattr(platform, "value", platform))
+        for user_id, device_id, token, platform in rows
+    ]
+
+    users_with_devices = {device[0] for device in devices}
+    no_device = [user_id for user_id in user_ids if user_id not in users_with_devices]
+    rate_limited = redis_client.check_rate_limits(sorted(users_with_devices))
+    if rate_limited:
+        limited = set(rate_limited)
+        devices = [device for device in devices if device[0] not in limited]
+    return user_ids, devices, no_device, rate_limited
+
+
+def shard_devices(
+    devices: Sequence[DeviceTarget], size: int = FCM_BATCH_SIZE
+) -> List[List[DeviceTarget]]:
+    return [
+        list(devices[start : start + size]) for start in range(0, len(devices), size)
+    ]
+
+
+def increment_counts(db: Session, notification_id: int, sent: int = 0, failed: int = 0):
+    """동시에 끝나는 shard 들이 서로 덮어쓰지 않도록 DB 에서 더함"""
+    db.query(PushNotification).filter(PushNotification.id == notification_id).update(
+        {
+            PushNotification.sent_count: func.coalesce(PushNotification.sent_count, 0)
+            + sent,
+            PushNotification.failed_count: func.coalesce(
+                PushNotification.failed_count, 0
+            )
+            + failed,
+        },
+        synchronize_session=False,
+    )
+
+
+def record_undeliverable(
+    db: Session, notification_id: int, user_ids: Sequence[int], error_message: str
+):
+    """기기 없음/발송 한도 초과 사용자의 실패 기록 (bulk insert)"""
+    if not user_ids:
+        return
+    db.bulk_insert_mappings(
+        NotificationRecipient,
+        [
+            {
+                "notification_id": notification_id,
+                "user_id": user_id,
+                "status": NotificationStatus.FAILED,
+                "error_message": error_message,
+            }
+            for user_id in user_ids
+        ],
+    )
+
+
+def claim_dispatch(db: Session, notification_id: int) -> bool:
+    """
+    fan-out 시작 표시 (이미 다른 실행이 시작했으면 False)
+
+    조건부 UPDATE 라 동시에 실행돼도 한 번만 성공합니다. 커밋은 prepare_fanout 이
+    발송 불가 기록과 함께 하므로, 그 전에 실패하면 표시도 함께 롤백됩니다.
+    """
+    claimed = (
+        db.query(PushNotification)
+        .filter(
+            PushNotification.id == notification_id,
+            PushNotification.dispatched_at.is_(None),
+        )
+        .update({PushNotification.dispatched_at: func.now()}, synchronize_session=False)
+    )
+    return claimed == 1
+
+
+def prepare_fanout(
+    db: Session, notification: PushNotification, shard_size: int = FCM_BATCH_SIZE
+) -> List[List[DeviceTarget]]:
+    """
+    수신 대상 확정: 카운터 초기화, 발송 불가 사용자 기록 후 기기 shard 목록 반환
+    """
+    user_ids, devices, no_device, rate_limited = resolve_devices(db, notification)
+    record_undeliverable(db, notification.id, no_device, "No active devices")
+    record_undeliverable(db, notification.id, rate_limited, "Rate limit exceeded")
+    notification.total_recipients = len(user_ids)
+    notification.sent_count = 0
+    notification.failed_count = len(no_device) + len(rate_limited)
+    db.commit()
+    return shard_devices(devices, shard_size)
+
+
+def platform_config(
+    platform: str,
+) -> Tuple[Optional[messaging.AndroidConfig], Optional[messaging.APNSConfig]]:
+    """플랫폼별 FCM 설정 (android 외에는 APNs 설정 사용)"""
+    if platform == "android":
+        android_config = messaging.AndroidConfig(
+            priority="high",
+            notification=messaging.AndroidNotification(
+                click_action="FLUTTER_NOTIFICATION_CLICK",
+                channel_id="default_channel",
+            ),
+        )
+        return android_config, None
+    apns_config = messaging.APNSConfig(
+        payload=messaging.APNSPayload(aps=messaging.Aps(badge=1, sound="default"))
+    )
+    return None, apns_config
+
+
+def create_multicast_message(
+    tokens: List[str],
+    title: str,
+    body: str,
+    data: Optional[Dict] = None,
+    image_url: Optional[str] = None,
+    platform: str = "android",
+) -> messaging.MulticastMessage:
+    android_config, apns_config = platform_config(platform)
+    return messaging.MulticastMessage(
+        tokens=tokens,
+        notification=messaging.Notification(title=title, body=body, image=image_url),
+        data=data or {},
+        android=android_config,
+        apns=apns_config,
+    )
+
+
+def send_multicast(message: messaging.MulticastMessage) -> messaging.BatchResponse:
+    return messaging.send_each_for_multicast(message)
+
+
+def send_shard(
+    payload: Dict[str, Any],
+    devices: Sequence[DeviceTarget],
+    send: Optional[SendMulticast] = None,
+) -> List[Outcome]:
+    """
+    shard 하나 발송 (플랫폼마다 multicast 1회), devices 순서대로 결과 반환
+
+    FCM 호출 자체가 실패하면 해당 플랫폼 기기 전체를 실패로 봅니다.
+    """
+    send = send or send_multicast
+    by_platform: Dict[str, List[int]] = {}
+    for index, (_, _, _, platform) in enumerate(devices):
+        by_platform.setdefault(platform, []).append(index)
+
+    outcomes: List[Outcome] = [Outcome(False)] * len(devices)
+    for platform, indexes in by_platform.items():
+        message = create_multicast_message(
+            [devices[index][2] for index in indexes], platform=platform, **payload
+        )
+        try:
+            responses = send(message).responses
+            results = [
+                fcm_outcome(None if response.success else response.exception)
+                for response in responses
+            ]
+        except Exception as e:
+            logger.error(
+                f"Multicast send failed ({platform}, {len(indexes)} devices): {e}"
+            )
+            results = [Outcome(False, str(e))] * len(indexes)
+        for index, outcome in zip(indexes, results):
+            outcomes[index] = outcome
+    return outcomes
+
+
+def dead_token_indexes(outcomes: Sequence[Outcome]) -> List[int]:
+    """
+    비활성화할 기기 위치
+
+    INVALID_ARGUMENT 는 메시지 자체가 잘못됐을 때도 오므로,
+    같은 묶음에서 성공한 기기가 있을 때만 토큰 문제로 봅니다.
+    """
+    payload_ok = any(outcome.success for outcome in outcomes)
+    return [
+        index
+        for index, outcome in enumerate(outcomes)
+        if outcome.reason == UNREGISTERED
+        or (outcome.reason == INVALID_ARGUMENT and payload_ok)
+    ]
+
+
+def prune_dead_tokens(
+    db: Session,
+    devices: Sequence[DeviceTarget],
+    outcomes: Sequence[Outcome],
+    church_id: Optional[int] = None,
+) -> int:
+    """만료 토큰 기기를 한 번에 비활성화하고 Redis 에서 제거 (commit 은 호출자)"""
+    dead = [devices[index] for index in dead_token_indexes(outcomes)]
+    if church_id is not None:
+        redis_client.increment_stat(f"{DEVICES_STAT}:{church_id}", amount=len(devices))
+        if dead:
+            redis_client.increment_stat(
+                f"{DEAD_TOKENS_STAT}:{church_id}", amount=len(dead)
+            )
+    if not dead:
+        return 0
+
+    db.query(UserDevice).filter(
+        UserDevice.id.in_([device[1] for device in dead])
+    ).update({UserDevice.is_active: False}, synchronize_session=False)
+    for user_id, _, token, _ in dead:
+        redis_client.remove_device_token(user_id, token)
+    logger.info(
+        f"Deactivated {len(dead)} dead device tokens"
+        + (f" for church {church_id}" if church_id is not None else "")
+    )
+    return len(dead)
+
+
+def dead_token_rate(church_id: int, day: str) -> Dict[str, Any]:
+    """교회의 하루(YYYY-MM-DD) 발송 기기 수 대비 만료 토큰 비율"""
+    devices = redis_client.get_stat(f"{DEVICES_STAT}:{church_id}", day)
+    dead = redis_client.get_stat(f"{DEAD_TOKENS_STAT}:{church_id}", day)
+    return {
+        "date": day,
+        "devices": devices,
+        "dead_tokens": dead,
+        "dead_token_rate": round(dead / devices, 4) if devices else 0.0,
+    }
+
+
+def record_shard(
+    db: Session,
+    notification_id: int,
+    devices: Sequence[DeviceTarget],
+    outcomes: Sequence[Outcome],
+    church_id: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    shard 결과를 bulk insert 한 번으로 기록하고 카운터 누적, 만료 토큰 정리
+    (commit 은 호출자)
+    """
+    sent_at = datetime.now(timezone.utc)
+    db.bulk_insert_mappings(
+        NotificationRecipient,
+        [
+            {
+                "notification_id": notification_id,
+                "user_id": user_id,
+                "device_id": device_id,
+                "status": (
+                    NotificationStatus.SENT
+                    if outcome.success
+                    else NotificationStatus.FAILED
+                ),
+                "sent_at": sent_at if outcome.success else None,
+                "error_message": outcome.error,
+            }
+            for (user_id, device_id, _, _), outcome in zip(devices, outcomes)
+        ],
+    )
+    sent = sum(1 for outcome in outcomes if outcome.success)
+    failed = len(outcomes) - sent
+    increment_counts(db, notification_id, sent=sent, failed=failed)
+    dead = prune_dead_tokens(db, devices, outcomes, church_id)
+    return {"sent": sent, "failed": failed, "dead_tokens": dead}
+
+
+def deliver_shard(
+    db: Session,
+    notification_id: int,
+    payload: Dict[str, Any],
+    devices: Sequence[DeviceTarget],
+    church_id: Optional[int] = None,
+    send: Optional[SendMulticast] = None,
+) -> Dict[str, int]:
+    """shard 하나 발송 → 수신자 기록 bulk insert → 카운터 누적/토큰 정리 → commit"""
+    outcomes = send_shard(payload, devices, send)
+    counts = record_shard(db, notification_id, devices, outcomes, church_id)
+    db.commit()
+    return counts
@@ -14,6 +14,16 @@ from app.models.push_notification import (
 from app.models.user import User
 from app.core.config import settings
 from app.core.redis import redis_client
+from app.services.push_fanout import (
+    fcm_outcome,
+    increment_counts,
+    platform_config,
+    record_shard,
+    record_undeliverable,
+    resolve_devices,
+    send_shard,
+    shard_devices,
+)
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 
@@ -28,7 +38,8 @@ except Exception as e:
     logger.error(f"Failed to initialize Firebase Admin SDK: {e}")
     logger.warning("Push notifications will be disabled")
 
-executor = ThreadPoolExecutor(max_workers=10)
+SEND_CONCURRENCY = 10
+executor = ThreadPoolExecutor(max_workers=SEND_CONCURRENCY)
 
 
 class PushNotificationService:
@@ -130,48 +141,34 @@ class PushNotificationService:
             db.commit()
             return result
 
-        # Send to all user devices
-        success_count = 0
-        failed_count = 0
-
-        for device in devices:
-            try:
-                await PushNotificationService._send_fcm_message(
-                    device_token=device.device_token,
-                    title=title,
-                    body=body,
-                    data=data,
-                    image_url=image_url,
-                    platform=device.platform,
-                )
-
-                # Record success
-                recipient = NotificationRecipient(
-                    notification_id=notification.id,
-                    user_id=user_id,
-                    device_id=device.id,
-                    status=NotificationStatus.SENT,
-                    sent_at=datetime.now(timezone.utc),
-                )
-                db.add(recipient)
-                success_count += 1
-
-            except Exception as e:
-                logger.error(f"Failed to send to device {device.id}: {e}")
-                # Record failure
-                recipient = NotificationRecipient(
-                    notification_id=notification.id,
-                    user_id=user_id,
-                    device_id=device.id,
-                    status=NotificationStatus.FAILED,
-                    error_message=str(e),
-                )
-                db.add(recipient)
-                failed_count += 1
+        # Send to all user devices concurrently (bounded by the executor size)
+        semaphore = asyncio.Semaphore(SEND_CONCURRENCY)
 
-        # Update notification stats
-        notification.sent_count = success_count
-        notification.failed_count = failed_count
+        async def send(device: UserDevice):
+            async with semaphore:
+                try:
+                    await PushNotificationService._send_fcm_message(
+                        device_token=device.device_token,
+                        title=title,
+                        body=body,
+                        data=data,
+                        image_url=image_url,
+                        platform=device.platform,
+                    )
+                    return fcm_outcome(None)
+                except Exception as e:
+                    logger.error(f"Failed to send to device {device.id}: {e}")
+                    return fcm_outcome(e)
+
+        outcomes = await asyncio.gather(*(send(device) for device in devices))
+        targets = [
+            (user_id, device.id, device.device_token, device.platform)
+            for device in devices
+        ]
+        counts = record_shard(db, notification.id, targets, outcomes, user.church_id)
+        success_count, failed_count = counts["sent"], counts["failed"]
+
+        # Counts were added by record_shard
         notification.sent_at = datetime.now(timezone.utc)
         db.commit()
 
@@ -228,140 +225,47 @@ class PushNotificationService:
         db.commit()
         result["notification_id"] = notification.id
 
-        # Get all active devices for users
-        devices = (
-            db.query(UserDevice)
-            .join(User)
-            .filter(UserDevice.user_id.in_(user_ids), UserDevice.is_active == True)
-            .all()
-        )
-
-        # Track users without devices
-        users_with_devices = set()
-        for device in devices:
-            users_with_devices.add(device.user_id)
-
-        users_without_devices = set(user_ids) - users_with_devices
-        result["no_device_users"] = list(users_without_devices)
-
-        # Add recipient records for users without devices
-        for user_id in users_without_devices:
-            recipient = NotificationRecipient(
-                notification_id=notification.id,
-                user_id=user_id,
-                status=NotificationStatus.FAILED,
-                error_message="No active devices",
-            )
-            db.add(recipient)
+        _, devices, no_device, rate_limited = resolve_devices(db, notification)
+        result["no_device_users"] = no_device
+        record_undeliverable(db, notification.id, no_device, "No active devices")
+        record_undeliverable(db, notification.id, rate_limited, "Rate limit exceeded")
+        undeliverable = len(no_device) + len(rate_limited)
+        increment_counts(db, notification.id, failed=undeliverable)
 
         if not devices:
-            notification.failed_count = len(user_ids)
             db.commit()
             result["message"] = "등록된 기기가 있는 사용자가 없습니다"
-            result["failed_count"] = len(user_ids)
+            result["failed_count"] = undeliverable
             return result
 
-        # Group devices by user
-        user_devices = {}
-        for device in devices:
-            if device.user_id not in user_devices:
-                user_devices[device.user_id] = []
-            user_devices[device.user_id].append(device)
-
-        # Send notifications in batches
-        messages = []
-        device_map = {}
-
-        for user_id, user_devices_list in user_devices.items():
-            # Check rate limit per user
-            if not redis_client.check_rate_limit(user_id):
-                logger.warning(f"Rate limit exceeded for user {user_id}")
-                recipient = NotificationRecipient(
-                    notification_id=notification.id,
-                    user_id=user_id,
-                    status=NotificationStatus.FAILED,
-                    error_message="Rate limit exceeded",
-                )
-                db.add(recipient)
-                continue
-
-            for device in user_devices_list:
-                message = PushNotificationService._create_fcm_message(
-                    device_token=device.device_token,
-                    title=title,
-                    body=body,
-                    data=data,
-                    image_url=image_url,
-                    platform=device.platform,
-                )
-                messages.append(message)
-                device_map[device.device_token] = (user_id, device.id)
+        # FCM multicast per shard, shards sent concurrently; DB writes stay on this session
+        semaphore = asyncio.Semaphore(SEND_CONCURRENCY)
+        loop = asyncio.get_running_loop()
+        payload = {"title": title, "body": body, "data": data, "image_url": image_url}
 
-        # Send batch (FCM supports up to 500 messages per batch)
-        success_count = 0
-        failed_count = 0
+        async def send(shard):
+            async with semaphore:
+                return await loop.run_in_executor(executor, send_shard, payload, shard)
 
-        if messages:
-            for i in range(0, len(messages), 500):
-                batch = messages[i : i + 500]
-                try:
-                    batch_response = await PushNotificationService._send_batch_fcm(
-                        batch
-                    )
+        shards = shard_devices(devices)
+        success_count = failed_count = 0
+        for shard, outcomes in zip(
+            shards, await asyncio.gather(*(send(s) for s in shards))
+        ):
+            counts = record_shard(db, notification.id, shard, outcomes, church_id)
+            success_count += counts["sent"]
+            failed_count += counts["failed"]
 
-                    # Process responses
-                    for idx, response in enumerate(batch_response.responses):
-                        token = batch[idx].token
-                        user_id, device_id = device_map[token]
-
-                        if response.success:
-                            recipient = NotificationRecipient(
-                                notification_id=notification.id,
-                                user_id=user_id,
-                                device_id=device_id,
-                                status=NotificationStatus.SENT,
-                                sent_at=datetime.now(timezone.utc),
-                            )
-                            success_count += 1
-                        else:
-                            recipient = NotificationRecipient(
-                                notification_id=notification.id,
-                                user_id=user_id,
-                                device_id=device_id,
-                                status=NotificationStatus.FAILED,
-                                error_message=str(response.exception),
-                            )
-                            failed_count += 1
-
-                        db.add(recipient)
-                except Exception as e:
-                    logger.error(f"Batch send failed: {e}")
-                    # Mark all in batch as failed
-                    for message in batch:
-                        user_id, device_id = device_map[message.token]
-                        recipient = NotificationRecipient(
-                            notification_id=notification.id,
-                            user_id=user_id,
-                            device_id=device_id,
-                            status=NotificationStatus.FAILED,
-                            error_message=str(e),
-                        )
-                        db.add(recipient)
-                        failed_count += 1
-
-        # Update notification stats
-        notification.sent_count = success_count
-        notification.failed_count = failed_count + len(users_without_devices)
         notification.sent_at = datetime.now(timezone.utc)
         db.commit()
 
         result["success"] = success_count > 0
         result["sent_count"] = success_count
-        result["failed_count"] = failed_count + len(users_without_devices)
+        result["failed_count"] = failed_count + undeliverable
 
-        if users_without_devices:
+        if no_device:
             result["message"] = (
-                f"성공: {success_count}명, 실패: {failed_count}명, 기기 없음: {len(users_without_devices)}명"
+                f"성공: {success_count}명, 실패: {failed_count}명, 기기 없음: {len(no_device)}명"
             )
         else:
             result["message"] = f"성공: {success_count}명, 실패: {failed_count}명"
@@ -449,29 +353,11 @@ class PushNotificationService:
         platform: str = "android",
     ) -> messaging.Message:
         """FCM 메시지 생성"""
-        notification = messaging.Notification(title=title, body=body, image=image_url)
-
-        # Platform specific configuration
-        android_config = None
-        apns_config = None
-
-        if platform == "android":
-            android_config = messaging.AndroidConfig(
-                priority="high",
-                notification=messaging.AndroidNotification(
-                    click_action="FLUTTER_NOTIFICATION_CLICK",
-                    channel_id="default_channel",
-                ),
-            )
-        else:  # iOS
-            apns_config = messaging.APNSConfig(
-                payload=messaging.APNSPayload(
-                    aps=messaging.Aps(badge=1, sound="default")
-                )
-            )
-
+        android_config, apns_config = platform_config(platform)
         return messaging.Message(
-            notification=notification,
+            notification=messaging.Notification(
+                title=title, body=body, image=image_url
+            ),
             data=data or {},
             token=device_token,
             android=android_config,
@@ -492,15 +378,9 @@ class PushNotificationService:
             device_token, title, body, data, image_url, platform
         )
 
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(executor, messaging.send, message)
 
-    @staticmethod
-    async def _send_batch_fcm(messages: List[messaging.Message]):
-        """배치 FCM 메시지 발송"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(executor, messaging.send_all, messages)
-
     @staticmethod
     def register_device(
         db: Session,
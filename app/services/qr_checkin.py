@@ -0,0 +1,482 @@
+"""
+QR 출석 체크인 고속 경로
+
+예배 시작 직전 몰리는 스캔을 DB 왕복 없이 처리합니다.
+- 교회별 당일 활성 QR 코드 인덱스 (Redis hash, 교회 첫 스캔 시 1회 적재)
+- 중복 체크인 방지: 교회/날짜/예배유형별 Redis set 에 SADD (멱등)
+- 출석 기록은 Redis 대기열에 넣고 CheckInBatcher 가 1초마다 DB 에 일괄 입력
+  (insert_attendance_chunk 의 ON CONFLICT DO NOTHING 으로 재시도해도 안전)
+- 해석할 수 없는 항목, 거부된 행(교인/교회 불일치), 여러 번 입력에 실패한 항목은
+  dead-letter 목록(DEAD_LETTER_KEY)으로 옮겨 나머지 대기열을 막지 않음
+- 수기/일괄 입력 출석은 commit 후 체크인 set 에 반영 (queue_checked_in),
+  비활성화된 코드는 인덱스에서 제거 (drop_codes)
+
+스캔 1건 = Lua 스크립트 1회 (인덱스 조회 + 중복 확인 + 대기열 추가).
+Redis 를 쓸 수 없거나 교회 ID 가 없는 코드는 호출자가 기존 동기 경로로 처리합니다.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.db.session import SessionLocal
+from app.models.attendance import Attendance
+from app.models.member import Member
+from app.models.qr_code import QRCode
+
+logger = logging.getLogger(__name__)
+
+INDEX_TTL = 36 * 3600  # 당일 인덱스/체크인 set 보관 시간 (초)
+LOADED_MARKER = "__loaded__"
+SEEDED_MARKER = "__seeded__"
+PENDING_KEY = "qr_checkin:pending"
+DEAD_LETTER_KEY = "qr_checkin:dead_letter"  # 항목 JSON + error (+ attempts)
+LOAD_WAIT_ATTEMPTS = 50  # 다른 요청이 인덱스를 적재 중일 때 재확인 횟수
+LOAD_WAIT_INTERVAL = 0.05  # 초
+MARK_CHUNK_SIZE = 1000  # SADD 1회당 member_id 수 (Lua unpack 한도 이내)
+
+# KEYS: 인덱스 hash, 체크인 set, 대기열 / ARGV: code, now(epoch), service_date, service_type
+_CHECK_IN_SCRIPT = """
+if redis.call("exists", KEYS[1]) == 0 then
+    return {"no_index"}
+end
+local entry = redis.call("hget", KEYS[1], ARGV[1])
+if not entry then
+    return {"invalid"}
+end
+local info = cjson.decode(entry)
+if info.expires_at ~= cjson.null and info.expires_at < tonumber(ARGV[2]) then
+    return {"expired", entry}
+end
+if redis.call("exists", KEYS[2]) == 0 then
+    return {"no_seen", entry}
+end
+if redis.call("sadd", KEYS[2], tostring(info.member_id)) == 0 then
+    return {"already_marked", entry}
+end
+redis.call("rpush", KEYS[3], cjson.encode({
+    church_id = info.church_id,
+    member_id = info.member_id,
+    service_date = ARGV[3],
+    service_type = ARGV[4],
+    check_in_time = tonumber(ARGV[2]),
+}))
+return {"queued", entry}
+"""
+
+
+# KEYS: 체크인 set / ARGV: member_id 목록
+# set 이 이미 채워진 경우에만 추가 (없으면 첫 스캔 때 seed_checked_in 이 DB 에서 채움)
+_MARK_SCRIPT = """
+if redis.call("exists", KEYS[1]) == 1 then
+    redis.call("sadd", KEYS[1], unpack(ARGV))
+end
+return 0
+"""
+
+
+def church_id_from_code(code: str) -> Optional[int]:
+    """generate_qr_code 가 만든 '{church_id}:{member_id}:{hex}' 형식에서 교회 ID 추출"""
+    prefix = code.split(":", 1)[0]
+    return int(prefix) if prefix.isdigit() else None
+
+
+def _index_key(church_id: int, day: date) -> str:
+    return f"qr_checkin:codes:{church_id}:{day.isoformat()}"
+
+
+def _seen_key(church_id: int, day: date, service_type: str) -> str:
+    return f"qr_checkin:seen:{church_id}:{day.isoformat()}:{service_type}"
+
+
+def _entry(qr_code: QRCode, member: Member) -> str:
+    expires_at = qr_code.expires_at
+    if expires_at is not None and expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return json.dumps(
+        {
+            "church_id": qr_code.church_id,
+            "member_id": qr_code.member_id,
+            "expires_at": expires_at.timestamp() if expires_at else None,
+            "name": member.name,
+            "profile_photo_url": member.profile_photo_url,
+        },
+        ensure_ascii=False,
+    )
+
+
+class QRCheckIn:
+    def __init__(self, redis=redis_client):
+        self.redis = redis
+        self._script = None
+        self._mark_script = None
+
+    @property
+    def available(self) -> bool:
+        return settings.QR_CHECKIN_WRITE_BEHIND and self.redis.connected
+
+    def _run_script(self, keys: List[str], args: List[Any]):
+        if self._script is None:
+            self._script = self.redis.client.register_script(_CHECK_IN_SCRIPT)
+        return self._script(keys=keys, args=args)
+
+    def load_index(self, db: Session, church_id: int, day: date) -> int:
+        """교회의 활성 QR 코드 전체를 당일 인덱스로 적재 (쿼리 1회)"""
+        rows = (
+            db.query(QRCode, Member)
+            .join(Member, Member.id == QRCode.member_id)
+            .filter(QRCode.church_id == church_id, QRCode.is_active == True)
+            .all()
+        )
+        mapping = {qr_code.code: _entry(qr_code, member) for qr_code, member in rows}
+        mapping[LOADED_MARKER] = "1"
+
+        key = _index_key(church_id, day)
+        pipe = self.redis.client.pipeline()
+        pipe.hset(key, mapping=mapping)
+        pipe.expire(key, INDEX_TTL)
+        pipe.execute()
+        return len(rows)
+
+    def seed_checked_in(
+        self, db: Session, church_id: int, day: date, service_type: str
+    ) -> int:
+        """이미 DB 에 있는 당일 출석을 체크인 set 에 반영 (수기 입력분 중복 방지)"""
+        member_ids = [
+            member_id
+            for (member_id,) in db.query(Attendance.member_id).filter(
+                Attendance.church_id == church_id,
+                Attendance.service_date == day,
+                Attendance.service_type == service_type,
+            )
+        ]
+        key = _seen_key(church_id, day, service_type)
+        pipe = self.redis.client.pipeline()
+        pipe.sadd(key, SEEDED_MARKER, *member_ids)
+        pipe.expire(key, INDEX_TTL)
+        pipe.execute()
+        return len(member_ids)
+
+    def update_code(self, qr_code: QRCode, member: Member, replaced: List[str]):
+        """QR 재발급 시 오늘 인덱스가 이미 적재돼 있으면 새 코드 추가, 이전 코드 제거"""
+        if not self.redis.connected:
+            return
+        key = _index_key(qr_code.church_id, datetime.now(timezone.utc).date())
+        try:
+            if not self.redis.client.exists(key):
+                return
+            pipe = self.redis.client.pipeline()
+            if replaced:
+                pipe.hdel(key, *replaced)
+            pipe.hset(key, qr_code.code, _entry(qr_code, member))
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to update QR check-in index: {e}")
+
+    def drop_codes(self, church_id: int, codes: List[str]):
+        """비활성화된 코드를 오늘 인덱스에서 제거 (commit 후 호출)"""
+        if not self.redis.connected or not codes:
+            return
+        key = _index_key(church_id, datetime.now(timezone.utc).date())
+        try:
+            self.redis.client.hdel(key, *codes)
+        except Exception as e:
+            logger.warning(f"Failed to update QR check-in index: {e}")
+
+    def mark_checked_in(self, rows: Iterable[Any]):
+        """
+        출석 행(church_id, member_id, service_date, service_type)을 체크인 set 에 추가
+
+        이미 채워진 set 에만 추가하므로 지난 날짜나 아직 스캔이 없는 예배는 그대로 둡니다.
+        """
+        if not self.redis.connected:
+            return
+        by_key = defaultdict(list)
+        for row in rows:
+            key = _seen_key(row.church_id, row.service_date, row.service_type)
+            by_key[key].append(row.member_id)
+        if not by_key:
+            return
+        try:
+            if self._mark_script is None:
+                self._mark_script = self.redis.client.register_script(_MARK_SCRIPT)
+            pipe = self.redis.client.pipeline(transaction=False)
+            for key, member_ids in by_key.items():
+                for start in range(0, len(member_ids), MARK_CHUNK_SIZE):
+                    chunk = member_ids[start : start + MARK_CHUNK_SIZE]
+                    self._mark_script(keys=[key], args=chunk, client=pipe)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to update QR check-in set: {e}")
+
+    def unmark_checked_in(self, rows: Iterable[Any]):
+        """삭제/변경된 출석을 체크인 set 에서 제거 (다시 QR 체크인 가능)"""
+        if not self.redis.connected:
+            return
+        by_key = defaultdict(list)
+        for row in rows:
+            key = _seen_key(row.church_id, row.service_date, row.service_type)
+            by_key[key].append(row.member_id)
+        if not by_key:
+            return
+        try:
+            pipe = self.redis.client.pipeline(transaction=False)
+            for key, member_ids in by_key.items():
+                pipe.srem(key, *member_ids)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to update QR check-in set: {e}")
+
+    def check_in(
+        self, db: Session, code: str, service_type: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        고속 경로 체크인
+
+        Returns:
+            {"status": queued|already_marked|invalid|expired, "entry": 인덱스 항목}
+            고속 경로를 쓸 수 없으면 None (호출자가 동기 경로로 처리)
+        """
+        church_id = church_id_from_code(code)
+        if church_id is None or not self.available:
+            return None
+
+        now = datetime.now(timezone.utc)
+        day = now.date()
+        keys = [
+            _index_key(church_id, day),
+            _seen_key(church_id, day, service_type),
+            PENDING_KEY,
+        ]
+        args = [code, now.timestamp(), day.isoformat(), service_type]
+
+        try:
+            # 인덱스/체크인 set 이 없으면 적재 후 재시도 (교회·예배별 당일 최초 1회).
+            # 동시에 몰린 첫 스캔들은 락을 잡은 하나만 적재하고 나머지는 잠시 대기
+            for _ in range(LOAD_WAIT_ATTEMPTS):
+                result = self._run_script(keys, args)
+                status = result[0]
+                if status == "no_index":
+                    self._load_once(keys[0], self.load_index, db, church_id, day)
+                elif status == "no_seen":
+                    self._load_once(
+                        keys[1], self.seed_checked_in, db, church_id, day, service_type
+                    )
+                else:
+                    entry = json.loads(result[1]) if len(result) > 1 else None
+                    return {"status": status, "entry": entry}
+        except Exception as e:
+            logger.warning(f"QR fast path unavailable, falling back to database: {e}")
+        return None
+
+    def _load_once(self, key: str, loader, *args):
+        token = self.redis.acquire_lock(key, ttl=30)
+        if token is None:
+            time.sleep(LOAD_WAIT_INTERVAL)
+            return
+        try:
+            loader(*args)
+        finally:
+            self.redis.release_lock(key, token)
+
+    def pending_count(self) -> int:
+        return self.redis.client.llen(PENDING_KEY) if self.redis.connected else 0
+
+
+class CheckInBatcher:
+    """대기열의 체크인을 주기적으로 꺼내 출석 테이블에 일괄 입력 (write-behind)"""
+
+    def __init__(
+        self, checkin: QRCheckIn, interval: float = None, batch_size: int = None
+    ):
+        self.checkin = checkin
+        self.interval = interval or settings.QR_CHECKIN_FLUSH_INTERVAL
+        self.batch_size = batch_size or settings.QR_CHECKIN_BATCH_SIZE
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None or not self.checkin.available:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="qr-checkin-batcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+        try:
+            while self.flush() >= self.batch_size:
+                pass  # 종료 전 남은 체크인 반영
+        except Exception as e:
+            logger.error(f"QR check-in flush on shutdown failed: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                while self.flush() >= self.batch_size:
+                    pass  # 밀린 대기열은 바로 이어서 처리
+            except Exception as e:
+                logger.error(f"QR check-in flush failed: {e}")
+
+    def _pop(self) -> List[str]:
+        # LRANGE + LTRIM 을 MULTI 로 묶어 여러 워커가 같은 항목을 가져가지 않게 함
+        pipe = self.checkin.redis.client.pipeline(transaction=True)
+        pipe.lrange(PENDING_KEY, 0, self.batch_size - 1)
+        pipe.ltrim(PENDING_KEY, self.batch_size, -1)
+        items, _ = pipe.execute()
+        return items
+
+    def _dead_letter(self, entries: List[str]):
+        if entries:
+            self.checkin.redis.client.rpush(DEAD_LETTER_KEY, *entries)
+
+    def flush(self) -> int:
+        """대기열에서 최대 batch_size 건을 DB 에 입력하고 꺼낸 건수 반환"""
+        from app.services.attendance_ingest import insert_attendance_chunk
+        from app.services.church_data_cache import invalidate_attendance_cache
+
+        if not self.checkin.redis.connected:
+            return 0
+        items = self._pop()
+        if not items:
+            return 0
+
+        records, rows, unparseable = [], [], []
+        for item in items:
+            try:
+                record = json.loads(item)
+                row = {
+                    "church_id": int(record["church_id"]),
+                    "member_id": int(record["member_id"]),
+                    "service_date": date.fromisoformat(record["service_date"]),
+                    "service_type": record["service_type"],
+                    "present": True,
+                    "check_in_method": "qr_code",
+                    "check_in_time": datetime.fromtimestamp(
+                        record["check_in_time"], tz=timezone.utc
+                    ),
+                }
+            except (KeyError, TypeError, ValueError) as e:
+                unparseable.append(json.dumps({"raw": item, "error": repr(e)}))
+                continue
+            records.append(record)
+            rows.append(row)
+        self._dead_letter(unparseable)
+        if not rows:
+            logger.error(f"Moved {len(unparseable)} unparseable QR check-ins")
+            return len(items)
+
+        db = SessionLocal()
+        try:
+            result = insert_attendance_chunk(db, rows)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            # 실패한 항목은 시도 횟수를 올려 대기열 앞에 되돌리고 (ON CONFLICT 로
+            # 재입력해도 중복 없음), 한도에 닿은 항목은 dead-letter 로 옮겨 뒤 항목을 막지 않음
+            retried, dead = [], []
+            for record in records:
+                attempts = record.get("attempts", 0) + 1
+                if attempts < settings.QR_CHECKIN_MAX_FLUSH_ATTEMPTS:
+                    retried.append(json.dumps({**record, "attempts": attempts}))
+                else:
+                    dead.append(
+                        json.dumps({**record, "attempts": attempts, "error": repr(e)})
+                    )
+            if retried:
+                self.checkin.redis.client.lpush(PENDING_KEY, *reversed(retried))
+            self._dead_letter(dead)
+            if dead:
+                logger.error(
+                    f"Moved {len(dead)} QR check-ins to {DEAD_LETTER_KEY} after "
+                    f"{settings.QR_CHECKIN_MAX_FLUSH_ATTEMPTS} failed flushes: {e}"
+                )
+            if retried:
+                raise
+            return len(items)
+        finally:
+            db.close()
+
+        rejected_ids = {id(row) for row in result["rejected_rows"]}
+        self._dead_letter(
+            [
+                json.dumps({**record, "error": "rejected"})
+                for record, row in zip(records, rows)
+                if id(row) in rejected_ids
+            ]
+        )
+
+        created_by_church = defaultdict(int)
+        for row in result["created"]:
+            created_by_church[row.church_id] += 1
+        for church_id in created_by_church:
+            invalidate_attendance_cache(church_id)
+        logger.info(
+            f"Flushed {len(result['created'])} QR check-ins "
+            f"({result['skipped']} duplicates, {result['rejected']} rejected, "
+            f"{len(unparseable)} unparseable)"
+        )
+        return len(items)
+
+
+qr_checkin = QRCheckIn()
+checkin_batcher = CheckInBatcher(qr_checkin)
+
+
+# 세션에서 입력/삭제된 출석을 모았다가 commit 후 체크인 set 에 반영 (rollback 되면 버림)
+_MARKS_KEY = "qr_checkin_marks"
+
+
+class CheckInMark(NamedTuple):
+    church_id: int
+    member_id: int
+    service_date: date
+    service_type: str
+
+
+def queue_checked_in(db: Session, rows: Iterable[Any], removed: bool = False):
+    """
+    출석 입력(removed=True 면 삭제)을 commit 후 체크인 set 에 반영하도록 예약
+
+    commit 전에 반영하면 rollback 된 출석 때문에 QR 체크인이 already_marked 로 막힐 수 있음
+    """
+    if not qr_checkin.redis.connected:
+        return
+    marks = [
+        CheckInMark(row.church_id, row.member_id, row.service_date, row.service_type)
+        for row in rows
+    ]
+    if not marks:
+        return
+    pending = db.info.setdefault(_MARKS_KEY, {"added": [], "removed": []})
+    pending["removed" if removed else "added"].extend(marks)
+    if not event.contains(Session, "after_commit", _apply_marks):
+        event.listen(Session, "after_commit", _apply_marks)
+        event.listen(Session, "after_rollback", _discard_marks)
+
+
+def _apply_marks(session: Session):
+    pending = session.info.pop(_MARKS_KEY, None)
+    if not pending:
+        return
+    qr_checkin.unmark_checked_in(pending["removed"])
+    qr_checkin.mark_checked_in(pending["added"])
+
+
+def _discard_marks(session: Session):
+    session.info.pop(_MARKS_KEY, None)
@@ -38,7 +38,8 @@ class SmartAssistantService:
         church_id: int,
         user_id: int,
         db: Session,
-        gpt_config: Dict = None
+        gpt_config: Dict = None,
+        openai_service: Optional[OpenAIService] = None
     ) -> Dict:
         """
         사용자 질문을 처리하여 데이터 기반 AI 응답 생성
@@ -49,6 +50,7 @@ class SmartAssistantService:
             user_id: 사용자 ID
             db: 데이터베이스 세션
             gpt_config: GPT 모델 설정
+            openai_service: 교회별 API 키로 생성한 서비스 (없으면 기본 서비스 사용)
             
         Returns:
             AI 응답과 메타데이터
@@ -75,7 +77,7 @@ class SmartAssistantService:
                 "temperature": 0.3
             }
             
-            ai_response = await self.openai_service.generate_response(
+            ai_response = await (openai_service or self.openai_service).generate_response(
                 messages=[{"role": "user", "content": user_message}],
                 system_prompt=system_prompt,
                 **gpt_config
@@ -0,0 +1,49 @@
+from celery import shared_task
+from celery.utils.log import get_task_logger
+from typing import Optional
+
+from app.db.session import SessionLocal
+from app.models.church import Church
+from app.services.attendance_rollup import (
+    check_attendance_rollups,
+    rebuild_attendance_rollups,
+)
+from app.services.church_data_cache import invalidate_attendance_cache
+
+logger = get_task_logger(__name__)
+
+
+@shared_task
+def backfill_attendance_rollups(
+    church_id: Optional[int] = None, check_only: bool = False
+):
+    """Rebuild attendance rollups from raw attendances, or only report mismatches"""
+    db = SessionLocal()
+    try:
+        if check_only:
+            mismatches = check_attendance_rollups(db, church_id)
+            if mismatches:
+                logger.warning(
+                    f"{len(mismatches)} attendance rollup buckets "
+                    "differ from attendances"
+                )
+            return {"mismatches": len(mismatches), "samples": mismatches[:20]}
+
+        rows = rebuild_attendance_rollups(db, church_id)
+        db.commit()
+
+        church_ids = (
+            [church_id] if church_id else [cid for (cid,) in db.query(Church.id)]
+        )
+        for cid in church_ids:
+            invalidate_attendance_cache(cid)
+
+        logger.info(f"Rebuilt {rows} attendance rollup rows")
+        return {"rows": rows}
+
+    except Exception as e:
+        logger.error(f"Error backfilling attendance rollups: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,82 @@
+from celery import shared_task
+from celery.utils.log import get_task_logger
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from app.db.session import SessionLocal
+from app.models.church import Church
+from app.models.ai_agent import AIAgent
+from app.models.qr_code import QRCode
+from app.services.church_data_cache import cache_manager
+from app.services.qr_checkin import qr_checkin
+
+logger = get_task_logger(__name__)
+
+
+@shared_task
+def prewarm_church_data_cache(data_types: Optional[List[str]] = None):
+    """Refresh church data caches for churches using AI agents ahead of peak traffic"""
+    if not cache_manager.redis.connected:
+        logger.warning("Skipping cache pre-warm: Redis not available")
+        return {"churches": 0, "entries": 0}
+
+    db = SessionLocal()
+    try:
+        church_ids = [
+            church_id
+            for (church_id,) in db.query(Church.id)
+            .filter(
+                Church.is_active == True,
+                db.query(AIAgent.id)
+                .filter(AIAgent.church_id == Church.id, AIAgent.is_active == True)
+                .exists(),
+            )
+            .all()
+        ]
+
+        warmed_entries = 0
+        for church_id in church_ids:
+            warmed_entries += len(cache_manager.warm_cache(db, church_id, data_types))
+
+        logger.info(
+            f"Pre-warmed {warmed_entries} cache entries for {len(church_ids)} churches"
+        )
+        return {"churches": len(church_ids), "entries": warmed_entries}
+
+    except Exception as e:
+        logger.error(f"Error pre-warming church data cache: {e}")
+        raise
+    finally:
+        db.close()
+
+
+@shared_task
+def prewarm_qr_checkin_index():
+    """Load today's QR check-in code index for every church with active codes"""
+    if not qr_checkin.available:
+        logger.warning("Skipping QR check-in index pre-warm: fast path not available")
+        return {"churches": 0, "codes": 0}
+
+    db = SessionLocal()
+    try:
+        # Check-ins are keyed by the UTC service date, same as verify_qr_code
+        today = datetime.now(timezone.utc).date()
+        church_ids = [
+            church_id
+            for (church_id,) in db.query(QRCode.church_id)
+            .filter(QRCode.is_active == True)
+            .distinct()
+        ]
+
+        loaded_codes = 0
+        for church_id in church_ids:
+            loaded_codes += qr_checkin.load_index(db, church_id, today)
+
+        logger.info(f"Loaded {loaded_codes} QR codes for {len(church_ids)} churches")
+        return {"churches": len(church_ids), "codes": loaded_codes}
+
+    except Exception as e:
+        logger.error(f"Error pre-warming QR check-in index: {e}")
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,38 @@
+from celery import shared_task
+from celery.utils.log import get_task_logger
+from typing import Any, List
+
+from app.db.session import SessionLocal
+from app.services.content_index import build_church_index, update_church_documents
+
+logger = get_task_logger(__name__)
+
+
+@shared_task
+def build_content_index(church_id: int):
+    """Build a church's content index if it does not exist yet (chat uses full lists until then)"""
+    db = SessionLocal()
+    try:
+        built = build_church_index(db, church_id)
+        if built:
+            logger.info(f"Built content index for church {church_id}")
+        return {"built": built}
+    except Exception as e:
+        logger.error(f"Error building content index for church {church_id}: {e}")
+        raise
+    finally:
+        db.close()
+
+
+@shared_task(bind=True, max_retries=3)
+def update_content_index(self, church_id: int, keys: List[List[Any]]):
+    """Re-read committed document changes and apply them to the church's content index"""
+    db = SessionLocal()
+    try:
+        counts = update_church_documents(db, church_id, [tuple(key) for key in keys])
+        return counts
+    except Exception as e:
+        logger.error(f"Error updating content index for church {church_id}: {e}")
+        raise self.retry(exc=e, countdown=30 * (2**self.request.retries))
+    finally:
+        db.close()
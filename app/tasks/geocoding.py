@@ -0,0 +1,32 @@
+from celery import shared_task
+from celery.utils.log import get_task_logger
+from typing import Optional
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.geocoding import backfill_missing_coordinates
+
+logger = get_task_logger(__name__)
+
+
+@shared_task
+def backfill_coordinates(
+    church_id: Optional[int] = None, batch_size: Optional[int] = None
+):
+    """Geocode members and pastoral care requests with an address but no coordinates"""
+    if not settings.NAVER_MAPS_CLIENT_ID or not settings.NAVER_MAPS_CLIENT_SECRET:
+        logger.warning("Skipping coordinate backfill: Naver Maps API is not configured")
+        return {}
+
+    db = SessionLocal()
+    try:
+        summary = backfill_missing_coordinates(db, church_id, batch_size)
+        logger.info(f"Coordinate backfill finished: {summary}")
+        return summary
+
+    except Exception as e:
+        logger.error(f"Error backfilling coordinates: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -1,11 +1,11 @@
-from celery import shared_task
+from celery import chord, shared_task
 from celery.utils.log import get_task_logger
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import asyncio
+import time
 
 from app.db.session import SessionLocal
-from app.models.user import User
 from app.models.member import Member
 from app.models.worship_schedule import WorshipService
 from app.models.push_notification import (
@@ -16,89 +16,152 @@ from app.models.push_notification import (
     NotificationRecipient,
 )
 from app.services.push_notification import PushNotificationService
+from app.services.push_fanout import (
+    claim_dispatch,
+    deliver_shard,
+    notification_payload,
+    prepare_fanout,
+)
+from app.services import notification_scheduler
 from app.core.redis import redis_client
 
 logger = get_task_logger(__name__)
 
+QUEUE_BATCH_SIZE = 100  # notifications popped from the Redis queue per round trip
+QUEUE_DRAIN_LIMIT = 5000  # per run; the rest is picked up on the next beat
+
 
 @shared_task(bind=True, max_retries=3)
 def send_push_notification_task(self, notification_id: int):
-    """Send push notification with retry logic"""
+    """Resolve recipients once and fan the devices out to parallel shard tasks"""
     db = SessionLocal()
     try:
-        notification = (
-            db.query(PushNotification)
-            .filter(PushNotification.id == notification_id)
-            .first()
-        )
+        try:
+            notification = (
+                db.query(PushNotification)
+                .filter(PushNotification.id == notification_id)
+                .first()
+            )
 
-        if not notification:
-            logger.error(f"Notification {notification_id} not found")
-            return
+            if not notification:
+                logger.error(f"Notification {notification_id} not found")
+                return
 
-        # Use Redis to track processing status
-        redis_client.set_notification_status(notification_id, "processing")
+            if (
+                notification.cancelled_at is not None
+                or notification.sent_at is not None
+            ):
+                logger.info(
+                    f"Notification {notification_id} already cancelled or sent, skipping"
+                )
+                return
+
+            # Scheduled for later: hand it to the scheduler instead of sending now
+            if not notification_scheduler.is_due(notification):
+                if notification_scheduler.schedule_notification(notification):
+                    redis_client.set_notification_status(notification_id, "scheduled")
+                    return
+                logger.warning(
+                    f"Notification {notification_id} could not be scheduled, sending now"
+                )
 
-        # Get target users
-        if notification.target_type == "all":
-            user_ids = (
-                db.query(User.id)
-                .filter(
-                    User.church_id == notification.church_id, User.is_active == True
+            # Only one run may fan out; a redelivered or retried task stops here
+            if not claim_dispatch(db, notification_id):
+                logger.info(
+                    f"Notification {notification_id} already dispatched, skipping"
                 )
-                .all()
-            )
-            user_ids = [uid[0] for uid in user_ids]
-        else:
-            user_ids = notification.target_users
+                return
 
-        # Process in batches using Redis
-        batch_id = f"notification_{notification_id}"
-        redis_client.add_batch_notification(batch_id, user_ids)
+            # Use Redis to track processing status
+            redis_client.set_notification_status(notification_id, "processing")
 
-        total_sent = 0
-        total_failed = 0
+            # Commits the dispatch claim together with the undeliverable recipients
+            shards = prepare_fanout(db, notification)
+            payload = notification_payload(notification)
+            church_id = notification.church_id
 
-        while redis_client.get_batch_size(batch_id) > 0:
-            batch_users = redis_client.get_batch_users(batch_id, count=50)
+        except Exception as e:
+            # Nothing has been committed yet, so retrying is safe
+            logger.error(f"Error sending notification {notification_id}: {e}")
+            db.rollback()
+            redis_client.set_notification_status(notification_id, "failed")
 
-            # Send notifications asynchronously
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            # Retry with exponential backoff
+            raise self.retry(exc=e, countdown=60 * (2**self.request.retries))
 
-            result = loop.run_until_complete(
-                PushNotificationService.send_to_multiple_users(
-                    db=db,
-                    user_ids=batch_users,
-                    title=notification.title,
-                    body=notification.body,
-                    data=notification.data,
-                    image_url=notification.image_url,
-                    notification_type=notification.type,
-                    church_id=notification.church_id,
+        # From here on the fan-out is recorded; retrying would duplicate recipients
+        try:
+            if not shards:
+                finalize_push_notification([], notification_id)
+                return
+
+            chord(
+                send_push_notification_shard.s(
+                    notification_id, payload, shard, church_id
                 )
+                for shard in shards
+            )(finalize_push_notification.s(notification_id))
+            logger.info(
+                f"Notification {notification_id}: dispatched {len(shards)} shards "
+                f"for {sum(len(shard) for shard in shards)} devices"
+            )
+        except Exception as e:
+            logger.error(
+                f"Error dispatching shards of notification {notification_id}: {e}"
             )
+            redis_client.set_notification_status(notification_id, "failed")
+    finally:
+        db.close()
+
+
+@shared_task
+def send_push_notification_shard(
+    notification_id: int,
+    payload: Dict[str, Any],
+    devices: List[List[Any]],
+    church_id: Optional[int] = None,
+):
+    """Send one FCM-sized shard, add its counts and deactivate dead tokens"""
+    db = SessionLocal()
+    try:
+        return deliver_shard(
+            db,
+            notification_id,
+            payload,
+            [tuple(device) for device in devices],
+            church_id,
+        )
+    except Exception as e:
+        logger.error(f"Error sending shard of notification {notification_id}: {e}")
+        db.rollback()
+        return {"sent": 0, "failed": 0, "error": str(e)}
+    finally:
+        db.close()
+
 
-            total_sent += result.get("success", 0)
-            total_failed += result.get("failed", 0)
+@shared_task
+def finalize_push_notification(
+    shard_results: List[Dict[str, Any]], notification_id: int
+):
+    """Mark the notification as sent once every shard has reported back"""
+    db = SessionLocal()
+    try:
+        notification = (
+            db.query(PushNotification)
+            .filter(PushNotification.id == notification_id)
+            .first()
+        )
+        if not notification:
+            return
 
-        # Update notification status
-        notification.sent_count = total_sent
-        notification.failed_count = total_failed
         notification.sent_at = datetime.utcnow()
         db.commit()
 
         redis_client.set_notification_status(notification_id, "completed")
         logger.info(
-            f"Notification {notification_id} sent: {total_sent} success, {total_failed} failed"
+            f"Notification {notification_id} sent: {notification.sent_count} success, "
+            f"{notification.failed_count} failed ({len(shard_results)} shards)"
         )
-
-    except Exception as e:
-        logger.error(f"Error sending notification {notification_id}: {e}")
-        redis_client.set_notification_status(notification_id, "failed")
-
-        # Retry with exponential backoff
-        raise self.retry(exc=e, countdown=60 * (2**self.request.retries))
     finally:
         db.close()
 
@@ -136,7 +199,7 @@ def send_worship_reminders():
                 )
 
             title = "주일예배 안내"
-            body = f"오늘의 예배 시간입니다.\n" + "\n".join(service_times)
+            body = "오늘의 예배 시간입니다.\n" + "\n".join(service_times)
 
             # Create notification
             notification = PushNotification(
@@ -214,28 +277,68 @@ def send_birthday_notifications():
 
 @shared_task
 def process_notification_queue():
-    """Process notifications from Redis queue"""
-    max_processing = 10
+    """Drain the Redis notification queue in batches"""
     processed = 0
 
-    while processed < max_processing:
-        notification_data = redis_client.get_from_notification_queue()
-        if not notification_data:
+    while processed < QUEUE_DRAIN_LIMIT:
+        batch = redis_client.get_from_notification_queue_batch(QUEUE_BATCH_SIZE)
+        if not batch:
             break
 
-        try:
-            # Process notification
-            notification_id = notification_data.get("notification_id")
-            if notification_id:
-                send_push_notification_task.delay(notification_id)
-                processed += 1
-        except Exception as e:
-            logger.error(f"Error processing queued notification: {e}")
+        for notification_data in batch:
+            try:
+                # Scheduled notifications are rerouted to the scheduler by the send task
+                notification_id = notification_data.get("notification_id")
+                if notification_id:
+                    send_push_notification_task.delay(notification_id)
+                    processed += 1
+            except Exception as e:
+                logger.error(f"Error processing queued notification: {e}")
 
     if processed > 0:
         logger.info(f"Processed {processed} notifications from queue")
 
 
+@shared_task
+def dispatch_scheduled_notifications():
+    """Fan out scheduled notifications whose send time has come"""
+    dispatched = 0
+
+    for _ in range(notification_scheduler.MAX_BATCHES_PER_RUN):
+        notification_ids = notification_scheduler.pop_due_notification_ids()
+        if not notification_ids:
+            break
+
+        for index, notification_id in enumerate(notification_ids):
+            try:
+                send_push_notification_task.delay(notification_id)
+            except Exception as e:
+                # Put the ids we could not hand off back so the next run retries them
+                logger.error(
+                    f"Error dispatching scheduled notification {notification_id}: {e}"
+                )
+                for remaining_id in notification_ids[index:]:
+                    redis_client.schedule_notification(remaining_id, time.time())
+                return {"dispatched": dispatched, "error": str(e)}
+            dispatched += 1
+
+    if dispatched > 0:
+        logger.info(f"Dispatched {dispatched} scheduled notifications")
+    return {"dispatched": dispatched}
+
+
+@shared_task
+def restore_notification_schedule():
+    """Re-register future scheduled notifications in case Redis lost the schedule"""
+    db = SessionLocal()
+    try:
+        restored = notification_scheduler.restore_schedule(db)
+        logger.info(f"Restored {restored} scheduled notifications")
+        return {"restored": restored}
+    finally:
+        db.close()
+
+
 @shared_task
 def cleanup_expired_tokens():
     """Clean up expired device tokens"""
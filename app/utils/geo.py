@@ -0,0 +1,33 @@
+"""
+위경도 거리 계산 유틸리티
+"""
+
+import math
+from typing import Tuple
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180  # 위도 1도 ≈ 111.19km
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """두 지점 사이의 대권 거리 (km)"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def longitude_scale(latitude: float) -> float:
+    """해당 위도에서 경도 1도의 길이 / 위도 1도의 길이 (= cos(위도))"""
+    return max(math.cos(math.radians(latitude)), 1e-6)
+
+
+def bounding_box(
+    latitude: float, longitude: float, radius_km: float
+) -> Tuple[float, float, float, float]:
+    """중심에서 radius_km 안의 점을 모두 포함하는 (min_lat, max_lat, min_lon, max_lon)"""
+    dlat = radius_km / KM_PER_DEGREE
+    dlon = dlat / longitude_scale(latitude)
+    return latitude - dlat, latitude + dlat, longitude - dlon, longitude + dlon
@@ -68,6 +68,23 @@ def match_initial_consonants(text: str, pattern: str) -> bool:
     return False
 
 
+# pg_trgm extracts trigrams only from runs of 3+ literal characters, so shorter
+# terms fall back to a prefix match that the btree index can serve
+MIN_CONTAINS_SEARCH_LENGTH = 3
+
+
+def initial_consonants_like_pattern(pattern: str) -> str:
+    """
+    Build an index-servable SQL LIKE pattern over name_initials.
+
+    Short terms match as a prefix ("ㄱㅁ" -> "ㄱㅁ%", idx_members_church_name_initials);
+    3+ characters match contiguously ("ㄱㅁㅅ" -> "%ㄱㅁㅅ%", idx_members_name_initials_trgm).
+    """
+    if len(pattern) < MIN_CONTAINS_SEARCH_LENGTH:
+        return f"{pattern}%"
+    return f"%{pattern}%"
+
+
 def is_korean_initial_consonant(char: str) -> bool:
     """
     Check if character is a Korean initial consonant.
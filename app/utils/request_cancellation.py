@@ -0,0 +1,45 @@
+"""
+클라이언트 연결 종료 감지 유틸리티
+요청한 클라이언트가 끊어지면 진행 중인 작업(예: LLM 호출)을 취소합니다.
+"""
+
+import asyncio
+from typing import Awaitable, TypeVar
+
+from starlette.requests import Request
+
+T = TypeVar("T")
+
+
+class ClientDisconnected(Exception):
+    """응답을 기다리던 클라이언트가 연결을 끊음"""
+
+
+async def cancel_on_disconnect(
+    request: Request, awaitable: Awaitable[T], poll_interval: float = 0.5
+) -> T:
+    """
+    작업을 실행하면서 클라이언트 연결 상태를 주기적으로 확인
+
+    Args:
+        request: 현재 요청 객체
+        awaitable: 실행할 작업 (코루틴)
+        poll_interval: 연결 상태 확인 주기 (초)
+
+    Returns:
+        작업 결과
+
+    Raises:
+        ClientDisconnected: 작업 완료 전에 클라이언트가 연결을 끊은 경우
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
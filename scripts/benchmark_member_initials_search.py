@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+교인 초성 검색 벤치마크
+
+합성 교회(기본 2만 명)에서 초성 검색("ㄱㅁ" 등)을 교회 전체를 불러와
+파이썬으로 거르던 기존 방식과 name_initials 컬럼 LIKE 조회(read_members)로
+비교하고, 결과가 기대값(2글자 이하는 접두어, 3글자 이상은 연속 일치)과 같은지 확인합니다.
+
+SQLite 에서는 조회를 SQL 로 옮긴 효과만 보입니다. 인덱스 사용 여부는 PostgreSQL 에서
+--explain 으로 확인합니다 (마이그레이션과 같은 인덱스를 만들고 실행 계획 출력,
+pg_trgm 이 없는 서버면 trigram 인덱스는 건너뜀).
+
+Usage:
+    python scripts/benchmark_member_initials_search.py --members 20000
+    python scripts/benchmark_member_initials_search.py --database-url $DB_URL --explain
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 설정 로딩에 필요한 값만 채움 (벤치마크 DB 는 --database-url 로 지정)
+for _key, _value in {
+    "SECRET_KEY": "benchmark",
+    "DATABASE_URL": "sqlite://",
+    "SUPABASE_URL": "http://localhost",
+    "SUPABASE_ANON_KEY": "benchmark",
+}.items():
+    os.environ.setdefault(_key, _value)
+
+from sqlalchemy import create_engine, event, insert, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.api.api_v1.endpoints.members import read_members  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.models.church import Church  # noqa: E402
+from app.models.member import Member  # noqa: E402
+from app.utils.korean import (  # noqa: E402
+    MIN_CONTAINS_SEARCH_LENGTH,
+    get_initial_consonants,
+    match_initial_consonants,
+)
+
+SURNAMES = "김이박최정강조윤장임한오서신권황안송류홍"
+GIVEN = "민서지현준우예은도하수영진호성연재희가나다라마바사아자차카타파"
+QUERIES = ["ㄱ", "ㄱㅁ", "ㅇㅈㅎ", "ㅂㅅ", "ㅎㄱㄷ"]
+
+
+def seed_church(db, members: int, seed: int = 7) -> int:
+    rng = random.Random(seed)
+    church = Church(name="벤치마크교회")
+    db.add(church)
+    db.commit()
+
+    rows = []
+    for _ in range(members):
+        name = rng.choice(SURNAMES) + "".join(rng.choices(GIVEN, k=rng.choice([1, 2])))
+        rows.append(
+            {
+                "church_id": church.id,
+                "name": name,
+                "name_initials": get_initial_consonants(name),
+                "status": "active",
+            }
+        )
+    for start in range(0, len(rows), 5000):
+        db.execute(insert(Member), rows[start : start + 5000])
+    db.commit()
+    return church.id
+
+
+def legacy_search(db, church_id: int, pattern: str, skip: int, limit: int) -> list:
+    """변경 전 방식: 교회 교인 전체 로드 후 파이썬 루프로 초성 비교"""
+    members = db.query(Member).filter(Member.church_id == church_id).all()
+    matches = [
+        m for m in members if m.name and match_initial_consonants(m.name, pattern)
+    ]
+    return matches[skip : skip + limit]
+
+
+def expected_ids(db, church_id: int, pattern: str) -> set:
+    """read_members 가 돌려줘야 하는 교인 (2글자 이하는 접두어, 3글자 이상은 연속 일치)"""
+    members = db.query(Member).filter(Member.church_id == church_id).all()
+    if len(pattern) < MIN_CONTAINS_SEARCH_LENGTH:
+        return {
+            m.id for m in members if get_initial_consonants(m.name).startswith(pattern)
+        }
+    return {m.id for m in members if pattern in get_initial_consonants(m.name)}
+
+
+def indexed_search(db, church_id: int, pattern: str, skip: int, limit: int) -> list:
+    user = SimpleNamespace(id=0, email="", church_id=church_id, is_superuser=False)
+    with contextlib.redirect_stdout(io.StringIO()):  # read_members 의 디버그 출력 숨김
+        return read_members(
+            db=db,
+            skip=skip,
+            limit=limit,
+            search=pattern,
+            member_status=None,
+            current_user=user,
+        )
+
+
+def measure(session_factory, fn, church_id: int, pattern: str, runs: int, limit: int):
+    timings = []
+    for _ in range(runs):
+        with session_factory() as db:
+            started = time.perf_counter()
+            fn(db, church_id, pattern, 0, limit)
+            timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def referenced_tables(table) -> list:
+    """table 과 외래 키로 참조하는 테이블 전체 (PostgreSQL 은 참조 대상이 있어야 생성됨)"""
+    tables, stack = set(), [table]
+    while stack:
+        current = stack.pop()
+        if current not in tables:
+            tables.add(current)
+            stack.extend(fk.column.table for fk in current.foreign_keys)
+    return list(tables)
+
+
+def create_search_indexes(engine):
+    """마이그레이션(member_initials_001)과 같은 인덱스"""
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS idx_members_church_name_initials "
+                "ON members (church_id, name_initials varchar_pattern_ops)"
+            )
+        )
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS idx_members_name_initials_trgm "
+                    "ON members USING gin (name_initials gin_trgm_ops)"
+                )
+            )
+    except Exception as e:
+        print(f"pg_trgm unavailable, skipping trigram index: {str(e).splitlines()[0]}")
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE members"))
+
+
+def explain(engine, session_factory, church_id: int, pattern: str, limit: int):
+    """read_members 가 실제로 보내는 페이지 조회의 실행 계획"""
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "name_initials LIKE" in statement and "LIMIT" in statement:
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        with session_factory() as db:
+            indexed_search(db, church_id, pattern, 0, limit)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    statement, parameters = captured[-1]
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql("EXPLAIN " + statement, parameters).scalars().all()
+    print(f"-- {pattern}")
+    for line in plan:
+        print(f"   {line}")
+
+
+def main(args):
+    database_url = args.database_url or "sqlite:///" + os.path.join(
+        tempfile.mkdtemp(), "member_initials.db"
+    )
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine, tables=referenced_tables(Member.__table__))
+    session_factory = sessionmaker(bind=engine)
+
+    with session_factory() as db:
+        church_id = seed_church(db, args.members)
+    print(f"Seeded {args.members} members ({engine.dialect.name})")
+
+    if engine.dialect.name == "postgresql":
+        create_search_indexes(engine)
+
+    print(
+        f"{'query':>8} {'matches':>8} {'legacy ms':>10} "
+        f"{'indexed ms':>11} {'expected':>9}"
+    )
+    for pattern in QUERIES:
+        with session_factory() as db:
+            expected = expected_ids(db, church_id, pattern)
+            indexed_ids = {
+                m.id for m in indexed_search(db, church_id, pattern, 0, args.members)
+            }
+        legacy = measure(
+            session_factory, legacy_search, church_id, pattern, args.runs, args.limit
+        )
+        indexed = measure(
+            session_factory, indexed_search, church_id, pattern, args.runs, args.limit
+        )
+        print(
+            f"{pattern:>8} {len(indexed_ids):>8} {legacy * 1000:>10.1f} "
+            f"{indexed * 1000:>11.1f} {'yes' if expected == indexed_ids else 'NO':>9}"
+        )
+
+    if args.explain:
+        if engine.dialect.name != "postgresql":
+            print("--explain needs a PostgreSQL --database-url")
+            return
+        for pattern in QUERIES:
+            explain(engine, session_factory, church_id, pattern, args.limit)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--members", type=int, default=20000)
+    parser.add_argument("--limit", type=int, default=20, help="페이지 크기")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--database-url", help="기본값: 임시 SQLite 파일")
+    parser.add_argument(
+        "--explain", action="store_true", help="PostgreSQL 실행 계획 출력"
+    )
+    main(parser.parse_args())
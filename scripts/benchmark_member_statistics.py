@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+교인 통계 집계 벤치마크
+
+합성 교회(기본 5만 명)를 만들어 통계 항목마다 따로 조회하던 기존 방식과
+get_enhanced_member_statistics 의 단일 패스 집계(FILTER / GROUPING SETS)를
+쿼리 수와 소요 시간으로 비교하고, 두 결과의 집계값이 같은지 확인합니다.
+
+Usage:
+    python scripts/benchmark_member_statistics.py --members 50000
+    python scripts/benchmark_member_statistics.py --database-url postgresql://...
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 설정 로딩에 필요한 값만 채움 (벤치마크 DB 는 --database-url 로 지정)
+for _key, _value in {
+    "SECRET_KEY": "benchmark",
+    "DATABASE_URL": "sqlite://",
+    "SUPABASE_URL": "http://localhost",
+    "SUPABASE_ANON_KEY": "benchmark",
+}.items():
+    os.environ.setdefault(_key, _value)
+
+from sqlalchemy import case, create_engine, desc, event, func, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.models.church import Church  # noqa: E402
+from app.models.member import Family, Member  # noqa: E402
+from app.services.church_data_context import (
+    get_enhanced_member_statistics,
+)  # noqa: E402
+
+POSITIONS = ["pastor", "elder", "deacon", "member", "youth", "child", None]
+DEPARTMENTS = ["장년부", "청년부", "중고등부", "유년부", "찬양대", None]
+MARITAL = ["single", "married", "divorced", "widowed", None]
+
+
+def seed_church(db, members: int, seed: int = 7) -> int:
+    rng = random.Random(seed)
+    church = Church(name="벤치마크교회")
+    db.add(church)
+    db.commit()
+
+    db.execute(
+        insert(Family),
+        [
+            {"church_id": church.id, "family_name": f"가정{i}"}
+            for i in range(members // 3)
+        ],
+    )
+    today = date.today()
+    rows = []
+    for i in range(members):
+        age = rng.choice([None] + list(range(1, 95)))
+        baptized = rng.random() < 0.4
+        rows.append(
+            {
+                "church_id": church.id,
+                "name": f"교인{i}",
+                "age": age,
+                "gender": rng.choice(["M", "F", None]),
+                "marital_status": rng.choice(MARITAL),
+                "position": rng.choice(POSITIONS),
+                "department": rng.choice(DEPARTMENTS),
+                "district": rng.choice([f"{n}구역" for n in range(1, 41)] + [None]),
+                "baptism_date": (
+                    today - timedelta(days=rng.randint(0, 20000)) if baptized else None
+                ),
+                "baptism_church": "벤치마크교회" if baptized else None,
+                "registration_date": today - timedelta(days=rng.randint(0, 3000)),
+                "status": "active" if rng.random() < 0.9 else "inactive",
+            }
+        )
+    for start in range(0, len(rows), 5000):
+        db.execute(insert(Member), rows[start : start + 5000])
+    db.commit()
+    return church.id
+
+
+def legacy_member_statistics(db, church_id: int) -> dict:
+    """변경 전 방식: 통계 항목마다 개별 쿼리, 세례 교인 전체 로드 후 len()"""
+    active = (Member.church_id == church_id, Member.status == "active")
+    start_of_month = date.today().replace(day=1)
+
+    def grouped(column):
+        return dict(
+            db.query(column, func.count(Member.id))
+            .filter(*active, column.isnot(None))
+            .group_by(column)
+            .all()
+        )
+
+    total = db.query(Member).filter(*active).count()
+    position = dict(
+        db.query(Member.position, func.count(Member.id))
+        .filter(*active)
+        .group_by(Member.position)
+        .all()
+    )
+    new_members = (
+        db.query(Member)
+        .filter(*active, Member.registration_date >= start_of_month)
+        .count()
+    )
+    department = grouped(Member.department)
+    district = grouped(Member.district)
+    buckets = (
+        db.query(
+            *(
+                func.sum(case((Member.age.between(low, high), 1), else_=0))
+                for low, high in ((0, 12), (13, 18), (19, 35), (36, 60), (61, 150))
+            )
+        )
+        .filter(*active, Member.age.isnot(None))
+        .first()
+    )
+    gender = grouped(Member.gender)
+    marital = grouped(Member.marital_status)
+    ages = grouped(Member.age)
+    avg_age = (
+        db.query(func.avg(Member.age)).filter(*active, Member.age.isnot(None)).scalar()
+    )
+    baptized = (
+        db.query(Member)
+        .filter(*active, Member.baptism_date.isnot(None))
+        .order_by(desc(Member.baptism_date))
+        .all()
+    )
+    families = db.query(Family).filter(Family.church_id == church_id).count()
+    return {
+        "total_members": total,
+        "new_members_this_month": new_members,
+        "recent_baptisms": len(baptized),
+        "family_count": families,
+        "average_age": round(float(avg_age), 1) if avg_age else 0,
+        "members_by_position": {k: v for k, v in position.items() if k},
+        "members_by_department": department,
+        "members_by_district": district,
+        "age_demographics": dict(
+            zip(["children", "youth", "young_adult", "adult", "senior"], buckets)
+        ),
+        "detailed_age_distribution": ages,
+        "gender_distribution": gender,
+        "marital_status_distribution": marital,
+        "baptism_details": [m.name for m in baptized[:20]],
+    }
+
+
+def measure(engine, session_factory, fn, church_id: int, runs: int):
+    queries = []
+    listener = lambda *args: queries.append(1)  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    timings, result = [], None
+    try:
+        for _ in range(runs):
+            queries.clear()
+            with session_factory() as db:
+                started = time.perf_counter()
+                result = fn(db, church_id)
+                timings.append(time.perf_counter() - started)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return result, len(queries), statistics.median(timings)
+
+
+def main(args):
+    database_url = args.database_url or "sqlite:///" + os.path.join(
+        tempfile.mkdtemp(), "member_stats.db"
+    )
+    engine = create_engine(database_url)
+    Base.metadata.create_all(
+        engine, tables=[Church.__table__, Family.__table__, Member.__table__]
+    )
+    session_factory = sessionmaker(bind=engine)
+
+    with session_factory() as db:
+        started = time.perf_counter()
+        church_id = seed_church(db, args.members)
+        print(
+            f"Seeded {args.members} members in "
+            f"{time.perf_counter() - started:.1f}s ({engine.dialect.name})"
+        )
+
+    legacy, legacy_queries, legacy_time = measure(
+        engine, session_factory, legacy_member_statistics, church_id, args.runs
+    )
+    current, current_queries, current_time = measure(
+        engine, session_factory, get_enhanced_member_statistics, church_id, args.runs
+    )
+
+    print(f"{'':>12} {'queries':>8} {'median ms':>10}")
+    print(f"{'per-stat':>12} {legacy_queries:>8} {legacy_time * 1000:>10.1f}")
+    print(f"{'single-pass':>12} {current_queries:>8} {current_time * 1000:>10.1f}")
+
+    mismatched = [
+        key
+        for key in legacy
+        if key != "baptism_details" and legacy[key] != current.get(key)
+    ]
+    if [d["member_name"] for d in current["baptism_details"]] != legacy[
+        "baptism_details"
+    ]:
+        mismatched.append("baptism_details")
+    print("results match" if not mismatched else f"MISMATCH: {', '.join(mismatched)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--members", type=int, default=50000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--database-url", help="기본값: 임시 SQLite 파일")
+    main(parser.parse_args())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+심방 요청 위치 검색 벤치마크
+
+합성 교회(기본 10만 건, 수도권 범위에 분포)에서 반경 검색을 교회 전체를 불러와
+파이썬 haversine 루프로 거르던 기존 방식과 bounding box + SQL 정렬 방식
+(find_requests_near)으로 비교하고, 첫 페이지 결과가 같은지 확인합니다.
+
+Usage:
+    python scripts/benchmark_pastoral_location_search.py --requests 100000
+    python scripts/benchmark_pastoral_location_search.py --database-url postgresql://...
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 설정 로딩에 필요한 값만 채움 (벤치마크 DB 는 --database-url 로 지정)
+for _key, _value in {
+    "SECRET_KEY": "benchmark",
+    "DATABASE_URL": "sqlite://",
+    "SUPABASE_URL": "http://localhost",
+    "SUPABASE_ANON_KEY": "benchmark",
+}.items():
+    os.environ.setdefault(_key, _value)
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.models.church import Church  # noqa: E402
+from app.models.pastoral_care import PastoralCareRequest  # noqa: E402
+from app.services.pastoral_care_location import find_requests_near  # noqa: E402
+from app.utils.geo import haversine_km  # noqa: E402
+
+# 수도권 대략 범위 (위도, 경도)
+LAT_RANGE = (37.2, 37.8)
+LON_RANGE = (126.6, 127.4)
+CENTERS = [(37.5665, 126.9780), (37.4979, 127.0276), (37.3947, 127.1112)]
+RADII_KM = [1, 3, 5, 10]
+
+
+def seed_church(db, requests: int, seed: int = 7) -> int:
+    rng = random.Random(seed)
+    church = Church(name="벤치마크교회")
+    db.add(church)
+    db.commit()
+
+    rows = [
+        {
+            "church_id": church.id,
+            "requester_name": f"요청자{i}",
+            "requester_phone": "010-0000-0000",
+            "request_content": "심방 요청",
+            "status": "pending",
+            "latitude": round(rng.uniform(*LAT_RANGE), 6),
+            "longitude": round(rng.uniform(*LON_RANGE), 6),
+        }
+        for i in range(requests)
+    ]
+    for start in range(0, len(rows), 5000):
+        db.execute(insert(PastoralCareRequest), rows[start : start + 5000])
+    db.commit()
+    return church.id
+
+
+def legacy_search(db, church_id, latitude, longitude, radius_km, skip, limit):
+    """변경 전 방식: 좌표가 있는 요청 전체 로드 후 파이썬 haversine 루프"""
+    requests = (
+        db.query(PastoralCareRequest)
+        .filter(
+            PastoralCareRequest.church_id == church_id,
+            PastoralCareRequest.latitude.isnot(None),
+            PastoralCareRequest.longitude.isnot(None),
+        )
+        .all()
+    )
+    nearby = []
+    for request in requests:
+        distance = haversine_km(
+            latitude, longitude, float(request.latitude), float(request.longitude)
+        )
+        if distance <= radius_km:
+            nearby.append((request, distance))
+    nearby.sort(key=lambda pair: pair[1])
+    return nearby[skip : skip + limit]
+
+
+def measure(session_factory, fn, args, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        with session_factory() as db:
+            started = time.perf_counter()
+            fn(db, *args)
+            timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main(args):
+    database_url = args.database_url or "sqlite:///" + os.path.join(
+        tempfile.mkdtemp(), "pastoral_location.db"
+    )
+    engine = create_engine(database_url)
+    Base.metadata.create_all(
+        engine, tables=[Church.__table__, PastoralCareRequest.__table__]
+    )
+    session_factory = sessionmaker(bind=engine)
+
+    with session_factory() as db:
+        church_id = seed_church(db, args.requests)
+    print(f"Seeded {args.requests} pastoral care requests ({engine.dialect.name})")
+
+    print(f"{'center':>20} {'km':>4} {'legacy ms':>10} {'indexed ms':>11} {'same':>5}")
+    for latitude, longitude in CENTERS:
+        for radius in RADII_KM:
+            query = (church_id, latitude, longitude, radius, 0, args.limit)
+            with session_factory() as db:
+                legacy_ids = [r.id for r, _ in legacy_search(db, *query)]
+                indexed_ids = [r.id for r, _ in find_requests_near(db, *query)]
+            legacy = measure(session_factory, legacy_search, query, args.runs)
+            indexed = measure(session_factory, find_requests_near, query, args.runs)
+            print(
+                f"{latitude:>9.4f},{longitude:>10.4f} {radius:>4} {legacy * 1000:>10.1f} "
+                f"{indexed * 1000:>11.1f} {'yes' if legacy_ids == indexed_ids else 'NO':>5}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=100000)
+    parser.add_argument("--limit", type=int, default=50, help="페이지 크기")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--database-url", help="기본값: 임시 SQLite 파일")
+    main(parser.parse_args())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+비서 모드 프롬프트 컨텍스트 벤치마크
+
+합성 교회 데이터(공지 100건, 기도요청 200건, 심방요청 150건 + 통계)로
+기존 format_context_for_prompt 전체 덤프와 토큰 예산 기반 build_prompt_context 의
+프롬프트 크기, 조립 시간, 가짜 LLM 서버 기준 응답 지연을 비교합니다.
+가짜 서버는 프롬프트 길이에 비례해 지연(prefill)을 추가합니다.
+
+Usage:
+    python scripts/benchmark_prompt_context.py --budget 4000
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from load_test_openai import start_fake_llm_server  # noqa: E402 (sets env defaults)
+
+QUERIES = [
+    "이번 주 김영희 집사님 심방 일정 알려줘",
+    "수술 앞둔 성도 기도제목 정리해줘",
+    "다음 달 수련회 공지 내용이 뭐야?",
+    "올해 헌금 현황 어때?",
+]
+
+WORDS = "교회 성도 가정 예배 기도 감사 건강 회복 수술 자녀 진학 취업 사업 이사 선교 봉사 찬양 수련회 바자회 새벽기도 구역모임".split()
+NAMES = ["김영희", "이철수", "박민수", "최은혜", "정다윗", "한사랑", "오믿음", "윤소망"]
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)) + "."
+
+
+def build_synthetic_context(seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    now = datetime.now()
+
+    def ts(i):
+        return (now - timedelta(days=i)).isoformat()
+
+    return {
+        "announcements": [
+            {
+                "id": i,
+                "title": f"{rng.choice(WORDS)} {rng.choice(WORDS)} 안내",
+                "content": " ".join(_sentence(rng, 12) for _ in range(6)),
+                "category": "general",
+                "is_pinned": i < 2,
+                "created_at": ts(i),
+            }
+            for i in range(100)
+        ],
+        "prayer_requests": [
+            {
+                "id": i,
+                "requester_name": rng.choice(NAMES),
+                "prayer_type": rng.choice(["healing", "family", "work"]),
+                "prayer_content": " ".join(_sentence(rng, 10) for _ in range(3)),
+                "is_urgent": i % 17 == 0,
+                "prayer_count": rng.randint(0, 40),
+                "created_at": ts(i),
+            }
+            for i in range(200)
+        ],
+        "pastoral_care_requests": [
+            {
+                "id": i,
+                "requester_name": rng.choice(NAMES),
+                "requester_phone": "010-0000-0000",
+                "request_type": rng.choice(["general", "hospital", "counseling"]),
+                "request_content": " ".join(_sentence(rng, 10) for _ in range(3)),
+                "status": rng.choice(["pending", "scheduled", "completed"]),
+                "is_urgent": i % 13 == 0,
+                "preferred_date": now.date().isoformat(),
+                "scheduled_date": None,
+                "scheduled_time": None,
+                "address": "서울특별시 강남구 테헤란로 123",
+                "completion_notes": _sentence(rng, 15),
+                "admin_notes": _sentence(rng, 15),
+                "created_at": ts(i),
+            }
+            for i in range(150)
+        ],
+        "offering_stats": {
+            "totals": {
+                "this_year": 152000000,
+                "last_year": 140000000,
+                "this_month": 12000000,
+            },
+            "fund_breakdown": [
+                {"fund_type": "십일조", "total": 90000000, "percentage": 59.2},
+                {"fund_type": "감사헌금", "total": 40000000, "percentage": 26.3},
+            ],
+        },
+        "attendance_stats": {
+            "total_members": 1200,
+            "last_week_attendance": 820,
+            "attendance_rate": 68.3,
+            "average_weekly_attendance": 790,
+        },
+    }
+
+
+async def measure_latency(service, system_prompt: str, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await service.generate_response(
+            messages=[{"role": "user", "content": QUERIES[0]}],
+            system_prompt=system_prompt,
+        )
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+async def main(args):
+    from app.services.church_data_context import format_context_for_prompt
+    from app.services.openai_service import OpenAIService
+    from app.services.prompt_context_builder import (
+        build_prompt_context,
+        estimate_tokens,
+    )
+
+    context = build_synthetic_context()
+
+    started = time.perf_counter()
+    legacy_text = format_context_for_prompt(context)
+    legacy_ms = (time.perf_counter() - started) * 1000
+    legacy_tokens = estimate_tokens(legacy_text)
+
+    print(f"{'query':<36} {'before tok':>10} {'after tok':>10} {'build ms':>9}")
+    budgeted = []
+    for query in QUERIES:
+        started = time.perf_counter()
+        result = build_prompt_context(context, query, args.budget)
+        build_ms = (time.perf_counter() - started) * 1000
+        budgeted.append(result)
+        print(
+            f"{query:<36} {legacy_tokens:>10} "
+            f"{result['token_count']:>10} {build_ms:>9.1f}"
+        )
+    print(f"(legacy format_context_for_prompt: {legacy_ms:.1f}ms)")
+
+    server = start_fake_llm_server(args.port, args.latency, args.prefill_per_char)
+    service = OpenAIService(
+        api_key="sk-benchmark", base_url=f"http://127.0.0.1:{args.port}/v1"
+    )
+    before = await measure_latency(service, legacy_text, args.runs)
+    after = await measure_latency(service, budgeted[0]["text"], args.runs)
+    print(
+        f"end-to-end median over {args.runs} runs: "
+        f"before {before * 1000:.0f}ms, after {after * 1000:.0f}ms"
+    )
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget", type=int, default=4000)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument(
+        "--prefill-per-char",
+        type=float,
+        default=0.00002,
+        help="seconds per prompt char",
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
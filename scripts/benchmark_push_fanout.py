@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+푸시 알림 fan-out 벤치마크 (가짜 FCM)
+
+합성 교회(기본 사용자/기기 5만 개)에 교회 전체 알림을 보내면서
+FCM 호출은 지연 시간과 일부 실패를 흉내 내는 가짜 백엔드로 바꿉니다.
+1) Celery eager 모드로 send_push_notification_task 전체 흐름(chord 포함) 실행
+2) 같은 shard 들을 --workers 개 스레드(워커 흉내)로 병렬 실행해 처리량 측정
+3) PushNotificationService.send_to_multiple_users 로 --service-users 명에게 발송
+   (FCM 지연 0 → 걸린 시간이 곧 DB/메시지 생성 오버헤드)
+각 실행 후 sent/failed 카운터, 수신자 행 수, 알림 행 수가 기대값과 같은지 확인합니다.
+1) 은 같은 알림을 한 번 더 실행해 중복 기록/카운터 초기화가 없는지도 확인합니다.
+실패 응답은 UNREGISTERED 이므로 1) 에서 해당 기기가 비활성화되고,
+2)/3) 에서는 FCM 에 보내지 않고 "기기 없음" 으로 기록되어야 합니다.
+
+Usage:
+    python scripts/benchmark_push_fanout.py --devices 50000 --workers 8
+    python scripts/benchmark_push_fanout.py --database-url postgresql://...
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_DB_FILE = os.path.join(tempfile.mkdtemp(), "push_fanout.db")
+
+# 설정 로딩에 필요한 값만 채움 (벤치마크 DB 는 --database-url 로 지정)
+for _key, _value in {
+    "SECRET_KEY": "benchmark",
+    "DATABASE_URL": f"sqlite:///{_DB_FILE}",
+    "SUPABASE_URL": "http://localhost",
+    "SUPABASE_ANON_KEY": "benchmark",
+}.items():
+    os.environ.setdefault(_key, _value)
+
+from sqlalchemy import create_engine, func  # noqa: E402
+from firebase_admin import messaging  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.core.celery_app import celery_app  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.models.church import Church  # noqa: E402
+from app.models.push_notification import (  # noqa: E402
+    NotificationRecipient,
+    NotificationType,
+    PushNotification,
+    UserDevice,
+)
+from app.models.user import User  # noqa: E402
+from app.services import push_fanout  # noqa: E402
+from app.services.push_notification import PushNotificationService  # noqa: E402
+from app.tasks import notifications  # noqa: E402
+
+FakeResponse = namedtuple("FakeResponse", ["success", "exception"])
+FakeBatchResponse = namedtuple("FakeBatchResponse", ["responses"])
+
+
+class FakeFCM:
+    """multicast 호출마다 latency 초 대기, fail_every 번째 기기마다 UNREGISTERED 응답"""
+
+    def __init__(self, latency: float, fail_every: int):
+        self.latency = latency
+        self.fail_every = fail_every
+        self.calls = 0
+        self.tokens = 0
+        self.max_batch = 0
+
+    def reset(self):
+        self.calls = self.tokens = 0
+
+    def __call__(self, message):
+        self.calls += 1
+        self.tokens += len(message.tokens)
+        self.max_batch = max(self.max_batch, len(message.tokens))
+        time.sleep(self.latency)
+        return FakeBatchResponse(
+            [
+                (
+                    FakeResponse(
+                        False,
+                        messaging.UnregisteredError("Requested entity was not found."),
+                    )
+                    if int(token.rsplit("-", 1)[1]) % self.fail_every == 0
+                    else FakeResponse(True, None)
+                )
+                for token in message.tokens
+            ]
+        )
+
+
+def seed_church(db, devices: int, users_without_device: int) -> int:
+    church = Church(name="벤치마크교회")
+    db.add(church)
+    db.commit()
+
+    users = devices + users_without_device
+    db.bulk_insert_mappings(
+        User,
+        [
+            {
+                "email": f"user{i}@example.com",
+                "username": f"user{i}",
+                "hashed_password": "x",
+                "church_id": church.id,
+                "is_active": True,
+            }
+            for i in range(users)
+        ],
+    )
+    db.commit()
+    user_ids = [
+        user_id
+        for (user_id,) in db.query(User.id)
+        .filter(User.church_id == church.id)
+        .order_by(User.id)
+    ]
+    db.bulk_insert_mappings(
+        UserDevice,
+        [
+            {
+                "user_id": user_id,
+                "device_token": f"token-{i + 1}",
+                "platform": "android" if i % 3 else "ios",
+                "is_active": True,
+            }
+            for i, user_id in enumerate(user_ids[:devices])
+        ],
+    )
+    db.commit()
+    return church.id
+
+
+def create_notification(db, church_id: int) -> int:
+    notification = PushNotification(
+        church_id=church_id,
+        type=NotificationType.ANNOUNCEMENT,
+        title="벤치마크 공지",
+        body="교회 전체 알림",
+        data={"type": "announcement"},
+        target_type="all",
+    )
+    db.add(notification)
+    db.commit()
+    return notification.id
+
+
+def check(db, notification_id: int, expected: dict, label: str):
+    notification = db.get(PushNotification, notification_id)
+    db.refresh(notification)
+    recipients = (
+        db.query(func.count(NotificationRecipient.id))
+        .filter(NotificationRecipient.notification_id == notification_id)
+        .scalar()
+    )
+    actual = {
+        "sent": notification.sent_count,
+        "failed": notification.failed_count,
+        "recipients": recipients,
+        "total_recipients": notification.total_recipients,
+        "sent_at": notification.sent_at is not None,
+    }
+    status = "OK" if actual == expected else f"MISMATCH (expected {expected})"
+    print(f"  [{label}] {actual} {status}")
+    return actual == expected
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="푸시 알림 fan-out 벤치마크 (가짜 FCM)"
+    )
+    parser.add_argument("--devices", type=int, default=50000, help="기기(=사용자) 수")
+    parser.add_argument(
+        "--users-without-device", type=int, default=500, help="기기 없는 사용자 수"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=8, help="병렬 실행할 shard 워커 수"
+    )
+    parser.add_argument(
+        "--fcm-latency-ms", type=float, default=150.0, help="가짜 FCM 호출 지연 (ms)"
+    )
+    parser.add_argument(
+        "--fail-every", type=int, default=97, help="N 번째 기기마다 실패 응답"
+    )
+    parser.add_argument(
+        "--service-users", type=int, default=10000, help="서비스 경로로 보낼 사용자 수"
+    )
+    parser.add_argument(
+        "--database-url", default=os.environ["DATABASE_URL"], help="벤치마크 DB URL"
+    )
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    notifications.SessionLocal = Session
+
+    fake = FakeFCM(args.fcm_latency_ms / 1000, args.fail_every)
+    push_fanout.send_multicast = fake
+
+    db = Session()
+    started = time.perf_counter()
+    church_id = seed_church(db, args.devices, args.users_without_device)
+    print(
+        f"seeded {args.devices} devices + "
+        f"{args.users_without_device} users without devices "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+    failed_devices = args.devices // args.fail_every
+    expected = {
+        "sent": args.devices - failed_devices,
+        "failed": failed_devices + args.users_without_device,
+        "recipients": args.devices + args.users_without_device,
+        "total_recipients": args.devices + args.users_without_device,
+        "sent_at": True,
+    }
+    # 기기를 플랫폼순으로 나누므로 플랫폼이 바뀌는 shard 하나만 multicast 2회
+    shards = -(-args.devices // push_fanout.FCM_BATCH_SIZE)
+    ok = True
+
+    # 1) 실제 작업 흐름 (eager 모드에서는 shard 가 순서대로 실행됨)
+    celery_app.conf.task_always_eager = True
+    notification_id = create_notification(db, church_id)
+    fake.reset()
+    started = time.perf_counter()
+    notifications.send_push_notification_task.delay(notification_id)
+    elapsed = time.perf_counter() - started
+    print(
+        f"eager task: {elapsed:.2f}s, {fake.calls} FCM calls / {fake.tokens} tokens "
+        f"(max batch {fake.max_batch})"
+    )
+    ok &= check(db, notification_id, expected, "eager")
+    ok &= shards <= fake.calls <= shards + 1 and fake.tokens == args.devices
+    active = (
+        db.query(func.count(UserDevice.id))
+        .filter(UserDevice.is_active == True)
+        .scalar()
+    )
+    expected_active = args.devices - failed_devices
+    print(f"  active devices after pruning: {active} (expected {expected_active})")
+    ok &= active == expected_active
+    # 재전달/재시도 흉내 (shard 가 아직 도는 중이라 sent_at 이 없는 상태):
+    # 다시 실행해도 수신자 행과 카운터가 그대로여야 함
+    db.get(PushNotification, notification_id).sent_at = None
+    db.commit()
+    fake.reset()
+    notifications.send_push_notification_task.delay(notification_id)
+    db.get(PushNotification, notification_id).sent_at = datetime.utcnow()
+    db.commit()
+    ok &= check(db, notification_id, expected, "eager, redelivered") and fake.calls == 0
+
+    # 2) shard 를 워커 수만큼 병렬 실행
+    notification_id = create_notification(db, church_id)
+    fake.reset()
+    started = time.perf_counter()
+    notification = db.get(PushNotification, notification_id)
+    shard_list = push_fanout.prepare_fanout(db, notification)
+    payload = push_fanout.notification_payload(notification)
+    prepared = time.perf_counter() - started
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        results = list(
+            executor.map(
+                lambda shard: notifications.send_push_notification_shard(
+                    notification_id, payload, shard
+                ),
+                shard_list,
+            )
+        )
+    notifications.finalize_push_notification(results, notification_id)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{args.workers} workers: {elapsed:.2f}s (resolve {prepared:.2f}s), "
+        f"{fake.tokens / elapsed:,.0f} devices/s, "
+        f"{fake.calls} FCM calls / {fake.tokens} tokens"
+    )
+    ok &= check(db, notification_id, expected, f"{args.workers} workers")
+    ok &= fake.tokens == args.devices - failed_devices
+    ok &= not any("error" in result for result in results)
+
+    # 3) 서비스 경로 (API 의 send/church 발송)
+    user_ids = [
+        user_id
+        for (user_id,) in db.query(User.id)
+        .filter(User.church_id == church_id)
+        .order_by(User.id)
+        .limit(args.service_users)
+    ]
+    fake.latency = 0.0
+    started = time.perf_counter()
+    result = asyncio.run(
+        PushNotificationService.send_to_multiple_users(
+            db=db,
+            user_ids=user_ids,
+            title="벤치마크 공지",
+            body="서비스 경로",
+            church_id=church_id,
+        )
+    )
+    elapsed = time.perf_counter() - started
+    print(
+        f"send_to_multiple_users ({len(user_ids)} users): {elapsed:.2f}s, "
+        f"sent {result['sent_count']}, failed {result['failed_count']}"
+    )
+    service_devices = min(len(user_ids), args.devices)
+    service_failed = service_devices // args.fail_every
+    ok &= check(
+        db,
+        result["notification_id"],
+        {
+            "sent": service_devices - service_failed,
+            "failed": service_failed + len(user_ids) - service_devices,
+            "recipients": len(user_ids),
+            "total_recipients": len(user_ids),
+            "sent_at": True,
+        },
+        "service",
+    )
+
+    total_notifications = db.query(func.count(PushNotification.id)).scalar()
+    print(f"push_notifications rows: {total_notifications} (expected 3)")
+    ok &= total_notifications == 3
+    db.close()
+
+    print("all checks passed" if ok else "CHECKS FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
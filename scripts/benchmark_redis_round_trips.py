@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+RedisClient 왕복(round trip) 횟수 벤치마크
+
+기존 구현(명령마다 왕복)과 현재 RedisClient(pipeline, SPOP count, 가변 인자 SADD,
+Lua 발송 한도)의 호출 1회당 Redis 왕복 횟수와 소요 시간을 비교하고 결과가 같은지 확인합니다.
+왕복 횟수는 연결의 send_packed_command 호출 수로 셉니다 (pipeline 은 1회,
+Lua 스크립트 pipeline 은 SCRIPT EXISTS 확인 1회 추가).
+--redis-url 이 없으면 fakeredis 를 사용합니다 (pip install fakeredis lupa).
+fakeredis 는 네트워크 지연이 없고 Lua 실행이 느리므로 시간은 실제 Redis 로 재야 의미가 있습니다.
+
+Usage:
+    python scripts/benchmark_redis_round_trips.py
+    python scripts/benchmark_redis_round_trips.py --redis-url redis://localhost:6379/15
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 설정 로딩에 필요한 값만 채움
+for _key, _value in {
+    "SECRET_KEY": "benchmark",
+    "DATABASE_URL": "sqlite://",
+    "SUPABASE_URL": "http://localhost",
+    "SUPABASE_ANON_KEY": "benchmark",
+}.items():
+    os.environ.setdefault(_key, _value)
+
+import redis  # noqa: E402
+from redis.connection import AbstractConnection  # noqa: E402
+
+from app.core import redis as redis_module  # noqa: E402
+
+ROUND_TRIPS = [0]
+_send_packed_command = AbstractConnection.send_packed_command
+
+
+def _counting_send(self, *args, **kwargs):
+    ROUND_TRIPS[0] += 1
+    return _send_packed_command(self, *args, **kwargs)
+
+
+AbstractConnection.send_packed_command = _counting_send
+
+
+# 기존 구현 (명령마다 왕복)
+def legacy_get_user_device_tokens(client, user_id):
+    device_tokens = client.smembers(f"user_devices:{user_id}")
+    active_tokens = []
+    for token in device_tokens:
+        key = f"device_token:{user_id}:{token}"
+        if client.exists(key):
+            active_tokens.append(token)
+        else:
+            client.srem(f"user_devices:{user_id}", token)
+    return active_tokens
+
+
+def legacy_add_batch_notification(client, batch_id, user_ids):
+    key = f"batch:{batch_id}"
+    for user_id in user_ids:
+        client.sadd(key, user_id)
+    client.expire(key, 3600)
+
+
+def legacy_get_batch_users(client, batch_id, count=100):
+    key = f"batch:{batch_id}"
+    users = []
+    for _ in range(count):
+        user_id = client.spop(key)
+        if user_id:
+            users.append(int(user_id))
+        else:
+            break
+    return users
+
+
+def legacy_check_rate_limit(client, user_id, limit=100, window=3600):
+    key = f"rate_limit:push:{user_id}"
+    current_count = client.incr(key)
+    if current_count == 1:
+        client.expire(key, window)
+    return current_count <= limit
+
+
+def connect(redis_url):
+    if redis_url:
+        client = redis.Redis.from_url(redis_url, decode_responses=True)
+    else:
+        import fakeredis
+
+        client = fakeredis.FakeRedis(decode_responses=True)
+    client.flushdb()
+    redis_client = redis_module.RedisClient.__new__(redis_module.RedisClient)
+    redis_client.client = client
+    redis_client.connected = True
+    redis_client._rate_limit_script = client.register_script(
+        redis_module._RATE_LIMIT_SCRIPT
+    )
+    return redis_client
+
+
+def measure(setup, call, read, repeat):
+    trips, elapsed, result = 0, 0.0, None
+    for _ in range(repeat):
+        setup()
+        ROUND_TRIPS[0] = 0
+        started = time.perf_counter()
+        result = call()
+        elapsed += time.perf_counter() - started
+        trips += ROUND_TRIPS[0]
+        if read:
+            result = read()
+    return trips / repeat, elapsed / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RedisClient 왕복 횟수 벤치마크")
+    parser.add_argument(
+        "--redis-url", default=None, help="Redis URL (없으면 fakeredis)"
+    )
+    parser.add_argument(
+        "--tokens", type=int, default=10, help="사용자 1명의 기기 토큰 수"
+    )
+    parser.add_argument(
+        "--users", type=int, default=500, help="일괄 발송 대상 사용자 수"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="반복 횟수 (평균)")
+    args = parser.parse_args()
+
+    rc = connect(args.redis_url)
+    client = rc.client
+    user_ids = list(range(1, args.users + 1))
+
+    def seed_tokens():
+        client.flushdb()
+        for i in range(args.tokens):
+            rc.store_device_token(1, f"token-{i}", "android")
+        client.delete("device_token:1:token-0")  # 만료된 토큰 하나
+
+    def reset_batch():
+        client.delete("batch:b")
+
+    def seed_batch():
+        client.delete("batch:b")
+        client.sadd("batch:b", *user_ids)
+
+    def reset_limits():
+        client.delete(*[f"rate_limit:push:{user_id}" for user_id in user_ids])
+
+    def batch_members():
+        return sorted(map(int, client.smembers("batch:b")))
+
+    def limit_ttls():
+        return [client.ttl(f"rate_limit:push:{user_id}") > 0 for user_id in user_ids]
+
+    # (이름, 준비, 기존 구현, 현재 구현, 결과 확인용 읽기)
+    cases = [
+        (
+            f"get_user_device_tokens ({args.tokens} tokens)",
+            seed_tokens,
+            lambda: sorted(legacy_get_user_device_tokens(client, 1)),
+            lambda: sorted(rc.get_user_device_tokens(1)),
+            None,
+        ),
+        (
+            f"add_batch_notification ({args.users} users)",
+            reset_batch,
+            lambda: legacy_add_batch_notification(client, "b", user_ids),
+            lambda: rc.add_batch_notification("b", user_ids),
+            batch_members,
+        ),
+        (
+            "get_batch_users (count=100)",
+            seed_batch,
+            lambda: len(legacy_get_batch_users(client, "b", 100)),
+            lambda: len(rc.get_batch_users("b", 100)),
+            None,
+        ),
+        (
+            "check_rate_limit (1 user)",
+            reset_limits,
+            lambda: legacy_check_rate_limit(client, 1),
+            lambda: rc.check_rate_limit(1),
+            None,
+        ),
+        (
+            f"rate limit for {args.users} users",
+            reset_limits,
+            lambda: [u for u in user_ids if not legacy_check_rate_limit(client, u)],
+            lambda: rc.check_rate_limits(user_ids),
+            limit_ttls,
+        ),
+    ]
+
+    print(
+        f"{'operation':<40} {'trips before':>12} {'trips after':>12} "
+        f"{'ms before':>10} {'ms after':>10}"
+    )
+    ok = True
+    for label, setup, legacy, current, read in cases:
+        trips_before, ms_before, expected = measure(setup, legacy, read, args.repeat)
+        trips_after, ms_after, actual = measure(setup, current, read, args.repeat)
+        same = expected == actual
+        ok &= same
+        print(
+            f"{label:<40} {trips_before:>12.0f} {trips_after:>12.0f} "
+            f"{ms_before:>10.2f} {ms_after:>10.2f}"
+            + ("" if same else "  RESULT MISMATCH")
+        )
+
+    # 원자성: 첫 INCR 뒤 EXPIRE 전에 끊겨도 TTL 없는 키가 남지 않음
+    reset_limits()
+    rc.check_rate_limit(1)
+    ttl = client.ttl("rate_limit:push:1")
+    print(f"rate limit key TTL after first hit: {ttl}s")
+    ok &= ttl > 0
+
+    print("all results match" if ok else "RESULTS DIFFER")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
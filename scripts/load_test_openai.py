@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+OpenAI 호출 경로 부하 테스트
+
+로컬 가짜 LLM 서버(OpenAI 호환 /v1/chat/completions)를 띄우고,
+이벤트 루프를 막는 동기 호출 방식과 AsyncOpenAI 기반 비동기 호출 방식의
+동시성별 처리량, 스트리밍 응답의 첫 토큰 도착 시간을 비교합니다.
+
+Usage:
+    python scripts/load_test_openai.py --latency 0.5 --requests 64
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 설정 로딩에 필요한 값만 채움 (실제 DB/Supabase 연결은 하지 않음)
+for _key, _value in {
+    "SECRET_KEY": "load-test",
+    "DATABASE_URL": "sqlite://",
+    "SUPABASE_URL": "http://localhost",
+    "SUPABASE_ANON_KEY": "load-test",
+}.items():
+    os.environ.setdefault(_key, _value)
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+FAKE_REPLY = "안녕하세요. 부하 테스트용 가짜 응답입니다."
+
+
+def create_fake_llm_app(latency: float, prefill_per_char: float = 0.0) -> FastAPI:
+    """prefill_per_char: 프롬프트 길이에 비례하는 추가 지연 (초/문자)"""
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if body.get("stream"):
+            return StreamingResponse(
+                stream_chunks(body.get("model", "gpt-4o-mini")),
+                media_type="text/event-stream",
+            )
+        prompt_chars = sum(len(m.get("content") or "") for m in body["messages"])
+        await asyncio.sleep(latency + prompt_chars * prefill_per_char)
+        return {
+            "id": "chatcmpl-load-test",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": FAKE_REPLY},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+        }
+
+    async def stream_chunks(model: str):
+        # 첫 토큰은 짧은 지연 후, 나머지는 전체 지연 시간에 걸쳐 나누어 전송
+        words = FAKE_REPLY.split(" ")
+        await asyncio.sleep(latency / 10)
+        for i, word in enumerate(words):
+            delta = {"content": word if i == 0 else " " + word}
+            yield _chunk(model, [{"index": 0, "delta": delta, "finish_reason": None}])
+            await asyncio.sleep(latency / len(words))
+        yield _chunk(model, [{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        yield _chunk(
+            model,
+            [],
+            usage={"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+        )
+        yield "data: [DONE]\n\n"
+
+    def _chunk(model: str, choices: list, usage: dict = None) -> str:
+        payload = {
+            "id": "chatcmpl-load-test",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": choices,
+            "usage": usage,
+        }
+        return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+    return app
+
+
+def start_fake_llm_server(
+    port: int, latency: float, prefill_per_char: float = 0.0
+) -> uvicorn.Server:
+    config = uvicorn.Config(
+        create_fake_llm_app(latency, prefill_per_char),
+        host="127.0.0.1",
+        port=port,
+        log_level="warning",
+    )
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def run_batch(call, total: int, concurrency: int) -> float:
+    """total 개의 요청을 concurrency 개씩 동시에 보내고 초당 처리량 반환"""
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            await call()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return total / (time.perf_counter() - started)
+
+
+async def main(args):
+    from app.services.openai_service import OpenAIService
+
+    server = start_fake_llm_server(args.port, args.latency)
+    service = OpenAIService(
+        api_key="sk-load-test", base_url=f"http://127.0.0.1:{args.port}/v1"
+    )
+    messages = [{"role": "user", "content": "오늘 예배 시간 알려줘"}]
+
+    async def blocking_call():
+        # 기존 방식: async 함수 안에서 동기 클라이언트 호출 (이벤트 루프 정지)
+        service.generate_response_sync(messages=messages)
+
+    async def async_call():
+        await service.generate_response(messages=messages)
+
+    print(f"Fake LLM latency: {args.latency:.2f}s, requests per run: {args.requests}")
+    print(f"{'concurrency':>12} {'blocking req/s':>16} {'async req/s':>14}")
+    for concurrency in args.concurrency:
+        blocking = await run_batch(blocking_call, args.requests, concurrency)
+        non_blocking = await run_batch(async_call, args.requests, concurrency)
+        print(f"{concurrency:>12} {blocking:>16.1f} {non_blocking:>14.1f}")
+
+    # 스트리밍: 첫 토큰까지의 시간(TTFB)과 전체 완료 시간 비교
+    first_token, total = [], []
+    for _ in range(5):
+        started = time.perf_counter()
+        async for event in service.stream_response(messages=messages):
+            if event["type"] == "delta" and len(first_token) < len(total) + 1:
+                first_token.append(time.perf_counter() - started)
+        total.append(time.perf_counter() - started)
+    print(
+        f"stream: first token {statistics.median(first_token) * 1000:.0f}ms, "
+        f"complete {statistics.median(total) * 1000:.0f}ms (median of 5)"
+    )
+
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 32])
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+QR 출석 체크인 부하 테스트
+
+실행 중인 서버의 /qr-codes/verify/{code} 로 예배 시작 직전과 같은 스캔 폭주
+(기본 분당 2,000건)를 고정 도착률(open-loop)로 보내고 p50/p99 지연 시간과
+응답 상태 분포를 출력합니다. 응답이 늦어져도 요청 간격은 유지되므로
+대기 시간이 측정에서 빠지지 않습니다.
+
+스캔할 코드는 --church-id 로 DB 의 활성 QR 코드를 읽거나 --codes-file (한 줄에
+코드 1개)로 지정합니다. 코드 수보다 많이 보내면 재스캔(already_marked)이
+섞입니다.
+
+Usage:
+    python scripts/load_test_qr_checkin.py --church-id 1 --rate 2000 --duration 60
+    python scripts/load_test_qr_checkin.py --codes-file codes.txt --base-url $API_URL
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+
+def load_codes(args) -> list:
+    if args.codes_file:
+        with open(args.codes_file) as f:
+            return [line.strip() for line in f if line.strip()]
+
+    from app.db.session import SessionLocal
+    from app.models.qr_code import QRCode
+
+    db = SessionLocal()
+    try:
+        return [
+            code
+            for (code,) in db.query(QRCode.code).filter(
+                QRCode.church_id == args.church_id, QRCode.is_active == True
+            )
+        ]
+    finally:
+        db.close()
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def main(args):
+    codes = load_codes(args)
+    if not codes:
+        sys.exit("No QR codes to scan")
+
+    rng = random.Random(args.seed)
+    rng.shuffle(codes)
+    total = int(args.rate / 60 * args.duration)
+    interval = 60 / args.rate
+    url = f"{args.base_url.rstrip('/')}/api/v1/qr-codes/verify/{{}}"
+
+    latencies, statuses = [], Counter()
+
+    async def scan(client: httpx.AsyncClient, code: str):
+        started = time.perf_counter()
+        try:
+            response = await client.post(
+                url.format(code), params={"attendance_type": args.service_type}
+            )
+            body = response.json() if response.status_code == 200 else {}
+            statuses[body.get("status", str(response.status_code))] += 1
+        except httpx.HTTPError as e:
+            statuses[type(e).__name__] += 1
+        latencies.append(time.perf_counter() - started)
+
+    print(
+        f"{total} scans over {args.duration}s ({args.rate}/min) "
+        f"across {len(codes)} codes -> {args.base_url}"
+    )
+    limits = httpx.Limits(max_connections=args.connections)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        started = time.perf_counter()
+        tasks = []
+        for i in range(total):
+            # 고정 도착률: 이전 응답을 기다리지 않고 예정 시각에 발사
+            delay = started + i * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(scan(client, codes[i % len(codes)])))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    ms = [value * 1000 for value in latencies]
+    print(f"achieved {len(ms) / elapsed * 60:.0f}/min in {elapsed:.1f}s")
+    print(
+        f"latency ms: p50 {statistics.median(ms):.1f}  p90 {percentile(ms, 90):.1f}  "
+        f"p99 {percentile(ms, 99):.1f}  max {max(ms):.1f}"
+    )
+    print("statuses:", ", ".join(f"{k}={v}" for k, v in statuses.most_common()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--church-id", type=int, default=1)
+    parser.add_argument(
+        "--codes-file", help="한 줄에 QR 코드 1개 (없으면 DB 에서 읽음)"
+    )
+    parser.add_argument("--rate", type=int, default=2000, help="분당 스캔 수")
+    parser.add_argument("--duration", type=int, default=60, help="초")
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--service-type", default="주일예배")
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Rebuild or check attendance rollups against the attendances table
+
+Use after bulk imports or direct SQL edits to attendances. --check only
+reports buckets whose counts differ from the raw rows and changes nothing.
+
+Usage:
+    python scripts/rebuild_attendance_rollups.py              # all churches
+    python scripts/rebuild_attendance_rollups.py --church-id 1
+    python scripts/rebuild_attendance_rollups.py --check
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.tasks.attendance_rollups import backfill_attendance_rollups
+
+
+def main(church_id=None, check_only=False):
+    result = backfill_attendance_rollups(church_id, check_only)
+    scope = f" for church {church_id}" if church_id else ""
+    if not check_only:
+        print(f"Rebuilt {result['rows']} attendance rollup rows{scope}")
+        return 0
+
+    for mismatch in result["samples"]:
+        print(
+            f"church={mismatch['church_id']} {mismatch['service_type']} "
+            f"{mismatch['period_type']} {mismatch['period_start']}: "
+            f"expected={mismatch['expected']} actual={mismatch['actual']}"
+        )
+    print(f"{result['mismatches']} mismatched buckets{scope}")
+    return 1 if result["mismatches"] else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--church-id", type=int, help="only this church")
+    parser.add_argument(
+        "--check", action="store_true", help="report mismatches without rebuilding"
+    )
+    args = parser.parse_args()
+    sys.exit(main(args.church_id, args.check))
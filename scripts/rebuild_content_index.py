@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Rebuild the per-church content index used for chat retrieval
+
+Indexes are built and kept current on ORM writes by Celery tasks
+(app.tasks.content_index); run this to build them up front, after bulk SQL
+edits, after changing CONTENT_INDEX_ENCODER/CONTENT_INDEX_DIM, or to try a
+query against the index with --query.
+
+Usage:
+    python scripts/rebuild_content_index.py              # all churches
+    python scripts/rebuild_content_index.py --church-id 1
+    python scripts/rebuild_content_index.py --church-id 1 --query "수련회 일정"
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import SessionLocal
+from app.models.church import Church
+from app.services.content_index import ChurchIndex, rebuild_church_index
+
+
+def main(church_id=None, query=None, k=8):
+    db = SessionLocal()
+    try:
+        if query:
+            started = time.perf_counter()
+            hits = ChurchIndex(church_id).search(query, k)
+            elapsed = (time.perf_counter() - started) * 1000
+            for hit in hits:
+                text = hit["text"].replace("\n", " ")[:80]
+                print(f"{hit['score']:.3f} {hit['type']}#{hit['id']} {text}")
+            print(f"{len(hits)} hits in {elapsed:.1f}ms")
+            return 0
+
+        church_ids = (
+            [church_id] if church_id else [cid for (cid,) in db.query(Church.id)]
+        )
+        for cid in church_ids:
+            started = time.perf_counter()
+            chunks = rebuild_church_index(db, cid)
+            print(
+                f"church={cid}: {chunks} chunks in {time.perf_counter() - started:.1f}s"
+            )
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--church-id", type=int, help="only this church")
+    parser.add_argument("--query", help="search the index instead of rebuilding")
+    parser.add_argument("--k", type=int, default=8)
+    args = parser.parse_args()
+    if args.query and not args.church_id:
+        parser.error("--query needs --church-id")
+    sys.exit(main(args.church_id, args.query, args.k))
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Rebuild offering monthly rollups from the offerings table
+
+Use after bulk imports or direct SQL edits to offerings.
+
+Usage:
+    python scripts/rebuild_offering_rollups.py              # all churches
+    python scripts/rebuild_offering_rollups.py --church-id 1
+"""
+import argparse
+import logging
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import SessionLocal
+from app.services.church_data_cache import invalidate_offering_cache
+from app.services.offering_rollup import rebuild_offering_rollups
+from app.models import Church
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main(church_id=None):
+    db = SessionLocal()
+    try:
+        rows = rebuild_offering_rollups(db, church_id)
+        db.commit()
+        print(
+            f"Rebuilt {rows} monthly rollup rows"
+            + (f" for church {church_id}" if church_id else "")
+        )
+
+        church_ids = [church_id] if church_id else [c.id for c in db.query(Church.id)]
+        for cid in church_ids:
+            invalidate_offering_cache(cid)
+    except Exception as e:
+        logger.error(f"Error rebuilding offering rollups: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--church-id", type=int, help="rebuild only this church")
+    main(parser.parse_args().church_id)
@@ -0,0 +1,276 @@
+"""
+교회 데이터 캐시 테스트
+
+Redis 는 fakeredis, DB 는 sqlite 를 사용합니다.
+- 쓰기 엔드포인트 호출 후 다음 get_*_cached 조회가 새 데이터를 반환하는지 (버전 무효화)
+- L1(프로세스 내) 캐시 적중과 다른 워커의 무효화 반영
+- stale-while-revalidate: 만료 후 이전 값을 즉시 반환하고 한 번만 백그라운드 갱신
+"""
+
+import threading
+import time
+from datetime import date, time as dt_time, timedelta
+from decimal import Decimal
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import models, schemas
+from app.api.api_v1.endpoints import (
+    announcements,
+    attendances,
+    financial,
+    pastoral_care,
+    prayer_requests,
+    worship_schedule,
+)
+from app.core.redis import RedisClient
+from app.db.base import Base
+from app.schemas.pastoral_care import PastoralCareRequestCreate, PrayerRequestCreate
+from app.schemas.worship_schedule import WorshipServiceCreate
+from app.services import church_data_cache
+from app.services.church_data_cache import ChurchDataCache, cache_manager
+
+
+def _fake_redis_client() -> RedisClient:
+    client = RedisClient.__new__(RedisClient)
+    client.client = fakeredis.FakeRedis(decode_responses=True)
+    client.connected = True
+    return client
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = _fake_redis_client()
+    monkeypatch.setattr(cache_manager, "redis", client)
+    cache_manager._local.clear()
+    yield client
+    cache_manager._local.clear()
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _register_functions(dbapi_connection, connection_record):
+        # prayer_requests.expires_at 기본값의 PostgreSQL interval() 대체
+        dbapi_connection.create_function("interval", 1, lambda value: None)
+
+    Base.metadata.create_all(engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def church(db):
+    church = models.Church(name="테스트교회")
+    db.add(church)
+    db.commit()
+    return church
+
+
+@pytest.fixture
+def admin(db, church):
+    user = models.User(
+        email="admin@example.com",
+        username="admin",
+        full_name="관리자",
+        hashed_password="x",
+        church_id=church.id,
+        role="admin",
+        is_active=True,
+    )
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def member(db, church):
+    member = models.Member(church_id=church.id, name="홍길동", phone="010-0000-0000")
+    db.add(member)
+    db.commit()
+    return member
+
+
+def _ids(rows):
+    return {row["id"] for row in rows}
+
+
+def test_announcement_write_invalidates_cached_list(redis, db, church, admin):
+    assert church_data_cache.get_announcements_cached(db, church.id) == []
+
+    created = announcements.create_announcement(
+        db=db,
+        announcement_in=schemas.AnnouncementCreate(
+            title="수련회 안내", content="8월 수련회", category="event"
+        ),
+        current_user=admin,
+    )
+
+    assert _ids(church_data_cache.get_announcements_cached(db, church.id)) == {
+        created.id
+    }
+
+
+def test_prayer_request_write_invalidates_cached_list(redis, db, church, admin):
+    assert church_data_cache.get_prayer_requests_cached(db, church.id) == []
+
+    created = prayer_requests.create_prayer_request(
+        db=db,
+        request_in=PrayerRequestCreate(requester_name="홍길동", prayer_content="건강"),
+        current_user=admin,
+    )
+
+    assert _ids(church_data_cache.get_prayer_requests_cached(db, church.id)) == {
+        created.id
+    }
+
+
+def test_pastoral_care_write_invalidates_cached_list(redis, db, church, admin):
+    assert church_data_cache.get_pastoral_care_requests_cached(db, church.id) == []
+
+    created = pastoral_care.create_pastoral_care_request(
+        db=db,
+        request_in=PastoralCareRequestCreate(
+            requester_name="홍길동",
+            requester_phone="010-0000-0000",
+            request_content="병문안 요청",
+        ),
+        current_user=admin,
+    )
+
+    assert _ids(church_data_cache.get_pastoral_care_requests_cached(db, church.id)) == {
+        created.id
+    }
+
+
+def test_offering_write_invalidates_cached_stats(redis, db, church, admin, member):
+    before = church_data_cache.get_offering_stats_cached(db, church.id)
+    assert before["recent_offerings"] == []
+
+    created = financial.create_offering(
+        db=db,
+        offering_in=schemas.financial.OfferingCreate(
+            member_id=member.id,
+            church_id=church.id,
+            offered_on=date.today(),
+            fund_type="십일조",
+            amount=Decimal("10000.00"),
+        ),
+        current_user=admin,
+    )
+
+    after = church_data_cache.get_offering_stats_cached(db, church.id)
+    assert _ids(after["recent_offerings"]) == {created.id}
+
+
+def test_attendance_write_invalidates_cached_stats(redis, db, church, admin, member):
+    before = church_data_cache.get_attendance_stats_cached(db, church.id)
+    assert before["recent_attendances"] == []
+
+    created = attendances.create_attendance(
+        db=db,
+        attendance_in=schemas.AttendanceCreate(
+            church_id=church.id,
+            member_id=member.id,
+            service_date=date.today() - timedelta(days=1),
+            service_type="주일예배",
+        ),
+        current_user=admin,
+    )
+
+    after = church_data_cache.get_attendance_stats_cached(db, church.id)
+    assert _ids(after["recent_attendances"]) == {created.id}
+
+
+def test_worship_write_invalidates_cached_schedule(redis, db, church, admin):
+    assert church_data_cache.get_worship_schedule_cached(db, church.id) == []
+
+    created = worship_schedule.create_worship_service(
+        service=WorshipServiceCreate(
+            name="주일 1부 예배", day_of_week=6, start_time=dt_time(9, 0)
+        ),
+        db=db,
+        current_user=admin,
+    )
+
+    assert _ids(church_data_cache.get_worship_schedule_cached(db, church.id)) == {
+        created.id
+    }
+
+
+def test_local_tier_serves_repeats_until_another_worker_invalidates(
+    redis, db, church, admin
+):
+    church_data_cache.get_announcements_cached(db, church.id)
+    local_hits = cache_manager.get_tier_stats()["local"]["hits"]
+
+    # 같은 버전이면 Redis 조회 없이 L1 에서 반환
+    church_data_cache.get_announcements_cached(db, church.id)
+    assert cache_manager.get_tier_stats()["local"]["hits"] == local_hits + 1
+
+    # 다른 워커가 쓰고 버전만 올린 경우: 이 프로세스의 L1 항목은 버전 불일치로 폐기
+    db.add(
+        models.Announcement(
+            church_id=church.id,
+            title="다른 워커",
+            content="다른 워커에서 작성",
+            author_id=admin.id,
+            category="event",
+        )
+    )
+    db.commit()
+    redis.cache_bump_version(cache_manager.get_cache_tag(church.id, "announcements"))
+
+    titles = [
+        row["title"]
+        for row in church_data_cache.get_announcements_cached(db, church.id)
+    ]
+    assert titles == ["다른 워커"]
+
+
+def test_stale_value_is_served_while_one_background_refresh_runs(monkeypatch):
+    cache = ChurchDataCache(local_max_size=10)
+    cache.redis = _fake_redis_client()
+    cache.cache_ttl["member_stats"] = 1
+    cache.stale_ttl["member_stats"] = 60
+
+    calls = []
+    release = threading.Event()
+
+    def fetch(db, church_id):
+        calls.append(church_id)
+        if len(calls) > 1:
+            # 백그라운드 갱신은 테스트가 허용할 때까지 대기
+            release.wait(5)
+        return {"generation": len(calls)}
+
+    monkeypatch.setitem(cache.data_fetchers, "member_stats", fetch)
+
+    assert cache.get_cached_data(None, 1, "member_stats") == {"generation": 1}
+    time.sleep(1.1)
+
+    # 만료 후에도 유예 시간 동안은 이전 값을 즉시 반환 (갱신은 한 번만 예약)
+    assert cache.get_cached_data(None, 1, "member_stats") == {"generation": 1}
+    assert cache.get_cached_data(None, 1, "member_stats") == {"generation": 1}
+    release.set()
+    cache._refresh_executor.shutdown(wait=True)
+
+    assert cache.get_cached_data(None, 1, "member_stats") == {"generation": 2}
+    stats = cache.get_tier_stats()
+    assert stats["stale_served"] == 2
+    assert stats["background_refreshes"] == 1
+    assert len(calls) == 2
@@ -0,0 +1,80 @@
+"""
+교회별 OpenAI 클라이언트 레지스트리 테스트
+
+- 암호화된 교회 키는 복호화해서 사용
+- 평문 키(직접 저장된 sk-... 키, OPENAI_API_KEY 환경변수 대체 키)는 그대로 사용
+- 키가 없거나 테스트 키면 테스트 서비스, 같은 키는 캐시된 서비스를 재사용
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from cryptography.fernet import Fernet
+
+from app.core.security import encrypt_data
+from app.services import openai_test_service
+from app.services.openai_service import OpenAIClientRegistry, OpenAIService
+
+
+@pytest.fixture(autouse=True)
+def encryption_key(monkeypatch):
+    monkeypatch.setenv("ENCRYPTION_KEY", Fernet.generate_key().decode())
+
+
+def test_encrypted_church_key_is_decrypted():
+    registry = OpenAIClientRegistry()
+    church = SimpleNamespace(id=1, gpt_api_key=encrypt_data("sk-proj-encrypted"))
+
+    service = registry.get_for_church(church)
+
+    assert isinstance(service, OpenAIService)
+    assert service.api_key == "sk-proj-encrypted"
+
+
+def test_plain_church_key_is_used_as_is():
+    registry = OpenAIClientRegistry()
+    church = SimpleNamespace(id=1, gpt_api_key="sk-proj-abcdef")
+
+    service = registry.get_for_church(church)
+
+    assert isinstance(service, OpenAIService)
+    assert service.api_key == "sk-proj-abcdef"
+
+
+def test_environment_key_fallback_does_not_touch_church():
+    registry = OpenAIClientRegistry()
+    church = SimpleNamespace(id=1, gpt_api_key=None)
+
+    service = registry.get_for_church(church, fallback_key="sk-proj-from-env")
+
+    assert isinstance(service, OpenAIService)
+    assert service.api_key == "sk-proj-from-env"
+    assert church.gpt_api_key is None
+
+
+def test_missing_or_test_key_uses_test_service():
+    registry = OpenAIClientRegistry()
+
+    assert isinstance(
+        registry.get_for_church(SimpleNamespace(id=1, gpt_api_key=None)),
+        openai_test_service.TestOpenAIService,
+    )
+    assert isinstance(
+        registry.get_for_church(SimpleNamespace(id=2, gpt_api_key="sk-test-key")),
+        openai_test_service.TestOpenAIService,
+    )
+
+
+def test_service_is_reused_until_the_key_changes():
+    registry = OpenAIClientRegistry()
+    church = SimpleNamespace(id=1, gpt_api_key="sk-proj-first")
+
+    first = registry.get_for_church(church)
+    assert registry.get_for_church(church) is first
+
+    church.gpt_api_key = "sk-proj-second"
+    second = registry.get_for_church(church)
+
+    assert second is not first
+    assert second.api_key == "sk-proj-second"
+    assert registry.get_stats()["size"] == 1
@@ -0,0 +1,303 @@
+"""
+푸시 알림 fan-out 테스트
+
+FCM 은 가짜 multicast 함수, Redis 는 fakeredis, DB 는 sqlite 를 사용합니다.
+- 교회 전체(기기 5만 개) 알림의 sent/failed 카운터, 수신자 행 수, FCM 호출 크기
+- UNREGISTERED 응답 기기 비활성화
+- 같은 알림 작업이 재전달돼도 다시 발송하거나 수신자를 중복 기록하지 않음 (멱등성)
+- deliver_shard 에 send 를 주입한 단일 shard 발송
+"""
+
+from collections import namedtuple
+from datetime import datetime
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from firebase_admin import exceptions, messaging
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core import redis as redis_module
+from app.core.celery_app import celery_app
+from app.core.redis import RedisClient
+from app.db.base import Base
+from app.models.church import Church
+from app.models.push_notification import (
+    NotificationRecipient,
+    NotificationType,
+    PushNotification,
+    UserDevice,
+)
+from app.models.user import User
+from app.services import push_fanout
+from app.tasks import notifications
+
+DEVICES = 50000
+USERS_WITHOUT_DEVICE = 300
+FAIL_EVERY = 97  # N 번째 기기마다 UNREGISTERED 응답
+
+FakeResponse = namedtuple("FakeResponse", ["success", "exception"])
+FakeBatchResponse = namedtuple("FakeBatchResponse", ["responses"])
+
+
+class FakeFCM:
+    """send_each_for_multicast 대역: 호출/토큰 수를 세고 토큰 번호로 실패 여부 결정"""
+
+    def __init__(self, fail_every: int = FAIL_EVERY, error=None):
+        self.fail_every = fail_every
+        self.error = error or (
+            lambda: messaging.UnregisteredError("Requested entity was not found.")
+        )
+        self.calls = 0
+        self.tokens = 0
+        self.max_batch = 0
+
+    def __call__(self, message):
+        self.calls += 1
+        self.tokens += len(message.tokens)
+        self.max_batch = max(self.max_batch, len(message.tokens))
+        return FakeBatchResponse(
+            [
+                (
+                    FakeResponse(False, self.error())
+                    if int(token.rsplit("-", 1)[1]) % self.fail_every == 0
+                    else FakeResponse(True, None)
+                )
+                for token in message.tokens
+            ]
+        )
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    # 실제 생성자를 거쳐야 Lua 스크립트가 등록됨
+    monkeypatch.setattr(
+        redis_module.redis.Redis,
+        "from_url",
+        lambda url, **kwargs: fakeredis.FakeRedis(decode_responses=True),
+    )
+    client = RedisClient()
+    monkeypatch.setattr(push_fanout, "redis_client", client)
+    monkeypatch.setattr(notifications, "redis_client", client)
+    return client
+
+
+@pytest.fixture
+def Session(monkeypatch):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    monkeypatch.setattr(notifications, "SessionLocal", session_factory)
+    yield session_factory
+    engine.dispose()
+
+
+@pytest.fixture
+def db(Session):
+    session = Session()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def fcm(monkeypatch):
+    fake = FakeFCM()
+    monkeypatch.setattr(push_fanout, "send_multicast", fake)
+    return fake
+
+
+@pytest.fixture
+def eager_celery():
+    previous = (
+        celery_app.conf.task_always_eager,
+        celery_app.conf.task_eager_propagates,
+    )
+    celery_app.conf.task_always_eager = True
+    celery_app.conf.task_eager_propagates = True
+    yield
+    (
+        celery_app.conf.task_always_eager,
+        celery_app.conf.task_eager_propagates,
+    ) = previous
+
+
+def seed_church(db, devices: int, users_without_device: int = 0) -> int:
+    church = Church(name="테스트교회")
+    db.add(church)
+    db.commit()
+
+    db.bulk_insert_mappings(
+        User,
+        [
+            {
+                "email": f"user{i}@example.com",
+                "username": f"user{i}",
+                "hashed_password": "x",
+                "church_id": church.id,
+                "is_active": True,
+            }
+            for i in range(devices + users_without_device)
+        ],
+    )
+    db.commit()
+    user_ids = [
+        user_id
+        for (user_id,) in db.query(User.id)
+        .filter(User.church_id == church.id)
+        .order_by(User.id)
+    ]
+    db.bulk_insert_mappings(
+        UserDevice,
+        [
+            {
+                "user_id": user_id,
+                "device_token": f"token-{i + 1}",
+                "platform": "android" if i % 3 else "ios",
+                "is_active": True,
+            }
+            for i, user_id in enumerate(user_ids[:devices])
+        ],
+    )
+    db.commit()
+    return church.id
+
+
+def create_notification(db, church_id: int) -> int:
+    notification = PushNotification(
+        church_id=church_id,
+        type=NotificationType.ANNOUNCEMENT,
+        title="공지",
+        body="교회 전체 알림",
+        data={"type": "announcement"},
+        target_type="all",
+    )
+    db.add(notification)
+    db.commit()
+    return notification.id
+
+
+def delivery_state(db, notification_id: int) -> dict:
+    db.expire_all()
+    notification = db.get(PushNotification, notification_id)
+    recipients = (
+        db.query(func.count(NotificationRecipient.id))
+        .filter(NotificationRecipient.notification_id == notification_id)
+        .scalar()
+    )
+    return {
+        "sent": notification.sent_count,
+        "failed": notification.failed_count,
+        "recipients": recipients,
+        "total_recipients": notification.total_recipients,
+    }
+
+
+def active_devices(db) -> int:
+    return (
+        db.query(func.count(UserDevice.id))
+        .filter(UserDevice.is_active == True)
+        .scalar()
+    )
+
+
+def test_church_wide_fanout_counts(db, redis, fcm, eager_celery):
+    church_id = seed_church(db, DEVICES, USERS_WITHOUT_DEVICE)
+    notification_id = create_notification(db, church_id)
+
+    notifications.send_push_notification_task.delay(notification_id)
+
+    dead = DEVICES // FAIL_EVERY
+    assert delivery_state(db, notification_id) == {
+        "sent": DEVICES - dead,
+        "failed": dead + USERS_WITHOUT_DEVICE,
+        "recipients": DEVICES + USERS_WITHOUT_DEVICE,
+        "total_recipients": DEVICES + USERS_WITHOUT_DEVICE,
+    }
+    assert db.get(PushNotification, notification_id).sent_at is not None
+
+    # 기기를 플랫폼순으로 나누므로 플랫폼이 바뀌는 shard 하나만 multicast 2회
+    shards = -(-DEVICES // push_fanout.FCM_BATCH_SIZE)
+    assert shards <= fcm.calls <= shards + 1
+    assert fcm.tokens == DEVICES
+    assert fcm.max_batch <= push_fanout.FCM_BATCH_SIZE
+
+    # UNREGISTERED 기기는 비활성화되고 통계에 남음
+    assert active_devices(db) == DEVICES - dead
+    day = datetime.now().strftime("%Y-%m-%d")
+    rate = push_fanout.dead_token_rate(church_id, day)
+    assert (rate["devices"], rate["dead_tokens"]) == (DEVICES, dead)
+
+
+def test_redelivered_task_is_idempotent(db, redis, fcm, eager_celery):
+    church_id = seed_church(db, 1200, 10)
+    notification_id = create_notification(db, church_id)
+    notifications.send_push_notification_task.delay(notification_id)
+    delivered = delivery_state(db, notification_id)
+    calls = fcm.calls
+
+    # shard 가 아직 도는 중 (sent_at 없음) 에 같은 작업이 다시 전달된 경우
+    db.get(PushNotification, notification_id).sent_at = None
+    db.commit()
+    notifications.send_push_notification_task.delay(notification_id)
+
+    assert fcm.calls == calls
+    assert delivery_state(db, notification_id) == delivered
+    assert not push_fanout.claim_dispatch(db, notification_id)
+
+
+def test_deliver_shard_with_injected_send(db, redis):
+    church_id = seed_church(db, 10)
+    notification_id = create_notification(db, church_id)
+    notification = db.get(PushNotification, notification_id)
+    [shard] = push_fanout.prepare_fanout(db, notification)
+
+    fake = FakeFCM(fail_every=5)
+    counts = push_fanout.deliver_shard(
+        db,
+        notification_id,
+        push_fanout.notification_payload(notification),
+        shard,
+        church_id,
+        send=fake,
+    )
+
+    assert counts == {"sent": 8, "failed": 2, "dead_tokens": 2}
+    assert fake.calls == 2  # android, ios
+    assert delivery_state(db, notification_id) == {
+        "sent": 8,
+        "failed": 2,
+        "recipients": 10,
+        "total_recipients": 10,
+    }
+    assert active_devices(db) == 8
+
+
+def test_invalid_argument_for_every_device_keeps_tokens(db, redis):
+    church_id = seed_church(db, 4)
+    notification_id = create_notification(db, church_id)
+    notification = db.get(PushNotification, notification_id)
+    [shard] = push_fanout.prepare_fanout(db, notification)
+
+    # 모든 기기가 INVALID_ARGUMENT 면 토큰이 아니라 메시지 문제로 봄
+    fake = FakeFCM(
+        fail_every=1,
+        error=lambda: exceptions.InvalidArgumentError("Invalid payload"),
+    )
+    counts = push_fanout.deliver_shard(
+        db,
+        notification_id,
+        push_fanout.notification_payload(notification),
+        shard,
+        church_id,
+        send=fake,
+    )
+
+    assert counts == {"sent": 0, "failed": 4, "dead_tokens": 0}
+    assert active_devices(db) == 4
@@ -0,0 +1,169 @@
+"""
+QR 체크인 write-behind 일괄 입력 테스트
+
+Redis 는 fakeredis, DB 는 sqlite 를 사용합니다.
+- 정상 항목은 출석으로 입력되고, 해석할 수 없는 항목/거부된 행은 dead-letter 로 이동
+- DB 오류가 난 항목은 시도 횟수를 올려 대기열에 되돌리고, 한도에 닿은 항목만 dead-letter 로 이동
+"""
+
+import json
+import time
+from datetime import date
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import models
+from app.core.config import settings
+from app.core.redis import RedisClient
+from app.db.base import Base
+from app.services import attendance_ingest, qr_checkin
+from app.services.qr_checkin import (
+    DEAD_LETTER_KEY,
+    PENDING_KEY,
+    CheckInBatcher,
+    QRCheckIn,
+)
+
+SERVICE_DATE = date(2026, 10, 18)
+
+
+@pytest.fixture
+def redis():
+    client = RedisClient.__new__(RedisClient)
+    client.client = fakeredis.FakeRedis(decode_responses=True)
+    client.connected = True
+    return client
+
+
+@pytest.fixture
+def Session(monkeypatch):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    monkeypatch.setattr(qr_checkin, "SessionLocal", session_factory)
+    yield session_factory
+    engine.dispose()
+
+
+@pytest.fixture
+def db(Session):
+    session = Session()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def batcher(redis, Session):
+    return CheckInBatcher(QRCheckIn(redis=redis), batch_size=100)
+
+
+@pytest.fixture
+def members(db):
+    church = models.Church(name="테스트교회")
+    other = models.Church(name="다른교회")
+    db.add_all([church, other])
+    db.commit()
+    members = [models.Member(church_id=church.id, name=f"교인{i}") for i in range(3)]
+    db.add_all(members)
+    db.commit()
+    return church, other, members
+
+
+def _queue(redis, *items):
+    redis.client.rpush(PENDING_KEY, *items)
+
+
+def _check_in(church_id: int, member_id: int) -> str:
+    return json.dumps(
+        {
+            "church_id": church_id,
+            "member_id": member_id,
+            "service_date": SERVICE_DATE.isoformat(),
+            "service_type": "주일예배",
+            "check_in_time": time.time(),
+        }
+    )
+
+
+def _dead_letters(redis):
+    return [json.loads(item) for item in redis.client.lrange(DEAD_LETTER_KEY, 0, -1)]
+
+
+def _attendances(db):
+    return {member_id for (member_id,) in db.query(models.Attendance.member_id)}
+
+
+def test_unparseable_and_rejected_items_move_to_dead_letter(
+    redis, db, batcher, members
+):
+    church, other, (first, second, _) = members
+    _queue(
+        redis,
+        _check_in(church.id, first.id),
+        "not json",
+        json.dumps({"church_id": church.id}),
+        _check_in(other.id, second.id),  # 다른 교회 소속으로 들어온 행
+        _check_in(church.id, second.id),
+    )
+
+    assert batcher.flush() == 5
+
+    assert _attendances(db) == {first.id, second.id}
+    assert redis.client.llen(PENDING_KEY) == 0
+    dead = _dead_letters(redis)
+    assert [entry.get("raw") for entry in dead[:2]] == [
+        "not json",
+        json.dumps({"church_id": church.id}),
+    ]
+    assert dead[2]["church_id"] == other.id and dead[2]["error"] == "rejected"
+    assert len(dead) == 3
+
+
+def test_failing_batch_is_retried_then_dead_lettered(
+    redis, db, batcher, members, monkeypatch
+):
+    church, _, (first, second, third) = members
+    failures = []
+    insert_attendance_chunk = attendance_ingest.insert_attendance_chunk
+
+    def failing_insert(db, rows, *args, **kwargs):
+        failures.append(len(rows))
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(attendance_ingest, "insert_attendance_chunk", failing_insert)
+    _queue(redis, _check_in(church.id, first.id), _check_in(church.id, second.id))
+
+    for attempt in range(1, settings.QR_CHECKIN_MAX_FLUSH_ATTEMPTS):
+        with pytest.raises(RuntimeError):
+            batcher.flush()
+        pending = [json.loads(item) for item in redis.client.lrange(PENDING_KEY, 0, -1)]
+        assert [item["member_id"] for item in pending] == [first.id, second.id]
+        assert {item["attempts"] for item in pending} == {attempt}
+
+    # 한도에 닿은 항목만 dead-letter 로 옮기고, 새로 들어온 항목은 다시 대기
+    _queue(redis, _check_in(church.id, third.id))
+    with pytest.raises(RuntimeError):
+        batcher.flush()
+    dead = _dead_letters(redis)
+    assert [entry["member_id"] for entry in dead] == [first.id, second.id]
+    assert dead[0]["attempts"] == settings.QR_CHECKIN_MAX_FLUSH_ATTEMPTS
+    assert "database unavailable" in dead[0]["error"]
+    assert len(failures) == settings.QR_CHECKIN_MAX_FLUSH_ATTEMPTS
+
+    # DB 가 돌아오면 남은 항목은 그대로 입력됨
+    monkeypatch.setattr(
+        attendance_ingest, "insert_attendance_chunk", insert_attendance_chunk
+    )
+    assert batcher.flush() == 1
+    assert _attendances(db) == {third.id}
+    assert redis.client.llen(PENDING_KEY) == 0